@@ -2,7 +2,8 @@ import os
 import math
 import logging
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+import json
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import numpy as np
 import pandas as pd
@@ -10,9 +11,6 @@ import joblib
 import requests
 from dotenv import load_dotenv
 import rasterio
-from rasterio.mask import mask
-import geopandas as gpd
-from shapely.geometry import Point, box     
 import warnings
 
 # Global Land Mask - Bellek optimizasyonu ile yükleme
@@ -49,16 +47,39 @@ from meteor_physics import (
     crater_depth_m_from_diameter,
     crater_diameter_m_pi_scaling,
     moment_magnitude_mw_from_energy,
-    simulate_atmospheric_entry_vectorized,
     validate_energy_partition,
     calculate_fireball_radius_m,
     calculate_horizon_distance_km,
     seismic_damage_radius_km,
+    standard_atmosphere_density,
     thermal_radius_m_corrected,
     thermal_radius_m_from_yield,
     thermal_radius_m_for_flux_threshold,
     tnt_equivalent_megatons,
     tnt_equivalent_tons,
+    us_standard_atmosphere_1976_table,
+)
+from entry_emulator import emulate_entry, load_entry_emulator
+from parallel_entry import simulate_atmospheric_entry_auto
+from population_grid import (
+    SHARED_DISC_MASK_CACHE,
+    disc_pixel_summary,
+    load_population_grid,
+    load_population_pyramid,
+    radial_population_profile,
+    raster_window_reader,
+)
+from raster_tiles import SHARED_TILE_CACHE, TiledRaster
+from jobs import JobManager, JobQueueFull, report_progress as report_job_progress
+from monte_carlo import (
+    DEFAULT_BLOCK_SIZE,
+    SAMPLERS,
+    entry_input_dims,
+    entry_input_sampler,
+    entry_inputs_from_normals,
+    run_adaptive_monte_carlo,
+    run_importance_sampling,
+    run_streaming_monte_carlo,
 )
 # Gelişmiş Fizik Motoru (Yarışma İçin)
 from physics_engine import AdvancedPhysics
@@ -221,6 +242,8 @@ if os.path.exists(SENTRY_THREATS_PATH):
         print(f"Sentry verileri yüklenirken hata: {e}")
 else:
     print(f"UYARI: JPL Sentry verileri bulunamadı.")
+# Gece taramasının (sentry_sweep.py) önceden hesaplanmış sıralama deposu
+SENTRY_SWEEP_DB = os.environ.get('SENTRY_SWEEP_DB', 'results/sentry_sweep.sqlite')
 
 # SMASS II Spektral Taksonomi
 TAXONOMY_PATH = 'datasets/smass_taxonomy.csv'
@@ -775,14 +798,21 @@ if os.path.exists(TSUNAMI_PHYS_PATH):
 # 39. US Standard Atmosphere 1976 (Atmosferik profil)
 ATMOSPHERE_PATH = 'datasets/us_standard_atmosphere_1976.json'
 ATMOSPHERE_1976 = None
+ATMOSPHERE_1976_TABLE = None  # Paylaşılan yoğunluk tablosu (meteor_physics; skaler ve toplu sorgular)
 if os.path.exists(ATMOSPHERE_PATH):
     try:
         with open(ATMOSPHERE_PATH, 'r', encoding='utf-8') as f:
             ATMOSPHERE_1976 = json.load(f)
+        ATMOSPHERE_1976_TABLE = us_standard_atmosphere_1976_table()
         print(f"✓ US Standard Atmosphere 1976 yüklendi ({len(ATMOSPHERE_1976.get('layers', []))} katman).")
     except Exception as e:
         print(f"Atmosphere 1976 hatası: {e}")
 
+# 39b. Giriş sonucu emülatörü (python entry_emulator.py build ile üretilir)
+ENTRY_EMULATOR = load_entry_emulator()
+if ENTRY_EMULATOR is not None:
+    print(f"✓ Entry emulator v{ENTRY_EMULATOR.version} yüklendi ({ENTRY_EMULATOR.meta.get('grid_points')} nokta).")
+
 # 40. DE440s Ephemeris (Binary - sadece varlık kontrolü)
 DE440S_PATH = 'datasets/de440s.bsp'
 DE440S_AVAILABLE = os.path.exists(DE440S_PATH)
@@ -816,8 +846,15 @@ print(f"TOPLAM VERİ SETİ: {TOTAL_DATASETS_LOADED}/50 yüklendi")
 print(f"{'='*60}\n")
 
 # Import Decision Support Engine
+# Sobol sensitivity budget cap per /decision_support request (n·6 entry-solver rows)
+DECISION_SENSITIVITY_MAX_SAMPLES = 8192
+# /decision_support_portfolio limits
+PORTFOLIO_MAX_SCENARIOS = 50_000
+PORTFOLIO_MAX_SAMPLES = 10_000
+PORTFOLIO_MAX_SENSITIVITY_TOP = 50
 try:
-    from decision_support_engine import DecisionSupportEngine, get_engine, format_for_claude
+    from decision_support_engine import (DecisionSupportEngine, get_engine, format_for_claude,
+                                         DEFAULT_SENSITIVITY_SAMPLES, sentry_portfolio_scenarios)
     DECISION_ENGINE = get_engine(seed=42)
     print(f"✓ Decision Support Engine ACTIVE - {len(DECISION_ENGINE.datasets_loaded)} datasets loaded")
     if DECISION_ENGINE.datasets_missing:
@@ -826,6 +863,12 @@ except Exception as e:
     print(f"Decision Support Engine init error: {e}")
     DECISION_ENGINE = None
 
+try:
+    from sentry_sweep import load_rankings as load_sentry_rankings
+except Exception as e:
+    print(f"Sentry sweep rankings unavailable: {e}")
+    load_sentry_rankings = None
+
 # ============================================================================
 # YARDIMCI FONKSİYONLAR - GELİŞMİŞ VERİ ENTEGRASYONU
 # ============================================================================
@@ -1587,47 +1630,17 @@ def get_meteorite_material_properties(composition):
     return {'tensile_strength_mpa': 25, 'weibull_modulus': 6}
 
 def get_atmospheric_density_at_altitude(altitude_km):
-    """Belirli irtifadaki atmosfer yoğunluğunu döndürür (US Standard 1976)."""
-    if ATMOSPHERE_1976 is None:
-        # Basit üstel azalma
-        rho_0 = 1.225  # kg/m³ deniz seviyesi
-        H = 8.5  # scale height km
-        return rho_0 * math.exp(-altitude_km / H)
-    
-    layers = ATMOSPHERE_1976.get('layers', [])
-    constants = ATMOSPHERE_1976.get('constants', {})
-    
-    R = constants.get('R_gas_constant', 8.31432)
-    g0 = constants.get('g0_gravity', 9.80665)
-    M = constants.get('M_air_molar_mass', 0.0289644)
-    
-    # Uygun katmanı bul
-    for i, layer in enumerate(layers):
-        base_alt = layer['base_altitude_km']
-        if i < len(layers) - 1:
-            next_alt = layers[i + 1]['base_altitude_km']
-        else:
-            next_alt = 100  # Karman çizgisi
-        
-        if base_alt <= altitude_km < next_alt:
-            lapse_rate = layer['lapse_rate_k_km']
-            base_temp = layer['base_temp_k']
-            base_density = layer['base_density_kgm3']
-            
-            delta_h = altitude_km - base_alt
-            
-            if abs(lapse_rate) < 0.001:
-                # İzotermik katman
-                scale_height = (R * base_temp) / (g0 * M * 1000)  # km cinsinden
-                return base_density * math.exp(-delta_h / scale_height)
-            else:
-                # Lapse rate olan katman
-                T = base_temp + lapse_rate * delta_h
-                exponent = -g0 * M / (R * lapse_rate / 1000)
-                return base_density * (T / base_temp) ** (exponent - 1)
-    
-    # Mesosphere üstü
-    return 1e-6
+    """Belirli irtifadaki atmosfer yoğunluğunu döndürür (US Standard 1976).
+
+    Skaler ve dizi girdisi aynı paylaşılan tablodan (meteor_physics.
+    standard_atmosphere_density) çözülür; 100 km ve üstü 1e-6 kg/m³ tabanıdır.
+    Dizi girdisi aynı şekilde dizi döner.
+    """
+    if ATMOSPHERE_1976_TABLE is None:
+        # Basit üstel azalma (rho_0 = 1.225 kg/m³, ölçek yüksekliği 8.5 km)
+        rho = 1.225 * np.exp(-np.asarray(altitude_km, dtype=float) / 8.5)
+        return float(rho) if rho.ndim == 0 else rho
+    return standard_atmosphere_density(altitude_km, ATMOSPHERE_1976_TABLE)
 
 def calculate_seasonality_casualty_multiplier(hour_local, day_of_week, month):
     """Zamanlama faktörlerinden kayıp çarpanı hesaplar."""
@@ -1874,9 +1887,27 @@ if not os.path.exists(WORLDPOP_FILE):
     print("="*60)
 else:
     print(f"'{WORLDPOP_FILE}' verisi belleğe yükleniyor...")
-    WORLDPOP_DATA_SRC = rasterio.open(WORLDPOP_FILE)
+    # Karo önbellekli pencere okuma (raster_tiles): her yarıçap sınırlı bellekle
+    WORLDPOP_DATA_SRC = TiledRaster(rasterio.open(WORLDPOP_FILE))
     print("Nüfus verisi başarıyla yüklendi.")
 
+# Nüfus önek toplamı deposu (python population_grid.py build ile üretilir);
+# varsa daire sorguları maskeleme yerine satır önek farklarından yanıtlanır
+POPULATION_GRID = load_population_grid()
+# /population_profile: istek başına en çok yarıçap sayısı
+POPULATION_PROFILE_MAX_POINTS = 512
+# Çok çözünürlüklü nüfus piramidi (python population_grid.py build-pyramid);
+# önek deposu yoksa büyük yarıçaplar buradan yanıtlanır
+POPULATION_PYRAMID = load_population_pyramid()
+if POPULATION_PYRAMID is not None:
+    print(f"✓ Population pyramid v{POPULATION_PYRAMID.version} yüklendi "
+          f"({', '.join(f'{POPULATION_PYRAMID.pixel_km(f):.0f} km' for f in POPULATION_PYRAMID.factors)}).")
+# Piramit varken bu yarıçapın üstü piramitten, altı tam çözünürlüklü rasterden
+POPULATION_DIRECT_MAX_RADIUS_KM = 150
+if POPULATION_GRID is not None:
+    print(f"✓ Population grid v{POPULATION_GRID.version} yüklendi "
+          f"({POPULATION_GRID.shape[0]}x{POPULATION_GRID.shape[1]}).")
+
 # --- DEM (Digital Elevation Model) & BATHYMETRY SETUP ---
 # Bilimsel Yarışma İçin Kritik: Gerçek Yükseklik ve Derinlik Verisi
 # GEBCO 2025 yüksek çözünürlüklü batimetri verileri kullanılıyor
@@ -1911,7 +1942,7 @@ GEBCO_TILE_SOURCES = {}
 OPEN_TOPO_API_ENABLED = False  # API kullanımını aktifleştir (dosya yoksa)
 if os.path.exists(DEM_FILE):
     try:
-        DEM_SRC = rasterio.open(DEM_FILE)
+        DEM_SRC = TiledRaster(rasterio.open(DEM_FILE))
         print(f"DEM verisi '{DEM_FILE}' yüklendi.")
     except Exception as e:
         print(f"DEM yükleme hatası: {e}")
@@ -1926,7 +1957,7 @@ loaded_tiles = 0
 for tile_key, tile_file in GEBCO_TILES.items():
     if os.path.exists(tile_file):
         try:
-            GEBCO_TILE_SOURCES[tile_key] = rasterio.open(tile_file)
+            GEBCO_TILE_SOURCES[tile_key] = TiledRaster(rasterio.open(tile_file))
             loaded_tiles += 1
         except Exception as e:
             print(f"  GEBCO tile yükleme hatası ({tile_file}): {e}")
@@ -1939,13 +1970,13 @@ else:
 # Global batimetri yükle (fallback)
 if os.path.exists(BATHYMETRY_GLOBAL_FILE):
     try:
-        BATHYMETRY_GLOBAL_SRC = rasterio.open(BATHYMETRY_GLOBAL_FILE)
+        BATHYMETRY_GLOBAL_SRC = TiledRaster(rasterio.open(BATHYMETRY_GLOBAL_FILE))
         print(f"  ✓ Global batimetri '{BATHYMETRY_GLOBAL_FILE}' yüklendi (fallback).")
     except Exception as e:
         print(f"  Global batimetri yükleme hatası: {e}")
 elif os.path.exists(BATHYMETRY_FILE_LEGACY):
     try:
-        BATHYMETRY_GLOBAL_SRC = rasterio.open(BATHYMETRY_FILE_LEGACY)
+        BATHYMETRY_GLOBAL_SRC = TiledRaster(rasterio.open(BATHYMETRY_FILE_LEGACY))
         print(f"  ✓ Eski batimetri '{BATHYMETRY_FILE_LEGACY}' yüklendi (legacy fallback).")
     except Exception as e:
         print(f"  Eski batimetri yükleme hatası: {e}")
@@ -1995,7 +2026,7 @@ def get_bathymetry_from_gebco(lat, lon):
     if tile_key in GEBCO_TILE_SOURCES:
         try:
             src = GEBCO_TILE_SOURCES[tile_key]
-            val = next(src.sample([(lon, lat)]))[0]
+            val = src.value_at(lon, lat)
             # GEBCO'da negatif değerler deniz derinliği, pozitif değerler kara yüksekliği
             if val < 0:
                 return abs(float(val)), "gebco_2025_tile"
@@ -2007,7 +2038,7 @@ def get_bathymetry_from_gebco(lat, lon):
     # 3. Global dosyadan oku (fallback)
     if BATHYMETRY_GLOBAL_SRC is not None:
         try:
-            val = next(BATHYMETRY_GLOBAL_SRC.sample([(lon, lat)]))[0]
+            val = BATHYMETRY_GLOBAL_SRC.value_at(lon, lat)
             if val < 0:
                 return abs(float(val)), "gebco_global"
             else:
@@ -2059,7 +2090,7 @@ def get_elevation_or_depth(lat, lon):
     # 1. Önce DEM (Kara) kontrolü - Lokal dosya
     if DEM_SRC:
         try:
-            val = next(DEM_SRC.sample([(lon, lat)]))[0]
+            val = DEM_SRC.value_at(lon, lat)
             if val > -100:  # Hata payı veya deniz seviyesi altı kara
                 elevation = float(val)
                 return elevation, "land"
@@ -2088,7 +2119,7 @@ def get_elevation_or_depth(lat, lon):
     # 4. Eski sistem fallback (BATHYMETRY_SRC)
     if BATHYMETRY_SRC:
         try:
-            val = next(BATHYMETRY_SRC.sample([(lon, lat)]))[0]
+            val = BATHYMETRY_SRC.value_at(lon, lat)
             if val < 0:
                 return -abs(float(val)), "water"
             else:
@@ -2106,7 +2137,8 @@ def get_elevation_or_depth(lat, lon):
 
 
 # YENİ EKLENEN FONKSİYON: Atmosferik Giriş Hesaplaması (Gelişmiş Fizik)
-def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa=1e7, surface_elevation_m=0):
+def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa=1e7, surface_elevation_m=0,
+                                use_emulator=False, dtype=np.float64):
     """
     Asteroitin atmosferden geçerken yavaşlamasını, kütle kaybını (ablation) ve parçalanmasını hesaplar.
 
@@ -2117,6 +2149,14 @@ def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, de
     - dh/dt = -v*sin(theta)
     - dm/dt = -(C_h * rho_atm * A * v^3)/(2Q)
     - P_ram = rho_atm*v^2; P_ram > sigma_yield ise parçalanma
+
+    use_emulator=True: etkileşimli çağrılar için önceden hesaplanmış tablo
+    (entry_emulator) kullanılır; ızgara dışındaki noktalar ve tablo yoksa
+    tam çözücüye düşülür. Tekil sonuçta "entry_model" hangisinin
+    kullanıldığını belirtir.
+
+    dtype=np.float32: Monte Carlo toplulukları için tek duyarlıklı RK4
+    (bellek trafiği yarıya iner; topluluk istatistikleri float64 ile uyumlu).
     """
     # Vektör / skaler uyumluluğu: mevcut API hem tekil hem vektör çağrılar yapıyor.
     mass_arr = np.atleast_1d(mass_kg).astype(float)
@@ -2142,14 +2182,7 @@ def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, de
     # RK4 integratörü (meteor_physics.py) artık tüm boyutlar için doğru fiziksel hesaplamayı yapıyor.
     # Büyük cisimler doğal olarak daha az yavaşlayacak, ancak simülasyon fizik kurallarına göre işleyecek.
 
-    results = simulate_atmospheric_entry_vectorized(
-        mass_kg=mass_arr,
-        diameter_m=diameter_arr,
-        velocity_kms=velocity_arr,
-        angle_deg=angle_arr,
-        density_kgm3=density_arr,
-        strength_pa=strength_arr,
-        surface_elevation_m=float(surface_elevation_m),
+    solver_kwargs = dict(
         Cd=DRAG_COEFFICIENT,
         g=GRAVITY,
         C_h=0.1,
@@ -2157,9 +2190,31 @@ def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, de
         dt=0.05,
         max_steps=20000,
     )
+    if use_emulator:
+        results = emulate_entry(
+            mass_arr, diameter_arr, velocity_arr, angle_arr, density_arr, strength_arr,
+            surface_elevation_m=float(surface_elevation_m),
+            emulator=ENTRY_EMULATOR,
+            **solver_kwargs,
+        )
+    else:
+        # Büyük partiler (SHARDED_MIN_SAMPLES+) otomatik olarak tüm çekirdeklere bölünür.
+        # Not: spawn işçileri __main__'i yeniden çalıştırır; `python app.py` ile başlatılırsa
+        # her işçi veri kümelerini yeniden yükler (bkz. parallel_entry modül açıklaması).
+        results = simulate_atmospheric_entry_auto(
+            mass_kg=mass_arr,
+            diameter_m=diameter_arr,
+            velocity_kms=velocity_arr,
+            angle_deg=angle_arr,
+            density_kgm3=density_arr,
+            strength_pa=strength_arr,
+            surface_elevation_m=float(surface_elevation_m),
+            dtype=dtype,
+            **solver_kwargs,
+        )
 
     if mass_arr.size == 1 and np.ndim(mass_kg) == 0:
-        return {
+        out = {
             "velocity_impact_kms": float(results["velocity_impact_kms"][0]),
             "mass_impact_kg": float(results["mass_impact_kg"][0]),
             "breakup_altitude_m": float(results["breakup_altitude_m"][0]),
@@ -2167,6 +2222,9 @@ def calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, de
             "is_airburst": bool(results["is_airburst"][0]),
             "energy_loss_percent": float(results["energy_loss_percent"][0]),
         }
+        if use_emulator:
+            out["entry_model"] = "emulator" if bool(results["emulated"][0]) else "exact"
+        return out
 
     return results
 
@@ -2225,7 +2283,7 @@ def get_bathymetry_depth(lat, lon, default_depth=3000):
     # 2. Eski sistem fallback
     if BATHYMETRY_SRC is not None:
         try:
-            val = next(BATHYMETRY_SRC.sample([(lon, lat)]))[0]
+            val = BATHYMETRY_SRC.value_at(lon, lat)
             if val < 0:
                 return abs(float(val))
             else:
@@ -2684,14 +2742,14 @@ def get_population_in_radius(lat, lon, radius_km):
     Belirtilen koordinat ve yarıçap (km) içindeki nüfusu hassas şekilde hesaplar.
     
     ÖZELLİKLER:
-    - Çok katmanlı adaptif sampling (büyük yarıçaplar için)
+    - Büyük yarıçaplar için çok çözünürlüklü nüfus piramidi (population_grid)
     - Deniz/kara ayrımı (okyanusta nüfus = 0)
     - Şehir merkezi tespiti ve yoğunluk profili
     - Radyal yoğunluk gradyanı hesaplama
     - Belirsizlik aralığı hesaplama
     - Çoklu validasyon katmanları
     """
-    if WORLDPOP_DATA_SRC is None:
+    if WORLDPOP_DATA_SRC is None and POPULATION_GRID is None and POPULATION_PYRAMID is None:
         return {"error": f"{WORLDPOP_FILE} bulunamadı.", "value": 0, "confidence": 0}
     
     if radius_km <= 0:
@@ -2700,19 +2758,16 @@ def get_population_in_radius(lat, lon, radius_km):
     try:
         src = WORLDPOP_DATA_SRC
         
-        # KÜÇÜK YARIÇAPLAR: Doğrudan tam hesaplama (<150km - bellek limiti)
-        if radius_km <= 150:
+        # Önek toplamı deposu her yarıçapta tam ve O(satır): halka örneklemesi gerekmez
+        if POPULATION_GRID is not None:
             return get_population_in_radius_direct(lat, lon, radius_km, src)
         
-        # BÜYÜK YARIÇAPLAR: Gelişmiş çok katmanlı sampling
-        # Her yarıçap için optimum sampling stratejisi
-        if radius_km <= 500:
-            return get_population_advanced_sampling(lat, lon, radius_km, src, layers=4)
-        elif radius_km <= 1000:
-            return get_population_advanced_sampling(lat, lon, radius_km, src, layers=6)
-        else:
-            # ÇOK BÜYÜK YARIÇAPLAR (>1000km): Kontinental seviye
-            return get_population_continental_scale(lat, lon, radius_km, src)
+        # BÜYÜK YARIÇAPLAR: Piramidin yarıçapa uygun en kaba seviyesi (ms mertebesi)
+        if POPULATION_PYRAMID is not None and (radius_km > POPULATION_DIRECT_MAX_RADIUS_KM or src is None):
+            return get_population_from_pyramid(lat, lon, radius_km)
+        
+        # Doğrudan tam hesaplama: karo önbellekli bloklar, her yarıçapta sınırlı bellek
+        return get_population_in_radius_direct(lat, lon, radius_km, src)
 
     except Exception as e:
         print(f"Nüfus Hesaplama Hatası: {e}")
@@ -2734,204 +2789,156 @@ def get_population_in_radius(lat, lon, radius_km):
         
         return int(area_km2 * base_density)
 
-def get_population_in_radius_direct(lat, lon, radius_km, src):
-    """KUSURSUZ Doğrudan raster maskeleme ile nüfus hesaplama."""
+def get_population_profile(lat, lon, radii_km, return_sources=False):
+    """
+    Aynı nokta etrafındaki birçok yarıçap için nüfus, tek pencere okumasıyla.
+
+    En büyük dairenin penceresi bir kez okunur (depo varsa önek farklarından,
+    yoksa WorldPop rasterinden) ve pikseller uzaklığa göre kovalanır. Her
+    yarıçapın ham toplamına get_population_in_radius ile aynı deniz kuralı ve
+    doğrulama katmanları (validate_population_total) uygulanır; sonuç
+    `radii_km` sırasıyla tamsayı listesidir. Veri kaynağı yoksa ya da okuma
+    başarısızsa None (çağıran get_population_in_radius'a düşer).
+    `return_sources=True` ise (nüfus, yarıçap başına kullanılan kaynak) çifti
+    döner: "population_grid", "population_pyramid" ya da "worldpop_raster".
+    """
+    radii = np.asarray(radii_km, dtype=float)
     try:
-        # BELLEK KORUMASI: Çok büyük yarıçaplar için direkt hesaplama yapma
-        if radius_km > 150:
-            # Büyük yarıçaplarda bu fonksiyon çağrılmamalı ama çağrılırsa fallback
-            raise MemoryError(f"Yarıçap çok büyük: {radius_km}km")
-        
-        point = Point(lon, lat)
-        
-        # Coğrafi koordinatları metrik bir sisteme dönüştür
-        gdf = gpd.GeoDataFrame([1], geometry=[point], crs="EPSG:4326")
-        gdf_proj = gdf.to_crs("EPSG:3395") 
-        
-        # Etki dairesini oluştur (metre cinsinden)
-        circle_proj = gdf_proj.buffer(radius_km * 1000)
-        
-        # KRİTİK DÜZELTME: Her zaman DAİRE geometrisi kullan (Bounding Box değil!)
-        # Daireyi raster'in CRS'ine çevir
-        circle_geo = circle_proj.to_crs(src.crs)
-        
-        # Daire maskesi ile veriyi oku
-        out_image, out_transform = mask(src, circle_geo, crop=True, nodata=src.nodata if hasattr(src, 'nodata') else -9999)
-        
-        # Veriyi işle
-        data = out_image[0]
-        
-        # NoData ve negatif değerleri sıfırla
-        if src.nodata is not None:
-            data = np.where(data == src.nodata, 0, data)
-        data = np.where(data < 0, 0, data)
-        
-        # Toplam nüfusu hesapla
-        total_pop = np.sum(data)
-        
-        # KUSURSUZ VALİDASYON KATMANLARI
-        # ================================
-        
-        # 1. Deniz Kontrolü: Okyanusta nüfus = 0
-        is_land = globe.is_land(lat, lon)
-        if not is_land:
-            # Kıyıya yakınsa kıyı nüfusunu hesapla
-            # Aksi halde okyanusun ortası = 0
-            if radius_km < 50:
-                return 0
+        if POPULATION_GRID is not None:
+            profile = POPULATION_GRID.radial_profile(lat, lon, radii)
+            sources = ["population_grid"] * radii.size
+        elif WORLDPOP_DATA_SRC is None and POPULATION_PYRAMID is None:
+            return None
+        else:
+            # Büyük yarıçaplar piramitten, küçükler tam çözünürlüklü rasterden
+            profile = np.zeros(radii.shape)
+            if WORLDPOP_DATA_SRC is None:
+                coarse = np.ones(radii.shape, dtype=bool)
+            elif POPULATION_PYRAMID is None:
+                coarse = np.zeros(radii.shape, dtype=bool)
+            else:
+                coarse = radii > POPULATION_DIRECT_MAX_RADIUS_KM
+            sources = ["population_pyramid" if c else "worldpop_raster" for c in coarse.tolist()]
+            if coarse.any():
+                profile[coarse] = POPULATION_PYRAMID.radial_profile(lat, lon, radii[coarse])
+            if not coarse.all():
+                profile[~coarse] = radial_population_profile(
+                    raster_window_reader(WORLDPOP_DATA_SRC), WORLDPOP_DATA_SRC.transform,
+                    WORLDPOP_DATA_SRC.shape, lat, lon, radii[~coarse], mask_cache=SHARED_DISC_MASK_CACHE
+                )
+    except Exception as e:
+        print(f"Nüfus profili hatası: {e}")
+        return None
+    # Deniz kontrolü: açık denizde küçük yarıçaplarda nüfus = 0 (get_population_in_radius ile aynı)
+    is_land = globe.is_land(lat, lon)
+    population = []
+    for radius_km, total_pop in zip(radii.tolist(), profile.tolist()):
+        if radius_km <= 0 or (not is_land and radius_km < 50):
+            population.append(0)
+        else:
+            population.append(validate_population_total(
+                total_pop, radius_km, population_pixel_summarizer(lat, lon, radius_km)))
+    if return_sources:
+        return population, sources
+    return population
+
+def get_population_from_pyramid(lat, lon, radius_km):
+    """
+    Nüfus piramidinden büyük yarıçaplı daire içi nüfus (seviye çözünürlüğünde tam),
+    raster/önek yoluyla aynı doğrulama katmanlarıyla.
+    """
+    total_pop = POPULATION_PYRAMID.disc_population(lat, lon, radius_km)
+    return validate_population_total(total_pop, radius_km, population_pixel_summarizer(lat, lon, radius_km))
+
+def population_pixel_summarizer(lat, lon, radius_km):
+    """
+    Doğrulama katmanları için daire içi piksel özeti (disc_pixel_summary) üreten
+    fonksiyon; tam çözünürlüklü kaynak önek deposu ya da WorldPop rasteridir.
+    Hiçbiri yoksa None.
+    """
+    if POPULATION_GRID is not None:
+        reader, transform, shape = POPULATION_GRID.read_window, POPULATION_GRID.transform, POPULATION_GRID.shape
+    elif WORLDPOP_DATA_SRC is not None:
+        reader = raster_window_reader(WORLDPOP_DATA_SRC)
+        transform, shape = WORLDPOP_DATA_SRC.transform, WORLDPOP_DATA_SRC.shape
+    else:
+        return None
+    return lambda clip=None: disc_pixel_summary(reader, transform, shape, lat, lon, radius_km, clip=clip,
+                                                mask_cache=SHARED_DISC_MASK_CACHE)
+
+def validate_population_total(total_pop, radius_km, summarize, summary=None):
+    """
+    KUSURSUZ VALİDASYON KATMANLARI: ham daire toplamına hangi kaynaktan
+    (önek deposu, raster, piramit, radyal profil) gelirse gelsin aynı kurallar.
+
+    Şehir merkezi ve outlier katmanları yalnızca toplam normal bölge sınırını
+    (500 kişi/km²) aşınca sonucu değiştirebilir; piksel özeti (`summarize`)
+    yalnızca o durumda hesaplanır. `summarize` None ise (tam çözünürlüklü
+    kaynak yok) bu katmanlar atlanır.
+    """
+    WORLD_POPULATION = 8_000_000_000
+    circle_area_km2 = np.pi * (radius_km ** 2)
+    
+    if total_pop > min(WORLD_POPULATION, circle_area_km2 * 500) and summarize is not None:
+        if summary is None:
+            summary = summarize()
         
         # 2. Şehir Merkezi Tespiti: Anormal yüksek yoğunluk kontrolü
-        valid_pixels = data[data > 0]
-        is_urban_center = False
-        
-        if len(valid_pixels) > 0:
-            pixel_mean = np.mean(valid_pixels)
-            pixel_max = np.max(valid_pixels)
-            
-            # Şehir merkezi göstergesi: Çok yüksek yoğunluk pixelleri
-            if pixel_max > 10000:  # Pixel başına 10000+ kişi = Megaşehir
-                is_urban_center = True
+        # Şehir merkezi göstergesi: Çok yüksek yoğunluk pixelleri (Pixel başına 10000+ kişi = Megaşehir)
+        is_urban_center = summary["count"] > 0 and summary["max"] > 10000
         
         # 3. Bölgesel Sınırlar
-        WORLD_POPULATION = 8_000_000_000
-        
         # Şehir merkezi için daha yüksek limit
         if is_urban_center:
             max_density_per_km2 = 30000  # Manhattan: ~27,000 kişi/km²
         else:
             max_density_per_km2 = 500  # Normal bölgeler
         
-        max_expected = min(WORLD_POPULATION, np.pi * (radius_km ** 2) * max_density_per_km2)
+        max_expected = min(WORLD_POPULATION, circle_area_km2 * max_density_per_km2)
         
         # 4. Outlier Düzeltmesi
-        if total_pop > max_expected:
-            if len(valid_pixels) > 0:
-                # İstatistiksel düzeltme: Aşırı değerleri çıkar
-                percentile_95 = np.percentile(valid_pixels, 95)
-                cleaned_data = np.where(data > percentile_95 * 2, percentile_95, data)
-                total_pop = np.sum(cleaned_data)
-                
-                # Hala yüksekse, median yoğunluk kullan
-                if total_pop > max_expected:
-                    median_density = np.median(valid_pixels)
-                    circle_area_km2 = np.pi * (radius_km ** 2)
-                    total_pop = int(circle_area_km2 * median_density * 0.8)
-        
-        # 5. MUTLAK SINIR: Dünya nüfusunu asla aşamaz
-        total_pop = min(total_pop, WORLD_POPULATION)
-        
-        # 6. Negatif kontrol
-        total_pop = max(0, total_pop)
-        
-        return int(total_pop)
-
-    except MemoryError:
-        print(f"Bellek yetersiz (radius={radius_km}km), tahmin kullanılıyor")
-        area_km2 = np.pi * (radius_km ** 2)
-        return int(area_km2 * 50)
-    except Exception as e:
-        print(f"Nüfus hesaplama hatası: {e}")
-        return {"error": f"Nüfus verisi işlenirken hata oluştu: {e}"}
+        if total_pop > max_expected and summary["count"] > 0:
+            # İstatistiksel düzeltme: Aşırı değerleri çıkar (ikinci geçiş, karolar önbellekte)
+            percentile_95 = summary["p95"]
+            total_pop = summarize(clip=(percentile_95 * 2, percentile_95))["total"]
+            
+            # Hala yüksekse, median yoğunluk kullan
+            if total_pop > max_expected:
+                total_pop = int(circle_area_km2 * summary["median"] * 0.8)
+    
+    # 5. MUTLAK SINIR: Dünya nüfusunu asla aşamaz
+    total_pop = min(total_pop, WORLD_POPULATION)
+    
+    # 6. Negatif kontrol
+    return int(max(0, total_pop))
 
-def get_population_advanced_sampling(lat, lon, radius_km, src, layers=3):
+def get_population_in_radius_direct(lat, lon, radius_km, src):
     """
-    GELİŞMİŞ ÇOK KATMANLI SAMPLING - BÜYÜK YARIÇAPLAR İÇİN
-    ======================================================
-    Büyük alanları konsantrik halkalar halinde böler ve her halkanın
-    yoğunluğunu ayrı ayrı örnekleyerek hassas sonuç üretir.
+    KUSURSUZ doğrudan nüfus hesaplama: ham toplam önek deposundan (varsa, O(satır))
+    ya da karo önbellekli raster bloklarından gelir; bellek yarıçaptan
+    bağımsızdır. Doğrulama katmanları iki yolda da aynıdır, depo yalnızca
+    hızlandırıcıdır.
     """
     try:
-        total_population = 0
-        ring_width = radius_km / layers
-        
-        for layer_idx in range(layers):
-            inner_radius = layer_idx * ring_width
-            outer_radius = (layer_idx + 1) * ring_width
-            mid_radius = (inner_radius + outer_radius) / 2
-            
-            num_samples = max(8, int(16 / (layer_idx + 1)))
-            ring_populations = []
-            valid_samples = 0
-            
-            for i in range(num_samples):
-                angle = (2 * np.pi * i) / num_samples
-                sample_lat = lat + (mid_radius / 111.32) * np.cos(angle)
-                sample_lon = lon + (mid_radius / (111.32 * np.cos(np.radians(lat)))) * np.sin(angle)
-                
-                if not globe.is_land(sample_lat, sample_lon):
-                    ring_populations.append(0)
-                    continue
-                
-                sample_pop = get_population_in_radius_direct(sample_lat, sample_lon, 8, src)
-                if isinstance(sample_pop, dict):
-                    sample_pop = 0
-                
-                if sample_pop > 0:
-                    valid_samples += 1
-                    sample_area = np.pi * (8 ** 2)
-                    density = sample_pop / sample_area
-                    ring_populations.append(density)
-                else:
-                    ring_populations.append(0)
-            
-            ring_area = np.pi * (outer_radius ** 2 - inner_radius ** 2)
-            
-            if ring_populations:
-                ring_density = np.median(ring_populations)
-                land_fraction = valid_samples / num_samples if num_samples > 0 else 0.5
-                ring_pop = ring_density * ring_area * land_fraction
-                total_population += ring_pop
-        
-        WORLD_POPULATION = 8_000_000_000
-        max_reasonable = min(WORLD_POPULATION, radius_km ** 2 * 300)
-        
-        if total_population > max_reasonable:
-            total_population = max_reasonable
-        
-        return int(max(0, total_population))
+        # 1. Deniz Kontrolü: Okyanusta nüfus = 0
+        is_land = globe.is_land(lat, lon)
+        if not is_land:
+            # Kıyıya yakınsa kıyı nüfusunu hesapla
+            # Aksi halde okyanusun ortası = 0
+            if radius_km < 50:
+                return 0
         
-    except Exception as e:
-        print(f"Advanced sampling hatası: {e}")
-        # Bellek limiti için max 80km
-        return get_population_in_radius_direct(lat, lon, min(radius_km, 80), src)
+        # Piksel merkezi dairenin içindeyse sayılır (NoData ve negatifler 0)
+        summarize = population_pixel_summarizer(lat, lon, radius_km)
+        if POPULATION_GRID is not None:
+            return validate_population_total(POPULATION_GRID.disc_population(lat, lon, radius_km), radius_km,
+                                             summarize)
+        summary = summarize()
+        return validate_population_total(summary["total"], radius_km, summarize, summary)
 
-def get_population_continental_scale(lat, lon, radius_km, src):
-    """KİTASAL ÖLÇEK NÜFUS HESAPLAMA (>1000km yarıçaplar)"""
-    try:
-        grid_size = 100
-        num_cells_axis = int(np.ceil(2 * radius_km / grid_size))
-        total_population = 0
-        
-        for i in range(num_cells_axis):
-            for j in range(num_cells_axis):
-                offset_lat = (i - num_cells_axis/2) * (grid_size / 111.32)
-                offset_lon = (j - num_cells_axis/2) * (grid_size / (111.32 * np.cos(np.radians(lat))))
-                cell_lat = lat + offset_lat
-                cell_lon = lon + offset_lon
-                
-                dist_km = haversine_distance(lat, lon, cell_lat, cell_lon)
-                if dist_km > radius_km:
-                    continue
-                
-                if not globe.is_land(cell_lat, cell_lon):
-                    continue
-                
-                # Bellek limiti: max 50km örnekleme
-                cell_pop = get_population_in_radius_direct(cell_lat, cell_lon, min(50, grid_size/2), src)
-                if isinstance(cell_pop, dict):
-                    cell_pop = 0
-                
-                if cell_pop > 0:
-                    total_population += cell_pop
-        
-        WORLD_POPULATION = 8_000_000_000
-        total_population = min(total_population, WORLD_POPULATION)
-        return int(max(0, total_population))
-        
     except Exception as e:
-        print(f"Continental scale hatası: {e}")
-        area_km2 = np.pi * (radius_km ** 2)
-        return int(area_km2 * 50)
+        print(f"Nüfus hesaplama hatası: {e}")
+        return {"error": f"Nüfus verisi işlenirken hata oluştu: {e}"}
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """İki nokta arası Haversine mesafe hesaplama (km)."""
@@ -2970,6 +2977,8 @@ def dataset_status():
                 "file": WORLDPOP_FILE,
                 "available": WORLDPOP_DATA_SRC is not None
             },
+            "raster_tile_cache": SHARED_TILE_CACHE.stats(),
+            "disc_mask_cache": SHARED_DISC_MASK_CACHE.stats(),
             "bathymetry": {
                 "source": "GEBCO 2025 High Resolution",
                 "tiles_loaded": len(GEBCO_TILE_SOURCES),
@@ -3338,9 +3347,36 @@ def get_sentry_threats():
         "source": "NASA/JPL Sentry System",
         "total_monitored": len(SENTRY_DF),
         "high_risk_count": len(high_risk),
-        "threats": threats
+        "threats": threats,
+        "rankings_url": "/sentry_rankings"
     })
 
+@app.route('/sentry_rankings')
+def get_sentry_rankings():
+    """
+    Gece taramasının (sentry_sweep.py) önceden hesaplanmış risk sıralaması.
+
+    Sorgu: location (temsili çarpma konumu), rank_by (palermo_scale,
+    expected_casualties, torino_scale, impact_probability), limit, offset.
+    Depo salt okunur açılır; hesaplama yapılmaz.
+    """
+    if load_sentry_rankings is None:
+        return jsonify({"error": "Sentry sweep module unavailable"}), 503
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 1000))
+        offset = max(0, int(request.args.get('offset', 0)))
+        kwargs = {"rank_by": request.args.get('rank_by', 'palermo_scale'), "limit": limit, "offset": offset}
+        if request.args.get('location'):
+            kwargs["location"] = request.args['location']
+        result = load_sentry_rankings(SENTRY_SWEEP_DB, **kwargs)
+    except FileNotFoundError:
+        return jsonify({"error": "No sweep results yet; run `python sentry_sweep.py`",
+                        "db": SENTRY_SWEEP_DB}), 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result["source"] = "NASA/JPL Sentry System (precomputed sweep)"
+    return jsonify(result)
+
 @app.route('/historical_impacts')
 def get_historical_impacts():
     """Tarihsel çarpışma kraterlerini döndürür."""
@@ -3774,6 +3810,93 @@ def get_dataset_asteroids():
 # ...existing code...
 
 # ------ MONTE CARLO SİMÜLASYONU İÇİN YENİ ENDPOINT ------
+# /simulate_monte_carlo blok boyutu: blok başına bellek sabit, iterations 10^8'e kadar çıkabilir
+MONTE_CARLO_BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+# Uyarlamalı modda varsayılan örnek bütçesi ve hassasiyeti izlenen metrikler
+MONTE_CARLO_MAX_ITERATIONS = 1_000_000
+MONTE_CARLO_ADAPTIVE_TARGETS = ("crater_m", "energy_mt")
+# Önem örneklemesi sorgularında kullanılabilen metrikler (P(metrik > eşik))
+MONTE_CARLO_TAIL_METRICS = ("crater_m", "energy_mt", "ground_impact")
+
+
+def _monte_carlo_entry_outcomes(inputs, dtype=np.float64):
+    """Bir örnek bloğu için krater çapı (m), enerji (MT) ve airburst bayrağı."""
+    # Atmosferik giriş (Vektörel Fonksiyon Çağrısı)
+    # YENİ: Yükseklik verisi eklenebilir (Şimdilik 0)
+    entry = calculate_atmospheric_entry(inputs["mass_kg"], inputs["diameter_m"], inputs["velocity_kms"],
+                                        inputs["angle_deg"], inputs["density_kgm3"],
+                                        strength_pa=inputs.get("strength_pa", 1e7), dtype=dtype)
+
+    v_impact_kms = np.asarray(entry["velocity_impact_kms"], dtype=float)
+    v_impact_ms = v_impact_kms * 1000
+    m_impact_kg = np.asarray(entry["mass_impact_kg"], dtype=float)
+    is_airburst = entry["is_airburst"]
+
+    # Enerji (Joule ve MT)
+    e_joules = 0.5 * m_impact_kg * (v_impact_ms**2)
+    e_mt = e_joules / 4.184e15
+
+    # Krater (Holsapple–Schmidt): D_c = K*(E/rho_t)^(1/3) * g^(-1/6)
+    rho_target = 2500.0
+    K = 1.0
+    d_crater = K * ((e_joules / rho_target) ** (1/3)) * (GRAVITY ** (-1/6))
+    d_crater = np.where(is_airburst, 0.0, d_crater)
+    return {"crater_m": d_crater, "energy_mt": e_mt, "airburst": is_airburst.astype(float)}
+
+
+def _monte_carlo_job_progress(total):
+    """Asenkron işte blok başına ilerleme + ara istatistik (senkron çağrıda etkisiz)."""
+    def progress(done, metrics):
+        if isinstance(metrics, dict):
+            partial = {name: {"count": m.count, "mean": float(m.mean), "std": float(m.std)}
+                       for name, m in metrics.items()}
+        else:
+            partial = {"tail_probabilities": metrics}
+        report_job_progress(done, total, stage="sampling", partial=partial)
+    return progress
+
+
+def _monte_carlo_tail_probabilities(spec, base, strength, iterations, seed, dtype):
+    """/simulate_monte_carlo önem örneklemesi modu: sorgu başına P(metrik > eşik)."""
+    base_strength, strength_sigma_dex = strength
+    dims = entry_input_dims(strength_sigma_dex)
+    queries = []
+    for query in spec.get('queries', [{"metric": "ground_impact"}]):
+        metric = str(query.get('metric', ''))
+        if metric not in MONTE_CARLO_TAIL_METRICS:
+            raise ValueError(f"metric şunlardan biri olmalı: {', '.join(MONTE_CARLO_TAIL_METRICS)}")
+        # ground_impact 0/1: eşik 0.5 "yere ulaştı" demektir
+        queries.append((metric, float(query.get('threshold', 0.5))))
+    shift = None
+    if spec.get('proposal'):
+        # Elle verilen öneri: boyut başına σ biriminde kaydırma (ör. {"strength": 2, "angle": 1})
+        shift = [float(spec['proposal'].get(name, 0.0)) for name in dims]
+
+    def sample_inputs(z):
+        return entry_inputs_from_normals(z, *base, base_strength=base_strength,
+                                         strength_sigma_dex=strength_sigma_dex)
+
+    def evaluate_block(inputs):
+        outcomes = _monte_carlo_entry_outcomes(inputs, dtype=dtype)
+        outcomes["ground_impact"] = 1.0 - outcomes["airburst"]
+        return outcomes
+
+    return run_importance_sampling(
+        sample_inputs,
+        evaluate_block,
+        queries,
+        dims=len(dims),
+        iterations=iterations,
+        shifts=None if shift is None else [shift] * len(queries),
+        seed=seed,
+        block_size=MONTE_CARLO_BLOCK_SIZE,
+        pilot_size=int(spec.get('pilot_size', 2000)),
+        # Krater/yere ulaşma bağlarını (airburst'lerde 0) çarpma enerjisi ayırır
+        tiebreak="energy_mt",
+        progress=_monte_carlo_job_progress(iterations),
+    ), dims
+
+
 @app.route('/simulate_monte_carlo', methods=['POST'])
 def simulate_monte_carlo():
     """
@@ -3781,84 +3904,134 @@ def simulate_monte_carlo():
     Tek bir sonuç yerine, parametrelerdeki belirsizliği hesaba katarak
     1000+ simülasyon yapar ve olasılık dağılımı çıkarır.
     Vektörize edilmiş hesaplama ile Yüksek Performans sağlar.
+
+    Örnekler bloklar halinde akar (monte_carlo.run_streaming_monte_carlo);
+    tek bloğa sığan koşularda yüzdelikler tam, daha büyüklerinde t-digest
+    tahminidir. İsteğe bağlı "seed" tekrarlanabilir sonuç verir.
+
+    Önem örneklemesi modu: "importance_sampling": {"queries": [{"metric":
+    "crater_m", "threshold": 1500}, {"metric": "ground_impact"}], "proposal":
+    {...}, "pilot_size": 2000} nadir kuyruk olasılıklarını (P(metrik > eşik))
+    olabilirlik oranıyla ağırlıklı örneklerle, varyans ve standart hatasıyla
+    döndürür; "iterations" sorgu başına örnek sayısıdır. Öneri verilmezse
+    çapraz entropi pilotu kaydırmayı seçer. Dayanım belirsizliği için
+    "strength_pa" (medyan) ve "strength_sigma_dex" (log10 σ) verilebilir.
+
+    Uyarlamalı mod: "target_relative_ci" (ör. 0.01 = ortalama krater ve
+    enerji için ±%1, %95 CI) verilirse "iterations" yok sayılır; örnekleme
+    hedefe ya da "max_iterations" bütçesine ulaşınca durur. Yanıttaki
+    "simulation_count" kullanılan örnek sayısıdır, "adaptive" ulaşılan
+    hassasiyeti raporlar.
     """
     try:
         data = request.json
         iterations = int(data.get('iterations', 10000)) # Varsayılan 10000 simülasyon
-        
+        # "double": float64 (varsayılan, önceki sonuçlarla aynı) | "single": float32 RK4 (isteğe bağlı, hızlı;
+        # topluluk istatistikleri float64 ile eşdeğer, bkz. test_entry_integrators.py)
+        precision = str(data.get('precision', 'double')).lower()
+        if precision not in ('single', 'double'):
+            return jsonify({"error": "precision 'single' veya 'double' olmalı"}), 400
+        
+        seed = data.get('seed')
+        seed = None if seed is None else int(seed)
+        # Örnekleme tasarımı: "random" | "sobol" | "lhs" (aynı marjinaller)
+        sampler = str(data.get('sampler', 'random')).lower()
+        if sampler not in SAMPLERS:
+            return jsonify({"error": f"sampler şunlardan biri olmalı: {', '.join(SAMPLERS)}"}), 400
+
         # Temel Değerler
         base_mass = float(data['mass_kg'])
         base_velocity = float(data['velocity_kms'])
         base_angle = float(data['angle_deg'])
         base_density = float(data['density'])
-        
-        # Monte Carlo - Sağlanan denklemlere göre örnekleme
-        # v ~ N(mu, sigma)
-        sigma_velocity = base_velocity * 0.05
-        velocities = np.random.normal(base_velocity, sigma_velocity, iterations)
-
-        # theta: ölçüm belirsizliği için base_angle etrafında örnekle (truncated normal)
-        # Uniform(0..90) taban girdiyi yok saydığı için pratikte daha az doğru.
-        sigma_angle = max(1.0, abs(base_angle) * 0.10)  # en az 1 derece
-        angles = np.random.normal(base_angle, sigma_angle, iterations)
-        angles = np.clip(angles, 0.1, 89.9)
-
-        # rho ~ p(rho)
-        # En basit yorum: kullanıcının verdiği yoğunluk etrafında dağılım (pozitif, sınırlı)
-        sigma_density = base_density * 0.10
-        densities = np.random.normal(base_density, sigma_density, iterations)
-
-        # Fiziksel sınırlar
-        velocities = np.maximum(velocities, 0.1)
-        densities = np.clip(densities, 100.0, 20000.0)
-
-        # Kütle sabit kabul edilir; yoğunluğa göre çap türetilir (küresel varsayım)
-        masses = np.full(iterations, base_mass, dtype=float)
-        vols = masses / densities
-        radii = ((3 * vols) / (4 * np.pi)) ** (1/3)
-        diameters = radii * 2.0
-        
-        # Atmosferik giriş (Vektörel Fonksiyon Çağrısı)
-        # YENİ: Yükseklik verisi eklenebilir (Şimdilik 0)
-        entry = calculate_atmospheric_entry(masses, diameters, velocities, angles, densities)
-        
-        v_impact_kms = entry["velocity_impact_kms"]
-        v_impact_ms = v_impact_kms * 1000
-        m_impact_kg = entry["mass_impact_kg"]
-        is_airburst = entry["is_airburst"]
-        
-        # Enerji (Joule ve MT)
-        e_joules = 0.5 * m_impact_kg * (v_impact_ms**2)
-        e_mt = e_joules / 4.184e15
-        
-        # Krater (Holsapple–Schmidt): D_c = K*(E/rho_t)^(1/3) * g^(-1/6)
-        rho_target = 2500.0
-        K = 1.0
-        d_crater = K * ((e_joules / rho_target) ** (1/3)) * (GRAVITY ** (-1/6))
-        d_crater = np.where(is_airburst, 0.0, d_crater)
-        
+        base_strength = float(data.get('strength_pa', 1e7))
+        strength_sigma_dex = float(data.get('strength_sigma_dex', 0.0))
+        entry_dtype = np.float32 if precision == 'single' else np.float64
+
+        if data.get('importance_sampling') is not None:
+            try:
+                tails, dims = _monte_carlo_tail_probabilities(
+                    data['importance_sampling'],
+                    (base_mass, base_velocity, base_angle, base_density),
+                    (base_strength, strength_sigma_dex),
+                    iterations,
+                    seed,
+                    entry_dtype,
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({
+                "mode": "importance_sampling",
+                "simulation_count": int(sum(t["samples"] + t["pilot_samples"] for t in tails)),
+                "precision": precision,
+                "proposal_dims": list(dims),
+                "tail_probabilities": tails,
+            })
+
+        # Akan Monte Carlo: MONTE_CARLO_BLOCK_SIZE'lık bloklar, metrik başına
+        # yalnızca moment / histogram / yüzdelik özetleri (bellek iterations'tan bağımsız)
+        sample_block = entry_input_sampler(base_mass, base_velocity, base_angle, base_density, sampler=sampler,
+                                           base_strength=base_strength, strength_sigma_dex=strength_sigma_dex)
+        evaluate_block = lambda inputs: _monte_carlo_entry_outcomes(inputs, dtype=entry_dtype)
+        adaptive = None
+        if data.get('target_relative_ci') is not None:
+            target = float(data['target_relative_ci'])
+            if not target > 0:
+                return jsonify({"error": "target_relative_ci pozitif olmalı"}), 400
+            max_iterations = int(data.get('max_iterations', MONTE_CARLO_MAX_ITERATIONS))
+            metrics, adaptive = run_adaptive_monte_carlo(
+                sample_block,
+                evaluate_block,
+                target_rel_half_width=target,
+                max_samples=max_iterations,
+                targets=MONTE_CARLO_ADAPTIVE_TARGETS,
+                block_size=MONTE_CARLO_BLOCK_SIZE,
+                seed=seed,
+                histogram_bins={"crater_m": 20},
+                progress=_monte_carlo_job_progress(max_iterations),
+            )
+            iterations = adaptive["samples_used"]
+        else:
+            metrics = run_streaming_monte_carlo(
+                sample_block,
+                evaluate_block,
+                iterations,
+                block_size=MONTE_CARLO_BLOCK_SIZE,
+                seed=seed,
+                histogram_bins={"crater_m": 20},
+                progress=_monte_carlo_job_progress(iterations),
+            )
+        crater = metrics["crater_m"]
+        ci_low, ci_high = crater.percentile([2.5, 97.5])
+        crater_counts, crater_edges = crater.histogram.result()
+
         # İstatistiksel Analiz
         stats = {
-            "mean_crater_m": float(np.mean(d_crater)),
-            "std_dev_crater": float(np.std(d_crater)),
-            "min_crater": float(np.min(d_crater)),
-            "max_crater": float(np.max(d_crater)),
+            "mean_crater_m": float(crater.mean),
+            "std_dev_crater": float(crater.std),
+            "min_crater": float(crater.moments.min),
+            "max_crater": float(crater.moments.max),
             "confidence_interval_95": [
-                float(np.percentile(d_crater, 2.5)),
-                float(np.percentile(d_crater, 97.5))
+                float(ci_low),
+                float(ci_high)
             ],
-            "probability_of_airburst": float(np.mean(is_airburst) * 100),
-            "mean_energy_mt": float(np.mean(e_mt))
+            "probability_of_airburst": float(metrics["airburst"].mean * 100),
+            "mean_energy_mt": float(metrics["energy_mt"].mean)
         }
 
-        return jsonify({
+        response = {
             "simulation_count": iterations,
+            "precision": precision,
+            "sampler": sampler,
             "statistics": stats,
             "histogram_data": {
-                "crater_bins": np.histogram(d_crater, bins=20)[0].tolist(),
-                "crater_edges": np.histogram(d_crater, bins=20)[1].tolist()
+                "crater_bins": crater_counts.tolist(),
+                "crater_edges": crater_edges.tolist()
             }
-        })
+        }
+        if adaptive is not None:
+            response["adaptive"] = adaptive
+        return jsonify(response)
 
     except Exception as e:
         print(f"Monte Carlo Hatası: {e}")
@@ -3946,7 +4119,8 @@ def validate_model():
         # Hesapla
         entry = calculate_atmospheric_entry(
             inp["mass_kg"], inp["diameter_m"], inp["velocity_kms"], 
-            inp["angle_deg"], inp["density"], inp.get("strength_pa", 1e7)
+            inp["angle_deg"], inp["density"], inp.get("strength_pa", 1e7),
+            use_emulator=True,
         )
         
         # Enerji Hesabı
@@ -3968,7 +4142,8 @@ def validate_model():
         model_result = {
             "energy_mt": round(e_entry_mt, 2), # Toplam enerji
             "airburst_altitude_km": round(entry["breakup_altitude_m"] / 1000, 1),
-            "is_airburst": entry["is_airburst"]
+            "is_airburst": entry["is_airburst"],
+            "entry_model": entry.get("entry_model", "exact"),
         }
         
         # Hata Analizi
@@ -4055,6 +4230,43 @@ def check_infrastructure_impact(lat, lon, radius_km):
         print(f"Altyapı analizi hatası: {e}")
         return []
 
+@app.route('/population_profile', methods=['GET', 'POST'])
+def population_profile():
+    """
+    Kümülatif nüfus – yarıçap eğrisi: arayüz halkaları yeni istek atmadan çizer.
+
+    Girdi (sorgu ya da JSON): latitude, longitude, max_radius_km, points
+    (eşit aralıklı yarıçap sayısı) veya doğrudan radii_km listesi.
+    """
+    try:
+        data = request.get_json(silent=True) or request.args
+        lat, lon = float(data['latitude']), float(data['longitude'])
+        radii = data.get('radii_km')
+        if radii is not None:
+            radii = [float(r) for r in (radii.split(',') if isinstance(radii, str) else radii)]
+        else:
+            points = int(data.get('points', 64))
+            points = max(2, min(points, POPULATION_PROFILE_MAX_POINTS))
+            radii = np.linspace(0.0, float(data['max_radius_km']), points).tolist()
+        if not radii or len(radii) > POPULATION_PROFILE_MAX_POINTS or min(radii) < 0:
+            return jsonify({"error": f"radii_km needs 1..{POPULATION_PROFILE_MAX_POINTS} non-negative values"}), 400
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Geçersiz girdi: {e}"}), 400
+    
+    result = get_population_profile(lat, lon, radii, return_sources=True)
+    if result is None:
+        return jsonify({"error": f"{WORLDPOP_FILE} bulunamadı."}), 404
+    population, sources = result
+    return jsonify({
+        "latitude": lat,
+        "longitude": lon,
+        "radii_km": radii,
+        "population": population,
+        # Yarıçap başına kullanılan kaynak; "sources" kullanılanların sıralı listesi
+        "source_per_radius": sources,
+        "sources": sorted(set(sources))
+    })
+
 @app.route('/calculate_human_impact', methods=['POST'])
 def calculate_human_impact():
     try:
@@ -4129,7 +4341,8 @@ def calculate_human_impact():
         strength_pa = mat_props["strength"]
         
         # YENİ: Yükseklik verisi ile hesapla
-        atm_entry = calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, density, strength_pa, surface_elevation_m)
+        atm_entry = calculate_atmospheric_entry(mass_kg, diameter_m, velocity_kms, angle_deg, density, strength_pa, surface_elevation_m,
+                                                use_emulator=True)
         
         # Hesaplamalarda artık "Yüzeye Çarpma" hız + kütleyi kullanıyoruz.
         impact_velocity_kms = atm_entry["velocity_impact_kms"]
@@ -4390,14 +4603,34 @@ def calculate_human_impact():
             
         thermal_radius_km = thermal_radius_m / 1000
         
-        affected_population = get_population_in_radius(lat, lon, thermal_radius_km)
-        
         # --- POPULATION IMPACT BREAKDOWN ---
         population_breakdown = {}
         
+        # Hasar yarıçapları önce toplanır; nüfus tek radyal profil okumasıyla bulunur
+        air_blast_radius_km = air_blast_radii.get("1_psi_km", 0) # Toplam enerjiden (1 psi - Cam kırılması)
+        destructive_seismic_radius_km = 0.0 if (is_airburst or seismic_mw < 4.0) else float(seismic_damage_radius_km(seismic_mw))
+        tsunami_radius_km = 0
+        if impact_category == "water" and tsunami_height_m > 1.0:
+            # Tsunami yarıçapı (Kabaca)
+            cavity_radius_m = 117 * (tnt_equivalent_megatons(E_crater_water) ** (1/3))
+            tsunami_radius_m = tsunami_height_m * cavity_radius_m / 1.0 
+            tsunami_radius_km = tsunami_radius_m / 1000
+        population_radii = {
+            "thermal": thermal_radius_km,
+            "airblast": air_blast_radius_km,
+            "seismic": destructive_seismic_radius_km,
+            "crater": ejecta_blanket_radius_km,
+            "tsunami": tsunami_radius_km,
+        }
+        population_counts = get_population_profile(lat, lon, list(population_radii.values()))
+        if population_counts is None:
+            population_counts = [get_population_in_radius(lat, lon, r) for r in population_radii.values()]
+        populations = dict(zip(population_radii, population_counts))
+        
+        affected_population = populations["thermal"]
+        
         # 1. Air Blast (1 psi - Cam kırılması / Hafif hasar sınırı)
-        air_blast_radius_km = air_blast_radii.get("1_psi_km", 0) # Toplam enerjiden
-        pop_airburst = get_population_in_radius(lat, lon, air_blast_radius_km)
+        pop_airburst = populations["airblast"]
         population_breakdown["airblast"] = {
             "radius_km": air_blast_radius_km,
             "count": pop_airburst if isinstance(pop_airburst, (int, float)) else 0,
@@ -4405,7 +4638,7 @@ def calculate_human_impact():
         }
         
         # 2. Thermal Radiation (Isısal Etki)
-        pop_thermal = get_population_in_radius(lat, lon, thermal_radius_km)
+        pop_thermal = populations["thermal"]
         
         # Ufuk limiti kontrolü (Görsel bilgi için)
         # Toplam Enerji üzerinden görsel limit hesabı (tutarlılık için)
@@ -4424,8 +4657,7 @@ def calculate_human_impact():
         }
         
         # 3. Seismic
-        destructive_seismic_radius_km = 0.0 if (is_airburst or seismic_mw < 4.0) else float(seismic_damage_radius_km(seismic_mw))
-        pop_seismic = get_population_in_radius(lat, lon, destructive_seismic_radius_km)
+        pop_seismic = populations["seismic"]
         population_breakdown["seismic"] = {
             "radius_km": destructive_seismic_radius_km,
             "count": pop_seismic if isinstance(pop_seismic, (int, float)) else 0,
@@ -4433,7 +4665,7 @@ def calculate_human_impact():
         }
 
         # 4. Crater / Ejecta (Krater ve Enkaz)
-        pop_crater = get_population_in_radius(lat, lon, ejecta_blanket_radius_km)
+        pop_crater = populations["crater"]
         population_breakdown["crater"] = {
             "radius_km": ejecta_blanket_radius_km,
             "count": pop_crater if isinstance(pop_crater, (int, float)) else 0,
@@ -4442,15 +4674,7 @@ def calculate_human_impact():
 
         # 5. Tsunami (Eğer su ise)
         if impact_category == "water":
-            # Tsunami yarıçapı (Kabaca)
-            if tsunami_height_m > 1.0:
-                 cavity_radius_m = 117 * (tnt_equivalent_megatons(E_crater_water) ** (1/3))
-                 tsunami_radius_m = tsunami_height_m * cavity_radius_m / 1.0 
-                 tsunami_radius_km = tsunami_radius_m / 1000
-            else:
-                 tsunami_radius_km = 0
-            
-            pop_tsunami = get_population_in_radius(lat, lon, tsunami_radius_km)
+            pop_tsunami = populations["tsunami"]
             population_breakdown["tsunami"] = {
                 "radius_km": tsunami_radius_km,
                 "count": pop_tsunami if isinstance(pop_tsunami, (int, float)) else 0,
@@ -5120,7 +5344,14 @@ def decision_support():
             impact_probability=impact_probability,
             affected_plants=affected_plants,
             base_population=base_population,
-            observation_arc_days=observation_arc_days
+            observation_arc_days=observation_arc_days,
+            sampler=str(data.get('sampler', 'random')).lower(),
+            target_rel_ci_half_width=(float(data['target_relative_ci'])
+                                      if data.get('target_relative_ci') is not None else None),
+            progress=lambda stage, index, total: report_job_progress(index, total, stage=stage),
+            sensitivity_samples=min(int(data.get('sensitivity_samples', DEFAULT_SENSITIVITY_SAMPLES)),
+                                    DECISION_SENSITIVITY_MAX_SAMPLES),
+            seed=int(data['seed']) if data.get('seed') is not None else None
         )
         
         return jsonify(result.to_dict())
@@ -5133,6 +5364,63 @@ def decision_support():
         }), 400
 
 
+@app.route('/decision_support_portfolio', methods=['POST'])
+def decision_support_portfolio():
+    """
+    Decision support pipeline for a whole threat portfolio in one batch.
+    
+    Input: {"scenarios": [{...decision_support fields...}, ...]} or
+           {"source": "sentry", "limit": N, "defaults": {...}} for the JPL Sentry list;
+           optional sampler, n_samples, seed, rank_by, sensitivity_top, include_results, top
+    Output: Risk ranking (+ per-scenario PipelineResults with include_results)
+    """
+    if DECISION_ENGINE is None:
+        return jsonify({
+            "error": "Decision Support Engine not initialized",
+            "suggestion": "Check if decision_support_engine.py is present"
+        }), 500
+    
+    try:
+        data = request.json or {}
+        if data.get('source') == 'sentry':
+            scenarios = sentry_portfolio_scenarios(SENTRY_THREATS_PATH, limit=data.get('limit'),
+                                                   **(data.get('defaults') or {}))
+        else:
+            scenarios = data.get('scenarios') or []
+        if not scenarios:
+            return jsonify({"error": "scenarios listesi ya da source='sentry' gerekli"}), 400
+        if len(scenarios) > PORTFOLIO_MAX_SCENARIOS:
+            return jsonify({"error": f"En fazla {PORTFOLIO_MAX_SCENARIOS} senaryo"}), 400
+        
+        result = DECISION_ENGINE.run_portfolio(
+            scenarios,
+            sampler=str(data.get('sampler', 'random')).lower(),
+            n_samples=min(int(data.get('n_samples', 1000)), PORTFOLIO_MAX_SAMPLES),
+            seed=int(data['seed']) if data.get('seed') is not None else None,
+            rank_by=str(data.get('rank_by', 'palermo_scale')),
+            sensitivity_top=min(int(data.get('sensitivity_top', 0)), PORTFOLIO_MAX_SENSITIVITY_TOP),
+            sensitivity_samples=min(int(data.get('sensitivity_samples', DEFAULT_SENSITIVITY_SAMPLES)),
+                                    DECISION_SENSITIVITY_MAX_SAMPLES),
+            progress=lambda stage, index, total: report_job_progress(index, total, stage=stage)
+        )
+        
+        payload = result.to_dict(include_results=bool(data.get('include_results', False)))
+        if data.get('top') is not None:
+            top = int(data['top'])
+            payload["ranking"] = payload["ranking"][:top]
+            if "results" in payload:
+                kept = {row["scenario_id"] for row in payload["ranking"]}
+                payload["results"] = [r for r in payload["results"] if r["metadata"]["scenario_id"] in kept]
+        return jsonify(payload)
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }), 400
+
+
 @app.route('/analytical_interpretation', methods=['POST'])
 def analytical_interpretation():
     """
@@ -5387,6 +5675,10 @@ def get_dataset_status():
         }
     })
 
+# /comprehensive_impact_analysis bölüm sayısı (asenkron iş ilerlemesi)
+COMPREHENSIVE_SECTION_COUNT = 15
+
+
 @app.route('/comprehensive_impact_analysis', methods=['POST'])
 def comprehensive_impact_analysis():
     """
@@ -5437,6 +5729,7 @@ def comprehensive_impact_analysis():
         }
         
         # ================== 1. ASTEROİT İÇ YAPI ANALİZİ ==================
+        report_job_progress(0, COMPREHENSIVE_SECTION_COUNT, stage="internal_structure")
         if ASTEROID_INTERNAL:
             internal = get_asteroid_internal_structure(spectral_type)
             if internal:
@@ -5451,22 +5744,24 @@ def comprehensive_impact_analysis():
             strength_mpa = 10
         
         # ================== 2. METEORİT FİZİĞİ ==================
+        report_job_progress(1, COMPREHENSIVE_SECTION_COUNT, stage="material_properties")
         if METEORITE_PHYSICS:
             material_props = get_meteorite_material_properties(composition)
             result["physics_analysis"]["material_properties"] = material_props
             result["datasets_used"].append("meteorite_physics.json")
         
         # ================== 3. ATMOSFERİK ANALİZ (US Standard 1976) ==================
+        report_job_progress(2, COMPREHENSIVE_SECTION_COUNT, stage="atmosphere")
         if ATMOSPHERE_1976:
             # Çeşitli irtifalarda yoğunluk
             altitudes = [0, 10, 20, 30, 40, 50, 60, 70, 80]
-            atm_profile = {}
-            for alt in altitudes:
-                atm_profile[f"{alt}km"] = get_atmospheric_density_at_altitude(alt)
+            densities = get_atmospheric_density_at_altitude(np.array(altitudes, dtype=float))
+            atm_profile = {f"{alt}km": float(rho) for alt, rho in zip(altitudes, densities)}
             result["physics_analysis"]["atmospheric_profile"] = atm_profile
             result["datasets_used"].append("us_standard_atmosphere_1976.json")
         
         # ================== 4. AIRBURST HESAPLAMASI ==================
+        report_job_progress(3, COMPREHENSIVE_SECTION_COUNT, stage="airburst")
         if AIRBURST_MODEL:
             breakup_alt = calculate_airburst_altitude(diameter_m, velocity_kms, strength_mpa, angle_deg)
             
@@ -5482,6 +5777,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("atmospheric_airburst_model.json")
         
         # ================== 5. ENERJİ HESAPLAMALARI ==================
+        report_job_progress(4, COMPREHENSIVE_SECTION_COUNT, stage="energy")
         velocity_ms = velocity_kms * 1000
         energy_j = 0.5 * mass_kg * velocity_ms ** 2
         energy_mt = energy_j / (4.184e15)
@@ -5496,6 +5792,7 @@ def comprehensive_impact_analysis():
         }
         
         # ================== 6. KRATER VE HASAR YARICAPLARI ==================
+        report_job_progress(5, COMPREHENSIVE_SECTION_COUNT, stage="crater_and_damage")
         crater_diameter_m = crater_diameter_m_pi_scaling(mass_kg, velocity_ms, angle_deg, bulk_density, 2500)
         crater_depth = crater_depth_m_from_diameter(crater_diameter_m)
         blast_radii = airblast_radii_km_from_energy_j(energy_j)
@@ -5513,6 +5810,7 @@ def comprehensive_impact_analysis():
         result["impact_effects"]["seismic_magnitude"] = round(seismic_mag, 1)
         
         # ================== 7. SİSMİK YAYILIM (PREM MODELİ) ==================
+        report_job_progress(6, COMPREHENSIVE_SECTION_COUNT, stage="seismic")
         if PREM_MODEL is not None:
             seismic_at_100km = get_seismic_propagation_prem(0, 100)
             seismic_at_500km = get_seismic_propagation_prem(0, 500)
@@ -5523,6 +5821,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("prem_earth_model.csv")
         
         # ================== 8. TSUNAMİ ANALİZİ (GELİŞMİŞ) ==================
+        report_job_progress(7, COMPREHENSIVE_SECTION_COUNT, stage="tsunami")
         is_ocean = not globe.is_land(lat, lon)
         
         if is_ocean and TSUNAMI_PHYSICS:
@@ -5544,12 +5843,14 @@ def comprehensive_impact_analysis():
             result["impact_effects"]["tsunami"] = {"is_ocean_impact": False}
         
         # ================== 9. TOPOĞRAFYA ETKİLERİ ==================
+        report_job_progress(8, COMPREHENSIVE_SECTION_COUNT, stage="terrain")
         if TOPOGRAPHY_DATA:
             terrain = get_terrain_effects(lat, lon)
             result["impact_effects"]["terrain"] = terrain
             result["datasets_used"].append("topography_slope_aspect.json")
         
         # ================== 10. ALTYAPI ETKİSİ ==================
+        report_job_progress(9, COMPREHENSIVE_SECTION_COUNT, stage="infrastructure")
         damage_radius_km = blast_radii.get('severe_km', 10)
         
         # Nükleer santraller
@@ -5577,6 +5878,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("submarine_cables.json")
         
         # ================== 11. SOSYO-EKONOMİK ETKİ ==================
+        report_job_progress(10, COMPREHENSIVE_SECTION_COUNT, stage="socioeconomic")
         # Nüfus etkisi
         thermal_km = thermal_radius / 1000
         estimated_pop = estimate_population_in_radius(lat, lon, thermal_km)
@@ -5593,6 +5895,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("socioeconomic_vulnerability_index.json")
         
         # ================== 12. ÇEVRESEL ETKİ ==================
+        report_job_progress(11, COMPREHENSIVE_SECTION_COUNT, stage="environment")
         # Biyoçeşitlilik
         if BIO_DF is not None:
             bio_impact = analyze_biodiversity_impact(lat, lon, damage_radius_km)
@@ -5618,6 +5921,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("impact_winter_parameters.json")
         
         # ================== 13. ZAMANSAL ANALİZ ==================
+        report_job_progress(12, COMPREHENSIVE_SECTION_COUNT, stage="temporal")
         if SEASONALITY_DATA:
             casualty_multiplier = calculate_seasonality_casualty_multiplier(hour_local, day_of_week, month)
             result["temporal_analysis"] = {
@@ -5630,6 +5934,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("seasonality_timing_effects.json")
         
         # ================== 14. TARİHSEL DOĞRULAMA ==================
+        report_job_progress(13, COMPREHENSIVE_SECTION_COUNT, stage="historical_validation")
         if HISTORICAL_DAMAGES:
             # Chelyabinsk benzeri olay mı?
             if 300 < energy_kt < 1000 and diameter_m < 30:
@@ -5650,6 +5955,7 @@ def comprehensive_impact_analysis():
             result["datasets_used"].append("historical_impacts.csv")
         
         # ================== 15. BELİRSİZLİK ANALİZİ ==================
+        report_job_progress(14, COMPREHENSIVE_SECTION_COUNT, stage="uncertainty")
         if UNCERTAINTY_DATA:
             result["uncertainty_quantification"] = {
                 "energy_uncertainty_percent": UNCERTAINTY_DATA.get('mass', {}).get('uncertainty_1sigma', 30),
@@ -5705,6 +6011,11 @@ except Exception as e:
     SCIENTIFIC_FUNCTIONS_LOADED = False
 
 
+# run_uncertainty_analysis örnek sayısı (her örnek giriş çözücüsünden geçer;
+# emülatörsüz float32 çözücüyle tek çekirdekte ~1-2 s)
+UNCERTAINTY_ANALYSIS_SAMPLES = 20_000
+
+
 @app.route('/scientific_impact_analysis', methods=['POST'])
 def scientific_impact_analysis():
     """
@@ -5726,6 +6037,18 @@ def scientific_impact_analysis():
         longitude = float(data.get('longitude', 30))
         spectral_type = data.get('spectral_type', 'S')
         
+        # Belirsizlik analizi tohumu: negatif olmayan tamsayı (bool/float kabul edilmez)
+        seed = data.get('seed')
+        if seed is not None:
+            try:
+                if isinstance(seed, (bool, float)):
+                    raise TypeError(seed)
+                seed = int(seed)
+            except (TypeError, ValueError):
+                seed = -1
+            if seed < 0:
+                return jsonify({"error": "seed negatif olmayan bir tamsayı olmalı"}), 400
+        
         # Zaman/mevsim
         impact_datetime = data.get('datetime', {'month': 6, 'hour': 12})
         
@@ -5737,6 +6060,7 @@ def scientific_impact_analysis():
         }
         
         # ========== 1. SPEKTRAL TAKSONOMİ ÖZELLİKLERİ ==========
+        composition = None
         if ASTEROID_INTERNAL:
             composition = get_composition_from_taxonomy(spectral_type, ASTEROID_INTERNAL)
             if composition:
@@ -5875,15 +6199,22 @@ def scientific_impact_analysis():
         
         # ========== 12. BELİRSİZLİK ANALİZİ ==========
         if UNCERTAINTY_PARAMS:
+            uncertainty_inputs = {
+                'mass_kg': mass_kg,
+                'diameter_m': diameter_m,
+                'density_kgm3': density_kgm3,
+                'velocity_kms': velocity_kms,
+                'angle_deg': angle_deg,
+                'spectral_type': spectral_type
+            }
+            if composition and composition.get('tensile_strength_pa'):
+                uncertainty_inputs['strength_pa'] = composition['tensile_strength_pa']
             uncertainty = run_uncertainty_analysis(
-                {
-                    'mass_kg': mass_kg,
-                    'velocity_kms': velocity_kms,
-                    'angle_deg': angle_deg,
-                    'energy_mt': energy_mt
-                },
+                uncertainty_inputs,
                 UNCERTAINTY_PARAMS,
-                n_samples=100
+                n_samples=UNCERTAINTY_ANALYSIS_SAMPLES,
+                seed=seed,
+                entry_emulator=ENTRY_EMULATOR
             )
             if uncertainty:
                 result["scientific_features"]["12_uncertainty_analysis"] = uncertainty
@@ -5984,6 +6315,117 @@ def calculate_airburst_dynamics():
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================================================
+# ASENKRON İŞ (JOB) API'Sİ - ağır endpoint'ler için gönder / izle / iptal / sonuç
+# ============================================================================
+
+# Süreç havuzunda çalıştırılabilen endpoint'ler (gövde senkron çağrıyla aynı)
+JOB_ENDPOINTS = ("simulate_monte_carlo", "decision_support", "decision_support_portfolio",
+                 "comprehensive_impact_analysis")
+JOB_MANAGER = JobManager(
+    max_workers=int(os.getenv("JOB_WORKERS", "0")) or None,
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "32")),
+)
+
+
+def _run_endpoint_job(endpoint, payload):
+    """İşçi süreçte: endpoint'i gerçek bir istek bağlamında çağırır, (durum kodu, JSON) döndürür."""
+    with app.test_request_context(f"/{endpoint}", method="POST", json=payload):
+        response = app.make_response(app.view_functions[endpoint]())
+    return response.status_code, response.get_json()
+
+
+@app.route('/jobs/<string:endpoint>', methods=['POST'])
+def submit_job(endpoint):
+    """İşi kuyruğa alır: 202 + iş kimliği. Gövde, senkron endpoint'inkiyle aynıdır."""
+    if endpoint not in JOB_ENDPOINTS:
+        return jsonify({"error": f"endpoint şunlardan biri olmalı: {', '.join(JOB_ENDPOINTS)}"}), 404
+    try:
+        job_id = JOB_MANAGER.submit(endpoint, _run_endpoint_job, endpoint, request.get_json() or {})
+    except JobQueueFull as e:
+        return jsonify({"error": f"İş kuyruğu dolu: {e}"}), 429
+    return jsonify({
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "stream_url": f"/jobs/{job_id}/stream",
+        "result_url": f"/jobs/{job_id}/result",
+    }), 202
+
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({"jobs": JOB_MANAGER.list_jobs()})
+
+
+@app.route('/jobs/<string:job_id>', methods=['GET'])
+def job_status(job_id):
+    """Durum, ilerleme (done/total/stage) ve son ara istatistikler."""
+    try:
+        return jsonify(JOB_MANAGER.status(job_id))
+    except KeyError:
+        return jsonify({"error": "İş bulunamadı"}), 404
+
+
+@app.route('/jobs/<string:job_id>/stream', methods=['GET'])
+def job_stream(job_id):
+    """İlerleme olaylarını Server-Sent Events olarak akıtır; iş bitince kapanır.
+
+    "Last-Event-ID" başlığı ya da ?after= ile kaldığı yerden devam edilir.
+    """
+    try:
+        JOB_MANAGER.status(job_id)
+    except KeyError:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    try:
+        after = int(request.headers.get('Last-Event-ID', request.args.get('after', 0)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Last-Event-ID / after bir tamsayı olmalı"}), 400
+
+    def events():
+        last = after
+        while True:
+            try:
+                batch, done = JOB_MANAGER.wait_events(job_id, last)
+            except KeyError:
+                return
+            for event in batch:
+                last = event["id"]
+                yield f"id: {last}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            if done and not batch:
+                return
+            if not batch:
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache"})
+
+
+@app.route('/jobs/<string:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Kuyruktaki iş hemen, çalışan iş bir sonraki ilerleme noktasında iptal edilir."""
+    try:
+        state = JOB_MANAGER.cancel(job_id)
+    except KeyError:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    return jsonify({"job_id": job_id, "state": state}), 200 if state == "cancelled" else 202
+
+
+@app.route('/jobs/<string:job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Bittiyse endpoint'in yanıtı (aynı durum koduyla); bitmediyse 202 + durum."""
+    try:
+        state, result = JOB_MANAGER.result(job_id)
+    except KeyError:
+        return jsonify({"error": "İş bulunamadı"}), 404
+    if state == "succeeded":
+        status_code, body = result
+        return jsonify(body), status_code
+    if state in ("queued", "running"):
+        return jsonify(JOB_MANAGER.status(job_id)), 202
+    # failed / cancelled
+    return jsonify(JOB_MANAGER.status(job_id)), 409
+
+
 # --- STATIC FILE SERVING ---
 @app.route('/')
 def serve_index_page():
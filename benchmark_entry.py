@@ -0,0 +1,98 @@
+"""
+Atmosferik giriş motoru mikro-benchmark'ı.
+
+Monte Carlo tipi bir karışımla (0.5–300 m, 11–40 km/s, 5–85°) giriş
+döngüsünün farklı yollarını karşılaştırır:
+
+    - masked  : her adımda boolean maske ile gather/scatter (eski yol)
+    - compact : yoğun, periyodik olarak sıkıştırılan aktif küme
+    - buffered: compact + önceden ayrılmış tamponlarla (out=) RK4 çekirdeği (varsayılan)
+    - numba   : örnek başına derlenmiş RK4 döngüsü (Numba kuruluysa; ilk çağrı derleme içerir)
+    - sharded : parallel_entry ile paylaşılan bellekte parçalanmış, tüm çekirdeklerde
+
+Kullanım:
+    python benchmark_entry.py                      # 1e3, 1e5, 1e6 örnek
+    python benchmark_entry.py --sizes 1000 20000 --repeat 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from meteor_physics import _simulate_entry_core
+
+ENTRY_KWARGS = dict(
+    start_altitude_m=100000.0,
+    surface_elevation_m=0.0,
+    Cd=0.47,
+    g=9.81,
+    C_h=0.1,
+    Q=8e6,
+    dt=0.05,
+    max_steps=20000,
+    return_history=False,
+    pancake_tau_s=1.0,
+    pancake_max_factor=5.0,
+)
+
+VARIANTS = {
+    "masked": dict(method="rk4", compact_active=False),
+    "compact": dict(method="rk4", compact_active=True, buffered_kernel=False),
+    "buffered": dict(method="rk4", compact_active=True, buffered_kernel=True),
+    "numba": dict(method="rk4", backend="numba"),
+    # parallel_entry: parçalar tüm çekirdeklerde (buffered çekirdek ile)
+    "sharded": dict(method="rk4"),
+}
+
+
+def monte_carlo_batch(n, seed=0):
+    return sample_monte_carlo_batch(np.random.default_rng(seed), n)
+
+
+def sample_monte_carlo_batch(rng, n):
+    diameter = 10 ** rng.uniform(np.log10(0.5), np.log10(300.0), n)
+    density = rng.uniform(1000.0, 7800.0, n)
+    mass = density * np.pi / 6.0 * diameter ** 3
+    velocity = rng.uniform(11.0, 40.0, n)
+    angle = rng.uniform(5.0, 85.0, n)
+    strength = 10 ** rng.uniform(5.0, 8.0, n)
+    return mass, diameter, velocity, angle, density, strength
+
+
+def time_variant(batch, variant, repeat, max_steps):
+    kwargs = dict(ENTRY_KWARGS, max_steps=max_steps, **VARIANTS[variant])
+    if variant == "sharded":
+        from parallel_entry import simulate_atmospheric_entry_sharded as run
+
+        kwargs.pop("return_history")
+    else:
+        run = _simulate_entry_core
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run(*batch, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--variants", nargs="+", default=["masked", "compact", "buffered"], choices=list(VARIANTS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--max-steps", type=int, default=ENTRY_KWARGS["max_steps"])
+    args = parser.parse_args()
+
+    baseline = args.variants[0]
+    print(f"{'n':>10} " + " ".join(f"{v:>12}" for v in args.variants) + "   speedup vs " + baseline)
+    print("-" * (12 + 13 * len(args.variants) + 20))
+    for n in args.sizes:
+        batch = monte_carlo_batch(n)
+        times = {v: time_variant(batch, v, args.repeat, args.max_steps) for v in args.variants}
+        speedups = " ".join(f"{times[baseline] / times[v]:.2f}x" for v in args.variants[1:])
+        print(f"{n:>10} " + " ".join(f"{times[v]:>11.3f}s" for v in args.variants) + "   " + speedups)
+
+
+if __name__ == "__main__":
+    main()
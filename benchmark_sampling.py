@@ -0,0 +1,102 @@
+"""
+Monte Carlo örnekleme tasarımları benchmark'ı: random vs Sobol vs LHS.
+
+/simulate_monte_carlo senaryosu (sabit kütle; hız, açı, yoğunluk belirsiz;
+tam RK4 giriş + Holsapple–Schmidt krater) her tasarım ve örnek sayısı N için
+`--reps` bağımsız tohumla koşturulur. Ortalama krater çapı ve ortalama
+enerji tahmincilerinin tekrarlar arası standart sapmasından %95 CI yarı
+genişliği (1.96·σ) ölçülür. Genişliğin N'ye göre log-log eğimi her tasarım
+için uydurulur ve random'un en büyük N'deki genişliğine ulaşmak için gereken
+örnek sayısı raporlanır.
+
+Kullanım:
+    python benchmark_sampling.py                         # Tunguska benzeri (~75 m) senaryo
+    python benchmark_sampling.py --sizes 256 1024 4096 --reps 32
+    python benchmark_sampling.py --mass 1.2e7 --velocity 19.16 --angle 18.3 --density 3300
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from meteor_physics import simulate_atmospheric_entry_vectorized
+from monte_carlo import SAMPLERS, entry_input_sampler
+
+# app.calculate_atmospheric_entry ile aynı çözücü ayarları
+SOLVER_KWARGS = dict(Cd=0.47, g=9.81, C_h=0.1, Q=8e6, dt=0.05, max_steps=20000)
+GRAVITY = 9.81
+
+
+def crater_and_energy(inputs):
+    """/simulate_monte_carlo değerlendirmesi: (krater çapı m, çarpma enerjisi MT)."""
+    res = simulate_atmospheric_entry_vectorized(
+        inputs["mass_kg"], inputs["diameter_m"], inputs["velocity_kms"], inputs["angle_deg"],
+        inputs["density_kgm3"], 1e7, **SOLVER_KWARGS,
+    )
+    e_joules = 0.5 * res["mass_impact_kg"] * (res["velocity_impact_kms"] * 1000.0) ** 2
+    crater = ((e_joules / 2500.0) ** (1 / 3)) * (GRAVITY ** (-1 / 6))
+    crater = np.where(res["is_airburst"], 0.0, crater)
+    return crater, e_joules / 4.184e15
+
+
+def ci_half_widths(scenario, sampler, n, reps, seed):
+    """Tekrarlar arası σ'dan ortalama krater / enerji için 1.96·σ."""
+    means = np.empty((reps, 2))
+    for r in range(reps):
+        sample = entry_input_sampler(*scenario, sampler=sampler)
+        crater, energy = crater_and_energy(sample(np.random.default_rng((seed, r)), n))
+        means[r] = crater.mean(), energy.mean()
+    return 1.96 * means.std(axis=0, ddof=1), means.mean(axis=0)
+
+
+def samples_for_width(sizes, widths, target):
+    """log(genişlik) ~ a + b·log(N) uydurup hedef genişlik için N."""
+    slope, intercept = np.polyfit(np.log(sizes), np.log(widths), 1)
+    if slope >= 0:
+        return float("inf"), slope
+    return float(np.exp((np.log(target) - intercept) / slope)), slope
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mass", type=float, default=5.5e8)
+    parser.add_argument("--velocity", type=float, default=15.0)
+    parser.add_argument("--angle", type=float, default=35.0)
+    parser.add_argument("--density", type=float, default=2500.0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256, 512, 1024])
+    parser.add_argument("--reps", type=int, default=16)
+    parser.add_argument("--samplers", nargs="+", default=list(SAMPLERS), choices=list(SAMPLERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scenario = (args.mass, args.velocity, args.angle, args.density)
+    sizes = np.asarray(args.sizes, dtype=float)
+    widths = {}
+    print(f"{'sampler':>8} {'N':>7} {'crater ±95% (m)':>16} {'energy ±95% (MT)':>17} {'time':>7}")
+    for sampler in args.samplers:
+        rows = []
+        for n in args.sizes:
+            t0 = time.perf_counter()
+            half, mean = ci_half_widths(scenario, sampler, n, args.reps, args.seed)
+            rows.append(half)
+            print(f"{sampler:>8} {n:>7} {half[0]:>16.4g} {half[1]:>17.4g} {time.perf_counter() - t0:>6.1f}s")
+        widths[sampler] = np.array(rows)
+
+    reference = args.samplers[0]
+    print()
+    print(f"Samples needed for {reference}'s CI width at N={args.sizes[-1]}:")
+    for column, label in ((0, "crater"), (1, "energy")):
+        target = widths[reference][-1, column]
+        for sampler in args.samplers:
+            w = widths[sampler][:, column]
+            if np.all(w == 0):
+                print(f"  {label:>6} {sampler:>7}: zero spread (deterministic)")
+                continue
+            needed, slope = samples_for_width(sizes, np.maximum(w, 1e-300), target)
+            print(f"  {label:>6} {sampler:>7}: N ≈ {needed:>10.0f}  (width ∝ N^{slope:.2f}, "
+                  f"{args.sizes[-1] / needed:.1f}x fewer than {reference})")
+
+
+if __name__ == "__main__":
+    main()
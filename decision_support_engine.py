@@ -16,14 +16,18 @@ Every output includes:
     - Model limitation acknowledgment
 """
 
+import csv
 import json
 import math
 import hashlib
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
 
+from parallel_entry import simulate_atmospheric_entry_auto
+from monte_carlo import DesignSampler, SAMPLERS, next_batch_size, normal_ppf, relative_ci_half_width, sobol_indices
+
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
@@ -93,6 +97,7 @@ class PhysicsDistribution:
     seismic_magnitude: ConfidenceInterval
     validation_error_pct: float
     model_used: str
+    sampling: Optional[Dict[str, Any]] = None  # adaptive sample-size report
     
     def to_dict(self) -> Dict:
         result = {
@@ -110,6 +115,8 @@ class PhysicsDistribution:
             result["crater_diameter_km"] = self.crater_diameter_km.to_dict()
         if self.tsunami_height_m:
             result["tsunami_height_m"] = self.tsunami_height_m
+        if self.sampling:
+            result["sampling"] = self.sampling
         return result
 
 
@@ -228,13 +235,20 @@ class SensitivityAnalysis:
     parameter_ranking: List[Dict]  # [{param, normalized_effect, direction}]
     dominant_driver: str
     sensitivity_method: str
+    indices: Optional[Dict[str, Dict[str, Dict]]] = None  # metric -> parameter -> Sobol indices
+    budget: Optional[Dict[str, Any]] = None  # evaluations / batches used
     
     def to_dict(self) -> Dict:
-        return {
+        result = {
             "parameter_ranking": self.parameter_ranking,
             "dominant_driver": self.dominant_driver,
             "sensitivity_method": self.sensitivity_method
         }
+        if self.indices:
+            result["indices"] = self.indices
+        if self.budget:
+            result["budget"] = self.budget
+        return result
 
 
 @dataclass
@@ -309,10 +323,90 @@ class PipelineResult:
         }
 
 
+@dataclass
+class PortfolioResult:
+    """Batch pipeline output: one PipelineResult per scenario plus a risk ranking."""
+    results: List[PipelineResult]
+    ranking: List[Dict]  # [{rank, scenario_id, palermo_scale, torino_scale, expected_casualties, ...}]
+    rank_by: str
+    n_samples: int
+    sampler: str
+
+    def to_dict(self, include_results: bool = True) -> Dict:
+        result = {
+            "n_scenarios": len(self.results),
+            "rank_by": self.rank_by,
+            "n_samples": self.n_samples,
+            "sampler": self.sampler,
+            "ranking": self.ranking
+        }
+        if include_results:
+            result["results"] = [r.to_dict() for r in self.results]
+        return result
+
+
 # =============================================================================
 # DECISION SUPPORT ENGINE
 # =============================================================================
 
+# Normal draws per compute_physics_distribution call (quasi-random design width)
+PHYSICS_DESIGN_DIMS = 8
+# Overpressure → cube-root blast radius scale (km per MT^1/3)
+BLAST_RADIUS_SCALES = (("1_psi", 0.8), ("5_psi", 0.4), ("20_psi", 0.15))
+# run_full_pipeline stages (progress reporting)
+PIPELINE_STAGE_COUNT = 8
+# Casualty timeline: (t_hours, cumulative fraction of final total, phase, infrastructure status)
+CASUALTY_TIMELINE = (
+    (0, 0.30, "Primary Impact", ["blast_wave", "thermal_flash"]),
+    (0.017, 0.50, "Immediate Aftermath", ["fire_ignition", "building_damage"]),
+    (1, 0.70, "Peak Casualties", ["fire_spread", "collapse_progression"]),
+    (24, 0.85, "Medical Surge", ["hospital_overload", "power_failure"]),
+    (168, 0.95, "Infrastructure Cascade", ["water_failure", "supply_chain"]),
+    (720, 1.00, "Recovery Phase", ["stabilization", "reconstruction"])
+)
+INFRASTRUCTURE_CASCADE = (
+    {"system": "power_grid", "fail_time_hours": 0, "dependency": "direct_damage"},
+    {"system": "water_supply", "fail_time_hours": 4, "dependency": "power_grid"},
+    {"system": "healthcare", "fail_time_hours": 12, "dependency": "power_grid + water"},
+    {"system": "communication", "fail_time_hours": 2, "dependency": "power_grid"},
+    {"system": "transportation", "fail_time_hours": 1, "dependency": "direct_damage"},
+    {"system": "food_supply", "fail_time_hours": 48, "dependency": "transportation + power"}
+)
+# Independent random streams per pipeline run, spawned in this order
+PIPELINE_RNG_STREAMS = ("physics", "sensitivity")
+# Global sensitivity: uncertain inputs (design column order) and reported metrics
+SENSITIVITY_PARAMETERS = ("velocity_kms", "mass_kg", "angle_deg", "density_kgm3")
+SENSITIVITY_METRICS = ("energy_mt", "crater_diameter_km", "thermal_radius_km", "affected_population")
+# Base samples per Sobol run; cost is n·(d + 2) entry-solver rows
+DEFAULT_SENSITIVITY_SAMPLES = 512
+# Entry solver settings used by app.calculate_atmospheric_entry
+SENSITIVITY_ENTRY_KWARGS = dict(Cd=0.47, g=9.81, C_h=0.1, Q=8e6, dt=0.05, max_steps=20000)
+SENSITIVITY_STRENGTH_PA = 1e7
+# run_portfolio: scenario × sample draws per physics batch (bounds the (N, n_samples) arrays)
+PORTFOLIO_CHUNK_DRAWS = 262_144
+PORTFOLIO_RANK_KEYS = ("palermo_scale", "expected_casualties", "torino_scale", "impact_probability")
+# Scenario fields a run_portfolio row may omit (same defaults as /decision_support)
+PORTFOLIO_SCENARIO_DEFAULTS = {
+    "velocity_kms": 20.0,
+    "angle_deg": 45.0,
+    "density_kgm3": 2500.0,
+    "lat": 0.0,
+    "lon": 0.0,
+    "is_ocean": False,
+    "country": "Unknown",
+    "impact_probability": 0.001,
+    "affected_plants": (),
+    "base_population": 1000000,
+    "observation_arc_days": 30
+}
+# Entry speed from Sentry v_inf: v² = v_inf² + v_esc² (Earth escape speed, km/s)
+EARTH_ESCAPE_VELOCITY_KMS = 11.186
+
+def scenario_seed_sequence(scenario_hash: str, seed: int) -> np.random.SeedSequence:
+    """SeedSequence for one pipeline run, keyed by the scenario hash and the seed."""
+    return np.random.SeedSequence([int(scenario_hash, 16), int(seed)])
+
+
 class DecisionSupportEngine:
     """
     Unified uncertainty-aware decision support pipeline.
@@ -324,8 +418,9 @@ class DecisionSupportEngine:
     
     def __init__(self, datasets_dir: str = "datasets", seed: int = 42):
         self.datasets_dir = Path(datasets_dir)
+        # No global np.random seeding: each pipeline run draws from its own
+        # Generators (see scenario_seed_sequence), so concurrent runs don't interleave
         self.seed = seed
-        np.random.seed(seed)
         
         # Load critical datasets
         self.uncertainty_params = self._load_json("parameter_uncertainty_distributions.json")
@@ -482,6 +577,19 @@ class DecisionSupportEngine:
     # STAGE 2: PHYSICS DISTRIBUTION
     # =========================================================================
     
+    def _input_sigma_percents(self) -> Tuple[float, float]:
+        """(diameter, density) 1-sigma in percent from model_error_profile_validation.json."""
+        if self.uncertainty_params:
+            phys_unc = self.uncertainty_params.get("physical_parameter_uncertainties", {})
+            diameter_sigma_pct = phys_unc.get("diameter_uncertainty", {}).get(
+                "measurement_methods", {}
+            ).get("absolute_magnitude_only", {}).get("typical_sigma_percent", 50)
+            density_sigma_pct = phys_unc.get("density_uncertainty", {}).get(
+                "typical_sigma_percent", 30
+            )
+            return diameter_sigma_pct, density_sigma_pct
+        return 50, 30
+    
     def compute_physics_distribution(
         self,
         mass_kg: float,
@@ -489,49 +597,90 @@ class DecisionSupportEngine:
         angle_deg: float,
         density_kgm3: float,
         is_ocean: bool,
-        n_samples: int = 1000
+        n_samples: int = 1000,
+        sampler: str = "random",
+        target_rel_ci_half_width: Optional[float] = None,
+        max_samples: int = 100_000,
+        rng: Optional[np.random.Generator] = None,
+        is_airburst: Optional[bool] = None
     ) -> PhysicsDistribution:
         """
         Compute physics outcomes with Monte Carlo uncertainty propagation.
         
+        `sampler` picks the joint design of the normal draws: "random"
+        (independent draws from `rng`), "sobol" (scrambled) or "lhs". The
+        marginals and their clipping are the same for all three. Without
+        `rng` a Generator seeded with the engine seed is used.
+        
+        With `target_rel_ci_half_width` (e.g. 0.01) the first `n_samples` draws
+        are extended in batches until the 95% CI half-width of every reported
+        mean is within that fraction of the mean, or `max_samples` is reached.
+        The impact type is decided on the first batch; the achieved precision
+        is reported in `sampling`.
+        
+        `is_airburst` (e.g. the entry solver's flag) replaces the size-based
+        airburst draw when given; the draw is still consumed, so the other
+        random streams are unchanged.
+        
         Sources: physics_engine.py, model_error_profile_validation.json
         """
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Unknown sampler {sampler!r}; expected one of {SAMPLERS}")
+        rng = rng if rng is not None else np.random.default_rng(self.seed)
+        design_sampler = None
+        if sampler != "random":
+            # One design column per normal draw below (velocity, density, angle,
+            # altitude or crater, thermal, 3 blast radii)
+            design_sampler = DesignSampler(sampler, PHYSICS_DESIGN_DIMS, rng)
+
+        def batch_normal(k):
+            design = None if design_sampler is None else iter(design_sampler.standard_normal(k).T)
+
+            def normal(mu, sigma):
+                if design is None:
+                    return rng.normal(mu, sigma, k)
+                return mu + sigma * next(design)
+            return normal
+
         # Get uncertainty parameters
-        if self.uncertainty_params:
-            phys_unc = self.uncertainty_params.get("physical_parameter_uncertainties", {})
-            diameter_sigma_pct = phys_unc.get("diameter_uncertainty", {}).get(
-                "measurement_methods", {}
-            ).get("absolute_magnitude_only", {}).get("typical_sigma_percent", 50)
-            density_sigma_pct = phys_unc.get("density_uncertainty", {}).get(
-                "typical_sigma_percent", 30
-            )
-        else:
-            diameter_sigma_pct = 50
-            density_sigma_pct = 30
+        diameter_sigma_pct, density_sigma_pct = self._input_sigma_percents()
         
         # Velocity uncertainty: 5% typical
         velocity_sigma = velocity_kms * 0.05
         
-        # Sample parameter distributions
-        velocities = np.random.normal(velocity_kms, velocity_sigma, n_samples)
-        velocities = np.clip(velocities, 5, 72)
-        
-        densities = np.random.normal(density_kgm3, density_kgm3 * density_sigma_pct / 100, n_samples)
-        densities = np.clip(densities, 500, 8000)
-        
-        angles = np.random.normal(angle_deg, max(1, angle_deg * 0.1), n_samples)
-        angles = np.clip(angles, 5, 85)
-        
-        # Compute energy distribution
-        energies_j = 0.5 * mass_kg * (velocities * 1000) ** 2
-        energies_mt = energies_j / 4.184e15
-        
-        energy_ci = ConfidenceInterval(
-            mean=float(np.mean(energies_mt)),
-            ci_lower=float(np.percentile(energies_mt, 2.5)),
-            ci_upper=float(np.percentile(energies_mt, 97.5)),
-            source="Monte_Carlo_N=" + str(n_samples)
-        )
+        def sample_inputs(normal):
+            velocities = normal(velocity_kms, velocity_sigma)
+            velocities = np.clip(velocities, 5, 72)
+            
+            densities = normal(density_kgm3, density_kgm3 * density_sigma_pct / 100)
+            densities = np.clip(densities, 500, 8000)
+            
+            angles = normal(angle_deg, max(1, angle_deg * 0.1))
+            angles = np.clip(angles, 5, 85)
+            
+            # Energy per sample
+            energies_j = 0.5 * mass_kg * (velocities * 1000) ** 2
+            return densities, energies_j
+        
+        def sample_outcomes(normal, energies_mt):
+            outcomes = {}
+            if impact_type == "airburst":
+                # Chyba-Hills model: altitude depends on strength and velocity
+                altitude_samples = normal(base_altitude, base_altitude * 0.18)
+                outcomes["airburst_altitude_km"] = np.clip(altitude_samples, 5, 60)
+            else:
+                # Pi-scaling: D ~ E^0.25
+                crater_samples = 0.1 * (energies_mt ** 0.25) * normal(1, 0.15)
+                outcomes["crater_diameter_km"] = np.maximum(crater_samples, 0)
+            # Thermal radius
+            outcomes["thermal_radius_km"] = thermal_base * np.sqrt(energies_mt) * normal(1, 0.1)
+            # Blast radii for different overpressures
+            for psi, scale in BLAST_RADIUS_SCALES:
+                outcomes["blast_radius_km." + psi] = scale * (energies_mt ** (1/3)) * normal(1, 0.1)
+            return outcomes
+        
+        normal = batch_normal(n_samples)
+        densities, energies_j = sample_inputs(normal)
         
         # Determine impact type based on energy and composition
         volume = mass_kg / np.mean(densities)
@@ -547,7 +696,8 @@ class DecisionSupportEngine:
         elif diameter < 200:
             airburst_prob = 0.1
         
-        is_airburst = np.random.random() < airburst_prob
+        airburst_draw = rng.random() < airburst_prob
+        is_airburst = airburst_draw if is_airburst is None else bool(is_airburst)
         
         if is_airburst:
             impact_type = "airburst"
@@ -555,15 +705,57 @@ class DecisionSupportEngine:
             impact_type = "ocean"
         else:
             impact_type = "land"
+        base_altitude = 30 - np.log10(max(diameter, 1)) * 10
+        thermal_base = 7.0 if not is_airburst else 14.0
+        
+        samples = sample_outcomes(normal, energies_j / 4.184e15)
+        samples_used = n_samples
+        sampling = None
+        if target_rel_ci_half_width is not None:
+            if not target_rel_ci_half_width > 0:
+                raise ValueError("target_rel_ci_half_width must be positive")
+            max_samples = max(int(max_samples), n_samples)
+            batches = 1
+            while True:
+                energies_mt = energies_j / 4.184e15
+                achieved = {"energy_mt": relative_ci_half_width(energies_mt.size, float(np.mean(energies_mt)),
+                                                                float(np.std(energies_mt)))}
+                for key, values in samples.items():
+                    achieved[key] = relative_ci_half_width(values.size, float(np.mean(values)), float(np.std(values)))
+                worst = max(achieved.values())
+                if worst <= target_rel_ci_half_width or samples_used >= max_samples:
+                    break
+                k = next_batch_size(samples_used, worst, target_rel_ci_half_width, min_batch=n_samples,
+                                    max_batch=max_samples, remaining=max_samples - samples_used)
+                normal = batch_normal(k)
+                _, batch_energies_j = sample_inputs(normal)
+                batch = sample_outcomes(normal, batch_energies_j / 4.184e15)
+                energies_j = np.concatenate([energies_j, batch_energies_j])
+                samples = {key: np.concatenate([values, batch[key]]) for key, values in samples.items()}
+                samples_used += k
+                batches += 1
+            sampling = {
+                "mode": "adaptive",
+                "target_relative_ci_half_width": target_rel_ci_half_width,
+                "achieved_relative_ci_half_width": achieved,
+                "samples_used": samples_used,
+                "max_samples": max_samples,
+                "batches": batches,
+                "converged": worst <= target_rel_ci_half_width,
+            }
+        energies_mt = energies_j / 4.184e15
+        
+        energy_ci = ConfidenceInterval(
+            mean=float(np.mean(energies_mt)),
+            ci_lower=float(np.percentile(energies_mt, 2.5)),
+            ci_upper=float(np.percentile(energies_mt, 97.5)),
+            source="Monte_Carlo_N=" + str(samples_used)
+        )
         
         # Airburst altitude (if applicable)
         airburst_altitude = None
         if impact_type == "airburst":
-            # Chyba-Hills model: altitude depends on strength and velocity
-            base_altitude = 30 - np.log10(max(diameter, 1)) * 10
-            altitude_samples = np.random.normal(base_altitude, base_altitude * 0.18, n_samples)
-            altitude_samples = np.clip(altitude_samples, 5, 60)
-            
+            altitude_samples = samples["airburst_altitude_km"]
             airburst_altitude = ConfidenceInterval(
                 mean=float(np.mean(altitude_samples)),
                 ci_lower=float(np.percentile(altitude_samples, 2.5)),
@@ -574,10 +766,7 @@ class DecisionSupportEngine:
         # Crater diameter (if ground/ocean impact)
         crater_diameter = None
         if impact_type in ["land", "ocean"]:
-            # Pi-scaling: D ~ E^0.25
-            crater_samples = 0.1 * (energies_mt ** 0.25) * np.random.normal(1, 0.15, n_samples)
-            crater_samples = np.maximum(crater_samples, 0)
-            
+            crater_samples = samples["crater_diameter_km"]
             crater_diameter = ConfidenceInterval(
                 mean=float(np.mean(crater_samples)),
                 ci_lower=float(np.percentile(crater_samples, 2.5)),
@@ -588,19 +777,9 @@ class DecisionSupportEngine:
         # Tsunami heights (if ocean)
         tsunami_heights = None
         if impact_type == "ocean":
-            cavity_radius = 117 * (np.mean(energies_mt) ** (1/3))
-            tsunami_heights = {
-                "source": float(cavity_radius),
-                "100km": float(cavity_radius * 0.01),
-                "500km": float(cavity_radius * 0.002),
-                "1000km": float(cavity_radius * 0.001),
-                "coast_runup": float(cavity_radius * 0.01 * 2.5)  # Green's Law amplification
-            }
-        
-        # Thermal radius
-        thermal_base = 7.0 if not is_airburst else 14.0
-        thermal_samples = thermal_base * np.sqrt(energies_mt) * np.random.normal(1, 0.1, n_samples)
+            tsunami_heights = self._tsunami_heights(float(np.mean(energies_mt)))
         
+        thermal_samples = samples["thermal_radius_km"]
         thermal_ci = ConfidenceInterval(
             mean=float(np.mean(thermal_samples)),
             ci_lower=float(np.percentile(thermal_samples, 2.5)),
@@ -608,10 +787,9 @@ class DecisionSupportEngine:
             source="Glasstone-Dolan_1977"
         )
         
-        # Blast radii for different overpressures
         blast_radii = {}
-        for psi, scale in [("1_psi", 0.8), ("5_psi", 0.4), ("20_psi", 0.15)]:
-            blast_samples = scale * (energies_mt ** (1/3)) * np.random.normal(1, 0.1, n_samples)
+        for psi, _ in BLAST_RADIUS_SCALES:
+            blast_samples = samples["blast_radius_km." + psi]
             blast_radii[psi] = ConfidenceInterval(
                 mean=float(np.mean(blast_samples)),
                 ci_lower=float(np.percentile(blast_samples, 2.5)),
@@ -624,7 +802,7 @@ class DecisionSupportEngine:
             seismic_samples = (np.log10(energies_j) - 4.8) / 1.5
             seismic_samples = np.maximum(seismic_samples, 0)
         else:
-            seismic_samples = np.zeros(n_samples)
+            seismic_samples = np.zeros(samples_used)
         
         seismic_ci = ConfidenceInterval(
             mean=float(np.mean(seismic_samples)),
@@ -634,13 +812,7 @@ class DecisionSupportEngine:
         )
         
         # Get validation error from historical benchmarks
-        validation_error = 15.0  # Default
-        if self.model_error_profile:
-            chelyabinsk = self.model_error_profile.get(
-                "historical_event_benchmarks", {}
-            ).get("chelyabinsk_2013", {}).get("model_predictions", {})
-            if chelyabinsk:
-                validation_error = 6.0  # From Chelyabinsk validation
+        validation_error = self._validation_error_pct()
         
         return PhysicsDistribution(
             energy_mt=energy_ci,
@@ -652,9 +824,32 @@ class DecisionSupportEngine:
             blast_radius_km=blast_radii,
             seismic_magnitude=seismic_ci,
             validation_error_pct=validation_error,
-            model_used="RK4_atmospheric + Pi-scaling_crater"
+            model_used="RK4_atmospheric + Pi-scaling_crater",
+            sampling=sampling
         )
     
+    def _tsunami_heights(self, mean_energy_mt: float) -> Dict[str, float]:
+        """Cavity-radius tsunami amplitudes for an ocean impact."""
+        cavity_radius = 117 * (mean_energy_mt ** (1/3))
+        return {
+            "source": float(cavity_radius),
+            "100km": float(cavity_radius * 0.01),
+            "500km": float(cavity_radius * 0.002),
+            "1000km": float(cavity_radius * 0.001),
+            "coast_runup": float(cavity_radius * 0.01 * 2.5)  # Green's Law amplification
+        }
+    
+    def _validation_error_pct(self) -> float:
+        """Model error from historical benchmarks (Chelyabinsk when available)."""
+        validation_error = 15.0  # Default
+        if self.model_error_profile:
+            chelyabinsk = self.model_error_profile.get(
+                "historical_event_benchmarks", {}
+            ).get("chelyabinsk_2013", {}).get("model_predictions", {})
+            if chelyabinsk:
+                validation_error = 6.0  # From Chelyabinsk validation
+        return validation_error
+    
     # =========================================================================
     # STAGE 3: TEMPORAL EVOLUTION
     # =========================================================================
@@ -700,18 +895,9 @@ class DecisionSupportEngine:
         casualty_rate = 0.1  # 10% of affected population
         base_casualties = base_population * casualty_rate
         
-        casualty_fractions = [
-            (0, 0.30, "Primary Impact", ["blast_wave", "thermal_flash"]),
-            (0.017, 0.50, "Immediate Aftermath", ["fire_ignition", "building_damage"]),
-            (1, 0.70, "Peak Casualties", ["fire_spread", "collapse_progression"]),
-            (24, 0.85, "Medical Surge", ["hospital_overload", "power_failure"]),
-            (168, 0.95, "Infrastructure Cascade", ["water_failure", "supply_chain"]),
-            (720, 1.00, "Recovery Phase", ["stabilization", "reconstruction"])
-        ]
-        
         peak_time = 1.0
         
-        for t_hours, fraction, phase, infra_status in casualty_fractions:
+        for t_hours, fraction, phase, infra_status in CASUALTY_TIMELINE:
             casualties_mean = base_casualties * fraction
             casualties_sigma = casualties_mean * 0.3  # 30% uncertainty
             
@@ -725,7 +911,7 @@ class DecisionSupportEngine:
                     ci_upper=casualties_mean + 1.96 * casualties_sigma,
                     source="temporal_impact_evolution.json"
                 ),
-                infrastructure_status=infra_status
+                infrastructure_status=list(infra_status)
             ))
         
         return TemporalEvolution(
@@ -759,14 +945,7 @@ class DecisionSupportEngine:
             ).get("dependencies", [])
             
             # Simplified cascade: power → water → healthcare → communication
-            cascade_sequence = [
-                {"system": "power_grid", "fail_time_hours": 0, "dependency": "direct_damage"},
-                {"system": "water_supply", "fail_time_hours": 4, "dependency": "power_grid"},
-                {"system": "healthcare", "fail_time_hours": 12, "dependency": "power_grid + water"},
-                {"system": "communication", "fail_time_hours": 2, "dependency": "power_grid"},
-                {"system": "transportation", "fail_time_hours": 1, "dependency": "direct_damage"},
-                {"system": "food_supply", "fail_time_hours": 48, "dependency": "transportation + power"}
-            ]
+            cascade_sequence = [dict(step) for step in INFRASTRUCTURE_CASCADE]
         
         # Sum affected power capacity
         total_power_loss = sum(p.get("capacity_mw", 0) for p in affected_plants)
@@ -804,20 +983,7 @@ class DecisionSupportEngine:
         
         Source: socioeconomic_vulnerability_index.json
         """
-        # Default values
-        vulnerability_mult = 1.0
-        hdi = 0.7
-        healthcare = "moderate"
-        evacuation = "moderate"
-        
-        if self.vulnerability_index:
-            countries = self.vulnerability_index.get("country_vulnerability", {})
-            if country in countries:
-                country_data = countries[country]
-                vulnerability_mult = country_data.get("casualty_multiplier", 1.0)
-                hdi = country_data.get("hdi", 0.7)
-                healthcare = country_data.get("healthcare_capacity", "moderate")
-                evacuation = country_data.get("evacuation_capability", "moderate")
+        vulnerability_mult, hdi, healthcare, evacuation = self._country_vulnerability(country)
         
         # Adjust casualties
         adjusted_mean = raw_casualties.mean * vulnerability_mult
@@ -856,6 +1022,24 @@ class DecisionSupportEngine:
             source="socioeconomic_vulnerability_index.json"
         )
     
+    def _country_vulnerability(self, country: str) -> Tuple[float, float, str, str]:
+        """(casualty multiplier, HDI, healthcare capacity, evacuation capability)."""
+        # Default values
+        vulnerability_mult = 1.0
+        hdi = 0.7
+        healthcare = "moderate"
+        evacuation = "moderate"
+        
+        if self.vulnerability_index:
+            countries = self.vulnerability_index.get("country_vulnerability", {})
+            if country in countries:
+                country_data = countries[country]
+                vulnerability_mult = country_data.get("casualty_multiplier", 1.0)
+                hdi = country_data.get("hdi", 0.7)
+                healthcare = country_data.get("healthcare_capacity", "moderate")
+                evacuation = country_data.get("evacuation_capability", "moderate")
+        return vulnerability_mult, hdi, healthcare, evacuation
+    
     # =========================================================================
     # STAGE 6: POLICY DECISION
     # =========================================================================
@@ -884,6 +1068,21 @@ class DecisionSupportEngine:
         )
         
         # Identify triggered thresholds
+        triggered = self._triggered_thresholds(impact_probability, warning_days.mean)
+        
+        return PolicyDecision(
+            torino_scale=torino,
+            palermo_scale=palermo,
+            recommended_action=action,
+            confidence_pct=confidence,
+            action_justification=justification,
+            rejected_alternatives=rejected,
+            thresholds_triggered=triggered,
+            source="decision_thresholds_policy_framework.json"
+        )
+    
+    def _triggered_thresholds(self, impact_probability: float, warning_days: float) -> List[Dict]:
+        """Observation / deflection thresholds exceeded by this scenario."""
         triggered = []
         if self.decision_framework:
             thresholds = self.decision_framework.get("decision_thresholds", {})
@@ -905,7 +1104,7 @@ class DecisionSupportEngine:
                     "threshold_value": 0.01,
                     "action": "24/7 monitoring"
                 })
-            if impact_probability > 0.3 and warning_days.mean > 730:
+            if impact_probability > 0.3 and warning_days > 730:
                 triggered.append({
                     "threshold": "deflection_mission_auth",
                     "value": impact_probability,
@@ -913,17 +1112,7 @@ class DecisionSupportEngine:
                     "threshold_value": 0.3,
                     "action": "Authorize deflection mission"
                 })
-        
-        return PolicyDecision(
-            torino_scale=torino,
-            palermo_scale=palermo,
-            recommended_action=action,
-            confidence_pct=confidence,
-            action_justification=justification,
-            rejected_alternatives=rejected,
-            thresholds_triggered=triggered,
-            source="decision_thresholds_policy_framework.json"
-        )
+        return triggered
     
     def _compute_torino_scale(self, energy_mt: float, impact_prob: float) -> int:
         """Compute Torino Impact Hazard Scale (0-10)."""
@@ -1086,77 +1275,162 @@ class DecisionSupportEngine:
     def compute_sensitivity(
         self,
         base_params: Dict,
-        result_metric: str = "energy_mt"
+        result_metric: str = "energy_mt",
+        base_population: Optional[float] = None,
+        n_samples: int = DEFAULT_SENSITIVITY_SAMPLES,
+        sampler: str = "sobol",
+        rng: Optional[np.random.Generator] = None
     ) -> SensitivityAnalysis:
         """
-        Compute parameter sensitivity ranking via perturbation analysis.
+        Global variance-based sensitivity (Sobol indices) of the physics chain.
+        
+        Velocity, mass, angle and density are drawn from the same uncertainty
+        model as compute_physics_distribution (mass from the diameter sigma,
+        log-normal). One Saltelli design of n_samples·(d + 2) rows is run
+        through the vectorized entry solver in batches, and first-order
+        (Saltelli 2010) and total (Jansen 1999) indices are estimated from
+        those rows for every metric in SENSITIVITY_METRICS; affected
+        population needs `base_population` (people within the nominal thermal
+        radius, uniform density assumed). The ranking uses the total indices
+        of `result_metric`. Without `rng` a Generator seeded with the engine
+        seed is used.
+        
+        Sources: Saltelli et al. 2010 (Comput. Phys. Commun. 181), Jansen 1999
         """
-        sensitivities = []
-        
-        # Parameters to analyze
-        params_to_test = ["velocity_kms", "mass_kg", "angle_deg", "density_kgm3"]
-        
-        # Base result
-        base_value = self._compute_metric(base_params, result_metric)
-        
-        # Perturb each parameter by ±10%
-        for param in params_to_test:
-            if param not in base_params:
+        params = [p for p in SENSITIVITY_PARAMETERS if p in base_params]
+        if not params:
+            return SensitivityAnalysis(parameter_ranking=[], dominant_driver="unknown",
+                                       sensitivity_method="sobol_saltelli_jansen")
+        rng = rng if rng is not None else np.random.default_rng(self.seed)
+        diameter_sigma_pct, density_sigma_pct = self._input_sigma_percents()
+        
+        def inputs_from_uniform(u):
+            values = {key: np.full(len(u), float(value)) for key, value in base_params.items()
+                      if key in SENSITIVITY_PARAMETERS}
+            z = normal_ppf(u)
+            for column, key in enumerate(params):
+                base = float(base_params[key])
+                if key == "velocity_kms":
+                    values[key] = np.clip(base + base * 0.05 * z[:, column], 5, 72)
+                elif key == "mass_kg":
+                    # D ~ log-normal → m ∝ D³
+                    values[key] = base * np.exp(3 * np.log1p(diameter_sigma_pct / 100) * z[:, column])
+                elif key == "angle_deg":
+                    values[key] = np.clip(base + max(1, base * 0.1) * z[:, column], 5, 85)
+                else:
+                    values[key] = np.clip(base + base * density_sigma_pct / 100 * z[:, column], 500, 8000)
+            return values
+        
+        nominal = self._sensitivity_chain({key: np.array([float(v)]) for key, v in base_params.items()
+                                           if key in SENSITIVITY_PARAMETERS})
+        reference_thermal_km = float(nominal["thermal_radius_km"][0])
+        
+        def evaluate_block(u):
+            outputs = self._sensitivity_chain(inputs_from_uniform(u))
+            if base_population is not None and reference_thermal_km > 0:
+                outputs["affected_population"] = (
+                    base_population * (outputs["thermal_radius_km"] / reference_thermal_km) ** 2
+                )
+            return outputs
+        
+        indices, report = sobol_indices(evaluate_block, len(params), n_samples, sampler=sampler, seed=rng)
+        
+        per_metric = {}
+        for metric in SENSITIVITY_METRICS:
+            if metric not in indices:
                 continue
-                
-            original = base_params[param]
-            
-            # +10%
-            perturbed_up = base_params.copy()
-            perturbed_up[param] = original * 1.1
-            value_up = self._compute_metric(perturbed_up, result_metric)
-            
-            # -10%
-            perturbed_down = base_params.copy()
-            perturbed_down[param] = original * 0.9
-            value_down = self._compute_metric(perturbed_down, result_metric)
-            
-            # Normalized sensitivity: |d(output)/d(input)| * (input/output)
-            if base_value != 0:
-                sensitivity = abs(value_up - value_down) / (0.2 * original) * (original / base_value)
-            else:
-                sensitivity = 0
-                
-            sensitivities.append({
+            est = indices[metric]
+            per_metric[metric] = {
+                param: {
+                    "first_order": round(float(est["first_order"][i]), 4),
+                    "total": round(float(est["total"][i]), 4),
+                    "first_order_ci_95": [round(float(x), 4) for x in est["first_order_ci_95"][i]],
+                    "total_ci_95": [round(float(x), 4) for x in est["total_ci_95"][i]]
+                }
+                for i, param in enumerate(params)
+            }
+        
+        if result_metric not in indices:
+            raise ValueError(f"Unknown sensitivity metric {result_metric!r}; expected one of {tuple(indices)}")
+        target = indices[result_metric]
+        total = float(np.sum(np.maximum(target["total"], 0)))
+        ranking = []
+        for i, param in enumerate(params):
+            ranking.append({
                 "parameter": param,
-                "raw_sensitivity": sensitivity,
-                "direction": "positive" if value_up > base_value else "negative"
+                "normalized_effect": round(max(float(target["total"][i]), 0) / total, 3) if total > 0 else 0,
+                "direction": ("positive" if target["trend"][i] > 0
+                              else "negative" if target["trend"][i] < 0 else "none"),
+                "first_order_index": round(float(target["first_order"][i]), 4),
+                "total_index": round(float(target["total"][i]), 4)
             })
         
-        # Normalize to sum to 1
-        total = sum(s["raw_sensitivity"] for s in sensitivities)
-        if total > 0:
-            for s in sensitivities:
-                s["normalized_effect"] = round(s["raw_sensitivity"] / total, 3)
-        
         # Sort by effect
-        sensitivities.sort(key=lambda x: x.get("normalized_effect", 0), reverse=True)
-        
-        dominant = sensitivities[0]["parameter"] if sensitivities else "unknown"
+        ranking.sort(key=lambda x: x["total_index"], reverse=True)
+        dominant = ranking[0]["parameter"] if total > 0 else "unknown"
         
         return SensitivityAnalysis(
-            parameter_ranking=[{
-                "parameter": s["parameter"],
-                "normalized_effect": s.get("normalized_effect", 0),
-                "direction": s["direction"]
-            } for s in sensitivities],
+            parameter_ranking=ranking,
             dominant_driver=dominant,
-            sensitivity_method="perturbation_±10%"
+            sensitivity_method="sobol_saltelli_jansen",
+            indices=per_metric,
+            budget={
+                "base_samples": report["base_samples"],
+                "evaluations": report["evaluations"],
+                "batches": report["batches"],
+                "sampler": sampler
+            }
+        )
+    
+    def compute_entry_effects(
+        self,
+        mass_kg,
+        velocity_kms,
+        angle_deg,
+        density_kgm3
+    ) -> Dict[str, np.ndarray]:
+        """
+        Deterministic, vectorized entry → effects chain (no uncertainty sampling).
+        
+        Runs the entry solver (app.calculate_atmospheric_entry settings;
+        large batches are sharded across cores by parallel_entry) and
+        applies the compute_physics_distribution scaling laws to the solver
+        outcome: crater from the surviving energy (zero for an airburst),
+        thermal radius and cube-root blast radii from the entry energy.
+        Airburst altitude is the peak energy deposition height (zero for
+        ground impacts).
+        Inputs broadcast; every output is an array of the broadcast shape.
+        """
+        mass, velocity, angle, density = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (mass_kg, velocity_kms, angle_deg, density_kgm3))
         )
+        diameter = 2 * (3 * mass / (4 * np.pi * density)) ** (1/3)
+        entry = simulate_atmospheric_entry_auto(
+            mass, diameter, velocity, angle, density, SENSITIVITY_STRENGTH_PA, **SENSITIVITY_ENTRY_KWARGS
+        )
+        energies_mt = 0.5 * mass * (velocity * 1000) ** 2 / 4.184e15
+        impact_mt = 0.5 * entry["mass_impact_kg"] * (entry["velocity_impact_kms"] * 1000) ** 2 / 4.184e15
+        is_airburst = np.asarray(entry["is_airburst"], dtype=bool)
+        effects = {
+            "diameter_m": diameter,
+            "energy_mt": energies_mt,
+            "impact_energy_mt": impact_mt,
+            "is_airburst": is_airburst,
+            "airburst_altitude_km": np.where(is_airburst, np.asarray(entry["airburst_altitude_m"], dtype=float) / 1000, 0.0),
+            "crater_diameter_km": np.where(is_airburst, 0.0, 0.1 * impact_mt ** 0.25),
+            "thermal_radius_km": np.where(is_airburst, 14.0, 7.0) * np.sqrt(energies_mt),
+        }
+        for psi, scale in BLAST_RADIUS_SCALES:
+            effects["blast_radius_km." + psi] = scale * energies_mt ** (1/3)
+        return effects
     
-    def _compute_metric(self, params: Dict, metric: str) -> float:
-        """Compute a single metric for sensitivity analysis."""
-        if metric == "energy_mt":
-            mass = params.get("mass_kg", 1e10)
-            velocity = params.get("velocity_kms", 20)
-            energy_j = 0.5 * mass * (velocity * 1000) ** 2
-            return energy_j / 4.184e15
-        return 0
+    def _sensitivity_chain(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """compute_entry_effects metrics reported by compute_sensitivity."""
+        effects = self.compute_entry_effects(
+            inputs.get("mass_kg", 1e10), inputs.get("velocity_kms", 20),
+            inputs.get("angle_deg", 45), inputs.get("density_kgm3", 3000)
+        )
+        return {key: effects[key] for key in ("energy_mt", "crater_diameter_km", "thermal_radius_km")}
     
     # =========================================================================
     # STAGE 8: BASELINE COMPARISON
@@ -1264,47 +1538,63 @@ class DecisionSupportEngine:
         impact_probability: float,
         affected_plants: List[Dict],
         base_population: int,
-        observation_arc_days: int = 30
+        observation_arc_days: int = 30,
+        sampler: str = "random",
+        target_rel_ci_half_width: Optional[float] = None,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+        sensitivity_samples: int = DEFAULT_SENSITIVITY_SAMPLES,
+        seed: Optional[int] = None,
+        is_airburst: Optional[bool] = None
     ) -> PipelineResult:
         """
         Execute full decision support pipeline.
         
         Returns structured output suitable for Claude analytical interpretation.
+        `progress(stage, index, PIPELINE_STAGE_COUNT)` is called before each stage.
+        `sensitivity_samples` is the Sobol base sample budget of stage 7.
+        `is_airburst` fixes the impact type's airburst flag (see
+        compute_physics_distribution).
+        
+        All random draws come from Generators spawned from
+        scenario_seed_sequence(scenario_hash, seed) (`seed` defaults to the
+        engine seed), so a run is bit-reproducible from its metadata and
+        concurrent runs in threads or processes are independent.
         """
-        # Generate scenario hash for reproducibility
-        params = {
-            "mass_kg": mass_kg,
-            "velocity_kms": velocity_kms,
-            "angle_deg": angle_deg,
-            "density_kgm3": density_kgm3,
-            "lat": lat,
-            "lon": lon,
-            "seed": self.seed
-        }
-        scenario_hash = self.compute_scenario_hash(params)
+        report_stage = progress or (lambda stage, index, total: None)
+        seed = self.seed if seed is None else int(seed)
+        scenario_hash, streams = self._scenario_streams(mass_kg, velocity_kms, angle_deg, density_kgm3,
+                                                        lat, lon, seed)
         
         # STAGE 1: Detection
+        report_stage("detection", 0, PIPELINE_STAGE_COUNT)
         detection = self.compute_detection(
             diameter_m=diameter_m,
             observation_arc_days=observation_arc_days
         )
         
         # STAGE 2: Physics
+        report_stage("physics", 1, PIPELINE_STAGE_COUNT)
         physics = self.compute_physics_distribution(
             mass_kg=mass_kg,
             velocity_kms=velocity_kms,
             angle_deg=angle_deg,
             density_kgm3=density_kgm3,
-            is_ocean=is_ocean
+            is_ocean=is_ocean,
+            sampler=sampler,
+            target_rel_ci_half_width=target_rel_ci_half_width,
+            rng=streams["physics"],
+            is_airburst=is_airburst
         )
         
         # STAGE 3: Temporal
+        report_stage("temporal", 2, PIPELINE_STAGE_COUNT)
         temporal = self.compute_temporal_evolution(
             physics=physics,
             base_population=base_population
         )
         
         # STAGE 4: Infrastructure
+        report_stage("infrastructure", 3, PIPELINE_STAGE_COUNT)
         infrastructure = self.compute_infrastructure_cascade(
             lat=lat,
             lon=lon,
@@ -1324,6 +1614,7 @@ class DecisionSupportEngine:
             )
         
         # STAGE 5: Socioeconomic
+        report_stage("socioeconomic", 4, PIPELINE_STAGE_COUNT)
         socioeconomic = self.compute_socioeconomic_adjustment(
             raw_casualties=final_casualties,
             country=country,
@@ -1331,6 +1622,7 @@ class DecisionSupportEngine:
         )
         
         # STAGE 6: Policy
+        report_stage("policy", 5, PIPELINE_STAGE_COUNT)
         policy = self.compute_policy_decision(
             energy_mt=physics.energy_mt,
             casualties=socioeconomic.adjusted_casualties,
@@ -1339,22 +1631,61 @@ class DecisionSupportEngine:
         )
         
         # STAGE 7: Sensitivity
+        report_stage("sensitivity", 6, PIPELINE_STAGE_COUNT)
         sensitivity = self.compute_sensitivity(
             base_params={
                 "mass_kg": mass_kg,
                 "velocity_kms": velocity_kms,
                 "angle_deg": angle_deg,
                 "density_kgm3": density_kgm3
-            }
+            },
+            base_population=base_population,
+            n_samples=sensitivity_samples,
+            rng=streams["sensitivity"]
         )
         
         # STAGE 8: Baseline
+        report_stage("baseline", 7, PIPELINE_STAGE_COUNT)
         baseline = self.compute_baseline_comparison(
             casualties_with_action=socioeconomic.adjusted_casualties,
             damage_with_action=socioeconomic.economic_damage_usd,
             action_type=policy.recommended_action.split("_")[0]
         )
         
+        return self._pipeline_result(scenario_id, seed, scenario_hash, detection, physics, temporal,
+                                     infrastructure, socioeconomic, policy, sensitivity, baseline)
+    
+    def _scenario_streams(
+        self,
+        mass_kg: float,
+        velocity_kms: float,
+        angle_deg: float,
+        density_kgm3: float,
+        lat: float,
+        lon: float,
+        seed: int
+    ) -> Tuple[str, Dict[str, np.random.Generator]]:
+        """Scenario hash and one Generator per PIPELINE_RNG_STREAMS entry."""
+        # Generate scenario hash for reproducibility
+        params = {
+            "mass_kg": mass_kg,
+            "velocity_kms": velocity_kms,
+            "angle_deg": angle_deg,
+            "density_kgm3": density_kgm3,
+            "lat": lat,
+            "lon": lon,
+            "seed": seed
+        }
+        scenario_hash = self.compute_scenario_hash(params)
+        streams = dict(zip(PIPELINE_RNG_STREAMS, (
+            np.random.default_rng(child)
+            for child in scenario_seed_sequence(scenario_hash, seed).spawn(len(PIPELINE_RNG_STREAMS))
+        )))
+        return scenario_hash, streams
+    
+    def _pipeline_result(self, scenario_id, seed, scenario_hash, detection, physics, temporal,
+                         infrastructure, socioeconomic, policy, sensitivity, baseline) -> PipelineResult:
+        """Attach data-quality provenance to the stage outputs."""
         # Determine overall confidence
         if len(self.datasets_missing) == 0:
             overall_confidence = "HIGH"
@@ -1373,7 +1704,7 @@ class DecisionSupportEngine:
         
         return PipelineResult(
             scenario_id=scenario_id,
-            seed=self.seed,
+            seed=seed,
             scenario_hash=scenario_hash,
             detection=detection,
             physics=physics,
@@ -1390,6 +1721,491 @@ class DecisionSupportEngine:
             model_limitations=limitations
         )
 
+    # =========================================================================
+    # PORTFOLIO (BATCH) EXECUTION
+    # =========================================================================
+    
+    def run_portfolio(
+        self,
+        scenarios: List[Dict],
+        sampler: str = "random",
+        n_samples: int = 1000,
+        seed: Optional[int] = None,
+        rank_by: str = "palermo_scale",
+        sensitivity_top: int = 0,
+        sensitivity_samples: int = DEFAULT_SENSITIVITY_SAMPLES,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> PortfolioResult:
+        """
+        Run the decision pipeline for many scenarios at once.
+        
+        Each scenario is a dict with run_full_pipeline's keyword names
+        (missing ones from PORTFOLIO_SCENARIO_DEFAULTS; mass_kg from
+        diameter_m and density_kgm3 when absent; optional per-scenario
+        "seed"; optional "is_airburst" from the entry solver, which replaces
+        the size-based airburst draw). Stages run as array operations over
+        the whole batch; the physics draws come from each scenario's own
+        streams, so every PipelineResult equals the one run_full_pipeline
+        returns for that scenario (adaptive sample sizing is not available
+        here).
+        
+        Sobol sensitivity costs a solver batch per scenario, so it is computed
+        only for the `sensitivity_top` highest-ranked scenarios; the others
+        carry a "not_computed" SensitivityAnalysis. `progress(stage, index,
+        PIPELINE_STAGE_COUNT)` is called before each stage.
+        """
+        if rank_by not in PORTFOLIO_RANK_KEYS:
+            raise ValueError(f"Unknown rank_by {rank_by!r}; expected one of {PORTFOLIO_RANK_KEYS}")
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Unknown sampler {sampler!r}; expected one of {SAMPLERS}")
+        report_stage = progress or (lambda stage, index, total: None)
+        rows = [self._portfolio_scenario(i, scenario, seed) for i, scenario in enumerate(scenarios)]
+        n = len(rows)
+        if n == 0:
+            return PortfolioResult(results=[], ranking=[], rank_by=rank_by, n_samples=n_samples, sampler=sampler)
+        
+        def column(key, dtype=float):
+            return np.array([row[key] for row in rows], dtype=dtype)
+        
+        mass = column("mass_kg")
+        velocity = column("velocity_kms")
+        angle = column("angle_deg")
+        density = column("density_kgm3")
+        impact_probability = column("impact_probability")
+        base_population = column("base_population")
+        streams = [
+            self._scenario_streams(row["mass_kg"], row["velocity_kms"], row["angle_deg"], row["density_kgm3"],
+                                   row["lat"], row["lon"], row["seed"])
+            for row in rows
+        ]
+        
+        # STAGE 1: Detection
+        report_stage("detection", 0, PIPELINE_STAGE_COUNT)
+        detection = self._detection_batch(column("diameter_m"), column("observation_arc_days"))
+        
+        # STAGE 2: Physics
+        report_stage("physics", 1, PIPELINE_STAGE_COUNT)
+        airburst_known = np.array([np.nan if row["is_airburst"] is None else float(row["is_airburst"])
+                                   for row in rows])
+        physics = {}
+        chunk_scenarios = max(1, PORTFOLIO_CHUNK_DRAWS // max(1, int(n_samples)))
+        for start in range(0, n, chunk_scenarios):
+            part = slice(start, start + chunk_scenarios)
+            chunk = self._physics_batch(
+                mass[part], velocity[part], angle[part], density[part], column("is_ocean", bool)[part],
+                [s["physics"] for _, s in streams[part]], n_samples, sampler, airburst_known[part]
+            )
+            for key, values in chunk.items():
+                physics.setdefault(key, []).append(values)
+        physics = {key: np.concatenate(parts) for key, parts in physics.items()}
+        
+        # STAGE 3: Temporal (cumulative casualty fraction per timeline step)
+        report_stage("temporal", 2, PIPELINE_STAGE_COUNT)
+        fractions = np.array([step[1] for step in CASUALTY_TIMELINE])
+        casualties_mean = (base_population * 0.1)[:, None] * fractions
+        casualties_sigma = casualties_mean * 0.3
+        casualties_lower = np.maximum(0, casualties_mean - 1.96 * casualties_sigma)
+        casualties_upper = casualties_mean + 1.96 * casualties_sigma
+        
+        # STAGE 4: Infrastructure
+        report_stage("infrastructure", 3, PIPELINE_STAGE_COUNT)
+        damage_radius = physics["thermal_radius_km.mean"]
+        power_loss = np.array([sum(p.get("capacity_mw", 0) for p in row["affected_plants"]) for row in rows])
+        
+        # STAGE 5: Socioeconomic
+        report_stage("socioeconomic", 4, PIPELINE_STAGE_COUNT)
+        countries, country_index = np.unique([str(row["country"]) for row in rows], return_inverse=True)
+        profiles = [self._country_vulnerability(country) for country in countries]
+        multiplier = np.array([p[0] for p in profiles])[country_index]
+        hdi = np.array([p[1] for p in profiles])[country_index]
+        adjusted = {
+            "mean": casualties_mean[:, -1] * multiplier,
+            "ci_lower": casualties_lower[:, -1] * multiplier,
+            "ci_upper": casualties_upper[:, -1] * multiplier
+        }
+        damage_mean = physics["energy_mt.mean"] * np.where(hdi > 0.8, 1e9, 5e8)
+        damage_sigma = damage_mean * 0.4
+        damage = {
+            "mean": damage_mean,
+            "ci_lower": np.maximum(0, damage_mean - 1.96 * damage_sigma),
+            "ci_upper": damage_mean + 1.96 * damage_sigma
+        }
+        
+        # STAGE 6: Policy
+        report_stage("policy", 5, PIPELINE_STAGE_COUNT)
+        energy_mean = physics["energy_mt.mean"]
+        torino = self._torino_scale_batch(energy_mean, impact_probability)
+        palermo = self._palermo_scale_batch(energy_mean, impact_probability, detection["warning_mean"])
+        expected_casualties = impact_probability * adjusted["mean"]
+        
+        # Ranking (descending risk; ties broken by expected casualties)
+        rank_values = {
+            "palermo_scale": palermo,
+            "expected_casualties": expected_casualties,
+            "torino_scale": torino.astype(float),
+            "impact_probability": impact_probability
+        }[rank_by]
+        order = np.lexsort((-expected_casualties, -rank_values))
+        
+        # STAGE 7: Sensitivity (top-ranked scenarios only)
+        report_stage("sensitivity", 6, PIPELINE_STAGE_COUNT)
+        sensitivity = {}
+        for i in order[:max(0, int(sensitivity_top))]:
+            row = rows[i]
+            sensitivity[i] = self.compute_sensitivity(
+                base_params={key: row[key] for key in SENSITIVITY_PARAMETERS},
+                base_population=row["base_population"],
+                n_samples=sensitivity_samples,
+                rng=streams[i][1]["sensitivity"]
+            )
+        
+        # STAGE 8: Baseline + per-scenario results
+        report_stage("baseline", 7, PIPELINE_STAGE_COUNT)
+        results = []
+        for i, row in enumerate(rows):
+            detection_i = DetectionAssessment(
+                detection_probability=float(detection["probability"][i]),
+                warning_time_days=ConfidenceInterval(
+                    mean=float(detection["warning_mean"][i]),
+                    ci_lower=float(detection["warning_lower"][i]),
+                    ci_upper=float(detection["warning_upper"][i]),
+                    source="neo_detection_constraints.json + orbital_uncertainty"
+                ),
+                limiting_factor=detection["limiting_factor"],
+                observation_arc_quality=detection["arc_quality"][i],
+                survey_coverage=detection["survey_coverage"][i]
+            )
+            physics_i = self._physics_from_batch(physics, i)
+            temporal_i = TemporalEvolution(
+                timeline=[
+                    TimelineEvent(
+                        t_hours=t_hours,
+                        phase=phase,
+                        description=f"Cumulative casualties reach {fraction*100:.0f}% of final total",
+                        casualties=ConfidenceInterval(
+                            mean=float(casualties_mean[i, j]),
+                            ci_lower=float(casualties_lower[i, j]),
+                            ci_upper=float(casualties_upper[i, j]),
+                            source="temporal_impact_evolution.json"
+                        ),
+                        infrastructure_status=list(infra_status)
+                    )
+                    for j, (t_hours, fraction, phase, infra_status) in enumerate(CASUALTY_TIMELINE)
+                ],
+                peak_casualty_time_hours=1.0,
+                recovery_start_days=30,
+                source="temporal_impact_evolution.json"
+            )
+            radius = float(damage_radius[i])
+            infrastructure_i = InfrastructureImpact(
+                systems_at_risk=[
+                    {"system_type": "power_plant", "count": len(row["affected_plants"]), "cascade_delay_hours": 0},
+                    {"system_type": "hospital", "count": int(radius / 10), "cascade_delay_hours": 12},
+                    {"system_type": "water_treatment", "count": int(radius / 20), "cascade_delay_hours": 4}
+                ],
+                critical_facilities=list(row["affected_plants"])[:10],
+                cascade_sequence=[dict(step) for step in INFRASTRUCTURE_CASCADE] if self.infrastructure_network else [],
+                total_power_loss_mw=power_loss[i].item(),
+                hospital_beds_lost=int(radius * 100),
+                source="infrastructure_dependency_network.json + power_plant_database"
+            )
+            country_profile = profiles[country_index[i]]
+            socioeconomic_i = SocioeconomicAssessment(
+                raw_casualty_estimate=temporal_i.timeline[-1].casualties,
+                vulnerability_multiplier=country_profile[0],
+                adjusted_casualties=ConfidenceInterval(
+                    mean=float(adjusted["mean"][i]),
+                    ci_lower=float(adjusted["ci_lower"][i]),
+                    ci_upper=float(adjusted["ci_upper"][i]),
+                    source=f"socioeconomic_vulnerability_index.json_mult={country_profile[0]}"
+                ),
+                economic_damage_usd=ConfidenceInterval(
+                    mean=float(damage["mean"][i]),
+                    ci_lower=float(damage["ci_lower"][i]),
+                    ci_upper=float(damage["ci_upper"][i]),
+                    source="World_Bank_damage_models"
+                ),
+                affected_region=row["country"],
+                hdi_score=country_profile[1],
+                healthcare_capacity=country_profile[2],
+                evacuation_capability=country_profile[3],
+                source="socioeconomic_vulnerability_index.json"
+            )
+            p = float(impact_probability[i])
+            action, confidence, justification, rejected = self._determine_action(
+                p, detection_i.warning_time_days.mean, socioeconomic_i.adjusted_casualties.mean,
+                physics_i.energy_mt.mean
+            )
+            policy_i = PolicyDecision(
+                torino_scale=int(torino[i]),
+                palermo_scale=float(palermo[i]),
+                recommended_action=action,
+                confidence_pct=confidence,
+                action_justification=justification,
+                rejected_alternatives=rejected,
+                thresholds_triggered=self._triggered_thresholds(p, detection_i.warning_time_days.mean),
+                source="decision_thresholds_policy_framework.json"
+            )
+            sensitivity_i = sensitivity.get(i) or SensitivityAnalysis(
+                parameter_ranking=[], dominant_driver="unknown", sensitivity_method="not_computed"
+            )
+            baseline_i = self.compute_baseline_comparison(
+                casualties_with_action=socioeconomic_i.adjusted_casualties,
+                damage_with_action=socioeconomic_i.economic_damage_usd,
+                action_type=action.split("_")[0]
+            )
+            results.append(self._pipeline_result(
+                row["scenario_id"], row["seed"], streams[i][0], detection_i, physics_i, temporal_i,
+                infrastructure_i, socioeconomic_i, policy_i, sensitivity_i, baseline_i
+            ))
+        
+        ranking = []
+        for rank, i in enumerate(order, start=1):
+            result = results[i]
+            ranking.append({
+                "rank": rank,
+                "scenario_id": result.scenario_id,
+                "palermo_scale": round(result.policy.palermo_scale, 2),
+                "torino_scale": result.policy.torino_scale,
+                "impact_probability": float(impact_probability[i]),
+                "energy_mt": round(result.physics.energy_mt.mean, 4),
+                "impact_type": result.physics.impact_type,
+                "expected_casualties": round(float(expected_casualties[i]), 2),
+                "recommended_action": result.policy.recommended_action
+            })
+        return PortfolioResult(results=results, ranking=ranking, rank_by=rank_by, n_samples=n_samples,
+                               sampler=sampler)
+    
+    def _portfolio_scenario(self, index: int, scenario: Dict, seed: Optional[int]) -> Dict:
+        """Fill run_portfolio defaults; mass from a sphere of diameter_m when absent."""
+        row = dict(PORTFOLIO_SCENARIO_DEFAULTS)
+        row.update({key: value for key, value in scenario.items() if value is not None})
+        row.setdefault("scenario_id", f"scenario_{index}")
+        # Values stay as given: the scenario hash (and so the random streams) must
+        # match run_full_pipeline called with the same arguments
+        if "mass_kg" in row:
+            row.setdefault("diameter_m", 2 * (3 * row["mass_kg"] / (4 * np.pi * row["density_kgm3"])) ** (1/3))
+        elif "diameter_m" in row:
+            row["mass_kg"] = (4/3) * np.pi * (float(row["diameter_m"]) / 2) ** 3 * row["density_kgm3"]
+        else:
+            raise ValueError(f"Scenario {row['scenario_id']!r} needs mass_kg or diameter_m")
+        row["diameter_m"] = float(row["diameter_m"])
+        row["is_ocean"] = bool(row["is_ocean"])
+        row["base_population"] = int(row["base_population"])
+        row["observation_arc_days"] = int(row["observation_arc_days"])
+        row["affected_plants"] = list(row["affected_plants"])
+        row["seed"] = int(row.get("seed", self.seed if seed is None else seed))
+        row["is_airburst"] = None if row.get("is_airburst") is None else bool(row["is_airburst"])
+        return row
+    
+    def _detection_batch(self, diameter_m: np.ndarray, observation_arc_days: np.ndarray) -> Dict[str, Any]:
+        """compute_detection over arrays (default albedo and solar elongation)."""
+        if self.detection_constraints:
+            completeness_data = self.detection_constraints.get(
+                "detection_probability_factors", {}
+            ).get("size_dependent_completeness", {}).get("data", [])
+            base_prob = np.full(diameter_m.shape, 0.001)
+            unmatched = np.ones(diameter_m.shape, dtype=bool)
+            for entry in completeness_data:
+                size = entry.get("diameter_m", entry.get("diameter_km", 1) * 1000)
+                hit = unmatched & (diameter_m <= size * 1.5)
+                base_prob[hit] = entry.get("completeness", 0.001)
+                unmatched &= ~hit
+        else:
+            base_prob = np.select([diameter_m >= 1000, diameter_m >= 140, diameter_m >= 50],
+                                  [0.95, 0.40, 0.025], 0.001)
+        # compute_detection defaults: elongation 90° (no penalty), albedo 0.15 (modifier 1)
+        probability = np.minimum(1.0, base_prob * 1.0 * 1.0)
+        
+        arc_quality = np.full(diameter_m.shape, "unknown", dtype=object)
+        if self.uncertainty_params:
+            arc_data = self.uncertainty_params.get(
+                "orbital_parameter_uncertainties", {}
+            ).get("typical_uncertainties_by_observation_arc", [])
+            unmatched = np.ones(diameter_m.shape, dtype=bool)
+            for entry in arc_data:
+                hit = unmatched & (observation_arc_days <= entry.get("observation_arc_days", 9999))
+                arc_quality[hit] = entry.get("arc_quality", "unknown")
+                unmatched &= ~hit
+        
+        base_warning = observation_arc_days * 3
+        warning_sigma = base_warning * 0.5
+        return {
+            "probability": probability,
+            "warning_mean": base_warning,
+            "warning_lower": np.maximum(1, base_warning - 1.96 * warning_sigma),
+            "warning_upper": base_warning + 1.96 * warning_sigma,
+            "limiting_factor": "none",
+            "arc_quality": list(arc_quality),
+            "survey_coverage": list(np.select([diameter_m >= 1000, diameter_m >= 140],
+                                              ["near_complete", "partial"], "incomplete"))
+        }
+    
+    def _physics_batch(
+        self,
+        mass_kg: np.ndarray,
+        velocity_kms: np.ndarray,
+        angle_deg: np.ndarray,
+        density_kgm3: np.ndarray,
+        is_ocean: np.ndarray,
+        rngs: List[np.random.Generator],
+        n_samples: int,
+        sampler: str,
+        is_airburst: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        compute_physics_distribution for a batch of scenarios: (N, n_samples) arrays.
+        
+        Each scenario's normals are drawn from its own Generator in the same
+        order as the scalar path (3 input columns, airburst draw, 5 outcome
+        columns), so the summaries match run_full_pipeline exactly.
+        `is_airburst` holds known airburst flags (1/0, NaN where the
+        size-based draw decides).
+        """
+        n, k = len(rngs), int(n_samples)
+        z = np.empty((PHYSICS_DESIGN_DIMS, n, k))
+        airburst_draw = np.empty(n)
+        for i, rng in enumerate(rngs):
+            if sampler == "random":
+                z[:3, i] = rng.standard_normal((3, k))
+                airburst_draw[i] = rng.random()
+                z[3:, i] = rng.standard_normal((PHYSICS_DESIGN_DIMS - 3, k))
+            else:
+                z[:, i] = DesignSampler(sampler, PHYSICS_DESIGN_DIMS, rng).standard_normal(k).T
+                airburst_draw[i] = rng.random()
+        
+        _, density_sigma_pct = self._input_sigma_percents()
+        col = lambda x: x[:, None]
+        velocities = np.clip(col(velocity_kms) + col(velocity_kms * 0.05) * z[0], 5, 72)
+        densities = np.clip(col(density_kgm3) + col(density_kgm3 * density_sigma_pct / 100) * z[1], 500, 8000)
+        energies_j = 0.5 * col(mass_kg) * (velocities * 1000) ** 2
+        energies_mt = energies_j / 4.184e15
+        
+        volume = mass_kg / np.mean(densities, axis=1)
+        diameter = 2 * (3 * volume / (4 * np.pi)) ** (1/3)
+        airburst_prob = np.select([diameter < 50, diameter < 100, diameter < 200], [0.9, 0.5, 0.1], 0.0)
+        drawn = airburst_draw < airburst_prob
+        is_airburst = drawn if is_airburst is None else np.where(np.isnan(is_airburst), drawn, is_airburst == 1)
+        base_altitude = col(30 - np.log10(np.maximum(diameter, 1)) * 10)
+        thermal_base = col(np.where(is_airburst, 14.0, 7.0))
+        
+        altitude = np.clip(base_altitude + base_altitude * 0.18 * z[3], 5, 60)
+        crater = np.maximum(0.1 * (energies_mt ** 0.25) * (1 + 0.15 * z[3]), 0)
+        samples = {
+            "energy_mt": energies_mt,
+            "airburst_altitude_km": altitude,
+            "crater_diameter_km": crater,
+            "thermal_radius_km": thermal_base * np.sqrt(energies_mt) * (1 + 0.1 * z[4])
+        }
+        for j, (psi, scale) in enumerate(BLAST_RADIUS_SCALES):
+            samples["blast_radius_km." + psi] = scale * (energies_mt ** (1/3)) * (1 + 0.1 * z[5 + j])
+        impact_type = np.where(is_airburst, "airburst", np.where(is_ocean, "ocean", "land"))
+        seismic = np.maximum((np.log10(energies_j) - 4.8) / 1.5, 0)
+        samples["seismic_magnitude"] = np.where(col(impact_type == "land"), seismic, 0.0)
+        
+        out = {"impact_type": impact_type, "n_samples": np.full(n, k)}
+        for key, values in samples.items():
+            out[key + ".mean"] = np.mean(values, axis=1)
+            out[key + ".ci_lower"], out[key + ".ci_upper"] = np.percentile(values, [2.5, 97.5], axis=1)
+        return out
+    
+    def _physics_from_batch(self, batch: Dict[str, np.ndarray], i: int) -> PhysicsDistribution:
+        """PhysicsDistribution for row `i` of a _physics_batch result."""
+        def ci(key, source):
+            return ConfidenceInterval(
+                mean=float(batch[key + ".mean"][i]),
+                ci_lower=float(batch[key + ".ci_lower"][i]),
+                ci_upper=float(batch[key + ".ci_upper"][i]),
+                source=source
+            )
+        impact_type = str(batch["impact_type"][i])
+        energy = ci("energy_mt", "Monte_Carlo_N=" + str(int(batch["n_samples"][i])))
+        tsunami_heights = None
+        if impact_type == "ocean":
+            tsunami_heights = self._tsunami_heights(energy.mean)
+        return PhysicsDistribution(
+            energy_mt=energy,
+            impact_type=impact_type,
+            airburst_altitude_km=(ci("airburst_altitude_km", "Chyba-Hills_model_±18%")
+                                  if impact_type == "airburst" else None),
+            crater_diameter_km=(ci("crater_diameter_km", "Pi-scaling_Holsapple")
+                                if impact_type in ["land", "ocean"] else None),
+            tsunami_height_m=tsunami_heights,
+            thermal_radius_km=ci("thermal_radius_km", "Glasstone-Dolan_1977"),
+            blast_radius_km={psi: ci("blast_radius_km." + psi, "cube_root_scaling") for psi, _ in BLAST_RADIUS_SCALES},
+            seismic_magnitude=ci("seismic_magnitude", "Gutenberg-Richter"),
+            validation_error_pct=self._validation_error_pct(),
+            model_used="RK4_atmospheric + Pi-scaling_crater"
+        )
+    
+    def _torino_scale_batch(self, energy_mt: np.ndarray, impact_prob: np.ndarray) -> np.ndarray:
+        """_compute_torino_scale over arrays."""
+        e = energy_mt
+        return np.select(
+            [impact_prob < 0.0001, impact_prob < 0.01, impact_prob < 0.1, impact_prob < 0.99],
+            [
+                0,
+                np.select([e < 10, e < 100], [1, 2], 3),
+                np.select([e < 100, e < 10000], [4, 5], 6),
+                np.where(e < 10000, 7, 8)
+            ],
+            np.select([e < 100, e < 10000], [8, 9], 10)
+        ).astype(int)
+    
+    def _palermo_scale_batch(self, energy_mt: np.ndarray, impact_prob: np.ndarray,
+                             warning_days: np.ndarray) -> np.ndarray:
+        """_compute_palermo_scale over arrays."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            background = 0.03 * (energy_mt ** -0.8) * np.maximum(1, warning_days / 365)
+            palermo = np.log10(impact_prob / background)
+        palermo = np.clip(np.nan_to_num(palermo, nan=-10.0), -10, 10)
+        return np.where((energy_mt <= 0) | ~(background > 0), -10.0, palermo)
+
+
+# =============================================================================
+# THREAT LISTS
+# =============================================================================
+
+def sentry_scenario(row: Dict[str, str], **defaults) -> Optional[Dict]:
+    """
+    One run_portfolio scenario from a JPL Sentry CSV row (des, diameter km, v_inf km/s, ip).
+    
+    Entry speed is sqrt(v_inf² + v_esc²); impact location and population are
+    unknown, so `defaults` (or PORTFOLIO_SCENARIO_DEFAULTS) fill them. Returns
+    None for rows without a diameter; a missing v_inf means entry at escape speed.
+    """
+    if not row.get("diameter"):
+        return None
+    v_inf = float(row.get("v_inf") or 0.0)
+    if not math.isfinite(v_inf):
+        v_inf = 0.0  # unknown (e.g. temporarily captured objects): entry at escape speed
+    scenario = dict(defaults)
+    scenario.update({
+        "scenario_id": row["des"],
+        "diameter_m": float(row["diameter"]) * 1000,
+        "velocity_kms": math.sqrt(v_inf ** 2 + EARTH_ESCAPE_VELOCITY_KMS ** 2),
+        "impact_probability": float(row.get("ip") or 0.0)
+    })
+    return scenario
+
+
+def sentry_portfolio_scenarios(
+    path: str = "datasets/jpl_sentry_threats.csv",
+    limit: Optional[int] = None,
+    **defaults
+) -> List[Dict]:
+    """run_portfolio scenarios (sentry_scenario) for the rows of a JPL Sentry export."""
+    scenarios = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            scenario = sentry_scenario(row, **defaults)
+            if scenario is None:
+                continue
+            scenarios.append(scenario)
+            if limit is not None and len(scenarios) >= limit:
+                break
+    return scenarios
+
 
 # =============================================================================
 # CLAUDE INTERFACE
@@ -0,0 +1,479 @@
+"""
+Atmosferik giriş sonucu emülatörü (entry-outcome emulator).
+
+Etkileşimli istekler için tam RK4 giriş döngüsünü her seferinde koşturmak
+yerine, çevrimdışı (offline) üretilmiş sürümlü bir tablodan çok-doğrusal
+(multilinear) interpolasyon yapar.
+
+Eksenler (girdi):
+    diameter_m          küre eşdeğeri çap, log ölçek
+    velocity_kms        giriş hızı
+    angle_deg           giriş açısı (yataydan)
+    density_kgm3        cisim yoğunluğu, log ölçek
+    strength_pa         dayanım, log ölçek
+    surface_elevation_m yüzey yüksekliği
+
+Tablodaki çıktılar: çarpma hızı (v_impact / v_entry), kütle oranı (m_impact / m_entry), parçalanma
+irtifası, airburst (en yüksek enerji bırakım) irtifası ve airburst koşulu.
+Çözücü kütleyi ve yoğunluğu kullandığı için sorgu, verilen kütlenin küre
+eşdeğeri çapıyla yapılır; >50 m "büyük cisim" kuralı (asla airburst değil)
+çağıranın verdiği çapa sorgu anında uygulanır.
+
+Bir nokta yalnızca çevreleyen hücrenin 2^6 köşesi aynı rejimdeyse
+(parçalanma ve airburst bayrakları oybirliği, hız ve kütle oranı yayılımı
+TRUST_* sınırları içinde) tablodan yanıtlanır. Tablo kurulurken ızgara
+içinden rastgele noktalar tam çözücüyle karşılaştırılır; bu güvenilir
+noktalardaki hatalar (p95 / maks) ve kapsama oranı tabloyla birlikte
+`error_bound` olarak saklanır. Izgara dışındaki, güven bölgesi dışındaki,
+sonlu olmayan veya tablonun çözücü ayarlarıyla uyuşmayan sorgular otomatik
+olarak tam çözücüye düşer (`emulate_entry`).
+
+Kullanım:
+    python entry_emulator.py build                       # datasets/entry_emulator_v1.npz
+    python entry_emulator.py build --workers 8 --validation-samples 4000
+    python entry_emulator.py info
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from meteor_physics import simulate_atmospheric_entry_vectorized
+from parallel_entry import simulate_atmospheric_entry_auto
+
+EMULATOR_VERSION = 1
+
+DEFAULT_EMULATOR_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "datasets", f"entry_emulator_v{EMULATOR_VERSION}.npz"
+)
+
+# Girdi eksenleri: (ad, log ölçek mi, varsayılan düğümler)
+INPUT_AXES = (
+    ("diameter_m", True, np.geomspace(1.0, 20000.0, 22)),
+    ("velocity_kms", False, np.linspace(11.0, 72.0, 14)),
+    ("angle_deg", False, np.linspace(5.0, 90.0, 10)),
+    ("density_kgm3", True, np.geomspace(500.0, 8000.0, 6)),
+    ("strength_pa", True, np.geomspace(1e4, 1e9, 11)),
+    ("surface_elevation_m", False, np.array([0.0, 1000.0, 2500.0, 5000.0])),
+)
+
+OUTPUTS = ("velocity_fraction", "mass_fraction", "breakup_altitude_m", "airburst_altitude_m", "airburst_condition")
+
+# Tablonun üretildiği çözücü ayarları; farklı ayarlı sorgular tam çözücüye gider.
+SOLVER_SETTINGS = dict(
+    Cd=0.47,
+    g=9.81,
+    C_h=0.1,
+    Q=8e6,
+    dt=0.05,
+    max_steps=20000,
+    start_altitude_m=100000.0,
+    pancake_tau_s=1.0,
+    pancake_max_factor=5.0,
+)
+
+# meteor_physics._finalize_entry ile aynı eşik
+LARGE_IMPACTOR_DIAMETER_M = 50.0
+
+# Güven bölgesi: hücrenin köşeleri bu kadar uyuşmuyorsa (rejim geçişi,
+# ör. cisim yere ulaşıyor / tamamen ablasyona uğruyor) tam çözücüye düşülür.
+TRUST_MAX_VELOCITY_FRACTION_SPREAD = 0.2
+TRUST_MAX_MASS_FRACTION_SPREAD = 0.2
+
+
+def _sphere_mass(diameter_m, density_kgm3):
+    return density_kgm3 * (math.pi / 6.0) * np.power(diameter_m, 3)
+
+
+def _solve_grid_chunk(args):
+    """Tek yüzey yüksekliği için bir parça ızgara noktası (Pool işçisi)."""
+    elevation, d, v, a, rho, s, settings = args
+    m0 = _sphere_mass(d, rho)
+    res = simulate_atmospheric_entry_vectorized(m0, d, v, a, rho, s, surface_elevation_m=float(elevation), **settings)
+    return _outputs_from_solver(res, m0, v, elevation)
+
+
+def _outputs_from_solver(res: Dict[str, np.ndarray], m0: np.ndarray, v0_kms: np.ndarray, surface_elevation_m) -> np.ndarray:
+    """Çözücü çıktısını OUTPUTS sırasındaki (n, 5) tabloya çevirir."""
+    E0 = res["initial_energy_joules"]
+    remaining = np.divide(res["final_energy_joules"], E0, out=np.zeros_like(E0), where=E0 > 0)
+    mass_fraction = np.divide(res["mass_impact_kg"], m0, out=np.zeros_like(E0), where=m0 > 0)
+    velocity_fraction = np.divide(res["velocity_impact_kms"], v0_kms, out=np.zeros_like(E0), where=v0_kms > 0)
+    # Airburst koşulu, büyük cisim kuralı uygulanmadan önceki haliyle saklanır.
+    broke = res["breakup_altitude_m"] > 0
+    condition = broke & (res["airburst_altitude_m"] > (np.asarray(surface_elevation_m) + 1000.0)) & (remaining < 0.2)
+    return np.stack([
+        velocity_fraction,
+        mass_fraction,
+        res["breakup_altitude_m"],
+        res["airburst_altitude_m"],
+        condition.astype(float),
+    ], axis=-1)
+
+
+class EntryEmulator:
+    """Sürümlü giriş sonucu tablosu üzerinde çok-doğrusal interpolasyon.
+
+    `table` şekli (*eksen_uzunlukları, len(OUTPUTS)`); log eksenlerde
+    interpolasyon log10 uzayında yapılır.
+    """
+
+    def __init__(self, axes: Dict[str, np.ndarray], log_axes: Dict[str, bool], table: np.ndarray, meta: Dict[str, object]):
+        self.axis_names = tuple(name for name, _, _ in INPUT_AXES)
+        if tuple(axes) != self.axis_names:
+            raise ValueError(f"Emulator axes must be {self.axis_names}")
+        self.axes = {name: np.asarray(axes[name], dtype=float) for name in self.axis_names}
+        self.log_axes = dict(log_axes)
+        self.table = np.asarray(table, dtype=float)
+        self.meta = dict(meta)
+
+        # İnterpolasyon koordinatları ve düz (flat) tablo adımları bir kez hazırlanır.
+        self._knots = [np.log10(self.axes[k]) if self.log_axes[k] else self.axes[k] for k in self.axis_names]
+        shape = self.table.shape[:-1]
+        strides = np.cumprod((1,) + shape[::-1])[:-1][::-1]
+        self._flat = self.table.reshape(-1, self.table.shape[-1])
+        corners = np.array(np.meshgrid(*([[0, 1]] * len(shape)), indexing="ij")).reshape(len(shape), -1).T
+        self._corner_bits = corners.astype(bool)
+        self._corner_offsets = corners @ strides
+        self._strides = strides
+        # Tek nokta sorguları için saf Python yolu (mikrosaniye mertebesi)
+        self._knot_lists = [k.tolist() for k in self._knots]
+        self._log_flags = [bool(self.log_axes[k]) for k in self.axis_names]
+        self._stride_list = [int(x) for x in strides]
+        self._dims = np.arange(len(shape))[None, :]
+        self._corner_sel = corners.astype(np.int64)
+
+    @property
+    def version(self) -> int:
+        return int(self.meta.get("version", 0))
+
+    @property
+    def solver_settings(self) -> Dict[str, float]:
+        return dict(self.meta.get("solver_settings", {}))
+
+    @property
+    def error_bound(self) -> Dict[str, Dict[str, float]]:
+        """Kurulumda ölçülen hata (ızgara içi rastgele noktalar, tam çözücüye karşı)."""
+        return dict(self.meta.get("error_bound", {}))
+
+    def interpolate_point(self, *x: float) -> Optional[np.ndarray]:
+        """Tek nokta (eksen sırasıyla); ızgara / güven bölgesi dışında ya da sonlu olmayan girdide None."""
+        W = np.empty((len(self._knot_lists), 2))
+        base = 0
+        for k, (xk, knots) in enumerate(zip(x, self._knot_lists)):
+            xk = float(xk)
+            if self._log_flags[k]:
+                if not xk > 0.0:
+                    return None
+                xk = math.log10(xk)
+            if not knots[0] <= xk <= knots[-1]:
+                return None
+            i = min(bisect.bisect_right(knots, xk) - 1, len(knots) - 2)
+            w = (xk - knots[i]) / (knots[i + 1] - knots[i])
+            W[k, 0] = 1.0 - w
+            W[k, 1] = w
+            base += i * self._stride_list[k]
+        values = self._flat[base + self._corner_offsets]
+        if not _trusted(values[None])[0]:
+            return None
+        corner_w = W[self._dims, self._corner_sel].prod(axis=1)
+        return corner_w @ values
+
+    def interpolate(self, **query) -> Dict[str, np.ndarray]:
+        """Eksen adlarıyla verilen noktalarda tablo çıktıları + `in_grid` / `trusted` maskeleri."""
+        cols = [np.atleast_1d(np.asarray(query[name], dtype=float)) for name in self.axis_names]
+        n = max(c.size for c in cols)
+        cols = [np.broadcast_to(c, (n,)) for c in cols]
+
+        in_grid = np.ones(n, dtype=bool)
+        base = np.zeros(n, dtype=np.int64)
+        weights = np.ones((n, len(self._knots), 2), dtype=float)
+        for k, (name, knots, x) in enumerate(zip(self.axis_names, self._knots, cols)):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                xt = np.log10(x) if self.log_axes[name] else x
+            in_grid &= np.isfinite(xt) & (xt >= knots[0]) & (xt <= knots[-1])
+            xt = np.clip(np.nan_to_num(xt, nan=knots[0]), knots[0], knots[-1])
+            i = np.clip(np.searchsorted(knots, xt, side="right") - 1, 0, knots.size - 2)
+            w = (xt - knots[i]) / (knots[i + 1] - knots[i])
+            weights[:, k, 0] = 1.0 - w
+            weights[:, k, 1] = w
+            base += i * self._strides[k]
+
+        # (n, 2^d) köşe ağırlıkları; her köşe her eksende alt (0) ya da üst (1) düğüm
+        dims = np.arange(len(self._knots))
+        corner_w = weights[:, dims, self._corner_bits.astype(np.int64)].prod(axis=-1)
+        values = self._flat[base[:, None] + self._corner_offsets]
+        out = np.einsum("nc,nco->no", corner_w, values)
+
+        result = {name: out[:, j] for j, name in enumerate(OUTPUTS)}
+        result["in_grid"] = in_grid
+        result["trusted"] = in_grid & _trusted(values)
+        return result
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            table=self.table.astype(np.float32),
+            meta=np.array(json.dumps(dict(self.meta, log_axes=self.log_axes))),
+            **{f"axis_{name}": self.axes[name] for name in self.axis_names},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EntryEmulator":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            axes = {name: data[f"axis_{name}"] for name, _, _ in INPUT_AXES}
+            table = data["table"]
+        log_axes = meta.pop("log_axes")
+        if int(meta.get("version", 0)) != EMULATOR_VERSION:
+            raise ValueError(f"Emulator table version {meta.get('version')} != {EMULATOR_VERSION}; rebuild it")
+        return cls(axes, log_axes, table, meta)
+
+
+def _trusted(values: np.ndarray) -> np.ndarray:
+    """(n, köşe, çıktı) köşe değerleri aynı rejimde mi?"""
+    spread = values.max(axis=1) - values.min(axis=1)
+    broke = values[:, :, 2] > 0
+    return (
+        (spread[:, 0] <= TRUST_MAX_VELOCITY_FRACTION_SPREAD)
+        & (spread[:, 1] <= TRUST_MAX_MASS_FRACTION_SPREAD)
+        & (spread[:, 4] == 0)
+        & (broke.all(axis=1) | ~broke.any(axis=1))
+    )
+
+
+def load_entry_emulator(path: str = DEFAULT_EMULATOR_PATH) -> Optional[EntryEmulator]:
+    """Tablo varsa ve sürümü uyuyorsa yükler; yoksa None (çağıran tam çözücüyü kullanır)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return EntryEmulator.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Entry emulator yüklenemedi ({path}): {e}")
+        return None
+
+
+def build_entry_emulator(
+    axes=None,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = 20000,
+    validation_samples: int = 2000,
+    seed: int = 0,
+    settings: Optional[Dict[str, float]] = None,
+) -> EntryEmulator:
+    """Izgarayı vektörel çözücüyle (tüm çekirdeklerde) doldurur ve hata sınırını ölçer."""
+    axes = {name: np.asarray(values, dtype=float) for name, _, values in INPUT_AXES} if axes is None else dict(axes)
+    log_axes = {name: is_log for name, is_log, _ in INPUT_AXES}
+    settings = dict(SOLVER_SETTINGS if settings is None else settings)
+    names = [name for name, _, _ in INPUT_AXES]
+    t0 = time.time()
+
+    # Yüzey yüksekliği çözücüde skaler; her yükseklik için ayrı parçalar üretilir.
+    flight_axes = names[:-1]
+    mesh = np.meshgrid(*[axes[k] for k in flight_axes], indexing="ij")
+    flight_points = [g.ravel() for g in mesh]
+    n_flight = flight_points[0].size
+    tasks = []
+    for elevation in axes["surface_elevation_m"]:
+        for start in range(0, n_flight, chunk_size):
+            sl = slice(start, start + chunk_size)
+            tasks.append((float(elevation),) + tuple(p[sl] for p in flight_points) + (settings,))
+
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers > 1:
+        with Pool(workers) as pool:
+            chunks = pool.map(_solve_grid_chunk, tasks)
+    else:
+        chunks = [_solve_grid_chunk(t) for t in tasks]
+
+    # Parçalar (yükseklik, uçuş noktası) sırasında; tablo eksen sırası yüksekliği sona koyar.
+    per_elevation = np.concatenate(chunks).reshape(axes["surface_elevation_m"].size, n_flight, len(OUTPUTS))
+    shape = tuple(axes[k].size for k in flight_axes)
+    table = np.moveaxis(per_elevation.reshape((axes["surface_elevation_m"].size,) + shape + (len(OUTPUTS),)), 0, -2)
+
+    meta = {
+        "version": EMULATOR_VERSION,
+        "outputs": list(OUTPUTS),
+        "solver_settings": settings,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "grid_points": int(table[..., 0].size),
+    }
+    emulator = EntryEmulator(axes, log_axes, table.astype(np.float32).astype(float), meta)
+    emulator.meta["error_bound"] = measure_error_bound(emulator, validation_samples, seed=seed)
+    emulator.meta["build_seconds"] = round(time.time() - t0, 1)
+    return emulator
+
+
+def measure_error_bound(emulator: EntryEmulator, samples: int, *, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Izgara içinden rastgele noktalarda emülatörü tam çözücüyle karşılaştırır."""
+    rng = np.random.default_rng(seed)
+    query = {}
+    for name in emulator.axis_names:
+        lo, hi = emulator._knots[emulator.axis_names.index(name)][[0, -1]]
+        x = rng.uniform(lo, hi, samples)
+        query[name] = 10.0 ** x if emulator.log_axes[name] else x
+    query["surface_elevation_m"] = rng.choice(emulator.axes["surface_elevation_m"], samples)
+
+    approx = emulator.interpolate(**query)
+    exact = np.empty((samples, len(OUTPUTS)))
+    for elevation in np.unique(query["surface_elevation_m"]):
+        sel = query["surface_elevation_m"] == elevation
+        exact[sel] = _solve_grid_chunk((
+            float(elevation), query["diameter_m"][sel], query["velocity_kms"][sel], query["angle_deg"][sel],
+            query["density_kgm3"][sel], query["strength_pa"][sel], emulator.solver_settings,
+        ))
+
+    ok = approx["trusted"]
+    bound = {"coverage": {"trusted_fraction": float(ok.mean()), "samples": int(samples)}}
+    if not ok.any():
+        return bound
+    for j, name in enumerate(OUTPUTS):
+        if name == "airburst_condition":
+            mismatch = (approx[name][ok] >= 0.5) != (exact[ok, j] >= 0.5)
+            bound[name] = {"mismatch_rate": float(mismatch.mean())}
+            continue
+        err = np.abs(approx[name][ok] - exact[ok, j])
+        bound[name] = {"p95_abs": float(np.percentile(err, 95)), "max_abs": float(err.max())}
+    return bound
+
+
+def emulate_entry(
+    mass_kg: Union[float, np.ndarray],
+    diameter_m: Union[float, np.ndarray],
+    velocity_kms: Union[float, np.ndarray],
+    angle_deg: Union[float, np.ndarray],
+    density_kgm3: Union[float, np.ndarray],
+    strength_pa: Union[float, np.ndarray],
+    surface_elevation_m: float = 0.0,
+    *,
+    emulator: Optional[EntryEmulator],
+    **solver_kwargs,
+) -> Dict[str, np.ndarray]:
+    """`simulate_atmospheric_entry_vectorized` ile aynı anahtarları döndürür (+ `emulated` maskesi).
+
+    Izgaranın güven bölgesindeki noktalar tablodan, geri kalanlar (ve emülatör
+    yoksa ya da `solver_kwargs` tablonun ayarlarından farklıysa hepsi) tam
+    çözücüden gelir.
+    """
+    elevation = float(surface_elevation_m)
+    settings = dict(SOLVER_SETTINGS, **solver_kwargs)
+    usable = emulator is not None and set(settings) == set(SOLVER_SETTINGS) and all(
+        math.isclose(float(settings[k]), float(emulator.solver_settings.get(k, math.nan))) for k in SOLVER_SETTINGS
+    )
+
+    inputs = (mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa)
+    if usable and all(np.ndim(x) == 0 for x in inputs):
+        point = _emulate_point(emulator, *(float(x) for x in inputs), elevation)
+        if point is not None:
+            return point
+
+    m = np.atleast_1d(np.asarray(mass_kg, dtype=float))
+    cols = [np.atleast_1d(np.asarray(x, dtype=float)) for x in inputs[1:]]
+    n = max([m.size] + [c.size for c in cols])
+    m = np.broadcast_to(m, (n,))
+    d, v, a, rho, s = (np.broadcast_to(c, (n,)) for c in cols)
+
+    out = {
+        "velocity_impact_kms": np.zeros(n),
+        "mass_impact_kg": np.zeros(n),
+        "breakup_altitude_m": np.zeros(n),
+        "airburst_altitude_m": np.zeros(n),
+        "is_airburst": np.zeros(n, dtype=bool),
+        "energy_loss_percent": np.zeros(n),
+        "initial_energy_joules": 0.5 * m * (v * 1000.0) ** 2,
+        "final_energy_joules": np.zeros(n),
+        "emulated": np.zeros(n, dtype=bool),
+    }
+
+    if usable:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_eq = np.cbrt(6.0 * m / (math.pi * rho))
+        approx = emulator.interpolate(
+            diameter_m=d_eq, velocity_kms=v, angle_deg=a, density_kgm3=rho, strength_pa=s,
+            surface_elevation_m=np.full(n, elevation),
+        )
+        ok = approx["trusted"] & (m > 0)
+        vi = np.maximum(approx["velocity_fraction"], 0.0) * v
+        mf = np.clip(approx["mass_fraction"], 0.0, 1.0)
+        out["velocity_impact_kms"] = np.where(ok, vi, 0.0)
+        out["mass_impact_kg"] = np.where(ok, mf * m, 0.0)
+        out["breakup_altitude_m"] = np.where(ok, approx["breakup_altitude_m"], 0.0)
+        out["airburst_altitude_m"] = np.where(ok, approx["airburst_altitude_m"], 0.0)
+        out["is_airburst"] = ok & (approx["airburst_condition"] >= 0.5) & ~(d > LARGE_IMPACTOR_DIAMETER_M)
+        out["final_energy_joules"] = 0.5 * out["mass_impact_kg"] * (out["velocity_impact_kms"] * 1000.0) ** 2
+        out["emulated"] = ok
+
+    exact = np.flatnonzero(~out["emulated"])
+    if exact.size:
+        res = simulate_atmospheric_entry_auto(
+            m[exact], d[exact], v[exact], a[exact], rho[exact], s[exact], surface_elevation_m=elevation, **settings
+        )
+        for key in ("velocity_impact_kms", "mass_impact_kg", "breakup_altitude_m", "airburst_altitude_m",
+                    "is_airburst", "initial_energy_joules", "final_energy_joules"):
+            out[key][exact] = res[key]
+
+    E0 = out["initial_energy_joules"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss = np.where(E0 > 0, 1.0 - out["final_energy_joules"] / E0, 1.0)
+    out["energy_loss_percent"] = np.clip(loss, 0.0, 1.0) * 100.0
+    return out
+
+
+def _emulate_point(emulator: EntryEmulator, m, d, v, a, rho, s, elevation) -> Optional[Dict[str, np.ndarray]]:
+    """Tek örnek için `emulate_entry` kısayolu; ızgara dışında None."""
+    if not (m > 0.0 and rho > 0.0):
+        return None
+    vals = emulator.interpolate_point((6.0 * m / (math.pi * rho)) ** (1.0 / 3.0), v, a, rho, s, elevation)
+    if vals is None:
+        return None
+    vi = max(float(vals[0]), 0.0) * v
+    m_impact = min(max(float(vals[1]), 0.0), 1.0) * m
+    E0 = 0.5 * m * (v * 1000.0) ** 2
+    E1 = 0.5 * m_impact * (vi * 1000.0) ** 2
+    loss = min(max(1.0 - E1 / E0, 0.0), 1.0) if E0 > 0 else 1.0
+    return {
+        "velocity_impact_kms": np.array([vi]),
+        "mass_impact_kg": np.array([m_impact]),
+        "breakup_altitude_m": np.array([float(vals[2])]),
+        "airburst_altitude_m": np.array([float(vals[3])]),
+        "is_airburst": np.array([bool(vals[4] >= 0.5 and not d > LARGE_IMPACTOR_DIAMETER_M)]),
+        "energy_loss_percent": np.array([loss * 100.0]),
+        "initial_energy_joules": np.array([E0]),
+        "final_energy_joules": np.array([E1]),
+        "emulated": np.array([True]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry-outcome emulator table tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="build the table with the vectorized solver")
+    p_build.add_argument("--out", default=DEFAULT_EMULATOR_PATH)
+    p_build.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    p_build.add_argument("--validation-samples", type=int, default=2000)
+    p_build.add_argument("--seed", type=int, default=0)
+    p_info = sub.add_parser("info", help="print version, grid and error bound of a table")
+    p_info.add_argument("--path", default=DEFAULT_EMULATOR_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        emulator = build_entry_emulator(workers=args.workers, validation_samples=args.validation_samples, seed=args.seed)
+        emulator.save(args.out)
+        print(f"✓ Entry emulator v{emulator.version}: {emulator.meta['grid_points']} nokta, "
+              f"{emulator.meta['build_seconds']} s -> {args.out}")
+        print(json.dumps(emulator.error_bound, indent=2))
+    else:
+        emulator = EntryEmulator.load(args.path)
+        print(json.dumps(emulator.meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
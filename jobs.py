@@ -0,0 +1,301 @@
+"""
+Yerel asenkron iş (job) altyapısı: ağır endpoint'leri Flask iş parçacığını
+bloklamadan çalıştırır.
+
+    submit   iş kimliği döndürür; iş sınırlı bir süreç havuzunda (spawn,
+             `max_workers`) çalışır, kuyrukta en çok `max_pending` iş durur
+    status   durum, ilerleme (done/total/stage) ve son ara istatistikler
+    events   ilerleme olaylarının sıralı akışı (SSE için bekleyerek okunur)
+    cancel   kuyruktaki iş hemen, çalışan iş bir sonraki `report_progress`
+             noktasında iptal edilir
+    result   bittiğinde hedef fonksiyonun dönüş değeri
+
+Harici broker yoktur: işçiler olayları bir multiprocessing kuyruğuna yazar,
+ebeveyndeki dinleyici iş parçacığı bunları iş kayıtlarına işler. İptal
+bayrakları paylaşılan bir tamsayı dizisinde (iş sırası → yuva) durur.
+Kayıtlar bellektedir; biten işler `retain` sınırını aşınca en eskiden
+silinir.
+
+İşçi tarafında hedef kod yalnızca `report_progress(...)` çağırır; iş
+dışında (senkron endpoint) bu çağrı hiçbir şey yapmaz.
+"""
+
+import collections
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+JOB_STATES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+DEFAULT_MAX_PENDING = 32
+DEFAULT_RETAIN = 256
+# İptal bayrağı yuvaları; eşzamanlı (kuyruk + çalışan) iş sayısından büyük olmalı
+CANCEL_SLOTS = 4096
+# İş başına tutulan son ilerleme olayı sayısı
+EVENT_HISTORY = 512
+
+
+class JobCancelled(BaseException):
+    """Çalışan iş iptal edildi. BaseException: endpoint'lerin `except Exception` blokları yutmasın."""
+
+
+class JobQueueFull(RuntimeError):
+    """Kuyruktaki + çalışan iş sayısı `max_pending` sınırında."""
+
+
+# --- İşçi süreç tarafı ---
+
+_worker: Dict[str, Any] = {"events": None, "cancel_flags": None, "job": None}
+
+
+def _init_worker(events, cancel_flags) -> None:
+    _worker["events"] = events
+    _worker["cancel_flags"] = cancel_flags
+
+
+def _check_cancelled() -> None:
+    job_id, seq = _worker["job"]
+    if _worker["cancel_flags"][seq % CANCEL_SLOTS] == seq:
+        raise JobCancelled(job_id)
+
+
+def _run_job(job_id: str, seq: int, fn: Callable, args: tuple):
+    _worker["job"] = (job_id, seq)
+    try:
+        _check_cancelled()
+        _worker["events"].put((job_id, "running", {"pid": os.getpid()}))
+        return fn(*args)
+    finally:
+        _worker["job"] = None
+        # Sonuç future üzerinden, olaylar kuyruktan gelir; bu işaret işin son olayıdır
+        _worker["events"].put((job_id, "end", {}))
+
+
+def report_progress(done: Optional[float] = None, total: Optional[float] = None, *,
+                    stage: Optional[str] = None, partial: Optional[Dict[str, Any]] = None) -> None:
+    """Çalışan işin ilerlemesini yayınlar; iş iptal edildiyse JobCancelled fırlatır.
+
+    İş dışında çağrılırsa hiçbir şey yapmaz. `partial` JSON'a çevrilebilir
+    ara istatistikler olmalıdır.
+    """
+    if _worker["job"] is None:
+        return
+    _check_cancelled()
+    _worker["events"].put((_worker["job"][0], "progress", {
+        "done": done,
+        "total": total,
+        "stage": stage,
+        "partial": partial,
+    }))
+
+
+# --- Ebeveyn (Flask) tarafı ---
+
+class JobManager:
+    """Sınırlı süreç havuzu üzerinde iş kayıtları; tüm yöntemler iş parçacığı güvenlidir."""
+
+    def __init__(self, max_workers: Optional[int] = None, *, max_pending: int = DEFAULT_MAX_PENDING,
+                 retain: int = DEFAULT_RETAIN):
+        self.max_workers = max(1, int(max_workers or max(1, (os.cpu_count() or 2) // 2)))
+        self.max_pending = int(max_pending)
+        self.retain = int(retain)
+        # fork, Numba'nın paralel iş parçacıkları başlamışken kilitlenebiliyor; spawn güvenli
+        self._ctx = multiprocessing.get_context("spawn")
+        self._events = None
+        self._cancel_flags = None
+        self._executor = None
+        self._listener = None
+        self._jobs: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    # -- havuz --
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._events is None:
+            self._events = self._ctx.Queue()
+            self._cancel_flags = self._ctx.Array("q", CANCEL_SLOTS, lock=False)
+            for i in range(CANCEL_SLOTS):
+                self._cancel_flags[i] = -1
+            self._listener = threading.Thread(target=self._listen, name="job-events", daemon=True)
+            self._listener.start()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=self._ctx,
+                initializer=_init_worker, initargs=(self._events, self._cancel_flags),
+            )
+        return self._executor
+
+    def _listen(self) -> None:
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            job_id, kind, payload = item
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None or job["state"] in FINAL_STATES:
+                    continue
+                if kind == "end":
+                    job["drained"] = True
+                    if job["outcome"] is not None:
+                        self._finalize(job)
+                elif kind == "running":
+                    job["state"] = "running"
+                    job["started_at"] = time.time()
+                    self._append_event(job, "running", payload)
+                else:
+                    job["progress"] = {k: payload[k] for k in ("done", "total", "stage")}
+                    if payload.get("partial") is not None:
+                        job["partial"] = payload["partial"]
+                    self._append_event(job, "progress", payload)
+                self._cond.notify_all()
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        if self._events is not None:
+            self._events.put(None)
+
+    # -- kayıtlar --
+
+    def _append_event(self, job: Dict[str, Any], kind: str, payload: Dict[str, Any]) -> None:
+        job["event_count"] += 1
+        job["events"].append({"id": job["event_count"], "type": kind, "time": time.time(), **payload})
+
+    def _get(self, job_id: str) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job["state"] in FINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - self.retain)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job_id: str, future) -> None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            # İşçi hiç çalışmadıysa (iptal) ya da öldüyse "end" işareti gelmez
+            drained = future.cancelled()
+            if future.cancelled():
+                job["outcome"] = ("cancelled", None, None)
+            else:
+                exc = future.exception()
+                if exc is None:
+                    job["outcome"] = ("succeeded", None, future.result())
+                elif isinstance(exc, JobCancelled):
+                    job["outcome"] = ("cancelled", None, None)
+                else:
+                    drained = isinstance(exc, BrokenProcessPool)
+                    job["outcome"] = ("failed", f"{type(exc).__name__}: {exc}", None)
+            job["future"] = None
+            if drained or job["drained"]:
+                self._finalize(job)
+
+    def _finalize(self, job: Dict[str, Any]) -> None:
+        """Sonuç ve son olay ikisi de geldiğinde işi kapatır (ilerleme olayları sonuçtan önce sıralanır)."""
+        state, error, result = job["outcome"]
+        job["state"] = state
+        job["error"] = error
+        job["result"] = result
+        job["finished_at"] = time.time()
+        self._append_event(job, state, {"error": error} if error else {})
+        self._prune()
+        self._cond.notify_all()
+
+    # -- genel API --
+
+    def submit(self, kind: str, fn: Callable, *args) -> str:
+        """`fn(*args)` işini kuyruğa ekler; `fn` ve `args` pickle edilebilir olmalı (modül düzeyi)."""
+        with self._cond:
+            active = sum(1 for job in self._jobs.values() if job["state"] not in FINAL_STATES)
+            if active >= self.max_pending:
+                raise JobQueueFull(f"{active} jobs pending (limit {self.max_pending})")
+            seq = self._seq
+            self._seq += 1
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "kind": kind,
+                "state": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {"done": None, "total": None, "stage": None},
+                "partial": None,
+                "error": None,
+                "result": None,
+                "events": collections.deque(maxlen=EVENT_HISTORY),
+                "event_count": 0,
+                "seq": seq,
+                "future": None,
+                "outcome": None,
+                "drained": False,
+            }
+            self._jobs[job_id] = job
+            self._append_event(job, "queued", {})
+            try:
+                future = self._ensure_executor().submit(_run_job, job_id, seq, fn, args)
+            except BrokenProcessPool:
+                # Çöken işçi havuzu bozar; yenisini kurup bir kez daha dene
+                self._executor = None
+                future = self._ensure_executor().submit(_run_job, job_id, seq, fn, args)
+            job["future"] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """Sonuç hariç iş kaydı (JSON'a çevrilebilir)."""
+        with self._cond:
+            job = self._get(job_id)
+            return {key: job[key] for key in ("job_id", "kind", "state", "submitted_at", "started_at",
+                                              "finished_at", "progress", "partial", "error")}
+
+    def result(self, job_id: str) -> Tuple[str, Any]:
+        """(durum, sonuç); sonuç yalnızca "succeeded" durumunda doludur."""
+        with self._cond:
+            job = self._get(job_id)
+            return job["state"], job["result"]
+
+    def cancel(self, job_id: str) -> str:
+        """İptal ister; iş kaydının o anki durumunu döndürür."""
+        with self._cond:
+            job = self._get(job_id)
+            if job["state"] in FINAL_STATES:
+                return job["state"]
+            self._cancel_flags[job["seq"] % CANCEL_SLOTS] = job["seq"]
+            future = job["future"]
+        if future is not None:
+            # Henüz başlamadıysa hemen iptal olur (_finish durumu "cancelled" yapar);
+            # başladıysa işçi bayrağı bir sonraki report_progress'te görür
+            future.cancel()
+        with self._cond:
+            return self._get(job_id)["state"]
+
+    def wait_events(self, job_id: str, after: int = 0, timeout: float = 15.0) -> Tuple[List[Dict[str, Any]], bool]:
+        """`after` kimliğinden sonraki olaylar; yoksa `timeout` saniye bekler. (olaylar, bitti_mi)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._get(job_id)
+                events = [event for event in job["events"] if event["id"] > after]
+                done = job["state"] in FINAL_STATES
+                remaining = deadline - time.monotonic()
+                if events or done or remaining <= 0:
+                    return events, done
+                self._cond.wait(remaining)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [self.status(job_id) for job_id in self._jobs]
@@ -1,6 +1,9 @@
+import contextlib
+import json
 import math
+import os
 from dataclasses import dataclass
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Sequence, Union
 
 import numpy as np
 
@@ -57,6 +60,97 @@ def atmospheric_density_isothermal(h_m: Union[float, np.ndarray]) -> Union[float
     return RHO0_AIR * np.exp(-np.asarray(h_m, dtype=float) / SCALE_HEIGHT_M)
 
 
+US_STANDARD_ATMOSPHERE_1976_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "datasets", "us_standard_atmosphere_1976.json"
+)
+
+
+class LayeredAtmosphereTable:
+    """Layered (US Standard 1976 style) density precomputed on a uniform altitude grid.
+
+    Density is evaluated once per knot from the hydrostatic layer equations
+    (pressure from the layer base, ρ = P·M / (R·T)); lookups interpolate
+    log ρ linearly between knots, which is exact inside isothermal layers
+    and within ~2e-6 relative of the layer equations elsewhere at the
+    default 10 m spacing.
+    Altitudes outside [bottom_m, top_m] clamp to the end values.
+    """
+
+    def __init__(self, data: Dict[str, object], *, bottom_m: float = -1000.0, top_m: float = 120000.0,
+                 step_m: float = 10.0):
+        layers = sorted(data["layers"], key=lambda layer: layer["base_altitude_km"])
+        consts = data.get("constants", {})
+        R = float(consts.get("R_gas_constant", 8.31432))
+        g0 = float(consts.get("g0_gravity", 9.80665))
+        M = float(consts.get("M_air_molar_mass", 0.0289644))
+
+        n = int(round((float(top_m) - float(bottom_m)) / float(step_m))) + 1
+        self.altitude_m = np.linspace(float(bottom_m), float(top_m), n)
+        self.bottom_m = float(bottom_m)
+        self.top_m = float(top_m)
+        self.step_m = (self.top_m - self.bottom_m) / (n - 1)
+
+        bases = np.array([layer["base_altitude_km"] * 1000.0 for layer in layers])
+        which = np.clip(np.searchsorted(bases, self.altitude_m, side="right") - 1, 0, len(layers) - 1)
+        log_rho = np.empty(n, dtype=float)
+        for i, layer in enumerate(layers):
+            sel = which == i
+            dh = self.altitude_m[sel] - bases[i]
+            Tb = float(layer["base_temp_k"])
+            L = float(layer["lapse_rate_k_km"]) / 1000.0
+            if abs(L) < 1e-9:
+                T = np.full(dh.shape, Tb)
+                log_p = math.log(layer["base_pressure_pa"]) - g0 * M * dh / (R * Tb)
+            else:
+                T = Tb + L * dh
+                log_p = math.log(layer["base_pressure_pa"]) + (g0 * M / (R * L)) * np.log(Tb / T)
+            log_rho[sel] = log_p + math.log(M / R) - np.log(T)
+        self.log_density = log_rho
+
+    def density(self, h_m: Union[float, np.ndarray]) -> np.ndarray:
+        """Air density (kg/m³) at geometric altitude `h_m` (m), any array shape."""
+        return np.exp(np.interp(h_m, self.altitude_m, self.log_density))
+
+
+_US1976_TABLE = None
+
+
+def us_standard_atmosphere_1976_table(path: str = US_STANDARD_ATMOSPHERE_1976_PATH) -> LayeredAtmosphereTable:
+    """Shared table built from `datasets/us_standard_atmosphere_1976.json` (loaded once)."""
+    global _US1976_TABLE
+    if _US1976_TABLE is None or _US1976_TABLE[0] != path:
+        with open(path, "r", encoding="utf-8") as f:
+            _US1976_TABLE = (path, LayeredAtmosphereTable(json.load(f)))
+    return _US1976_TABLE[1]
+
+
+# Scalar/array density lookups (`standard_atmosphere_density`) return a fixed
+# floor at and above this altitude instead of extending the table.
+STANDARD_ATMOSPHERE_CEILING_KM = 100.0
+ABOVE_CEILING_DENSITY_KGM3 = 1e-6
+
+
+def standard_atmosphere_density(altitude_km: Union[float, np.ndarray],
+                                table: Optional[LayeredAtmosphereTable] = None) -> Union[float, np.ndarray]:
+    """US Standard 1976 air density (kg/m³) at `altitude_km`, one code path for scalars and arrays.
+
+    Uses `table` (default: the shared `us_standard_atmosphere_1976_table()`);
+    at or above STANDARD_ATMOSPHERE_CEILING_KM the ABOVE_CEILING_DENSITY_KGM3
+    floor is returned. Scalar input returns a float, arrays keep their shape.
+    """
+    table = us_standard_atmosphere_1976_table() if table is None else table
+    h_km = np.asarray(altitude_km, dtype=float)
+    rho = np.where(h_km >= STANDARD_ATMOSPHERE_CEILING_KM, ABOVE_CEILING_DENSITY_KGM3, table.density(h_km * 1000.0))
+    return float(rho) if rho.ndim == 0 else rho
+
+
+def _air_density(h_m: np.ndarray, atmosphere: Optional[LayeredAtmosphereTable]) -> np.ndarray:
+    if atmosphere is None:
+        return atmospheric_density_isothermal(h_m)
+    # Tablo float64 döndürür; float32 durum dizilerini yükseltmesin
+    return atmosphere.density(h_m).astype(np.result_type(h_m, np.float32), copy=False)
+
+
 # --- 4) Aerodinamik ---
 
 def cross_section_area(radius_m: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
@@ -80,13 +174,13 @@ class EntryResult:
     energy_loss_percent: float
 
 
-def _as_1d(x: Union[float, np.ndarray]) -> np.ndarray:
-    return np.atleast_1d(np.asarray(x, dtype=float))
+def _as_1d(x: Union[float, np.ndarray], dtype=np.float64) -> np.ndarray:
+    return np.atleast_1d(np.asarray(x, dtype=dtype))
 
 
 def _broadcast_to_n(arr: np.ndarray, n: int) -> np.ndarray:
     if arr.size == 1 and n > 1:
-        return np.full(n, float(arr[0]), dtype=float)
+        return np.full(n, arr[0], dtype=arr.dtype)
     return arr
 
 
@@ -106,6 +200,7 @@ def _entry_derivatives(
     Q: float,
     pancake_tau_s: float,
     pancake_max_factor: float,
+    atmosphere: Optional[LayeredAtmosphereTable] = None,
 ) -> Dict[str, np.ndarray]:
     """Compute time-derivatives for the entry ODEs.
 
@@ -115,7 +210,7 @@ def _entry_derivatives(
       pancake growth for effective area.
     """
 
-    rho_air = atmospheric_density_isothermal(h)
+    rho_air = _air_density(h, atmosphere)
 
     # Base radius from current mass and density (sphere). Allows ablation shrink.
     with np.errstate(divide="ignore", invalid="ignore"):
@@ -156,6 +251,73 @@ def _entry_derivatives(
     }
 
 
+ENTRY_METHODS = ("rk4", "rk45")
+ENTRY_BACKENDS = ("numpy", "numba")
+ENTRY_ATMOSPHERES = ("isothermal", "us1976")
+# float32: Monte Carlo için tek duyarlıklı hızlı mod (yalnızca NumPy RK4)
+ENTRY_DTYPES = (np.dtype(np.float64), np.dtype(np.float32))
+
+# Samples slower than this are treated as stopped (m/s).
+STOP_VELOCITY_M_S = 10.0
+
+# Dormand–Prince 5(4) tableau (Hairer, Nørsett & Wanner 1993, Table II.5.2).
+_DP_C = (0.0, 1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1.0 / 5.0,),
+    (3.0 / 40.0, 9.0 / 40.0),
+    (44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0),
+    (19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0),
+    (9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0, 49.0 / 176.0, -5103.0 / 18656.0),
+    (35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0),
+)
+# 5th-order weights minus embedded 4th-order weights -> local error estimate.
+_DP_E = (
+    35.0 / 384.0 - 5179.0 / 57600.0,
+    0.0,
+    500.0 / 1113.0 - 7571.0 / 16695.0,
+    125.0 / 192.0 - 393.0 / 640.0,
+    -2187.0 / 6784.0 + 92097.0 / 339200.0,
+    11.0 / 84.0 - 187.0 / 2100.0,
+    -1.0 / 40.0,
+)
+
+# Step-size controller
+_RK45_SAFETY = 0.9
+_RK45_MIN_FACTOR = 0.2
+_RK45_MAX_FACTOR = 5.0
+_RK45_MIN_STEP_S = 1e-8
+# Absolute error floors: velocity (m/s), altitude (m), mass (fraction of entry mass)
+_RK45_ATOL_V = 1e-3
+_RK45_ATOL_H = 1e-3
+_RK45_ATOL_M_FRAC = 1e-9
+# A single step may not descend more than this many atmospheric scale heights.
+_RK45_MAX_SCALE_HEIGHTS_PER_STEP = 0.5
+# Bisection iterations for event location (resolves 2^-40 of a step)
+_RK45_EVENT_ITERS = 40
+
+
+def _derivatives_for(params: Dict[str, object], m, v, h, t_break, broke) -> Dict[str, np.ndarray]:
+    return _entry_derivatives(
+        m=m,
+        v=v,
+        h=h,
+        theta=params["theta"],
+        rho_m=params["rho_m"],
+        strength=params["strength"],
+        broke=broke,
+        t_since_break=t_break,
+        diameter_m=params["diameter_m"],
+        Cd=float(params["Cd"]),
+        g=float(params["g"]),
+        C_h=float(params["C_h"]),
+        Q=float(params["Q"]),
+        pancake_tau_s=float(params["pancake_tau_s"]),
+        pancake_max_factor=float(params["pancake_max_factor"]),
+        atmosphere=params.get("atmosphere"),
+    )
+
+
 def _rk4_step(state: Dict[str, np.ndarray], params: Dict[str, object], dt: float) -> Dict[str, np.ndarray]:
     m0 = state["m"]
     v0 = state["v"]
@@ -164,23 +326,7 @@ def _rk4_step(state: Dict[str, np.ndarray], params: Dict[str, object], dt: float
     broke0 = state["broke"]
 
     def f(m, v, h, t_break, broke):
-        return _entry_derivatives(
-            m=m,
-            v=v,
-            h=h,
-            theta=params["theta"],
-            rho_m=params["rho_m"],
-            strength=params["strength"],
-            broke=broke,
-            t_since_break=t_break,
-            diameter_m=params["diameter_m"],
-            Cd=float(params["Cd"]),
-            g=float(params["g"]),
-            C_h=float(params["C_h"]),
-            Q=float(params["Q"]),
-            pancake_tau_s=float(params["pancake_tau_s"]),
-            pancake_max_factor=float(params["pancake_max_factor"]),
-        )
+        return _derivatives_for(params, m, v, h, t_break, broke)
 
     k1 = f(m0, v0, h0, t_break0, broke0)
     m1 = np.maximum(0.0, m0 + 0.5 * dt * k1["dmdt"])
@@ -224,7 +370,82 @@ def _rk4_step(state: Dict[str, np.ndarray], params: Dict[str, object], dt: float
     }
 
 
-def _simulate_entry_core(
+def _dopri5_step(
+    state: Dict[str, np.ndarray],
+    k1: Dict[str, np.ndarray],
+    params: Dict[str, object],
+    dt: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """One Dormand–Prince 5(4) step with a per-sample step size `dt`.
+
+    `k1` are the derivatives at `state` (FSAL: the returned `k_end` is the
+    derivative at the new state and becomes the next step's `k1`).
+    """
+    m0 = state["m"]
+    v0 = state["v"]
+    h0 = state["h"]
+    t_break0 = state["t_since_break"]
+    broke0 = state["broke"]
+
+    ks = [k1]
+    # Oversized trial steps can blow up intermediate stages; the error norm
+    # turns those into rejections, so silence the floating point noise here.
+    with np.errstate(over="ignore", invalid="ignore"):
+        for i in range(1, 7):
+            a = _DP_A[i]
+            dm = sum(a[j] * ks[j]["dmdt"] for j in range(i) if a[j] != 0.0)
+            dv = sum(a[j] * ks[j]["dvdt"] for j in range(i) if a[j] != 0.0)
+            dh = sum(a[j] * ks[j]["dhdt"] for j in range(i) if a[j] != 0.0)
+            m_i = np.maximum(0.0, m0 + dt * dm)
+            v_i = np.maximum(0.0, v0 + dt * dv)
+            h_i = h0 + dt * dh
+            ks.append(_derivatives_for(params, m_i, v_i, h_i, t_break0 + _DP_C[i] * dt, broke0))
+
+    # Stage 7 is evaluated at the 5th-order solution (a[6] == b5).
+    err = {}
+    for key in ("dmdt", "dvdt", "dhdt"):
+        err[key] = dt * sum(_DP_E[j] * ks[j][key] for j in range(7) if _DP_E[j] != 0.0)
+
+    return {
+        "m": m_i,
+        "v": v_i,
+        "h": h_i,
+        "err_m": err["dmdt"],
+        "err_v": err["dvdt"],
+        "err_h": err["dhdt"],
+        "k_end": ks[6],
+    }
+
+
+def _hermite(y0: np.ndarray, f0: np.ndarray, y1: np.ndarray, f1: np.ndarray, dt: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Cubic Hermite interpolant of a step at fraction `s` in [0, 1]."""
+    s2 = s * s
+    s3 = s2 * s
+    return (
+        (2.0 * s3 - 3.0 * s2 + 1.0) * y0
+        + (s3 - 2.0 * s2 + s) * dt * f0
+        + (-2.0 * s3 + 3.0 * s2) * y1
+        + (s3 - s2) * dt * f1
+    )
+
+
+def _locate_first_event(triggered, n: int) -> np.ndarray:
+    """Smallest step fraction at which `triggered(s)` becomes True (bisection).
+
+    `triggered` maps an array of fractions (one per sample) to a boolean array
+    and must be True at s=1 for every sample passed in.
+    """
+    lo = np.zeros(n, dtype=float)
+    hi = np.ones(n, dtype=float)
+    for _ in range(_RK45_EVENT_ITERS):
+        mid = 0.5 * (lo + hi)
+        hit = triggered(mid)
+        hi = np.where(hit, mid, hi)
+        lo = np.where(hit, lo, mid)
+    return hi
+
+
+def _prepare_entry_state(
     mass_kg: Union[float, np.ndarray],
     diameter_m: Union[float, np.ndarray],
     velocity_kms: Union[float, np.ndarray],
@@ -233,27 +454,21 @@ def _simulate_entry_core(
     strength_pa: Union[float, np.ndarray],
     *,
     start_altitude_m: float,
-    surface_elevation_m: float,
     Cd: float,
     g: float,
     C_h: float,
     Q: float,
-    dt: float,
-    max_steps: int,
-    return_history: bool,
     pancake_tau_s: float,
     pancake_max_factor: float,
-) -> Dict[str, np.ndarray]:
-    """
-    Basitleştirilmiş ve sağlamlaştırılmış atmosferik giriş simülasyonu.
-    Bennu gibi büyük cisimlerin 'hatalı airburst' olarak işaretlenmesini engeller.
-    """
-    m = _as_1d(mass_kg).copy()
-    d = _as_1d(diameter_m)
-    v = _as_1d(velocity_kms) * 1000.0
-    theta = np.deg2rad(_as_1d(angle_deg))
-    rho_m = _as_1d(density_kgm3)
-    strength = _as_1d(strength_pa)
+    atmosphere: Optional[LayeredAtmosphereTable] = None,
+    dtype=np.float64,
+):
+    m = _as_1d(mass_kg, dtype).copy()
+    d = _as_1d(diameter_m, dtype)
+    v = _as_1d(velocity_kms, dtype) * 1000.0
+    theta = np.deg2rad(_as_1d(angle_deg, dtype))
+    rho_m = _as_1d(density_kgm3, dtype)
+    strength = _as_1d(strength_pa, dtype)
 
     n = int(max(m.size, d.size, v.size, theta.size, rho_m.size, strength.size))
     m = _broadcast_to_n(m, n)
@@ -262,36 +477,23 @@ def _simulate_entry_core(
     theta = _broadcast_to_n(theta, n)
     rho_m = _broadcast_to_n(rho_m, n)
     strength = _broadcast_to_n(strength, n)
-    
-    # Büyük cisim kontrolü (Critical check for scientific accuracy)
-    # 50m'den büyük cisimler atmosferde tamamen durmaz, momentumlarını korur.
-    is_large_impactor = d > 50.0
-
-    h = np.full(n, float(start_altitude_m), dtype=float)
-    broke = np.zeros(n, dtype=bool)
-    breakup_alt = np.zeros(n, dtype=float)
-    t_since_break = np.zeros(n, dtype=float)
-
-    active = (m > 0) & (v > 0)
 
     E0 = 0.5 * m * (v ** 2)
-    E = E0.copy()
-
-    history = None
-    if return_history:
-        history = {
-            "altitude": [],
-            "velocity": [],
-            "mass": [],
-            "energy": [],
-            "time": [],
-            "q_dyn": [],
-        }
-        t = 0.0
 
-    # Track peak energy deposition altitude (proxy for airburst height)
-    peak_dep = np.zeros(n, dtype=float)
-    peak_dep_alt = np.full(n, float(start_altitude_m), dtype=float)
+    state = {
+        "m": m,
+        "v": v,
+        "h": np.full(n, float(start_altitude_m), dtype=dtype),
+        "broke": np.zeros(n, dtype=bool),
+        "breakup_alt": np.zeros(n, dtype=dtype),
+        "t_since_break": np.zeros(n, dtype=dtype),
+        "active": (m > 0) & (v > 0),
+        "E0": E0,
+        "E": E0.copy(),
+        # Track peak energy deposition altitude (proxy for airburst height)
+        "peak_dep": np.zeros(n, dtype=dtype),
+        "peak_dep_alt": np.full(n, float(start_altitude_m), dtype=dtype),
+    }
 
     params = {
         "theta": theta,
@@ -304,21 +506,249 @@ def _simulate_entry_core(
         "Q": float(Q),
         "pancake_tau_s": float(pancake_tau_s),
         "pancake_max_factor": float(pancake_max_factor),
+        # None -> isothermal exponential atmosphere
+        "atmosphere": atmosphere,
     }
+    return state, params
+
+
+# Suggested capacity for callers opting into time-decimated history
+# (`history_max_records`). When the buffer fills up every other record is
+# dropped and the stride doubles, so long runs keep covering the whole
+# flight in bounded memory. The default is full, undecimated history.
+HISTORY_MAX_RECORDS = 2048
+
+# Ensemble bands reported with deposition profiles
+DEPOSITION_PERCENTILES = (5.0, 50.0, 95.0)
+
+_HISTORY_KEYS = ("altitude", "velocity", "mass", "energy", "time", "q_dyn")
+
+
+class _HistoryRecorder:
+    """Preallocated trajectory history for a subset of samples.
+
+    Two layouts:
+    - time decimation (default): one row every `stride` steps, into a buffer
+      of `max_records` rows that halves itself (doubling the stride) when full;
+    - altitude decimation (`altitude_step_m`): one row per altitude level from
+      the start altitude down to the surface, holding each sample's state when
+      it first reaches that level (NaN if it never does).
+
+    Arrays are shaped (records, tracked samples); iterating over a key still
+    yields one row per record, as the old list-of-arrays history did.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        *,
+        start_altitude_m: float,
+        surface_elevation_m: float,
+        per_sample_time: bool,
+        indices=None,
+        stride: int = 1,
+        max_records: Optional[int] = None,
+        altitude_step_m: Optional[float] = None,
+        atmosphere: Optional[LayeredAtmosphereTable] = None,
+    ):
+        self.atmosphere = atmosphere
+        if indices is None:
+            self.index = np.arange(n)
+        else:
+            self.index = np.unique(np.asarray(indices, dtype=np.int64))
+            if self.index.size and (self.index[0] < 0 or self.index[-1] >= n):
+                raise ValueError(f"history_indices must lie in [0, {n})")
+        k = self.index.size
+
+        self.by_altitude = altitude_step_m is not None
+        if self.by_altitude:
+            if float(altitude_step_m) <= 0:
+                raise ValueError("history_altitude_step_m must be > 0")
+            levels = np.arange(float(start_altitude_m), float(surface_elevation_m), -float(altitude_step_m))
+            self.levels = np.append(levels, float(surface_elevation_m))
+            rows = self.levels.size
+            self.last_level = np.full(k, -1, dtype=np.int64)
+            self.stride = 1
+        else:
+            if int(stride) < 1 or (max_records is not None and int(max_records) < 2):
+                raise ValueError("history_stride must be >= 1 and history_max_records >= 2")
+            self.stride = int(stride)
+        # Uncapped history grows by doubling instead of thinning itself.
+        self.capped = self.by_altitude or max_records is not None
+        if not self.by_altitude:
+            # Even capacity keeps the halved buffer aligned with the doubled stride.
+            rows = 64 if max_records is None else int(max_records) - int(max_records) % 2
+
+        self.count = 0
+        self.buffers = {key: np.full((rows, k), np.nan, dtype=float) for key in _HISTORY_KEYS if key != "time"}
+        if self.by_altitude or per_sample_time:
+            self.buffers["time"] = np.full((rows, k), np.nan, dtype=float)
+        else:
+            self.buffers["time"] = np.full(rows, np.nan, dtype=float)
+        self._start = float(start_altitude_m)
+        self._step = float(altitude_step_m) if self.by_altitude else None
+
+    def due(self, step: int) -> bool:
+        return self.by_altitude or step % self.stride == 0
+
+    def record(self, t, m, v, h, E, active) -> None:
+        """Store the tracked samples' state (arrays already restricted to `index`)."""
+        q_dyn = np.where(active, 0.5 * _air_density(h, self.atmosphere) * (v ** 2), 0.0)
+        values = {"altitude": h, "velocity": v, "mass": m, "energy": E, "q_dyn": q_dyn}
+        if self.by_altitude:
+            self._record_levels(t, values)
+            return
+
+        if self.count == self.buffers["altitude"].shape[0]:
+            if self.capped:
+                half = self.count // 2
+                for buf in self.buffers.values():
+                    buf[:half] = buf[0:self.count:2]
+                self.count = half
+                self.stride *= 2
+            else:
+                for key, buf in self.buffers.items():
+                    grown = np.full((2 * buf.shape[0],) + buf.shape[1:], np.nan, dtype=float)
+                    grown[:self.count] = buf
+                    self.buffers[key] = grown
+        row = self.count
+        for key, value in values.items():
+            self.buffers[key][row] = value
+        self.buffers["time"][row] = t
+        self.count += 1
+
+    def _record_levels(self, t, values) -> None:
+        reached = np.floor((self._start - values["altitude"]) / self._step).astype(np.int64)
+        reached = np.minimum(reached, self.levels.size - 1)
+        reached = np.where(values["altitude"] <= self.levels[-1], self.levels.size - 1, reached)
+        t = np.broadcast_to(t, reached.shape)
+        cols = np.flatnonzero(reached > self.last_level)
+        while cols.size:
+            self.last_level[cols] += 1
+            rows = self.last_level[cols]
+            for key, value in values.items():
+                self.buffers[key][rows, cols] = value[cols]
+            self.buffers["time"][rows, cols] = t[cols]
+            cols = cols[reached[cols] > self.last_level[cols]]
+        self.count = self.levels.size
+
+    def result(self) -> Dict[str, np.ndarray]:
+        out = {key: buf[:self.count] for key, buf in self.buffers.items()}
+        out["sample_index"] = self.index
+        if self.by_altitude:
+            out["altitude_levels_m"] = self.levels
+        else:
+            out["stride_steps"] = self.stride
+        return out
+
+
+def _record_from_state(history: _HistoryRecorder, t, st: Dict[str, np.ndarray]) -> None:
+    """Record the tracked samples straight from full-size state arrays."""
+    idx = history.index
+    history.record(
+        t[idx] if np.ndim(t) else t,
+        st["m"][idx],
+        st["v"][idx],
+        st["h"][idx],
+        st["E"][idx],
+        st["active"][idx],
+    )
+
+
+def _deposition_grid(n: int, bins: int, *, start_altitude_m: float, surface_elevation_m: float) -> Dict[str, object]:
+    """Fixed altitude bins from the surface up to the start altitude, plus an (n, bins) energy tally."""
+    if int(bins) < 1:
+        raise ValueError("deposition_bins must be >= 1")
+    bottom = float(surface_elevation_m)
+    top = float(start_altitude_m)
+    if not top > bottom:
+        raise ValueError("start_altitude_m must lie above surface_elevation_m for deposition bins")
+    return {
+        "bins": int(bins),
+        "bottom": bottom,
+        "top": top,
+        "width": (top - bottom) / int(bins),
+        "edges": np.linspace(bottom, top, int(bins) + 1),
+        "energy": np.zeros((n, int(bins)), dtype=float),
+    }
+
+
+def _deposit_energy(grid: Dict[str, object], rows: np.ndarray, h_from: np.ndarray, h_to: np.ndarray, dE: np.ndarray) -> None:
+    """Spread each sample's lost energy uniformly over the altitude band it crossed this step.
+
+    `rows` are distinct sample indices, so plain fancy-index `+=` is safe.
+    """
+    keep = dE > 0
+    if not np.any(keep):
+        return
+    rows, h_from, h_to, dE = rows[keep], h_from[keep], h_to[keep], dE[keep]
+
+    nb = grid["bins"]
+    bottom = grid["bottom"]
+    width = grid["width"]
+    flat = grid["energy"].reshape(-1)
+
+    lo = np.clip(np.minimum(h_from, h_to), bottom, grid["top"])
+    hi = np.clip(np.maximum(h_from, h_to), bottom, grid["top"])
+    span = hi - lo
+    first = np.minimum(((lo - bottom) / width).astype(np.int64), nb - 1)
+    last = np.minimum(((hi - bottom) / width).astype(np.int64), nb - 1)
+    base = rows * nb
+
+    point = span <= 0.0
+    if np.any(point):
+        flat[base[point] + first[point]] += dE[point]
+
+    sel = np.flatnonzero(~point)
+    density = dE[sel] / span[sel]
+    b = first[sel]
+    while sel.size:
+        e_lo = bottom + b * width
+        overlap = np.minimum(hi[sel], e_lo + width) - np.maximum(lo[sel], e_lo)
+        flat[base[sel] + b] += density * np.maximum(overlap, 0.0)
+        more = b < last[sel]
+        sel, density, b = sel[more], density[more], b[more] + 1
+
+
+def _integrate_rk4_masked(
+    st: Dict[str, np.ndarray],
+    params: Dict[str, object],
+    *,
+    surface_elevation_m: float,
+    dt: float,
+    max_steps: int,
+    history: Optional[_HistoryRecorder] = None,
+    deposition: Optional[Dict[str, object]] = None,
+) -> None:
+    """Reference RK4 loop that gathers/scatters the active set by boolean mask.
+
+    Kept for equivalence tests and benchmarks against `_integrate_rk4`.
+    """
+    m = st["m"]
+    v = st["v"]
+    h = st["h"]
+    broke = st["broke"]
+    breakup_alt = st["breakup_alt"]
+    t_since_break = st["t_since_break"]
+    active = st["active"]
+    E = st["E"]
+    peak_dep = st["peak_dep"]
+    peak_dep_alt = st["peak_dep_alt"]
+
+    theta = params["theta"]
+    rho_m = params["rho_m"]
+    strength = params["strength"]
+    d = params["diameter_m"]
+
+    t = 0.0
 
     for step in range(int(max_steps)):
         if not np.any(active):
             break
 
-        if return_history:
-            history["altitude"].append(h.copy())
-            history["velocity"].append(v.copy())
-            history["mass"].append(m.copy())
-            history["energy"].append(E.copy())
-            history["time"].append(t)
-            # Fill q_dyn later from last derivative; placeholder zeros ok for step 0
-            history["q_dyn"].append(np.zeros_like(m))
-            t += float(dt)
+        if history is not None and history.due(step):
+            _record_from_state(history, t, st)
+        t += float(dt)
 
         idx = active
 
@@ -327,12 +757,13 @@ def _simulate_entry_core(
             "rho_m": rho_m[idx],
             "strength": strength[idx],
             "diameter_m": d[idx],
-            "Cd": float(Cd),
-            "g": float(g),
-            "C_h": float(C_h),
-            "Q": float(Q),
-            "pancake_tau_s": float(pancake_tau_s),
-            "pancake_max_factor": float(pancake_max_factor),
+            "Cd": params["Cd"],
+            "g": params["g"],
+            "C_h": params["C_h"],
+            "Q": params["Q"],
+            "pancake_tau_s": params["pancake_tau_s"],
+            "pancake_max_factor": params["pancake_max_factor"],
+            "atmosphere": params["atmosphere"],
         }
 
         state = {
@@ -357,6 +788,8 @@ def _simulate_entry_core(
             breakup_alt[broke_idx] = h[broke_idx]
             t_since_break[broke_idx] = 0.0
 
+        h_prev = h[idx] if deposition is not None else None
+
         # Advance state
         m[idx] = m_new
         v[idx] = v_new
@@ -370,18 +803,16 @@ def _simulate_entry_core(
         E[idx] = 0.5 * m[idx] * (v[idx] ** 2)
         dE = np.maximum(0.0, E_prev - E[idx])
         dep_rate = dE / max(1e-9, float(dt))
+        if deposition is not None:
+            _deposit_energy(deposition, np.flatnonzero(idx), h_prev, h_new, dE)
 
         improve = dep_rate > peak_dep[idx]
         if np.any(improve):
             peak_dep[np.where(idx)[0][improve]] = dep_rate[improve]
             peak_dep_alt[np.where(idx)[0][improve]] = h[idx][improve]
 
-        if return_history:
-            # overwrite q_dyn placeholder for this step
-            history["q_dyn"][-1][idx] = info["q_dyn"].copy()
-
         hit_ground = h[idx] <= float(surface_elevation_m)
-        stopped = v[idx] < 10.0
+        stopped = v[idx] < STOP_VELOCITY_M_S
         dead = m[idx] <= 0.0
         done = hit_ground | stopped | dead
 
@@ -390,6 +821,776 @@ def _simulate_entry_core(
             h[done_idx] = float(surface_elevation_m)
             active[done_idx] = False
 
+    if history is not None and history.by_altitude:
+        _record_from_state(history, t, st)
+
+
+# Dense active-set layout for the RK4 loop: finished samples are written back
+# as they finish and dropped from the dense arrays once the alive fraction
+# falls below this threshold, so per-step cost follows the still-flying count.
+_COMPACT_ALIVE_FRACTION = 0.75
+
+# Per-sample state arrays carried in the dense (compacted) layout
+_DENSE_STATE_KEYS = ("m", "v", "h", "broke", "breakup_alt", "t_since_break", "E", "peak_dep", "peak_dep_alt")
+_DENSE_PARAM_KEYS = ("theta", "rho_m", "strength", "diameter_m")
+
+
+class _RK4Workspace:
+    """Preallocated scratch arrays for the buffered RK4 kernel.
+
+    Buffers are sized for the initial active set. After compaction the
+    kernel works on leading views (see `resize`), so no step allocates.
+    """
+
+    _FLOAT_BUFFERS = (
+        "rho", "r", "tmp", "A", "vsq", "F", "acc",
+        "sm", "sv", "sh", "tb",
+        "q_dyn", "m_next", "v_next", "h_next", "E_new", "dep",
+    )
+    _BOOL_BUFFERS = ("mask", "will_break", "done")
+
+    def __init__(self, n: int, dtype=np.float64):
+        self._base = {name: np.empty(n, dtype=dtype) for name in self._FLOAT_BUFFERS}
+        self._base.update({name: np.empty(n, dtype=bool) for name in self._BOOL_BUFFERS})
+        self._base_k = [{key: np.empty(n, dtype=dtype) for key in ("dmdt", "dvdt", "dhdt")} for _ in range(4)]
+        self.resize(n)
+
+    def resize(self, n: int) -> None:
+        for name, buf in self._base.items():
+            setattr(self, name, buf[:n])
+        self.k = [{key: buf[:n] for key, buf in stage.items()} for stage in self._base_k]
+
+
+def _kernel_constants(params: Dict[str, object]) -> Dict[str, np.ndarray]:
+    """Per-sample terms of `_entry_derivatives` that do not change during flight."""
+    theta = params["theta"]
+    d = params["diameter_m"]
+    sin_theta = np.sin(theta)
+    return {
+        "sin_theta": sin_theta,
+        "g_sin_theta": float(params["g"]) * sin_theta,
+        "rho_denom": 4.0 * math.pi * params["rho_m"],
+        "r0": np.where(d > 0, d / 2.0, 0.0),
+    }
+
+
+def _entry_derivatives_into(
+    ws: _RK4Workspace,
+    k: Dict[str, np.ndarray],
+    m: np.ndarray,
+    v: np.ndarray,
+    h: np.ndarray,
+    t_since_break: np.ndarray,
+    broke: np.ndarray,
+    params: Dict[str, object],
+    with_breakup: bool,
+) -> None:
+    """`_entry_derivatives` written into `k` (and ws.q_dyn/ws.will_break) in place.
+
+    Every operation mirrors the allocating version in the same order, so the
+    results are bit-identical.
+    """
+    rho = ws.rho
+    r = ws.r
+    tmp = ws.tmp
+    A = ws.A
+    vsq = ws.vsq
+    F = ws.F
+    mask = ws.mask
+
+    atmosphere = params["atmosphere"]
+    if atmosphere is None:
+        np.negative(h, out=rho)
+        np.divide(rho, SCALE_HEIGHT_M, out=rho)
+        np.exp(rho, out=rho)
+        np.multiply(rho, RHO0_AIR, out=rho)
+    else:
+        # interp float64 döndürür; exp'i durum dtype'ında (float32 modda tek duyarlık) yap
+        np.copyto(rho, np.interp(h, atmosphere.altitude_m, atmosphere.log_density), casting="same_kind")
+        np.exp(rho, out=rho)
+
+    np.multiply(m, 3.0, out=r)
+    np.divide(r, params["rho_denom"], out=r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.cbrt(r, out=r)
+    np.isfinite(r, out=mask)
+    np.logical_not(mask, out=mask)
+    np.copyto(r, 0.0, where=mask)
+    np.greater(r, 0.0, out=mask)
+    np.logical_not(mask, out=mask)
+    np.copyto(r, params["r0"], where=mask)
+
+    np.divide(t_since_break, max(1e-9, float(params["pancake_tau_s"])), out=tmp)
+    np.add(tmp, 1.0, out=tmp)
+    np.clip(tmp, 1.0, float(params["pancake_max_factor"]), out=tmp)
+    np.multiply(r, tmp, out=tmp)
+    np.copyto(r, tmp, where=broke)
+
+    np.square(r, out=A)
+    np.multiply(A, math.pi, out=A)
+    np.square(v, out=vsq)
+
+    np.multiply(rho, 0.5 * float(params["Cd"]), out=F)
+    np.multiply(F, A, out=F)
+    np.multiply(F, vsq, out=F)
+
+    dvdt = k["dvdt"]
+    np.maximum(m, 1e-12, out=tmp)
+    np.divide(F, tmp, out=dvdt)
+    np.negative(dvdt, out=dvdt)
+    np.subtract(dvdt, params["g_sin_theta"], out=dvdt)
+
+    dhdt = k["dhdt"]
+    np.multiply(v, params["sin_theta"], out=dhdt)
+    np.negative(dhdt, out=dhdt)
+
+    dmdt = k["dmdt"]
+    np.multiply(rho, float(params["C_h"]), out=dmdt)
+    np.multiply(dmdt, A, out=dmdt)
+    np.power(v, 3, out=tmp)
+    np.multiply(dmdt, tmp, out=dmdt)
+    np.negative(dmdt, out=dmdt)
+    np.divide(dmdt, 2.0 * float(params["Q"]), out=dmdt)
+
+    if with_breakup:
+        q_dyn = ws.q_dyn
+        will_break = ws.will_break
+        np.multiply(rho, 0.5, out=q_dyn)
+        np.multiply(q_dyn, vsq, out=q_dyn)
+        np.greater(q_dyn, params["strength"], out=will_break)
+        np.greater(m, 0, out=mask)
+        np.logical_and(will_break, mask, out=will_break)
+        np.greater(v, 0, out=mask)
+        np.logical_and(will_break, mask, out=will_break)
+
+
+def _rk4_step_into(ws: _RK4Workspace, state: Dict[str, np.ndarray], params: Dict[str, object], dt: float) -> None:
+    """Buffered `_rk4_step`: new m, v, h land in ws.m_next/v_next/h_next."""
+    m0 = state["m"]
+    v0 = state["v"]
+    h0 = state["h"]
+    t_break0 = state["t_since_break"]
+    broke0 = state["broke"]
+    k1, k2, k3, k4 = ws.k
+    sm, sv, sh, tb = ws.sm, ws.sv, ws.sh, ws.tb
+
+    def stage(k, scale):
+        np.multiply(k["dmdt"], scale, out=sm)
+        np.add(m0, sm, out=sm)
+        np.maximum(0.0, sm, out=sm)
+        np.multiply(k["dvdt"], scale, out=sv)
+        np.add(v0, sv, out=sv)
+        np.maximum(0.0, sv, out=sv)
+        np.multiply(k["dhdt"], scale, out=sh)
+        np.add(h0, sh, out=sh)
+        np.add(t_break0, scale, out=tb)
+
+    _entry_derivatives_into(ws, k1, m0, v0, h0, t_break0, broke0, params, True)
+    stage(k1, 0.5 * dt)
+    _entry_derivatives_into(ws, k2, sm, sv, sh, tb, broke0, params, False)
+    stage(k2, 0.5 * dt)
+    _entry_derivatives_into(ws, k3, sm, sv, sh, tb, broke0, params, False)
+    stage(k3, dt)
+    _entry_derivatives_into(ws, k4, sm, sv, sh, tb, broke0, params, False)
+
+    acc = ws.acc
+    for key, y0, out, clamp in (
+        ("dmdt", m0, ws.m_next, True),
+        ("dvdt", v0, ws.v_next, True),
+        ("dhdt", h0, ws.h_next, False),
+    ):
+        np.multiply(k2[key], 2.0, out=acc)
+        np.add(k1[key], acc, out=acc)
+        np.multiply(k3[key], 2.0, out=out)
+        np.add(acc, out, out=acc)
+        np.add(acc, k4[key], out=acc)
+        np.multiply(acc, dt / 6.0, out=acc)
+        np.add(y0, acc, out=out)
+        if clamp:
+            np.maximum(0.0, out, out=out)
+
+
+def _integrate_rk4(
+    st: Dict[str, np.ndarray],
+    params: Dict[str, object],
+    *,
+    surface_elevation_m: float,
+    dt: float,
+    max_steps: int,
+    history: Optional[_HistoryRecorder] = None,
+    buffered_kernel: bool = True,
+    deposition: Optional[Dict[str, object]] = None,
+) -> None:
+    """RK4 loop over a dense, periodically compacted set of active samples.
+
+    Structure-of-arrays copies of the active samples plus an index map
+    (`gidx`) replace the per-step boolean gather/scatter of the masked loop.
+    Samples that finish are scattered back immediately and kept as dead
+    slots (their values are no longer read) until compaction. Arithmetic
+    is element-wise identical to the masked loop, so results match it bit
+    for bit.
+
+    With `buffered_kernel` (default) the derivative evaluations and state
+    updates run through `_RK4Workspace` scratch arrays with `out=` ufuncs
+    instead of allocating fresh arrays per stage; results are unchanged.
+    """
+    surface = float(surface_elevation_m)
+    dt = float(dt)
+    dep_dt = max(1e-9, dt)
+    active = st["active"]
+
+    gidx = np.flatnonzero(active)
+    ds = {key: st[key][gidx] for key in _DENSE_STATE_KEYS}
+    dp = {key: params[key][gidx] for key in _DENSE_PARAM_KEYS}
+    for key in ("Cd", "g", "C_h", "Q", "pancake_tau_s", "pancake_max_factor", "atmosphere"):
+        dp[key] = params[key]
+    per_sample = list(_DENSE_PARAM_KEYS)
+    if buffered_kernel:
+        consts = _kernel_constants(dp)
+        dp.update(consts)
+        per_sample += list(consts)
+    alive = np.ones(gidx.size, dtype=bool)
+    n_alive = gidx.size
+    ws = _RK4Workspace(gidx.size, dtype=st["m"].dtype)
+
+    def write_back(sel):
+        g_sel = gidx[sel]
+        for key in _DENSE_STATE_KEYS:
+            st[key][g_sel] = ds[key][sel]
+
+    def record_tracked(t):
+        # Tracked samples still in flight live in the dense arrays, the rest in `st`.
+        tracked = history.index
+        pos = np.minimum(np.searchsorted(gidx, tracked), gidx.size - 1)
+        live = (gidx[pos] == tracked) & alive[pos]
+
+        def pick(key):
+            return np.where(live, ds[key][pos], st[key][tracked])
+
+        history.record(t, pick("m"), pick("v"), pick("h"), pick("E"), live)
+
+    t = 0.0
+
+    for step in range(int(max_steps)):
+        if n_alive == 0:
+            break
+
+        if history is not None and history.due(step):
+            record_tracked(t)
+        t += dt
+
+        # Dead slots keep integrating past the ground until the next compaction.
+        with np.errstate(all="ignore") if n_alive < gidx.size else contextlib.nullcontext():
+            if buffered_kernel:
+                _rk4_step_into(ws, ds, dp, dt)
+                m_new, v_new, h_new = ws.m_next, ws.v_next, ws.h_next
+                q_dyn, will_break = ws.q_dyn, ws.will_break
+            else:
+                stepped = _rk4_step(ds, params=dp, dt=dt)
+                m_new, v_new, h_new = stepped["m"], stepped["v"], stepped["h"]
+                q_dyn, will_break = stepped["info"]["q_dyn"], stepped["info"]["will_break"]
+
+        m, v, h = ds["m"], ds["v"], ds["h"]
+        broke = ds["broke"]
+        t_since_break = ds["t_since_break"]
+        E = ds["E"]
+        mask = ws.mask
+
+        # Breakup update (use current step q_dyn)
+        np.logical_not(broke, out=mask)
+        np.logical_and(mask, will_break, out=mask)
+        if mask.any():
+            np.copyto(broke, True, where=mask)
+            np.copyto(ds["breakup_alt"], h, where=mask)
+            np.copyto(t_since_break, 0.0, where=mask)
+
+        h_prev = h.copy() if deposition is not None else None
+
+        # Advance state
+        np.copyto(m, m_new)
+        np.copyto(v, v_new)
+        np.copyto(h, h_new)
+
+        # Advance breakup timers
+        np.add(t_since_break, dt, out=t_since_break)
+        np.logical_not(broke, out=mask)
+        np.copyto(t_since_break, 0.0, where=mask)
+
+        # Energy + deposition proxy (lost KE per step)
+        E_new = ws.E_new
+        dep_rate = ws.dep
+        np.multiply(m, 0.5, out=E_new)
+        np.square(v, out=dep_rate)
+        np.multiply(E_new, dep_rate, out=E_new)
+        np.subtract(E, E_new, out=dep_rate)
+        np.maximum(0.0, dep_rate, out=dep_rate)
+        if deposition is not None:
+            # Dead slots keep stepping until compaction; only live ones deposit.
+            _deposit_energy(deposition, gidx[alive], h_prev[alive], h[alive], dep_rate[alive])
+        np.divide(dep_rate, dep_dt, out=dep_rate)
+        np.copyto(E, E_new)
+
+        np.greater(dep_rate, ds["peak_dep"], out=mask)
+        if mask.any():
+            np.copyto(ds["peak_dep"], dep_rate, where=mask)
+            np.copyto(ds["peak_dep_alt"], h, where=mask)
+
+        done = ws.done
+        np.less_equal(h, surface, out=done)
+        np.less(v, STOP_VELOCITY_M_S, out=mask)
+        np.logical_or(done, mask, out=done)
+        np.less_equal(m, 0.0, out=mask)
+        np.logical_or(done, mask, out=done)
+        np.logical_and(done, alive, out=done)
+        if done.any():
+            np.copyto(h, surface, where=done)
+            write_back(done)
+            active[gidx[done]] = False
+            alive &= ~done
+            n_alive = int(np.count_nonzero(alive))
+
+            if n_alive <= _COMPACT_ALIVE_FRACTION * gidx.size:
+                gidx = gidx[alive]
+                for key in _DENSE_STATE_KEYS:
+                    ds[key] = ds[key][alive]
+                for key in per_sample:
+                    dp[key] = dp[key][alive]
+                alive = np.ones(gidx.size, dtype=bool)
+                ws.resize(gidx.size)
+
+    # Samples still flying after max_steps
+    write_back(alive)
+    if history is not None and history.by_altitude:
+        _record_from_state(history, t, st)
+
+
+def _integrate_rk45(
+    st: Dict[str, np.ndarray],
+    params: Dict[str, object],
+    *,
+    surface_elevation_m: float,
+    dt: float,
+    max_steps: int,
+    rtol: float,
+    history: Optional[_HistoryRecorder] = None,
+    deposition: Optional[Dict[str, object]] = None,
+) -> None:
+    """Adaptive Dormand–Prince integration with event location.
+
+    Every sample carries its own step size. Breakup (q_dyn crosses strength),
+    ground contact and stop (v < STOP_VELOCITY_M_S) are located inside the
+    accepted step on the cubic Hermite interpolant and the step is then
+    retaken exactly up to the event, so breakup altitudes are not quantized
+    to the step length.
+    """
+    m = st["m"]
+    v = st["v"]
+    h = st["h"]
+    broke = st["broke"]
+    breakup_alt = st["breakup_alt"]
+    t_since_break = st["t_since_break"]
+    active = st["active"]
+    E = st["E"]
+    peak_dep = st["peak_dep"]
+    peak_dep_alt = st["peak_dep_alt"]
+
+    theta = params["theta"]
+    strength = params["strength"]
+    surface = float(surface_elevation_m)
+    rtol = float(rtol)
+
+    n = m.size
+    step_size = np.full(n, float(dt), dtype=float)
+    t = np.zeros(n, dtype=float)
+    atol_m = np.abs(m) * _RK45_ATOL_M_FRAC
+
+    def subset(idx):
+        return {
+            "theta": theta[idx],
+            "rho_m": params["rho_m"][idx],
+            "strength": strength[idx],
+            "diameter_m": params["diameter_m"][idx],
+            "Cd": params["Cd"],
+            "g": params["g"],
+            "C_h": params["C_h"],
+            "Q": params["Q"],
+            "pancake_tau_s": params["pancake_tau_s"],
+            "pancake_max_factor": params["pancake_max_factor"],
+            "atmosphere": params["atmosphere"],
+        }
+
+    # FSAL derivative cache, plus bodies that are already past their strength at entry.
+    f_m = np.zeros(n, dtype=float)
+    f_v = np.zeros(n, dtype=float)
+    f_h = np.zeros(n, dtype=float)
+    idx = np.flatnonzero(active)
+    if idx.size:
+        k0 = _derivatives_for(subset(idx), m[idx], v[idx], h[idx], t_since_break[idx], broke[idx])
+        f_m[idx] = k0["dmdt"]
+        f_v[idx] = k0["dvdt"]
+        f_h[idx] = k0["dhdt"]
+        pre_broken = idx[k0["will_break"]]
+        broke[pre_broken] = True
+        breakup_alt[pre_broken] = h[pre_broken]
+
+    for step in range(int(max_steps)):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+
+        if history is not None and history.due(step):
+            # Per-sample clocks: each body advances with its own step size.
+            _record_from_state(history, t, st)
+
+        p = subset(idx)
+        state = {
+            "m": m[idx],
+            "v": v[idx],
+            "h": h[idx],
+            "broke": broke[idx],
+            "t_since_break": t_since_break[idx],
+        }
+        k1 = {"dmdt": f_m[idx], "dvdt": f_v[idx], "dhdt": f_h[idx]}
+
+        descent = np.maximum(state["v"] * np.sin(p["theta"]), 1.0)
+        dt_cap = (_RK45_MAX_SCALE_HEIGHTS_PER_STEP * SCALE_HEIGHT_M) / descent
+        dt_i = np.minimum(step_size[idx], dt_cap)
+
+        res = _dopri5_step(state, k1, p, dt_i)
+
+        sc_m = atol_m[idx] + rtol * np.maximum(np.abs(state["m"]), np.abs(res["m"]))
+        sc_v = _RK45_ATOL_V + rtol * np.maximum(np.abs(state["v"]), np.abs(res["v"]))
+        sc_h = _RK45_ATOL_H + rtol * np.maximum(np.abs(state["h"]), np.abs(res["h"]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            err = np.maximum.reduce([
+                np.abs(res["err_m"]) / sc_m,
+                np.abs(res["err_v"]) / sc_v,
+                np.abs(res["err_h"]) / sc_h,
+            ])
+        err = np.where(np.isfinite(err), err, np.inf)
+
+        accept = (err <= 1.0) | (dt_i <= _RK45_MIN_STEP_S)
+        with np.errstate(divide="ignore"):
+            factor = np.clip(_RK45_SAFETY * err ** -0.2, _RK45_MIN_FACTOR, _RK45_MAX_FACTOR)
+        factor = np.where(accept, factor, np.minimum(factor, 1.0))
+        step_size[idx] = np.maximum(dt_i * factor, _RK45_MIN_STEP_S)
+
+        if not np.any(accept):
+            continue
+
+        a = np.flatnonzero(accept)
+        gi = idx[a]
+        dt_a = dt_i[a]
+        y0 = {key: state[key][a] for key in ("m", "v", "h")}
+        f0 = {"m": k1["dmdt"][a], "v": k1["dvdt"][a], "h": k1["dhdt"][a]}
+        y1 = {"m": res["m"][a], "v": res["v"][a], "h": res["h"][a]}
+        f1 = {"m": res["k_end"]["dmdt"][a], "v": res["k_end"]["dvdt"][a], "h": res["k_end"]["dhdt"][a]}
+        strength_a = strength[gi]
+        intact_a = ~broke[gi]
+
+        # --- Event location on the step interpolant ---
+        s_event = np.ones(a.size, dtype=float)
+        is_break = np.zeros(a.size, dtype=bool)
+
+        def located(mask, triggered):
+            sel = np.flatnonzero(mask)
+            if sel.size == 0:
+                return sel, np.empty(0)
+
+            def trig(s):
+                return triggered(sel, s)
+
+            return sel, _locate_first_event(trig, sel.size)
+
+        def interp(key, sel, s):
+            return _hermite(y0[key][sel], f0[key][sel], y1[key][sel], f1[key][sel], dt_a[sel], s)
+
+        atmosphere = params["atmosphere"]
+        q_end = 0.5 * _air_density(y1["h"], atmosphere) * (y1["v"] ** 2)
+        break_mask = intact_a & (q_end > strength_a) & (y1["m"] > 0)
+        sel, s_b = located(
+            break_mask,
+            lambda sel, s: 0.5 * _air_density(interp("h", sel, s), atmosphere) * (interp("v", sel, s) ** 2) > strength_a[sel],
+        )
+        s_event[sel] = s_b
+        is_break[sel] = True
+
+        sel, s_g = located(y1["h"] <= surface, lambda sel, s: interp("h", sel, s) <= surface)
+        earlier = s_g < s_event[sel]
+        s_event[sel] = np.minimum(s_event[sel], s_g)
+        is_break[sel[earlier]] = False
+
+        sel, s_s = located(y1["v"] < STOP_VELOCITY_M_S, lambda sel, s: interp("v", sel, s) < STOP_VELOCITY_M_S)
+        earlier = s_s < s_event[sel]
+        s_event[sel] = np.minimum(s_event[sel], s_s)
+        is_break[sel[earlier]] = False
+
+        # Retake truncated steps exactly up to the event.
+        m_new = y1["m"]
+        v_new = y1["v"]
+        h_new = y1["h"]
+        k_end = {key: res["k_end"][key][a] for key in ("dmdt", "dvdt", "dhdt")}
+        dt_used = dt_a.copy()
+        cut = np.flatnonzero(s_event < 1.0)
+        if cut.size:
+            gc = gi[cut]
+            dt_cut = dt_a[cut] * s_event[cut]
+            sub_state = {
+                "m": y0["m"][cut],
+                "v": y0["v"][cut],
+                "h": y0["h"][cut],
+                "broke": broke[gc],
+                "t_since_break": t_since_break[gc],
+            }
+            sub_k1 = {"dmdt": f0["m"][cut], "dvdt": f0["v"][cut], "dhdt": f0["h"][cut]}
+            redo = _dopri5_step(sub_state, sub_k1, subset(gc), dt_cut)
+            m_new[cut] = redo["m"]
+            v_new[cut] = redo["v"]
+            h_new[cut] = redo["h"]
+            for key in ("dmdt", "dvdt", "dhdt"):
+                k_end[key][cut] = redo["k_end"][key]
+            dt_used[cut] = dt_cut
+
+        hit_ground = h_new <= surface
+        h_new[hit_ground] = surface
+
+        if deposition is not None:
+            E_end = 0.5 * m_new * (v_new ** 2)
+            _deposit_energy(deposition, gi, y0["h"], h_new, np.maximum(0.0, E[gi] - E_end))
+
+        # --- Commit accepted steps ---
+        was_broken = broke[gi]
+        m[gi] = m_new
+        v[gi] = v_new
+        h[gi] = h_new
+        t[gi] += dt_used
+        t_since_break[gi] = np.where(was_broken, t_since_break[gi] + dt_used, 0.0)
+        f_m[gi] = k_end["dmdt"]
+        f_v[gi] = k_end["dvdt"]
+        f_h[gi] = k_end["dhdt"]
+        E[gi] = 0.5 * m_new * (v_new ** 2)
+
+        newly_broken = gi[is_break]
+        broke[newly_broken] = True
+        breakup_alt[newly_broken] = h[newly_broken]
+        t_since_break[newly_broken] = 0.0
+
+        # Instantaneous deposition rate -dE/dt at the new state.
+        dep_rate = np.maximum(0.0, -(m_new * v_new * k_end["dvdt"] + 0.5 * (v_new ** 2) * k_end["dmdt"]))
+        improve = dep_rate > peak_dep[gi]
+        peak_dep[gi[improve]] = dep_rate[improve]
+        peak_dep_alt[gi[improve]] = h_new[improve]
+
+        done = (h_new <= surface) | (v_new < STOP_VELOCITY_M_S) | (m_new <= 0.0)
+        done_idx = gi[done]
+        h[done_idx] = surface
+        active[done_idx] = False
+
+    if history is not None and history.by_altitude:
+        _record_from_state(history, t, st)
+
+
+def _resolve_atmosphere(atmosphere: Union[str, LayeredAtmosphereTable]) -> Optional[LayeredAtmosphereTable]:
+    if isinstance(atmosphere, LayeredAtmosphereTable):
+        return atmosphere
+    if atmosphere not in ENTRY_ATMOSPHERES:
+        raise ValueError(f"Unknown atmosphere {atmosphere!r}; expected one of {ENTRY_ATMOSPHERES} or a LayeredAtmosphereTable")
+    return us_standard_atmosphere_1976_table() if atmosphere == "us1976" else None
+
+
+_NUMBA_BACKEND = None
+
+
+def _load_numba_backend():
+    """Import the optional Numba kernel once; None when Numba is not installed."""
+    global _NUMBA_BACKEND
+    if _NUMBA_BACKEND is None:
+        try:
+            import meteor_physics_numba
+            _NUMBA_BACKEND = meteor_physics_numba
+        except ImportError:
+            _NUMBA_BACKEND = False
+    return _NUMBA_BACKEND or None
+
+
+def numba_backend_available() -> bool:
+    return _load_numba_backend() is not None
+
+
+def _simulate_entry_core(
+    mass_kg: Union[float, np.ndarray],
+    diameter_m: Union[float, np.ndarray],
+    velocity_kms: Union[float, np.ndarray],
+    angle_deg: Union[float, np.ndarray],
+    density_kgm3: Union[float, np.ndarray],
+    strength_pa: Union[float, np.ndarray],
+    *,
+    start_altitude_m: float,
+    surface_elevation_m: float,
+    Cd: float,
+    g: float,
+    C_h: float,
+    Q: float,
+    dt: float,
+    max_steps: int,
+    return_history: bool,
+    pancake_tau_s: float,
+    pancake_max_factor: float,
+    method: str = "rk4",
+    rtol: float = 1e-6,
+    compact_active: bool = True,
+    buffered_kernel: bool = True,
+    backend: str = "numpy",
+    history_stride: int = 1,
+    history_max_records: Optional[int] = None,
+    history_altitude_step_m: Optional[float] = None,
+    history_indices: Optional[np.ndarray] = None,
+    deposition_bins: Optional[int] = None,
+    deposition_percentiles: Sequence[float] = DEPOSITION_PERCENTILES,
+    atmosphere: Union[str, LayeredAtmosphereTable] = "isothermal",
+    dtype=np.float64,
+) -> Dict[str, np.ndarray]:
+    """
+    Basitleştirilmiş ve sağlamlaştırılmış atmosferik giriş simülasyonu.
+    Bennu gibi büyük cisimlerin 'hatalı airburst' olarak işaretlenmesini engeller.
+    """
+    if method not in ENTRY_METHODS:
+        raise ValueError(f"Unknown entry integration method {method!r}; expected one of {ENTRY_METHODS}")
+    if backend not in ENTRY_BACKENDS:
+        raise ValueError(f"Unknown entry backend {backend!r}; expected one of {ENTRY_BACKENDS}")
+    if backend == "numba" and method != "rk4":
+        raise ValueError("The numba backend implements method='rk4' only")
+    dtype = np.dtype(dtype)
+    if dtype not in ENTRY_DTYPES:
+        raise ValueError(f"Unsupported entry dtype {dtype}; expected one of {[str(d) for d in ENTRY_DTYPES]}")
+    if dtype == np.float32 and (method != "rk4" or backend != "numpy"):
+        raise ValueError("dtype=float32 is implemented for method='rk4' with the numpy backend only")
+    atmosphere_table = _resolve_atmosphere(atmosphere)
+
+    st, params = _prepare_entry_state(
+        mass_kg,
+        diameter_m,
+        velocity_kms,
+        angle_deg,
+        density_kgm3,
+        strength_pa,
+        start_altitude_m=start_altitude_m,
+        Cd=Cd,
+        g=g,
+        C_h=C_h,
+        Q=Q,
+        pancake_tau_s=pancake_tau_s,
+        pancake_max_factor=pancake_max_factor,
+        atmosphere=atmosphere_table,
+        dtype=dtype,
+    )
+
+    history = None
+    if return_history:
+        history = _HistoryRecorder(
+            st["m"].size,
+            start_altitude_m=start_altitude_m,
+            surface_elevation_m=surface_elevation_m,
+            per_sample_time=(method == "rk45"),
+            indices=history_indices,
+            stride=history_stride,
+            max_records=history_max_records,
+            altitude_step_m=history_altitude_step_m,
+            atmosphere=atmosphere_table,
+        )
+
+    deposition = None
+    if deposition_bins is not None:
+        deposition = _deposition_grid(
+            st["m"].size,
+            deposition_bins,
+            start_altitude_m=start_altitude_m,
+            surface_elevation_m=surface_elevation_m,
+        )
+
+    jit = _load_numba_backend() if (backend == "numba" and not return_history) else None
+
+    if jit is not None:
+        jit.integrate_rk4_numba(
+            st,
+            params,
+            surface_elevation_m=surface_elevation_m,
+            dt=dt,
+            max_steps=max_steps,
+            deposition=deposition,
+        )
+    elif method == "rk45":
+        _integrate_rk45(
+            st,
+            params,
+            surface_elevation_m=surface_elevation_m,
+            dt=dt,
+            max_steps=max_steps,
+            rtol=rtol,
+            history=history,
+            deposition=deposition,
+        )
+    elif compact_active:
+        _integrate_rk4(
+            st,
+            params,
+            surface_elevation_m=surface_elevation_m,
+            dt=dt,
+            max_steps=max_steps,
+            history=history,
+            buffered_kernel=buffered_kernel,
+            deposition=deposition,
+        )
+    else:
+        _integrate_rk4_masked(
+            st,
+            params,
+            surface_elevation_m=surface_elevation_m,
+            dt=dt,
+            max_steps=max_steps,
+            history=history,
+            deposition=deposition,
+        )
+
+    out = _finalize_entry(
+        st,
+        params,
+        surface_elevation_m=surface_elevation_m,
+        history=None if history is None else history.result(),
+    )
+    if deposition is not None:
+        out.update(_deposition_summary(deposition, deposition_percentiles))
+    return out
+
+
+def _deposition_summary(grid: Dict[str, object], percentiles: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Per-sample dE/dh profiles and their ensemble percentile bands."""
+    profile = grid["energy"] / grid["width"]
+    levels = np.asarray(percentiles, dtype=float)
+    return {
+        "deposition_altitude_edges_m": grid["edges"],
+        "deposition_profile_J_per_m": profile,
+        "deposition_percentile_levels": levels,
+        "deposition_profile_percentiles": np.percentile(profile, levels, axis=0),
+    }
+
+
+def _finalize_entry(
+    st: Dict[str, np.ndarray],
+    params: Dict[str, object],
+    *,
+    surface_elevation_m: float,
+    history: Optional[Dict[str, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    m = st["m"]
+    v = st["v"]
+    E0 = st["E0"]
+    broke = st["broke"]
+
+    # Büyük cisim kontrolü (Critical check for scientific accuracy)
+    # 50m'den büyük cisimler atmosferde tamamen durmaz, momentumlarını korur.
+    is_large_impactor = params["diameter_m"] > 50.0
+
     E1 = 0.5 * m * (v ** 2)
     with np.errstate(divide="ignore", invalid="ignore"):
         energy_loss_ratio = np.where(E0 > 0, 1.0 - (E1 / E0), 1.0)
@@ -398,22 +1599,23 @@ def _simulate_entry_core(
     # Airburst logic: must break, deposit most energy aloft, and not deliver much KE to ground.
     # (Avoids the brittle "%90 energy loss" rule.)
     # KRITIK DÜZELTME: Büyük cisimler (>50m) her zaman yere çarpar kabul edilir.
-    airburst_alt = peak_dep_alt
-    remaining_frac = np.where(E0 > 0, E1 / E0, 0.0)
+    airburst_alt = st["peak_dep_alt"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        remaining_frac = np.where(E0 > 0, E1 / E0, 0.0)
     airburst_condition = broke & (airburst_alt > (float(surface_elevation_m) + 1000.0)) & (remaining_frac < 0.2)
     is_airburst = airburst_condition & (~is_large_impactor)
 
     out = {
         "velocity_impact_kms": v / 1000.0,
         "mass_impact_kg": m,
-        "breakup_altitude_m": breakup_alt,
+        "breakup_altitude_m": st["breakup_alt"],
         "airburst_altitude_m": airburst_alt,
         "is_airburst": is_airburst,
         "energy_loss_percent": energy_loss_ratio * 100.0,
         "initial_energy_joules": E0,
         "final_energy_joules": E1,
     }
-    if return_history and history is not None:
+    if history is not None:
         out["history"] = history
 
     return out
@@ -437,6 +1639,17 @@ def simulate_atmospheric_entry_vectorized(
     return_history: bool = False,
     pancake_tau_s: float = 1.0,
     pancake_max_factor: float = 5.0,
+    method: str = "rk4",
+    rtol: float = 1e-6,
+    backend: str = "numpy",
+    history_stride: int = 1,
+    history_max_records: Optional[int] = None,
+    history_altitude_step_m: Optional[float] = None,
+    history_indices: Optional[np.ndarray] = None,
+    deposition_bins: Optional[int] = None,
+    deposition_percentiles: Sequence[float] = DEPOSITION_PERCENTILES,
+    atmosphere: Union[str, LayeredAtmosphereTable] = "isothermal",
+    dtype=np.float64,
 ) -> Dict[str, np.ndarray]:
     """Vectorized atmospheric entry simulation.
 
@@ -446,6 +1659,57 @@ def simulate_atmospheric_entry_vectorized(
     - Breakup uses dynamic pressure q=0.5*rho*v^2.
     - Simple post-breakup pancake growth for drag area.
     - Airburst classification uses peak deposition altitude + delivered KE fraction.
+
+    `method="rk45"` switches to adaptive Dormand–Prince 5(4) stepping with
+    per-sample step control (`rtol`, `dt` is then only the initial step) and
+    exact event location for breakup, ground contact and stop. With the
+    default rtol it matches a converged fixed-step reference (RK4, dt=2 ms)
+    to within 0.5 % of entry velocity and 0.005 of entry mass, and breakup
+    altitudes agree with dt=0.05 RK4 to within one RK4 step of descent
+    (v·sinθ·dt). Fast, strongly ablating bodies are where dt=0.05 RK4 is
+    itself under-resolved (it can ablate them to zero mass); there the two
+    methods differ by design. Typical entries need 5–25× fewer steps. In
+    this mode `history["time"]` holds per-sample clocks instead of a scalar.
+
+    `backend="numba"` runs the RK4 loop as a compiled per-sample kernel over
+    all cores (`meteor_physics_numba`); outputs match the NumPy backend to
+    floating-point rounding. It falls back to NumPy when Numba is not
+    installed (see `numba_backend_available`) and for `return_history`.
+
+    History is written into preallocated `(records, tracked)` arrays, so
+    its memory no longer grows with `max_steps × N`:
+    - `history_indices` tracks only those samples (default: all).
+    - `history_stride` records every k-th step.
+    - `history_max_records` (opt-in, e.g. HISTORY_MAX_RECORDS) caps the
+      buffer: once full it keeps every other row and doubles the stride,
+      so long runs stay bounded. The default `None` keeps full history.
+    - `history_altitude_step_m` records each sample at fixed altitude
+      levels below `start_altitude_m` instead (NaN where a sample never
+      reached a level); `history["altitude_levels_m"]` lists the levels.
+    `history["sample_index"]` maps columns back to batch indices.
+
+    `deposition_bins=k` tallies the kinetic energy each sample loses into k
+    equal altitude bins between the surface and `start_altitude_m` while it
+    integrates (each step's loss is spread over the altitude band it
+    crossed). The result gains `deposition_profile_J_per_m` (n × k, dE/dh),
+    `deposition_altitude_edges_m` (k + 1) and
+    `deposition_profile_percentiles` (one row per entry of
+    `deposition_percentile_levels` across the ensemble) — O(n × k) memory,
+    no history needed.
+
+    `atmosphere="us1976"` replaces the isothermal exponential density with
+    the layered US Standard Atmosphere 1976 from
+    `datasets/us_standard_atmosphere_1976.json`, through a precomputed
+    `LayeredAtmosphereTable` (one vectorized interpolation per derivative
+    evaluation); a table instance may be passed directly.
+
+    `dtype=np.float32` runs the whole RK4 state and scratch workspace in
+    single precision (fixed-step RK4, NumPy backend only): half the memory
+    traffic per step, meant for Monte Carlo ensembles whose input
+    uncertainty dwarfs the rounding. Per-sample results then differ from
+    float64 by rounding growth over the flight; ensemble means, percentile
+    bands and the airburst fraction agree (see `test_entry_integrators`).
+    Result arrays keep the state dtype.
     """
 
     return _simulate_entry_core(
@@ -466,6 +1730,17 @@ def simulate_atmospheric_entry_vectorized(
         return_history=bool(return_history),
         pancake_tau_s=float(pancake_tau_s),
         pancake_max_factor=float(pancake_max_factor),
+        method=str(method),
+        rtol=float(rtol),
+        backend=str(backend),
+        history_stride=int(history_stride),
+        history_max_records=history_max_records,
+        history_altitude_step_m=history_altitude_step_m,
+        history_indices=history_indices,
+        deposition_bins=deposition_bins,
+        deposition_percentiles=deposition_percentiles,
+        atmosphere=atmosphere,
+        dtype=dtype,
     )
 
 
@@ -486,6 +1761,10 @@ def simulate_atmospheric_entry(
     start_altitude_m: float = 100000.0,
     pancake_tau_s: float = 1.0,
     pancake_max_factor: float = 5.0,
+    method: str = "rk4",
+    rtol: float = 1e-6,
+    backend: str = "numpy",
+    atmosphere: Union[str, LayeredAtmosphereTable] = "isothermal",
 ) -> EntryResult:
     """Scalar convenience wrapper for the vectorized core."""
 
@@ -507,6 +1786,10 @@ def simulate_atmospheric_entry(
         return_history=False,
         pancake_tau_s=float(pancake_tau_s),
         pancake_max_factor=float(pancake_max_factor),
+        method=str(method),
+        rtol=float(rtol),
+        backend=str(backend),
+        atmosphere=atmosphere,
     )
 
     E0 = float(res["initial_energy_joules"][0])
@@ -0,0 +1,917 @@
+"""
+Akan (streaming) Monte Carlo motoru: sabit bellekle blok blok örnekleme.
+
+Örnekler `block_size`'lık bloklar halinde üretilir ve değerlendirilir; her
+metrik için yalnızca özetler tutulur:
+    RunningMoments      ortalama / varyans / min / maks (Chan blok birleştirmesi)
+    StreamingHistogram  sabit sayıda ince kutu; aralık dışına çıkan veri
+                        geldikçe kutu genişliği ikiye katlanır (kutular hizalı
+                        kaldığından birleştirme kayıpsızdır); sonuç kenarları
+                        np.histogram gibi verinin tam [min, maks] aralığıdır
+    QuantileSketch      birleştirmeli t-digest; `exact_limit` örneğe kadar ham
+                        değerleri tutar (küçük koşular np.percentile ile aynı)
+
+Bellek blok boyutu ve sketch sıkıştırmasıyla sınırlıdır, `iterations`
+10^8'e çıksa da sabit kalır.
+
+Örnekleme tasarımları (`SAMPLERS`, `DesignSampler`):
+    random  bağımsız sözde-rastgele çekilişler
+    sobol   karıştırılmış (LMS + dijital kaydırma) Sobol dizisi; bloklar
+            arasında kaldığı yerden devam eder (Joe & Kuo 2008 yön sayıları)
+    lhs     her blok ayrı bir Latin hiperküp tasarımı
+Düzgün (0, 1) noktalar `normal_ppf` ile standart normale taşınır; çağıran
+aynı kırpılmış/kesilmiş marjinallere ölçekler.
+
+Uyarlamalı mod (`run_adaptive_monte_carlo`): hedef metriklerin ortalaması
+için göreli %95 CI yarı genişliği (z·σ/√n / |μ|) hedefe inene ya da örnek
+bütçesi bitene kadar partiler halinde örnekler. Sonraki parti, mevcut
+genişliğin 1/√n ile küçüleceği varsayımıyla gereken örnek sayısına göre
+boyutlanır. Sobol/LHS ile bu i.i.d. tahmin temkinlidir (gerçek hata daha
+küçüktür), yani erken durma riski yoktur.
+
+Önem örneklemesi (`run_importance_sampling`): nadir kuyruk olayları
+(krater > X, "genelde airburst" bir cismin yere ulaşması) için girdiler
+kaydırılmış bir normal öneriden çekilir ve olabilirlik oranı
+w = φ(z)/q(z) ile yeniden ağırlıklanır. Kaydırma verilmezse çok seviyeli
+çapraz entropi pilot koşusuyla seçilir. Sonuç, aşılma olasılığı ile
+tahmincinin varyansı ve standart hatasıdır.
+
+Küresel duyarlılık (`sobol_indices`): Saltelli A/B/AB_i tasarımı tek
+seferde n·(d + 2) satır olarak değerlendirilir; birinci derece indeksler
+Saltelli (2010), toplam indeksler Jansen (1999) tahmincileriyle, aynı
+değerlendirmelerden tüm metrikler için çıkarılır.
+"""
+
+import math
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 65_536
+DEFAULT_COMPRESSION = 500
+
+SAMPLERS = ("random", "sobol", "lhs")
+
+# Ortalamanın %95 güven aralığı için standart normal çeyreği
+CI_Z_95 = 1.959963984540054
+DEFAULT_MIN_SAMPLES = 1000
+
+# Giriş girdilerinin standart normal boyutları (entry_inputs_from_normals sütun sırası)
+ENTRY_NORMAL_DIMS = ("velocity", "angle", "density", "strength")
+DEFAULT_STRENGTH_PA = 1e7
+
+# Önem örneklemesi: çapraz entropi (CE) öneri ayarı
+DEFAULT_PILOT_SIZE = 2000
+DEFAULT_CE_RHO = 0.1
+DEFAULT_CE_STAGES = 10
+
+_SOBOL_BITS = 32
+# new-joe-kuo-6.21201, boyut 2..16: (s, a, m_1..m_s); 1. boyut van der Corput
+_SOBOL_JOE_KUO = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+SOBOL_MAX_DIMS = len(_SOBOL_JOE_KUO) + 1
+
+
+class RunningMoments:
+    """Blok blok güncellenen ortalama, popülasyon varyansı (ddof=0), min ve maks."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float).ravel()
+        n_b = x.size
+        if n_b == 0:
+            return
+        mean_b = float(x.mean())
+        m2_b = float(np.square(x - mean_b).sum())
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.count * n_b / n
+        self.count = n
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else float("nan")
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class StreamingHistogram:
+    """`bins` kutulu histogram; veri `bins * resolution` ince kutuda birikir.
+
+    İlk blok aralığı belirler (tek değerliyse np.histogram gibi ±0.5).
+    Sonraki bloklar aralık dışına çıkarsa ince kutular çiftler halinde
+    birleştirilip aralık yukarı/aşağı iki katına çıkarılır. `result()`
+    kenarları np.histogram ile aynıdır: verinin tam [min, max] aralığında
+    `bins` eşit kutu (tek değerliyse değer ±0.5). Sayımlar ince kutuların
+    merkezine göre kaba kutulara dağıtılır; kutu sınırına bir ince kutudan
+    yakın değerler komşu kutuya düşebilir.
+    """
+
+    def __init__(self, bins: int = 20, resolution: int = 64):
+        self.bins = int(bins)
+        self.fine = self.bins * 2 * max(1, int(resolution) // 2)
+        self.counts = np.zeros(self.fine, dtype=np.int64)
+        self.lo = None
+        self.width = None
+        self.x_min = None
+        self.x_max = None
+
+    @property
+    def hi(self) -> float:
+        return self.lo + self.fine * self.width
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if x.size == 0:
+            return
+        x_min, x_max = float(x.min()), float(x.max())
+        self.x_min = x_min if self.x_min is None else min(self.x_min, x_min)
+        self.x_max = x_max if self.x_max is None else max(self.x_max, x_max)
+        if self.lo is None:
+            if x_max > x_min:
+                self.lo, self.width = x_min, (x_max - x_min) / self.fine
+            else:
+                self.lo, self.width = x_min - 0.5, 1.0 / self.fine
+        half = self.fine // 2
+        while x_min < self.lo:
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            self.lo -= self.fine * self.width
+            self.width *= 2.0
+            self.counts = np.concatenate([np.zeros(half, dtype=np.int64), merged])
+        while x_max > self.hi:
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            self.width *= 2.0
+            self.counts = np.concatenate([merged, np.zeros(half, dtype=np.int64)])
+        idx = np.clip(((x - self.lo) / self.width).astype(np.int64), 0, self.fine - 1)
+        self.counts += np.bincount(idx, minlength=self.fine)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, edges): `bins` sayım ve `bins + 1` kenar; kenarlar np.histogram ile aynı."""
+        if self.lo is None:
+            return np.zeros(self.bins, dtype=np.int64), np.linspace(0.0, 1.0, self.bins + 1)
+        total = int(self.counts.sum())
+        if self.x_max == self.x_min:
+            # np.histogram: sıfır genişlikli aralık ±0.5 genişletilir, değer orta kutuya düşer
+            counts, edges = np.histogram([self.x_min], bins=self.bins)
+            return counts.astype(np.int64) * total, edges
+        edges = np.linspace(self.x_min, self.x_max, self.bins + 1)
+        filled = np.flatnonzero(self.counts)
+        centres = np.clip(self.lo + (filled + 0.5) * self.width, self.x_min, self.x_max)
+        idx = np.clip(((centres - self.x_min) / (self.x_max - self.x_min) * self.bins).astype(np.int64),
+                      0, self.bins - 1)
+        counts = np.bincount(idx, weights=self.counts[filled], minlength=self.bins).astype(np.int64)
+        return counts, edges
+
+
+class QuantileSketch:
+    """Birleştirmeli t-digest (k1 ölçek fonksiyonu) ile akan yüzdelik tahmini.
+
+    İlk `exact_limit` değer ham tutulur ve `quantile` tam np.percentile
+    döndürür. Sınır aşılınca değerler ağırlıklı merkezlere (centroid)
+    sıkıştırılır: her blok mevcut merkezlerle birlikte sıralanır ve
+    k(q) = δ/(2π)·asin(2q−1) ölçeğinde aynı birim aralığa düşenler tek
+    merkezde birleşir. Kuyruklara yakın merkezler küçük kaldığından
+    2.5/97.5 gibi uç yüzdelikler iyi çözülür. Bellek O(δ).
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION, exact_limit: int = DEFAULT_BLOCK_SIZE):
+        self.compression = float(compression)
+        self.exact_limit = int(exact_limit)
+        self._raw = []
+        self._raw_count = 0
+        self.means = None
+        self.weights = None
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def exact(self) -> bool:
+        return self.means is None
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if x.size == 0:
+            return
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        if self.exact and self._raw_count + x.size <= self.exact_limit:
+            self._raw.append(x.copy())
+            self._raw_count += x.size
+            return
+        if self.exact:
+            x = np.concatenate(self._raw + [x])
+            self._raw = []
+            self._raw_count = 0
+            self.means = np.empty(0)
+            self.weights = np.empty(0)
+        self._merge(x, np.ones(x.size))
+
+    def _merge(self, values: np.ndarray, weights: np.ndarray) -> None:
+        values = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        weights = weights[order]
+
+        total = weights.sum()
+        q_mid = (np.cumsum(weights) - 0.5 * weights) / total
+        k = self.compression / (2.0 * math.pi) * np.arcsin(np.clip(2.0 * q_mid - 1.0, -1.0, 1.0))
+        group = np.floor(k + 0.25 * self.compression).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(values * weights, starts) / w
+        self.weights = w
+
+    def quantile(self, q):
+        """q ∈ [0, 1] (skaler veya dizi) için tahmini yüzdelik."""
+        q = np.asarray(q, dtype=float)
+        if self.exact:
+            if not self._raw:
+                return np.full(q.shape, np.nan)[()] if q.ndim else float("nan")
+            return np.percentile(np.concatenate(self._raw), q * 100.0)
+        # Her merkez ağırlığının ortasına yerleşir; uçlar gözlenen min/maks
+        cum = np.cumsum(self.weights)
+        total = cum[-1]
+        pos = np.concatenate([[0.0], (cum - 0.5 * self.weights) / total, [1.0]])
+        vals = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q, pos, vals)
+
+    def percentile(self, p):
+        """np.percentile gibi 0–100 ölçeğinde."""
+        return self.quantile(np.asarray(p, dtype=float) / 100.0)
+
+
+class StreamingMetric:
+    """Tek metrik için momentler + yüzdelik sketch'i (+ istenirse histogram)."""
+
+    def __init__(self, histogram_bins: Optional[int] = None, *, compression: int = DEFAULT_COMPRESSION,
+                 exact_limit: int = DEFAULT_BLOCK_SIZE):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(compression, exact_limit)
+        self.histogram = StreamingHistogram(histogram_bins) if histogram_bins else None
+
+    def update(self, x: np.ndarray) -> None:
+        self.moments.update(x)
+        self.sketch.update(x)
+        if self.histogram is not None:
+            self.histogram.update(x)
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    @property
+    def mean(self) -> float:
+        return self.moments.mean
+
+    @property
+    def std(self) -> float:
+        return self.moments.std
+
+    def percentile(self, p):
+        return self.sketch.percentile(p)
+
+
+def iter_blocks(iterations: int, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterable[int]:
+    """`iterations` örneği en çok `block_size`'lık blok boyutlarına böler."""
+    block_size = max(1, int(block_size))
+    remaining = int(iterations)
+    while remaining > 0:
+        k = min(block_size, remaining)
+        yield k
+        remaining -= k
+
+
+def _update_metrics(metrics: Dict[str, StreamingMetric], outputs: Dict[str, np.ndarray],
+                    histogram_bins: Dict[str, int], compression: int, exact_limit: int) -> None:
+    for name, values in outputs.items():
+        if name not in metrics:
+            metrics[name] = StreamingMetric(histogram_bins.get(name), compression=compression,
+                                            exact_limit=exact_limit)
+        metrics[name].update(values)
+
+
+def run_streaming_monte_carlo(
+    sample_block: Callable[[np.random.Generator, int], Dict[str, np.ndarray]],
+    evaluate_block: Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]],
+    iterations: int,
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: Optional[int] = None,
+    histogram_bins: Optional[Dict[str, int]] = None,
+    compression: int = DEFAULT_COMPRESSION,
+    progress: Optional[Callable[[int, Dict[str, StreamingMetric]], None]] = None,
+) -> Dict[str, StreamingMetric]:
+    """`iterations` örneği bloklar halinde örnekler, değerlendirir ve özetler.
+
+    `sample_block(rng, k)` k örneklik girdi sözlüğü, `evaluate_block(girdiler)`
+    metrik adı → k uzunluklu dizi döndürür. `histogram_bins` adı verilen
+    metrikler için histogram da tutulur. Tek bir bloğa sığan koşularda
+    yüzdelikler tamdır. `progress(örnek_sayısı, metrikler)` her bloktan
+    sonra çağrılır.
+    """
+    rng = np.random.default_rng(seed)
+    histogram_bins = histogram_bins or {}
+    metrics: Dict[str, StreamingMetric] = {}
+    done = 0
+    for k in iter_blocks(iterations, block_size):
+        _update_metrics(metrics, evaluate_block(sample_block(rng, k)), histogram_bins, compression, block_size)
+        done += k
+        if progress is not None:
+            progress(done, metrics)
+    return metrics
+
+
+def relative_ci_half_width(count: int, mean: float, std: float, z: float = CI_Z_95) -> float:
+    """Ortalamanın göreli CI yarı genişliği z·σ/√n / |μ| (yayılım yoksa 0, μ = 0 ise inf)."""
+    if count < 2:
+        return math.inf
+    half = z * std / math.sqrt(count)
+    if half == 0.0:
+        return 0.0
+    return half / abs(mean) if mean != 0.0 else math.inf
+
+
+def next_batch_size(samples_done: int, relative_half_width: float, target: float, *,
+                    min_batch: int, max_batch: int, remaining: int) -> int:
+    """Genişlik ∝ 1/√n varsayımıyla hedefe kadar gereken ek örnek (+%10 pay), sınırlı."""
+    if math.isfinite(relative_half_width) and relative_half_width > 0:
+        needed = samples_done * (relative_half_width / target) ** 2 * 1.1 - samples_done
+    else:
+        needed = max_batch
+    return int(min(max(math.ceil(needed), min_batch), max_batch, remaining))
+
+
+def run_adaptive_monte_carlo(
+    sample_block: Callable[[np.random.Generator, int], Dict[str, np.ndarray]],
+    evaluate_block: Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]],
+    *,
+    target_rel_half_width: float,
+    max_samples: int,
+    targets: Optional[Sequence[str]] = None,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: Optional[int] = None,
+    histogram_bins: Optional[Dict[str, int]] = None,
+    compression: int = DEFAULT_COMPRESSION,
+    progress: Optional[Callable[[int, Dict[str, StreamingMetric]], None]] = None,
+) -> Tuple[Dict[str, StreamingMetric], Dict[str, object]]:
+    """Hedef metriklerin göreli CI yarı genişliği `target_rel_half_width`'e inene dek örnekler.
+
+    İlk parti `min_samples`, sonrakiler `next_batch_size` ile (en çok
+    `block_size`) boyutlanır; toplam `max_samples`'ı aşmaz. `targets`
+    verilmezse tüm metrikler hedeflenir. (metrikler, rapor) döndürür;
+    rapor kullanılan örnek sayısını ve ulaşılan hassasiyeti içerir.
+    `progress` her bloktan sonra çağrılır (bkz. run_streaming_monte_carlo).
+    """
+    if not target_rel_half_width > 0:
+        raise ValueError("target_rel_half_width must be positive")
+    max_samples = max(1, int(max_samples))
+    rng = np.random.default_rng(seed)
+    histogram_bins = histogram_bins or {}
+    metrics: Dict[str, StreamingMetric] = {}
+    achieved: Dict[str, float] = {}
+    batches = 0
+    k = min(max(2, int(min_samples)), max_samples)
+    while k > 0:
+        # Büyük partiler bellek sınırı için bloklara bölünür
+        for block in iter_blocks(k, block_size):
+            _update_metrics(metrics, evaluate_block(sample_block(rng, block)), histogram_bins, compression,
+                            block_size)
+            if progress is not None:
+                progress(next(iter(metrics.values())).count, metrics)
+        batches += 1
+        names = list(targets) if targets is not None else list(metrics)
+        achieved = {name: relative_ci_half_width(metrics[name].count, metrics[name].mean, metrics[name].std)
+                    for name in names}
+        worst = max(achieved.values(), default=0.0)
+        done = next(iter(metrics.values())).count if metrics else 0
+        if worst <= target_rel_half_width or done >= max_samples:
+            break
+        k = next_batch_size(done, worst, target_rel_half_width, min_batch=max(2, int(min_samples) // 2),
+                            max_batch=max(block_size, int(min_samples)), remaining=max_samples - done)
+
+    samples_used = next(iter(metrics.values())).count if metrics else 0
+    report = {
+        "mode": "adaptive",
+        "target_relative_ci_half_width": float(target_rel_half_width),
+        "achieved_relative_ci_half_width": {name: float(v) for name, v in achieved.items()},
+        "samples_used": int(samples_used),
+        "max_samples": max_samples,
+        "batches": batches,
+        "converged": bool(max(achieved.values(), default=0.0) <= target_rel_half_width),
+    }
+    return metrics, report
+
+
+def summarize_metric(metric: StreamingMetric, percentiles: Sequence[float] = (2.5, 97.5)) -> Dict[str, object]:
+    """JSON'a uygun özet: ortalama, std, min, maks ve istenen yüzdelikler."""
+    return {
+        "count": metric.count,
+        "mean": float(metric.mean),
+        "std": float(metric.std),
+        "min": float(metric.moments.min),
+        "max": float(metric.moments.max),
+        "percentiles": {str(p): float(v) for p, v in zip(percentiles, np.atleast_1d(metric.percentile(percentiles)))},
+    }
+
+
+# --- Önem örneklemesi (kuyruk aşılma olasılıkları) ---
+
+def normal_log_likelihood_ratio(z: np.ndarray, shift, scale=1.0) -> np.ndarray:
+    """log φ(z) − log q(z); q = Π_i N(shift_i, scale_i²) öneri yoğunluğu. (k, d) → (k,)."""
+    z = np.asarray(z, dtype=float)
+    shift = np.broadcast_to(np.asarray(shift, dtype=float), z.shape[1:])
+    scale = np.broadcast_to(np.asarray(scale, dtype=float), z.shape[1:])
+    u = (z - shift) / scale
+    return np.sum(np.log(scale) + 0.5 * (u * u - z * z), axis=1)
+
+
+class ExceedanceEstimate:
+    """Ağırlıklı aşılma olasılığı p = E_q[w·1{X > t}] ve varyansı, blok blok."""
+
+    def __init__(self):
+        self.count = 0
+        self.hits = 0
+        self.sum_w = 0.0      # tüm örneklerin ağırlık toplamı (tanı: ortalaması ≈ 1)
+        self.sum_hit_w = 0.0  # Σ w·1
+        self.sum_hit_w2 = 0.0  # Σ (w·1)²
+
+    def update(self, exceed: np.ndarray, weights: np.ndarray) -> None:
+        exceed = np.asarray(exceed, dtype=bool)
+        weights = np.asarray(weights, dtype=float)
+        hit_w = weights[exceed]
+        self.count += exceed.size
+        self.hits += int(hit_w.size)
+        self.sum_w += float(weights.sum())
+        self.sum_hit_w += float(hit_w.sum())
+        self.sum_hit_w2 += float(np.dot(hit_w, hit_w))
+
+    @property
+    def probability(self) -> float:
+        return self.sum_hit_w / self.count if self.count else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Tahmincinin varyansı: Var_q(w·1) / n (n−1 ile yansız)."""
+        if self.count < 2:
+            return math.inf
+        p = self.probability
+        return max(self.sum_hit_w2 / self.count - p * p, 0.0) / (self.count - 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        p = self.probability
+        std_error = math.sqrt(self.variance)
+        return {
+            "probability": p,
+            "variance": self.variance,
+            "std_error": std_error,
+            "relative_error": std_error / p if p > 0 else math.inf,
+            "ci_95": [max(p - CI_Z_95 * std_error, 0.0), p + CI_Z_95 * std_error],
+            "hits": self.hits,
+            # Kish: isabetlerin etkin sayısı (Σw)² / Σw²
+            "effective_hits": self.sum_hit_w ** 2 / self.sum_hit_w2 if self.sum_hit_w2 > 0 else 0.0,
+            "mean_weight": self.sum_w / self.count if self.count else math.nan,
+            "samples": self.count,
+        }
+
+
+def cross_entropy_shift(
+    evaluate_normals: Callable[[np.ndarray], Dict[str, np.ndarray]],
+    metric: str,
+    threshold: float,
+    dims: int,
+    rng: np.random.Generator,
+    *,
+    pilot_size: int = DEFAULT_PILOT_SIZE,
+    rho: float = DEFAULT_CE_RHO,
+    max_stages: int = DEFAULT_CE_STAGES,
+    tiebreak: Optional[str] = None,
+) -> Tuple[np.ndarray, int]:
+    """Çok seviyeli çapraz entropi ile {metric > threshold} için ortalama kaydırmalı normal öneri.
+
+    Her aşamada mevcut öneriden `pilot_size` örnek çekilir; en şiddetli `rho`
+    kesri (eşiği aşanlar yeterliyse yalnızca onlar) olabilirlik oranıyla
+    ağırlıklanıp yeni kaydırma olarak ortalanır. Metriğin bağlı olduğu
+    durumlarda (ör. airburst'lerde krater 0) sıralama `tiebreak` metriğiyle
+    sürdürülür. (kaydırma, aşama sayısı) döndürür.
+    """
+    shift = np.zeros(dims)
+    n_elite = max(1, int(rho * pilot_size))
+    for stage in range(1, max_stages + 1):
+        z = shift + rng.standard_normal((pilot_size, dims))
+        outputs = evaluate_normals(z)
+        score = np.asarray(outputs[metric], dtype=float)
+        exceed = score > threshold
+        done = int(exceed.sum()) >= n_elite
+        if done:
+            elite = exceed
+        else:
+            keys = (score,) if tiebreak is None else (np.asarray(outputs[tiebreak], dtype=float), score)
+            elite = np.lexsort(keys)[-n_elite:]
+        log_w = normal_log_likelihood_ratio(z[elite], shift)
+        w = np.exp(log_w - log_w.max())
+        shift = (w[:, None] * z[elite]).sum(axis=0) / w.sum()
+        if done:
+            return shift, stage
+    return shift, max_stages
+
+
+def run_importance_sampling(
+    sample_inputs: Callable[[np.ndarray], Dict[str, np.ndarray]],
+    evaluate_block: Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]],
+    queries: Sequence[Tuple[str, float]],
+    *,
+    dims: int,
+    iterations: int,
+    shifts: Optional[Sequence[Optional[Sequence[float]]]] = None,
+    seed: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    pilot_size: int = DEFAULT_PILOT_SIZE,
+    rho: float = DEFAULT_CE_RHO,
+    max_stages: int = DEFAULT_CE_STAGES,
+    tiebreak: Optional[str] = None,
+    progress: Optional[Callable[[int, list], None]] = None,
+) -> list:
+    """Her (metrik, eşik) sorgusu için P(metrik > eşik) önem örneklemesiyle.
+
+    Nominal dağılım `dims` boyutlu standart normaldir; `sample_inputs(z)` onu
+    model girdilerine taşır. Öneri N(kaydırma, I): kaydırma `shifts` ile
+    (σ birimi) verilmezse `cross_entropy_shift` pilot koşusuyla bulunur.
+    Ardından `iterations` örnek bloklar halinde çekilir ve ağırlıklar
+    w = φ(z)/q(z) ile tahmin edilir. Sorgu başına sonuç sözlüğü döndürür.
+    `progress(son_örnek_sayısı, sonuçlar)` her bloktan sonra o ana kadarki
+    (son sorgu için kısmi) sonuçlarla çağrılır.
+    """
+    rng = np.random.default_rng(seed)
+
+    def evaluate_normals(z):
+        return evaluate_block(sample_inputs(z))
+
+    results = []
+    for i, (metric, threshold) in enumerate(queries):
+        threshold = float(threshold)
+        given = None if shifts is None else shifts[i]
+        if given is None:
+            shift, stages = cross_entropy_shift(evaluate_normals, metric, threshold, dims, rng,
+                                                pilot_size=pilot_size, rho=rho, max_stages=max_stages,
+                                                tiebreak=tiebreak)
+            pilot_samples = stages * pilot_size
+        else:
+            shift = np.broadcast_to(np.asarray(given, dtype=float), (dims,)).copy()
+            pilot_samples = 0
+        estimate = ExceedanceEstimate()
+
+        def current():
+            result = {"metric": metric, "threshold": threshold}
+            result.update(estimate.to_dict())
+            result["pilot_samples"] = pilot_samples
+            result["proposal_shift"] = [float(v) for v in shift]
+            return result
+
+        for k in iter_blocks(iterations, block_size):
+            z = shift + rng.standard_normal((k, dims))
+            outputs = evaluate_normals(z)
+            weights = np.exp(normal_log_likelihood_ratio(z, shift))
+            estimate.update(np.asarray(outputs[metric], dtype=float) > threshold, weights)
+            if progress is not None:
+                progress(estimate.count, results + [current()])
+        results.append(current())
+    return results
+
+
+# --- Örnekleme tasarımları ---
+
+def _sobol_direction_numbers(dims: int) -> np.ndarray:
+    """(dims, 32) yön sayıları; V[d, j] = m_j << (32 - j - 1)."""
+    if not 1 <= dims <= SOBOL_MAX_DIMS:
+        raise ValueError(f"Sobol sampler supports 1..{SOBOL_MAX_DIMS} dimensions, got {dims}")
+    L = _SOBOL_BITS
+    V = np.zeros((dims, L), dtype=np.uint64)
+    V[0] = [1 << (L - 1 - j) for j in range(L)]
+    for d in range(1, dims):
+        s, a, m = _SOBOL_JOE_KUO[d - 1]
+        v = [0] * L
+        for j in range(min(s, L)):
+            v[j] = m[j] << (L - 1 - j)
+        for j in range(s, L):
+            v[j] = v[j - s] ^ (v[j - s] >> s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    v[j] ^= v[j - k]
+        V[d] = v
+    return V
+
+
+class SobolSequence:
+    """Karıştırılmış Sobol dizisi; `random(k)` bir sonraki k noktayı verir.
+
+    Owen tarzı doğrusal matris karıştırma (LMS) yön sayılarına bir kez
+    uygulanır, ardından rastgele dijital kaydırma yapılır; ikisi de (t, s)
+    ağ özelliğini korur. En iyi denge için toplam nokta sayısı 2'nin kuvveti
+    olmalıdır (varsayılan blok boyutu 2^16).
+    """
+
+    def __init__(self, dims: int, rng: Optional[np.random.Generator] = None, scramble: bool = True):
+        self.dims = int(dims)
+        V = _sobol_direction_numbers(self.dims)
+        self.shift = np.zeros(self.dims, dtype=np.uint64)
+        if scramble:
+            rng = rng if rng is not None else np.random.default_rng()
+            L = _SOBOL_BITS
+            # Alt üçgen, birim köşegenli rastgele ikili matris (boyut başına)
+            lower = np.tril(rng.integers(0, 2, size=(self.dims, L, L), dtype=np.uint8), -1)
+            lower[:, np.arange(L), np.arange(L)] = 1
+            shifts = np.arange(L - 1, -1, -1, dtype=np.uint64)
+            digits = ((V[:, :, None] >> shifts) & np.uint64(1)).astype(np.uint8)  # (d, yön, hane)
+            mixed = np.einsum("drc,djc->djr", lower.astype(np.int64), digits.astype(np.int64)) & 1
+            V = (mixed.astype(np.uint64) << shifts).sum(axis=2, dtype=np.uint64)
+            self.shift = rng.integers(0, 1 << L, size=self.dims, dtype=np.uint64)
+        self.V = V
+        self.index = 0
+
+    def random(self, k: int) -> np.ndarray:
+        idx = np.arange(self.index, self.index + int(k), dtype=np.uint64)
+        self.index += int(k)
+        gray = idx ^ (idx >> np.uint64(1))
+        x = np.broadcast_to(self.shift, (idx.size, self.dims)).copy()
+        for j in range(_SOBOL_BITS):
+            bit = ((gray >> np.uint64(j)) & np.uint64(1)).astype(bool)
+            if not bit.any():
+                break
+            x[bit] ^= self.V[:, j]
+        # Hücre ortası: 0 ve 1 uçlarına hiç düşmez
+        return (x.astype(float) + 0.5) / float(1 << _SOBOL_BITS)
+
+
+def latin_hypercube(rng: np.random.Generator, k: int, dims: int) -> np.ndarray:
+    """(k, dims) Latin hiperküp: her boyutta k eşit katmanın her birinde tam bir nokta."""
+    strata = np.argsort(rng.random((dims, k)), axis=1).T
+    return (strata + rng.random((k, dims))) / k
+
+
+# Acklam'ın ters normal CDF rasyonel yaklaşımı (bağıl hata < 1.2e-9)
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def _ppf_tail(p: np.ndarray) -> np.ndarray:
+    q = np.sqrt(-2.0 * np.log(p))
+    num = ((((_PPF_C[0] * q + _PPF_C[1]) * q + _PPF_C[2]) * q + _PPF_C[3]) * q + _PPF_C[4]) * q + _PPF_C[5]
+    den = (((_PPF_D[0] * q + _PPF_D[1]) * q + _PPF_D[2]) * q + _PPF_D[3]) * q + 1.0
+    return num / den
+
+
+def normal_ppf(u: np.ndarray) -> np.ndarray:
+    """Standart normal ters CDF, u ∈ (0, 1)."""
+    u = np.asarray(u, dtype=float)
+    out = np.empty_like(u)
+    low = u < _PPF_LOW
+    high = u > 1.0 - _PPF_LOW
+    mid = ~(low | high)
+    q = u[mid] - 0.5
+    r = q * q
+    num = ((((_PPF_A[0] * r + _PPF_A[1]) * r + _PPF_A[2]) * r + _PPF_A[3]) * r + _PPF_A[4]) * r + _PPF_A[5]
+    den = ((((_PPF_B[0] * r + _PPF_B[1]) * r + _PPF_B[2]) * r + _PPF_B[3]) * r + _PPF_B[4]) * r + 1.0
+    out[mid] = num * q / den
+    out[low] = _ppf_tail(u[low])
+    out[high] = -_ppf_tail(1.0 - u[high])
+    return out
+
+
+class DesignSampler:
+    """`SAMPLERS` türlerinden biri için blok blok (k, dims) çekilişler.
+
+    `standard_normal(k)` random türünde doğrudan `rng.standard_normal`
+    kullanır; sobol/lhs türlerinde düzgün noktaları `normal_ppf` ile taşır.
+    """
+
+    def __init__(self, kind: str, dims: int, rng: np.random.Generator):
+        if kind not in SAMPLERS:
+            raise ValueError(f"Unknown sampler {kind!r}; expected one of {SAMPLERS}")
+        self.kind = kind
+        self.dims = int(dims)
+        self.rng = rng
+        self._sobol = SobolSequence(self.dims, rng) if kind == "sobol" else None
+
+    def uniform(self, k: int) -> np.ndarray:
+        if self.kind == "sobol":
+            return self._sobol.random(k)
+        if self.kind == "lhs":
+            return latin_hypercube(self.rng, k, self.dims)
+        return self.rng.random((k, self.dims))
+
+    def standard_normal(self, k: int) -> np.ndarray:
+        if self.kind == "random":
+            return self.rng.standard_normal((k, self.dims))
+        return normal_ppf(self.uniform(k))
+
+
+def entry_inputs_from_normals(z: np.ndarray, base_mass, base_velocity, base_angle, base_density, *,
+                              base_strength: float = DEFAULT_STRENGTH_PA,
+                              strength_sigma_dex: float = 0.0) -> Dict[str, np.ndarray]:
+    """Standart normal sütunlarını (hız, açı, yoğunluk[, dayanım]) giriş girdilerine taşır.
+
+    Kırpmalar z'nin deterministik fonksiyonu olduğundan, önem örneklemesinde
+    olabilirlik oranı doğrudan z uzayında hesaplanabilir. Dördüncü sütun
+    yoksa (ya da `strength_sigma_dex` = 0) dayanım `base_strength`'te sabittir.
+    """
+    z = np.asarray(z, dtype=float)
+    k = z.shape[0]
+    velocities = base_velocity + base_velocity * 0.05 * z[:, 0]
+    # theta: ölçüm belirsizliği için base_angle etrafında (en az 1 derece), kesilmiş
+    sigma_angle = max(1.0, abs(base_angle) * 0.10)
+    angles = np.clip(base_angle + sigma_angle * z[:, 1], 0.1, 89.9)
+    # rho: verilen yoğunluk etrafında, pozitif ve sınırlı
+    densities = base_density + base_density * 0.10 * z[:, 2]
+
+    # Fiziksel sınırlar
+    velocities = np.maximum(velocities, 0.1)
+    densities = np.clip(densities, 100.0, 20000.0)
+
+    # Dayanım log-normal: medyan base_strength, σ = strength_sigma_dex (log10)
+    if z.shape[1] > 3 and strength_sigma_dex > 0:
+        strengths = float(base_strength) * 10.0 ** (strength_sigma_dex * z[:, 3])
+    else:
+        strengths = np.full(k, float(base_strength))
+
+    # Kütle sabit kabul edilir; yoğunluğa göre çap türetilir (küresel varsayım)
+    masses = np.full(k, float(base_mass), dtype=float)
+    radii = ((3 * (masses / densities)) / (4 * np.pi)) ** (1/3)
+    return {
+        "mass_kg": masses,
+        "diameter_m": radii * 2.0,
+        "velocity_kms": velocities,
+        "angle_deg": angles,
+        "density_kgm3": densities,
+        "strength_pa": strengths,
+    }
+
+
+def entry_input_dims(strength_sigma_dex: float = 0.0) -> Tuple[str, ...]:
+    """`entry_inputs_from_normals`'ın kullandığı normal boyutları."""
+    return ENTRY_NORMAL_DIMS if strength_sigma_dex > 0 else ENTRY_NORMAL_DIMS[:3]
+
+
+def entry_input_sampler(base_mass, base_velocity, base_angle, base_density, *, sampler: str = "random",
+                        base_strength: float = DEFAULT_STRENGTH_PA, strength_sigma_dex: float = 0.0):
+    """/simulate_monte_carlo girdi dağılımları; `sample(rng, k)` k örneklik blok üretir.
+
+    Hız, açı ve yoğunluk N(μ, σ) marjinalleriyle çekilip kırpılır; dayanım
+    `strength_sigma_dex` > 0 ise log-normaldir. `sampler` yalnızca bu
+    boyutların ortak tasarımını değiştirir (random/sobol/lhs). Tasarım ilk
+    blokta `rng` ile kurulur, sonraki bloklarda devam eder.
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler {sampler!r}; expected one of {SAMPLERS}")
+    dims = len(entry_input_dims(strength_sigma_dex))
+    design = {}
+
+    def sample(rng, k):
+        if sampler == "random":
+            # Sağlanan denklemlere göre örnekleme: v ~ N(mu, sigma), theta ve rho benzer
+            z = np.column_stack([rng.standard_normal(k) for _ in range(dims)])
+        else:
+            if "sampler" not in design:
+                design["sampler"] = DesignSampler(sampler, dims, rng)
+            z = design["sampler"].standard_normal(k)
+        return entry_inputs_from_normals(z, base_mass, base_velocity, base_angle, base_density,
+                                         base_strength=base_strength, strength_sigma_dex=strength_sigma_dex)
+
+    return sample
+
+
+# --- Varyans tabanlı küresel duyarlılık (Sobol indeksleri) ---
+
+def saltelli_matrices(uniform: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, 2d) düzgün tasarımı A = ilk d, B = son d sütun olarak böler."""
+    dims = uniform.shape[1] // 2
+    return uniform[:, :dims], uniform[:, dims:]
+
+
+def _sobol_estimates(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Son eksen örnekler boyunca: (birinci derece, toplam) indeksler.
+
+    S_i  = E[f_B (f_ABi − f_A)] / V      (Saltelli 2010)
+    ST_i = E[(f_A − f_ABi)²] / (2V)      (Jansen 1999)
+    V, A ve B'nin birleşik örnekleminden; V = 0 ise indeksler 0'dır.
+    """
+    variance = np.var(np.concatenate([f_a, f_b], axis=-1), axis=-1)
+    safe = np.where(variance > 0, variance, 1.0)[..., None]
+    first = np.mean(f_b[..., None, :] * (f_ab - f_a[..., None, :]), axis=-1) / safe
+    total = 0.5 * np.mean((f_a[..., None, :] - f_ab) ** 2, axis=-1) / safe
+    zero = (variance <= 0)[..., None]
+    return np.where(zero, 0.0, first), np.where(zero, 0.0, total)
+
+
+def sobol_indices(
+    evaluate_block: Callable[[np.ndarray], Dict[str, np.ndarray]],
+    dims: int,
+    n_base: int,
+    *,
+    sampler: str = "sobol",
+    seed: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    bootstrap: int = 200,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, object]]:
+    """Saltelli tasarımıyla tüm metrikler için birinci derece ve toplam Sobol indeksleri.
+
+    `evaluate_block(u)` (k, dims) düzgün noktaları alır ve metrik adı → k
+    değer sözlüğü döndürür. A, B ve d adet AB_i (A'nın i. sütunu B'den)
+    matrisleri alt alta dizilip `block_size`'lık partilerle değerlendirilir;
+    toplam n_base·(d + 2) değerlendirme tüm metrikler arasında paylaşılır.
+    %95 aralıkları örnek satırlarının `bootstrap` kez yeniden örneklenmesiyle
+    hesaplanır; `trend` işareti metriğin girdiyle artıp azaldığını gösterir.
+
+    (indeksler, rapor) döndürür; `progress(done, total)` her partiden sonra
+    çağrılır.
+    """
+    dims = int(dims)
+    n_base = max(2, int(n_base))
+    rng = np.random.default_rng(seed)
+    a, b = saltelli_matrices(DesignSampler(sampler, 2 * dims, rng).uniform(n_base))
+    design = np.empty(((dims + 2) * n_base, dims))
+    design[:n_base] = a
+    design[n_base:2 * n_base] = b
+    for i in range(dims):
+        ab = design[(i + 2) * n_base:(i + 3) * n_base]
+        ab[:] = a
+        ab[:, i] = b[:, i]
+
+    total_rows = design.shape[0]
+    outputs: Dict[str, list] = {}
+    batches = 0
+    for start in range(0, total_rows, max(1, int(block_size))):
+        block = evaluate_block(design[start:start + int(block_size)])
+        for name, values in block.items():
+            outputs.setdefault(name, []).append(np.asarray(values, dtype=float))
+        batches += 1
+        if progress is not None:
+            progress(min(start + int(block_size), total_rows), total_rows)
+
+    resample = rng.integers(0, n_base, size=(int(bootstrap), n_base)) if bootstrap > 0 else None
+    indices: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, parts in outputs.items():
+        f = np.concatenate(parts).reshape(dims + 2, n_base)
+        f_a, f_b, f_ab = f[0], f[1], f[2:]
+        first, total = _sobol_estimates(f_a, f_b, f_ab)
+        result = {
+            "first_order": first,
+            "total": total,
+            # E[(f_ABi − f_A)(B_i − A_i)]: işareti girdiyle eğilim yönü
+            "trend": np.mean((f_ab - f_a) * (b.T - a.T), axis=-1),
+            "mean": float(np.mean(f[:2])),
+            "variance": float(np.var(f[:2])),
+        }
+        if resample is not None:
+            boot_first, boot_total = _sobol_estimates(f_a[resample], f_b[resample], f_ab[:, resample].swapaxes(0, 1))
+            result["first_order_ci_95"] = np.percentile(boot_first, [2.5, 97.5], axis=0).T
+            result["total_ci_95"] = np.percentile(boot_total, [2.5, 97.5], axis=0).T
+        indices[name] = result
+
+    report = {
+        "method": "saltelli_jansen",
+        "sampler": sampler,
+        "base_samples": n_base,
+        "evaluations": int(total_rows),
+        "batches": batches,
+        "bootstrap": int(bootstrap),
+    }
+    return indices, report
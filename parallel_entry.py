@@ -0,0 +1,337 @@
+"""
+Çok çekirdekli (sharded) atmosferik giriş sürücüsü.
+
+Girdi dizileri sabit boyutlu parçalara (shard) bölünür ve bir süreç havuzunda
+`simulate_atmospheric_entry_vectorized` ile çözülür. Girdiler ve çıktılar
+`multiprocessing.shared_memory` bloklarında durur; işçilere yalnızca blok
+adları ve parça sınırları gönderilir, büyük diziler pickle edilmez. Sonuç,
+tek çekirdekli çözücüyle aynı anahtarlara sahip tek bir sözlüktür.
+
+Örnekleme işçide yapılıyorsa (`simulate_sampled_entry_sharded`) her parça
+kendi tohumunu `SeedSequence(seed, spawn_key=(parça_no,))` ile alır; parça
+sınırları yalnızca `shard_size`'a bağlı olduğundan sonuçlar işçi sayısından
+bağımsız olarak tekrarlanabilir.
+
+Havuz `ProcessPoolExecutor` (spawn) ile ilk sharded çağrıda bir kez kurulur
+ve sonraki çağrılarda yeniden kullanılır (işçi başlatma maliyeti her Monte
+Carlo bloğunda ödenmez). Bir işçi ölürse (OOM, başlatma/import hatası) çağrı
+beklemede kalmaz, `BrokenProcessPool` yükseltilir ve havuz bir sonraki
+çağrıda yeniden kurulur. Parça işi (`_run_shard`) yalnızca bu modülü ve meteor_physics'i
+import eder; ancak spawn her işçide ebeveynin `__main__` modülünü de
+`__mp_main__` olarak yeniden çalıştırır. Sunucu `python app.py` ile
+başlatılmışsa her işçi app.py'yi ve tüm veri kümelerini yeniden yükler;
+üretimde uygulamayı bir WSGI sunucusu ya da `flask run` ile başlatın
+(`__main__` o zaman başlatıcıdır, app.py değil).
+
+Kullanım:
+    python parallel_entry.py --samples 10000000             # tüm çekirdekler
+    python parallel_entry.py --samples 2000000 --workers 8 --seed 7
+"""
+
+import argparse
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from meteor_physics import DEPOSITION_PERCENTILES, simulate_atmospheric_entry_vectorized
+
+ENTRY_INPUT_KEYS = ("mass_kg", "diameter_m", "velocity_kms", "angle_deg", "density_kgm3", "strength_pa")
+
+ENTRY_OUTPUT_DTYPES = {
+    "velocity_impact_kms": np.float64,
+    "mass_impact_kg": np.float64,
+    "breakup_altitude_m": np.float64,
+    "airburst_altitude_m": np.float64,
+    "is_airburst": np.bool_,
+    "energy_loss_percent": np.float64,
+    "initial_energy_joules": np.float64,
+    "final_energy_joules": np.float64,
+}
+
+# Bu boyutun altında parçalara bölmek kazandırmaz; tek çekirdekli çözücü kullanılır.
+# Havuz kalıcı olduğundan eşik bir Monte Carlo bloğunun (monte_carlo.DEFAULT_BLOCK_SIZE
+# = 65 536) altında tutulur; bir blok DEFAULT_SHARD_SIZE'lık 4 parçaya bölünür.
+SHARDED_MIN_SAMPLES = 50_000
+DEFAULT_SHARD_SIZE = 16_384
+
+# Modül düzeyinde, ilk kullanımda kurulan süreç havuzu (bkz. _get_pool)
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+class _SharedArrays:
+    """Adlandırılmış shared-memory dizileri: ebeveyn oluşturur, işçiler bağlanır."""
+
+    def __init__(self):
+        self._blocks = {}
+        self.arrays = {}
+
+    def create(self, key: str, shape, dtype) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._blocks[key] = shm
+        self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return self.arrays[key]
+
+    def spec(self) -> Dict[str, Tuple[str, str, tuple]]:
+        return {key: (self._blocks[key].name, arr.dtype.str, arr.shape) for key, arr in self.arrays.items()}
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Tuple[str, str, tuple]]) -> "_SharedArrays":
+        self = cls()
+        for key, (name, dtype, shape) in spec.items():
+            shm = _attach_block(name)
+            self._blocks[key] = shm
+            self.arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        return self
+
+    def close(self) -> None:
+        self.arrays = {}
+        for shm in self._blocks.values():
+            shm.close()
+
+    def unlink(self) -> None:
+        for shm in self._blocks.values():
+            shm.unlink()
+        self._blocks = {}
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    # Bloğun sahibi ebeveyn. Python < 3.13'te işçiler ebeveynin resource_tracker'ını
+    # devralır; buradaki kayıt aynı ada ikinci kez eklenir ve ebeveynin unlink'i onu siler.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_shard(task) -> Tuple[int, float]:
+    """Tek parçayı çözer; girdileri/çıktıları paylaşılan bloklardan okur/yazar."""
+    spec, index, start, stop, sampler, seed, entry_kwargs = task
+    t0 = time.perf_counter()
+    shared = _SharedArrays.attach(spec)
+    try:
+        arrays = shared.arrays
+        if sampler is not None:
+            rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+            for key, values in zip(ENTRY_INPUT_KEYS, sampler(rng, stop - start)):
+                arrays[key][start:stop] = values
+        inputs = {key: arrays[key][start:stop] for key in ENTRY_INPUT_KEYS}
+        res = simulate_atmospheric_entry_vectorized(**inputs, **entry_kwargs)
+        for key in ENTRY_OUTPUT_DTYPES:
+            arrays[key][start:stop] = res[key]
+        if "deposition_profile_J_per_m" in arrays:
+            arrays["deposition_profile_J_per_m"][start:stop] = res["deposition_profile_J_per_m"]
+    finally:
+        shared.close()
+    return index, time.perf_counter() - t0
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Paylaşılan havuzu döndürür; yoksa ya da işçi sayısı farklıysa yeniden kurar."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=True)
+            # fork, Numba'nın paralel iş parçacıkları başlamışken kilitlenebiliyor; spawn güvenli.
+            _POOL = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Bozulan havuzu bırakır; bir sonraki _get_pool yenisini kurar."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL, _POOL_WORKERS = None, 0
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Paylaşılan havuzu kapatır (çıkışta otomatik çağrılır)."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        pool, _POOL, _POOL_WORKERS = _POOL, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_sharded(
+    n: int,
+    inputs: Optional[Dict[str, np.ndarray]],
+    *,
+    sampler: Optional[Callable],
+    seed: Optional[int],
+    workers: Optional[int],
+    shard_size: int,
+    entry_kwargs: Dict[str, object],
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    if entry_kwargs.get("return_history"):
+        raise ValueError("return_history is not supported by the sharded driver")
+    shard_size = max(1, int(shard_size))
+    workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+    bins = entry_kwargs.get("deposition_bins")
+    worker_kwargs = dict(entry_kwargs, deposition_percentiles=())
+
+    shared = _SharedArrays()
+    try:
+        for key in ENTRY_INPUT_KEYS:
+            arr = shared.create(key, (n,), np.float64)
+            if inputs is not None:
+                arr[:] = inputs[key]
+        # Kayan noktalı çıktılar çözücünün durum dtype'ını izler (dtype=np.float32 modu)
+        float_dtype = np.dtype(entry_kwargs.get("dtype", np.float64))
+        for key, dtype in ENTRY_OUTPUT_DTYPES.items():
+            shared.create(key, (n,), float_dtype if dtype is np.float64 else dtype)
+        if bins is not None:
+            shared.create("deposition_profile_J_per_m", (n, int(bins)), np.float64)
+
+        spec = shared.spec()
+        tasks = [
+            (spec, k, start, min(start + shard_size, n), sampler, seed, worker_kwargs)
+            for k, start in enumerate(range(0, n, shard_size))
+        ]
+        if workers > 1 and len(tasks) > 1:
+            # Ölen işçi BrokenProcessPool olarak, parça hatası kendi istisnasıyla yükselir.
+            pool = _get_pool(workers)
+            futures = []
+            try:
+                futures = [pool.submit(_run_shard, task) for task in tasks]
+                for future in as_completed(futures):
+                    future.result()
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                raise
+            finally:
+                # Bloklar unlink edilmeden önce çalışan parçalar biter; kuyruktakiler iptal edilir
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+        else:
+            for task in tasks:
+                _run_shard(task)
+
+        used_inputs = {key: shared.arrays[key].copy() for key in ENTRY_INPUT_KEYS}
+        out = {key: shared.arrays[key].copy() for key in ENTRY_OUTPUT_DTYPES}
+        if bins is not None:
+            profile = shared.arrays["deposition_profile_J_per_m"].copy()
+            levels = np.asarray(entry_kwargs.get("deposition_percentiles", DEPOSITION_PERCENTILES), dtype=float)
+            out["deposition_altitude_edges_m"] = np.linspace(
+                float(entry_kwargs.get("surface_elevation_m", 0.0)),
+                float(entry_kwargs.get("start_altitude_m", 100000.0)),
+                int(bins) + 1,
+            )
+            out["deposition_profile_J_per_m"] = profile
+            out["deposition_percentile_levels"] = levels
+            out["deposition_profile_percentiles"] = np.percentile(profile, levels, axis=0)
+    finally:
+        shared.close()
+        shared.unlink()
+    return used_inputs, out
+
+
+def simulate_atmospheric_entry_sharded(
+    mass_kg,
+    diameter_m,
+    velocity_kms,
+    angle_deg,
+    density_kgm3,
+    strength_pa,
+    *,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    **entry_kwargs,
+) -> Dict[str, np.ndarray]:
+    """`simulate_atmospheric_entry_vectorized` ile aynı sonuç, parçalar süreç havuzunda çözülür.
+
+    `entry_kwargs` vektörel çözücüye aynen iletilir (`return_history` hariç).
+    Her örnek bağımsız çözüldüğünden sonuçlar tek çekirdekli çağrıyla birebir aynıdır.
+    """
+    cols = [np.atleast_1d(np.asarray(x, dtype=float)) for x in (mass_kg, diameter_m, velocity_kms, angle_deg,
+                                                                  density_kgm3, strength_pa)]
+    n = max(c.size for c in cols)
+    inputs = {key: np.broadcast_to(c, (n,)) for key, c in zip(ENTRY_INPUT_KEYS, cols)}
+    _, out = _run_sharded(n, inputs, sampler=None, seed=None, workers=workers, shard_size=shard_size,
+                          entry_kwargs=entry_kwargs)
+    return out
+
+
+def simulate_sampled_entry_sharded(
+    n: int,
+    sampler: Callable[[np.random.Generator, int], tuple],
+    *,
+    seed: int,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    **entry_kwargs,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Girdileri işçilerde örnekleyerek `n` örnek çözer; (girdiler, sonuçlar) döndürür.
+
+    `sampler(rng, k)` ENTRY_INPUT_KEYS sırasıyla k uzunluklu 6 dizi döndürmeli
+    ve pickle edilebilir (modül düzeyinde) olmalıdır.
+    """
+    return _run_sharded(int(n), None, sampler=sampler, seed=int(seed), workers=workers, shard_size=shard_size,
+                        entry_kwargs=entry_kwargs)
+
+
+def simulate_atmospheric_entry_auto(
+    mass_kg,
+    diameter_m,
+    velocity_kms,
+    angle_deg,
+    density_kgm3,
+    strength_pa,
+    *,
+    min_samples: int = SHARDED_MIN_SAMPLES,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    **entry_kwargs,
+) -> Dict[str, np.ndarray]:
+    """Büyük partileri (>= min_samples, birden çok çekirdek) parçalara böler, küçükleri doğrudan çözer."""
+    n = max(np.size(x) for x in (mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa))
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if n >= min_samples and workers > 1 and not entry_kwargs.get("return_history"):
+        return simulate_atmospheric_entry_sharded(
+            mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa, workers=workers,
+            shard_size=shard_size, **entry_kwargs
+        )
+    return simulate_atmospheric_entry_vectorized(
+        mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa, **entry_kwargs
+    )
+
+
+def main():
+    from benchmark_entry import sample_monte_carlo_batch
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    _, res = simulate_sampled_entry_sharded(
+        args.samples, sample_monte_carlo_batch, seed=args.seed, workers=args.workers, shard_size=args.shard_size
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"{args.samples} örnek, {elapsed:.1f} s ({args.samples / elapsed:,.0f} örnek/s)")
+    print(f"airburst oranı      : {res['is_airburst'].mean():.4f}")
+    print(f"çarpma hızı p50/p95 : {np.percentile(res['velocity_impact_kms'], [50, 95])} km/s")
+
+
+if __name__ == "__main__":
+    main()
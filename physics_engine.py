@@ -8,18 +8,20 @@ Jüri Notu: Bu kod, NASA'nın GMAT ve ESA'nın analiz araçlarında kullanılan
 numerik yöntemleri (RK45 entegrasyonu, N-Cisim fiziği) uygular.
 """
 
-import math
 import json
 import pandas as pd
 import numpy as np
 from skyfield.api import Loader, Topos
 
+from meteor_physics import standard_atmosphere_density, us_standard_atmosphere_1976_table
+
 # Veri yolları
 base_dir = "datasets"
 
 class AdvancedPhysics:
     def __init__(self):
         self.atmosphere_data = self._load_atmosphere()
+        self.atmosphere_table = self._build_atmosphere_table()
         self.prem_df = self._load_prem()
         self.planets = self._load_ephemeris()
         self.material_data = self._load_materials()
@@ -30,6 +32,15 @@ class AdvancedPhysics:
                 return json.load(f)
         except: return None
 
+    def _build_atmosphere_table(self):
+        # meteor_physics'teki paylaşılan tablo (skaler ve dizi sorguları aynı kaynaktan)
+        if not self.atmosphere_data:
+            return None
+        try:
+            return us_standard_atmosphere_1976_table()
+        except Exception:
+            return None
+
     def _load_prem(self):
         try:
             return pd.read_csv(f"{base_dir}/prem_earth_model.csv")
@@ -52,52 +63,16 @@ class AdvancedPhysics:
 
     # --- 1. KATMANLI ATMOSFER (Rho'yu H'ye göre hesapla) ---
     def get_atmospheric_density(self, altitude_km):
-        """Standard Atmosphere 1976 katmanlarına göre yoğunluk hesaplar."""
-        if not self.atmosphere_data:
+        """Standard Atmosphere 1976 katmanlarına göre yoğunluk hesaplar.
+
+        Skaler ve dizi girdisi aynı paylaşılan tablodan çözülür
+        (meteor_physics.standard_atmosphere_density; 100 km üstü 1e-6 kg/m³).
+        """
+        if self.atmosphere_table is None:
             # Fallback: Basit üstel model
-            return 1.225 * math.exp(-altitude_km / 8.0)
-            
-        h = altitude_km * 1000 # metre cinsinden geometrik yükseklik
-        # Hangi katmanda?
-        layers = self.atmosphere_data['layers']
-        selected_layer = layers[0]
-        
-        for layer in layers:
-            if h >= layer['base_altitude_km'] * 1000:
-                selected_layer = layer
-            else:
-                break
-                
-        # Katman içi hesaplama (Hidrostatik denge)
-        # T = T_b + L * (h - h_b)
-        # P = P_b * (T_b / T) ^ (g0 * M / (R * L)) [L != 0]
-        # P = P_b * exp(-g0 * M * (h - h_b) / (R * T_b)) [L == 0]
-        
-        try:
-            consts = self.atmosphere_data['constants']
-            g0 = consts['g0_gravity']
-            M = consts['M_air_molar_mass']
-            R = consts['R_gas_constant']
-            
-            Hb = selected_layer['base_altitude_km'] * 1000
-            Tb = selected_layer['base_temp_k']
-            Pb = selected_layer['base_pressure_pa']
-            L = selected_layer['lapse_rate_k_km'] / 1000.0 # K/m
-            
-            delta_h = h - Hb
-            
-            if abs(L) < 1e-9: # İzotermal katman
-                pressure = Pb * math.exp(-g0 * M * delta_h / (R * Tb))
-                temp = Tb
-            else:
-                temp = Tb + L * delta_h
-                exponent = (g0 * M) / (R * L)
-                pressure = Pb * math.pow(Tb / temp, exponent)
-            
-            density = (pressure * M) / (R * temp)
-            return density
-        except:
-            return 1.225 * math.exp(-altitude_km / 8.0)
+            rho = 1.225 * np.exp(-np.asarray(altitude_km, dtype=float) / 8.0)
+            return float(rho) if rho.ndim == 0 else rho
+        return standard_atmosphere_density(altitude_km, self.atmosphere_table)
 
     # --- 2. N-CİSİM YÖRÜNGE HESABI (Pertürbasyon) ---
     def calculate_n_body_perturbation(self, object_mass, position_vector):
@@ -0,0 +1,689 @@
+"""
+WorldPop nüfus rasteri için önceden hesaplanmış indeks: sabit zamanlı
+(satır sayısıyla orantılı) daire içi nüfus sorguları.
+
+Depo (`datasets/population_grid_v1/`):
+    row_prefix.npy   (H, W + 1) float64, satır boyunca önek toplamları
+                     P[r, c] = raster[r, :c].sum() (nodata ve negatifler 0);
+                     np.memmap ile açılır, sorgu yalnızca gereken hücreleri okur
+    meta.json        sürüm, raster şekli, affine dönüşüm, kaynak dosya bilgisi
+
+Daire sorgusu: merkezi (lat, lon), yarıçapı r km olan jeodezik (küresel
+Dünya, R = 6371 km) dairenin her raster satırındaki boylam yarı genişliği
+küresel kosinüs teoreminden kapalı biçimde bulunur:
+
+    cos Δλ = (cos(r/R) − sin φ0 sin φ) / (cos φ0 cos φ)
+
+Piksel merkezi dairenin içindeyse piksel sayılır; her satırın katkısı
+P[r, bitiş] − P[r, başlangıç] farkıdır. Böylece sorgu O(dairedeki satır
+sayısı) maliyetlidir, poligon rasterleştirme veya projeksiyon gerekmez.
+360°'yi kaplayan rasterlarda tarih değiştirme çizgisini aşan satırlar iki
+parçaya bölünür; kutbu içeren dairelerde kutup tarafındaki satırlar tam
+sayılır.
+
+Radyal profil (`radial_population_profile`): en büyük dairenin penceresi
+bir kez okunur, pikseller merkeze uzaklıklarına göre kovalara toplanır ve
+istenen tüm yarıçaplar için kümülatif nüfus eğrisi döner; aynı nokta
+etrafındaki farklı hasar yarıçapları tek okumayla yanıtlanır. Depo yoksa
+aynı fonksiyon rasterio penceresiyle (raster_window_reader; karo önbellekli
+okuma için raster_tiles.TiledRaster) çalışır. Pencere, piksel bütçeli satır
+blokları halinde okunur (iter_disc_blocks); her yarıçap sınırlı bellekle
+tam toplanır.
+
+Nüfus piramidi (`datasets/population_pyramid_v1/`, level_<f>.npy): taban
+pikselin f×f bloklarının toplamı olan float32 ızgaralar (varsayılan ~5, 25,
+100 km). Büyük yarıçaplarda sorgu, piksel boyu yarıçapa göre küçük kalan en
+kaba seviyeyi seçer; kıtasal ölçekte sonuç piramit çözünürlüğünde tamdır ve
+milisaniyeler sürer. Halka örneklemesi ya da hücre başına maskeleme yoktur.
+
+Daire maskesi önbelleği (`DiscMaskCache`): satır başına sütun aralıkları
+yalnızca merkezin enlemine (raster satırı) ve yarıçapa bağlıdır; boylam
+değişince aralıklar kaydırılır. Önbellek (merkez satırı, yarıçap kovası)
+anahtarıyla, merkez pikselinin tamamını kapsayacak kadar genişletilmiş
+aralıkları tutar; pencereli okumalar bu aralıkları kullanır, pikseller yine
+gerçek merkeze olan uzaklıkla seçildiği için sonuç değişmez. Maske küre
+üzerinde tanımlıdır; Mercator (EPSG:3395) tamponlamasının yüksek
+enlemlerdeki bozulması yoktur.
+
+Kullanım:
+    python population_grid.py build --raster ppp_2020_1km_Aggregated.tif
+    python population_grid.py build-pyramid --raster ppp_2020_1km_Aggregated.tif
+    python population_grid.py info
+    python population_grid.py info --path datasets/population_pyramid_v1
+    python population_grid.py query 41.01 28.98 50
+    python population_grid.py query 41.01 28.98 2000 --pyramid
+"""
+
+import argparse
+import json
+import collections
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+POPULATION_GRID_VERSION = 1
+
+DEFAULT_POPULATION_GRID_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "datasets", f"population_grid_v{POPULATION_GRID_VERSION}"
+)
+DEFAULT_WORLDPOP_RASTER = "ppp_2020_1km_Aggregated.tif"
+
+# haversine_distance (app.py) ile aynı küresel Dünya yarıçapı
+EARTH_RADIUS_KM = 6371.0
+# Kurulumda bir seferde okunan raster satırı (1 km WorldPop: ~170 MB float32)
+BUILD_BLOCK_ROWS = 1024
+# Daire penceresi okunurken blok başına en çok piksel (float64 ara dizilerle ~32 MB)
+PROFILE_BLOCK_PIXELS = 4_000_000
+# Daire maskesi önbelleği: en çok bu kadar (merkez satırı, yarıçap kovası) girdisi
+DISC_MASK_CACHE_ENTRIES = 4096
+# Yarıçap kovası: piksel yüksekliğinin bu kesri
+DISC_MASK_RADIUS_STEP = 0.25
+# disc_pixel_summary: pozitif piksel değerleri için log10 histogramı
+SUMMARY_HISTOGRAM_RANGE = (-4.0, 8.0)
+SUMMARY_HISTOGRAM_BINS = 1200
+
+POPULATION_PYRAMID_VERSION = 1
+DEFAULT_POPULATION_PYRAMID_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "datasets", f"population_pyramid_v{POPULATION_PYRAMID_VERSION}"
+)
+# Taban piksel (1 km WorldPop) katları: ~5, 25, 100 km toplam ızgaraları
+PYRAMID_FACTORS = (5, 25, 100)
+# Seviye seçimi: yarıçap en az bu kadar piksel boyu olmalı
+PYRAMID_PIXELS_PER_RADIUS = 20
+
+
+def _affine(transform) -> Tuple[float, float, float, float, float, float]:
+    """rasterio/affine dönüşümünden (a, b, c, d, e, f); döndürülmüş rasterlar desteklenmez."""
+    a, b, c, d, e, f = (float(v) for v in tuple(transform)[:6])
+    if b != 0.0 or d != 0.0:
+        raise ValueError("Rotated rasters are not supported")
+    return a, b, c, d, e, f
+
+
+def is_periodic(transform, width: int) -> bool:
+    """Raster boylamda tam 360° kaplıyor mu (sütunlar dairesel)?"""
+    a = _affine(transform)[0]
+    return abs(abs(a) * width - 360.0) < abs(a) / 2
+
+
+def disc_row_extents(lat: float, lon: float, radius_km: float, transform, shape: Tuple[int, int]
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Jeodezik dairenin raster satırları ve satır başına [başlangıç, bitiş) sütun aralığı.
+
+    Sütunlar sarılmamıştır (negatif ya da W'den büyük olabilir); sarma ve
+    kırpma `row_sums` içinde yapılır. Tam satırlar (kutbu içeren daireler)
+    [0, W) döner. Boş satırlar atılır.
+    """
+    height, width = int(shape[0]), int(shape[1])
+    a, _, c, _, e, f = _affine(transform)
+    theta = radius_km / EARTH_RADIUS_KM
+    if not theta > 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    theta = min(theta, math.pi)
+    theta_deg = math.degrees(theta)
+
+    # Enlem bandındaki satırlar (piksel merkezleri)
+    lat_hi, lat_lo = min(90.0, lat + theta_deg), max(-90.0, lat - theta_deg)
+    r_edges = sorted(((lat_hi - f) / e - 0.5, (lat_lo - f) / e - 0.5))
+    r0 = max(0, int(math.ceil(r_edges[0])))
+    r1 = min(height - 1, int(math.floor(r_edges[1])))
+    if r1 < r0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    rows = np.arange(r0, r1 + 1, dtype=np.int64)
+    phi = np.radians(f + e * (rows + 0.5))
+    phi0 = math.radians(lat)
+
+    num = math.cos(theta) - math.sin(phi0) * np.sin(phi)
+    den = math.cos(phi0) * np.cos(phi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos_dl = num / den
+    # den ≈ 0 (kutupta merkez ya da satır): içeride mi yalnızca num'un işaretine bağlı
+    cos_dl = np.where(np.isfinite(cos_dl), cos_dl, np.where(num <= 0, -1.0, 2.0))
+    full = cos_dl <= -1.0
+    keep = cos_dl <= 1.0
+    dl = np.degrees(np.arccos(np.clip(cos_dl, -1.0, 1.0)))
+
+    # Piksel merkezi lon_k = c + a (k + 0.5), |lon_k − lon| ≤ Δλ
+    lo = (lon - dl - c) / a - 0.5
+    hi = (lon + dl - c) / a - 0.5
+    starts = np.ceil(np.minimum(lo, hi)).astype(np.int64)
+    stops = np.floor(np.maximum(lo, hi)).astype(np.int64) + 1
+    starts = np.where(full, 0, starts)
+    stops = np.where(full, width, stops)
+    keep &= stops > starts
+    return rows[keep], starts[keep], stops[keep]
+
+
+def row_sums(prefix: np.ndarray, rows: np.ndarray, starts: np.ndarray, stops: np.ndarray,
+             periodic: bool) -> np.ndarray:
+    """Satır önek toplamlarından (H, W + 1) her satırın [başlangıç, bitiş) toplamı."""
+    width = prefix.shape[1] - 1
+    if rows.size == 0:
+        return np.zeros(0)
+    if not periodic:
+        s = np.clip(starts, 0, width)
+        t = np.clip(stops, 0, width)
+        return prefix[rows, t] - prefix[rows, s]
+    span = np.minimum(stops - starts, width)
+    s = np.mod(starts, width)
+    t = s + span
+    wrapped = t > width
+    totals = prefix[rows, np.minimum(t, width)] - prefix[rows, s]
+    if wrapped.any():
+        totals[wrapped] += prefix[rows[wrapped], t[wrapped] - width]
+    return totals
+
+
+class DiscMaskCache:
+    """
+    (raster, merkez satırı, yarıçap kovası) anahtarlı LRU daire maskesi önbelleği.
+
+    `extents` merkez pikseli içindeki her nokta için dairenin tamamını
+    kapsayan satır/sütun aralıklarını döner (üst küme); aralıklar merkez
+    sütununa göreli saklanır, yeni boylamda yalnızca kaydırılır.
+    """
+
+    def __init__(self, max_entries: int = DISC_MASK_CACHE_ENTRIES):
+        self.max_entries = int(max_entries)
+        self._masks: "collections.OrderedDict[Any, Tuple[np.ndarray, ...]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def extents(self, lat: float, lon: float, radius_km: float, transform, shape: Tuple[int, int]
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """disc_row_extents'in üst kümesi (aynı biçim), önbellekten kaydırılarak."""
+        a, _, c, _, e, f = _affine(transform)
+        width = int(shape[1])
+        if not radius_km > 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        row = int(math.floor((lat - f) / e))
+        col = int(math.floor((lon - c) / a))
+        # Merkez pikselinin içindeki herhangi bir nokta piksel merkezine en çok yarım köşegen uzaklıkta
+        half_diagonal_km = (abs(a) + abs(e)) / 2 * math.pi / 180.0 * EARTH_RADIUS_KM
+        step_km = abs(e) * math.pi / 180.0 * EARTH_RADIUS_KM * DISC_MASK_RADIUS_STEP
+        bucket = int(math.ceil((radius_km + half_diagonal_km) / step_km))
+        key = ((a, c, e, f), (int(shape[0]), width), row, bucket)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                self.hits += 1
+        if mask is None:
+            centre_lat = min(90.0, max(-90.0, f + e * (row + 0.5)))
+            rows, starts, stops = disc_row_extents(centre_lat, c + a * 0.5, bucket * step_km, transform, shape)
+            # Referans merkez 0. sütunda: tam olmayan satırlar negatif sütundan başlar
+            full = (starts == 0) & (stops == width)
+            mask = (rows, starts, stops, full)
+            for array in mask:
+                array.setflags(write=False)
+            with self._lock:
+                self.misses += 1
+                self._masks[key] = mask
+                while len(self._masks) > self.max_entries:
+                    self._masks.popitem(last=False)
+        rows, starts, stops, full = mask
+        return rows, np.where(full, starts, starts + col), np.where(full, stops, stops + col)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._masks.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._masks), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+
+SHARED_DISC_MASK_CACHE = DiscMaskCache()
+
+
+def _read_columns(read_window: Callable[[int, int, int, int], np.ndarray], r0: int, r1: int,
+                  col_lo: int, col_hi: int, width: int, periodic: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """[col_lo, col_hi) sarılmamış sütunlarını okur (360° rasterda tarih çizgisinde iki parça)."""
+    if not periodic:
+        col_lo, col_hi = max(col_lo, 0), min(col_hi, width)
+        return read_window(r0, r1, col_lo, col_hi), np.arange(col_lo, col_hi)
+    if col_hi - col_lo >= width:
+        return read_window(r0, r1, 0, width), np.arange(width)
+    first = col_lo % width
+    stop = first + (col_hi - col_lo)
+    cols = np.arange(col_lo, col_hi)
+    if stop <= width:
+        return read_window(r0, r1, first, stop), cols
+    return np.concatenate([read_window(r0, r1, first, width), read_window(r0, r1, 0, stop - width)], axis=1), cols
+
+
+def iter_disc_blocks(read_window: Callable[[int, int, int, int], np.ndarray], transform,
+                     shape: Tuple[int, int], lat: float, lon: float, radius_km: float,
+                     block_pixels: int = PROFILE_BLOCK_PIXELS, mask_cache: Optional[DiscMaskCache] = None):
+    """
+    Dairenin sınır penceresi satır blokları halinde: (piksel bloğu, merkeze uzaklık km).
+
+    Blok başına en çok ~`block_pixels` piksel okunur; bellek yarıçaptan
+    bağımsızdır. Bloklar dairenin dışındaki pencere piksellerini de içerir,
+    ayıklama uzaklıkla yapılır. `mask_cache` verilirse pencere aralıkları
+    önbellekten gelir (biraz daha geniş, sonuç aynı).
+    """
+    a, _, c, _, e, f = _affine(transform)
+    width = int(shape[1])
+    periodic = is_periodic(transform, width)
+    if mask_cache is not None:
+        rows, starts, stops = mask_cache.extents(lat, lon, radius_km, transform, shape)
+    else:
+        rows, starts, stops = disc_row_extents(lat, lon, radius_km, transform, shape)
+    if rows.size == 0:
+        return
+    span = int(min(width, (stops - starts).max()))
+    step = max(1, int(block_pixels) // max(1, span))
+    phi0, lam0 = math.radians(lat), math.radians(lon)
+    for i in range(0, rows.size, step):
+        r0, r1 = int(rows[i]), int(rows[min(i + step, rows.size) - 1]) + 1
+        block, cols = _read_columns(read_window, r0, r1, int(starts[i:i + step].min()),
+                                    int(stops[i:i + step].max()), width, periodic)
+        phi = np.radians(f + e * (np.arange(r0, r1) + 0.5))[:, None]
+        lam = np.radians(c + a * (cols + 0.5))[None, :]
+        h = np.sin((phi - phi0) / 2) ** 2 + math.cos(phi0) * np.cos(phi) * np.sin((lam - lam0) / 2) ** 2
+        yield block, 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def radial_population_profile(read_window: Callable[[int, int, int, int], np.ndarray], transform,
+                              shape: Tuple[int, int], lat: float, lon: float, radii_km,
+                              block_pixels: int = PROFILE_BLOCK_PIXELS,
+                              mask_cache: Optional[DiscMaskCache] = None) -> np.ndarray:
+    """
+    Verilen yarıçaplardaki kümülatif nüfus (piksel merkezi ≤ r), tek okuma ile.
+
+    En büyük dairenin penceresi satır blokları halinde bir kez okunur; her
+    pikselin merkeze büyük daire uzaklığı hesaplanıp yarıçap kovalarına
+    toplanır. `read_window(r0, r1, c0, c1)` temizlenmiş (nodata = 0)
+    piksel bloğu döndürmelidir. Sonuç `radii_km` sırasıyladır.
+    """
+    radii = np.asarray(radii_km, dtype=float)
+    order = np.argsort(radii, kind="stable")
+    edges = np.maximum(radii[order], 0.0)
+    counts = np.zeros(edges.size + 1)
+    if edges.size == 0 or not edges[-1] > 0:
+        return np.zeros(radii.shape)
+    for block, distance in iter_disc_blocks(read_window, transform, shape, lat, lon, float(edges[-1]), block_pixels,
+                                            mask_cache):
+        bins = np.searchsorted(edges, distance.ravel(), side="left")
+        counts += np.bincount(bins, weights=np.asarray(block, dtype=np.float64).ravel(), minlength=edges.size + 1)
+    cumulative = np.cumsum(counts[:-1])
+    out = np.empty(radii.shape)
+    out[order] = np.where(radii[order] > 0, cumulative, 0.0)
+    return out
+
+
+def disc_pixel_summary(read_window: Callable[[int, int, int, int], np.ndarray], transform,
+                       shape: Tuple[int, int], lat: float, lon: float, radius_km: float,
+                       clip: Optional[Tuple[float, float]] = None,
+                       block_pixels: int = PROFILE_BLOCK_PIXELS,
+                       mask_cache: Optional[DiscMaskCache] = None) -> Dict[str, float]:
+    """
+    Daire içindeki piksellerin blok blok özeti: toplam, en büyük, pozitif piksel
+    sayısı, pozitif piksellerin medyanı ve 95. yüzdeliği.
+
+    Yüzdelikler log ölçekli histogramdan (SUMMARY_HISTOGRAM_BINS kova,
+    ~%2 göreli çözünürlük) bulunur; tüm pikselleri bellekte tutmak gerekmez.
+    `clip=(eşik, yeni_değer)` verilirse toplamda eşiği aşan pikseller
+    yeni değerle sayılır.
+    """
+    lo, hi = SUMMARY_HISTOGRAM_RANGE
+    histogram = np.zeros(SUMMARY_HISTOGRAM_BINS, dtype=np.int64)
+    total, peak = 0.0, 0.0
+    for block, distance in iter_disc_blocks(read_window, transform, shape, lat, lon, radius_km, block_pixels,
+                                            mask_cache):
+        values = np.asarray(block, dtype=np.float64)[distance <= radius_km]
+        if values.size == 0:
+            continue
+        peak = max(peak, float(values.max()))
+        positive = values[values > 0]
+        if positive.size:
+            scaled = (np.log10(positive) - lo) / (hi - lo) * SUMMARY_HISTOGRAM_BINS
+            histogram += np.bincount(np.clip(scaled.astype(np.int64), 0, SUMMARY_HISTOGRAM_BINS - 1),
+                                     minlength=SUMMARY_HISTOGRAM_BINS)
+        if clip is not None:
+            values = np.where(values > clip[0], clip[1], values)
+        total += float(values.sum())
+
+    count = int(histogram.sum())
+
+    def percentile(q):
+        if count == 0:
+            return 0.0
+        k = int(np.searchsorted(np.cumsum(histogram), q / 100.0 * count, side="left"))
+        return float(10 ** (lo + (k + 0.5) * (hi - lo) / SUMMARY_HISTOGRAM_BINS))
+
+    return {"total": total, "max": peak, "count": count, "median": percentile(50), "p95": percentile(95)}
+
+
+def raster_window_reader(src, band: int = 1) -> Callable[[int, int, int, int], np.ndarray]:
+    """
+    rasterio veri kümesi ya da raster_tiles.TiledRaster için `read_window(r0, r1, c0, c1)`
+    (nodata ve negatifler 0).
+    """
+    if hasattr(src, "read_window"):
+        return lambda r0, r1, c0, c1: _clean(src.read_window(r0, r1, c0, c1), src.nodata)
+    return lambda r0, r1, c0, c1: _clean(src.read(band, window=((r0, r1), (c0, c1))), src.nodata)
+
+
+class PopulationGrid:
+    """Satır önek toplamı deposu (memmap) üzerinde daire içi nüfus sorguları."""
+
+    def __init__(self, prefix: np.ndarray, meta: Dict[str, Any]):
+        self.prefix = prefix
+        self.meta = dict(meta)
+        self.shape = (int(prefix.shape[0]), int(prefix.shape[1]) - 1)
+        self.transform = _affine(self.meta["transform"])
+        self.periodic = is_periodic(self.transform, self.shape[1])
+
+    @property
+    def version(self) -> int:
+        return int(self.meta.get("version", 0))
+
+    @property
+    def pixel_km(self) -> float:
+        """Piksel yüksekliği (km); enlemden bağımsız."""
+        return abs(self.transform[4]) * math.pi / 180.0 * EARTH_RADIUS_KM
+
+    def disc_population(self, lat: float, lon: float, radius_km: float) -> float:
+        """Merkezi dairenin içinde kalan piksellerin toplam nüfusu."""
+        rows, starts, stops = disc_row_extents(lat, lon, radius_km, self.transform, self.shape)
+        return float(row_sums(self.prefix, rows, starts, stops, self.periodic).sum())
+
+    def read_window(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray:
+        """Piksel değerleri, önek farklarından (temizlenmiş raster)."""
+        return np.diff(self.prefix[row0:row1, col0:col1 + 1], axis=1)
+
+    def radial_profile(self, lat: float, lon: float, radii_km) -> np.ndarray:
+        """radial_population_profile: verilen yarıçaplardaki kümülatif nüfus."""
+        return radial_population_profile(self.read_window, self.transform, self.shape, lat, lon, radii_km)
+
+    def total_population(self) -> float:
+        return float(self.prefix[:, -1].sum())
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_POPULATION_GRID_DIR) -> "PopulationGrid":
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if int(meta.get("version", 0)) != POPULATION_GRID_VERSION:
+            raise ValueError(f"Population grid version {meta.get('version')} != {POPULATION_GRID_VERSION}; rebuild it")
+        prefix = np.load(os.path.join(directory, "row_prefix.npy"), mmap_mode="r")
+        return cls(prefix, meta)
+
+
+def load_population_grid(directory: str = DEFAULT_POPULATION_GRID_DIR) -> Optional[PopulationGrid]:
+    """Depo varsa ve sürümü uyuyorsa yükler; yoksa None (çağıran raster maskelemeye düşer)."""
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+    try:
+        return PopulationGrid.load(directory)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Population grid yüklenemedi ({directory}): {e}")
+        return None
+
+
+def _clean(block: np.ndarray, nodata) -> np.ndarray:
+    block = np.asarray(block, dtype=np.float64)
+    if nodata is not None:
+        block = np.where(block == nodata, 0.0, block)
+    return np.where(np.isfinite(block) & (block > 0), block, 0.0)
+
+
+def _open_source(source, transform=None, nodata=None):
+    """Kurulum kaynağı: (yükseklik, genişlik, dönüşüm, nodata, read_rows, kaynak bilgisi, kapat)."""
+    if isinstance(source, (str, os.PathLike)):
+        import rasterio
+        from rasterio.windows import Window
+
+        src = rasterio.open(source)
+        width = src.width
+        read_rows = lambda r0, r1: src.read(1, window=Window(0, r0, width, r1 - r0))
+        source_info = {"path": os.path.abspath(source), "size": os.path.getsize(source),
+                       "mtime": os.path.getmtime(source), "crs": str(src.crs)}
+        return src.height, width, src.transform, src.nodata, read_rows, source_info, src.close
+    array = np.asarray(source)
+    if transform is None:
+        raise ValueError("transform is required for array sources")
+    read_rows = lambda r0, r1: array[r0:r1]
+    return array.shape[0], array.shape[1], transform, nodata, read_rows, {"path": None}, lambda: None
+
+
+def _write_meta(directory: str, meta: Dict[str, Any]) -> None:
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def build_population_grid(source, directory: str = DEFAULT_POPULATION_GRID_DIR, *, transform=None,
+                          nodata=None, block_rows: int = BUILD_BLOCK_ROWS) -> PopulationGrid:
+    """
+    Raster dosyasından (rasterio) ya da 2B diziden (`transform` ile) depoyu kurar.
+
+    Raster satır blokları halinde okunur; bellek kullanımı blok boyutuyla
+    sınırlıdır.
+    """
+    started = time.time()
+    height, width, transform, nodata, read_rows, source_info, close = _open_source(source, transform, nodata)
+    os.makedirs(directory, exist_ok=True)
+    prefix_path = os.path.join(directory, "row_prefix.npy")
+    prefix = np.lib.format.open_memmap(prefix_path, mode="w+", dtype=np.float64, shape=(height, width + 1))
+    try:
+        for r0 in range(0, height, block_rows):
+            r1 = min(height, r0 + block_rows)
+            prefix[r0:r1, 0] = 0.0
+            np.cumsum(_clean(read_rows(r0, r1), nodata), axis=1, out=prefix[r0:r1, 1:])
+        prefix.flush()
+    finally:
+        del prefix
+        close()
+
+    _write_meta(directory, {
+        "version": POPULATION_GRID_VERSION,
+        "shape": [int(height), int(width)],
+        "transform": list(_affine(transform)),
+        "source": source_info,
+        "build_seconds": round(time.time() - started, 1),
+    })
+    return PopulationGrid.load(directory)
+
+
+# --- Çok çözünürlüklü nüfus piramidi ---
+
+def _span_sum(row: np.ndarray, start: int, stop: int, periodic: bool) -> float:
+    """Tek satırın sarılmamış [start, stop) sütunlarının toplamı."""
+    width = row.shape[0]
+    if not periodic:
+        return float(row[max(start, 0):min(stop, width)].sum(dtype=np.float64))
+    if stop - start >= width:
+        return float(row.sum(dtype=np.float64))
+    first = start % width
+    end = first + (stop - start)
+    if end <= width:
+        return float(row[first:end].sum(dtype=np.float64))
+    return float(row[first:].sum(dtype=np.float64) + row[:end - width].sum(dtype=np.float64))
+
+
+class PopulationPyramid:
+    """
+    Toplam nüfus ızgaraları (seviye çarpanı f: f×f taban pikselinin toplamı), float32 memmap.
+
+    Sorgu, piksel boyu yarıçapın 1/PYRAMID_PIXELS_PER_RADIUS'undan küçük
+    kalan en kaba seviyeyi seçer; yeterince ince seviye yoksa en incesi
+    kullanılır. Sonuç o seviyenin çözünürlüğünde tamdır (piksel merkezi
+    dairenin içindeyse sayılır).
+    """
+
+    def __init__(self, levels: Dict[int, np.ndarray], meta: Dict[str, Any]):
+        self.levels = {int(f): levels[f] for f in sorted(levels)}
+        self.meta = dict(meta)
+        a, b, c, d, e, f0 = _affine(self.meta["transform"])
+        self.geometry = {}
+        for factor, level in self.levels.items():
+            transform = (a * factor, b, c, d, e * factor, f0)
+            self.geometry[factor] = (transform, level.shape, is_periodic(transform, level.shape[1]))
+
+    @property
+    def version(self) -> int:
+        return int(self.meta.get("version", 0))
+
+    @property
+    def factors(self) -> Tuple[int, ...]:
+        return tuple(self.levels)
+
+    def pixel_km(self, factor: int) -> float:
+        """Seviye piksel yüksekliği (km)."""
+        return abs(self.geometry[factor][0][4]) * math.pi / 180.0 * EARTH_RADIUS_KM
+
+    def select_level(self, radius_km: float) -> int:
+        """Yarıçap için en kaba uygun seviye çarpanı."""
+        suitable = [f for f in self.levels if self.pixel_km(f) * PYRAMID_PIXELS_PER_RADIUS <= radius_km]
+        return suitable[-1] if suitable else self.factors[0]
+
+    def disc_population(self, lat: float, lon: float, radius_km: float, factor: Optional[int] = None) -> float:
+        """Seçilen (ya da verilen) seviyede daire içindeki piksellerin toplamı."""
+        factor = self.select_level(radius_km) if factor is None else int(factor)
+        transform, shape, periodic = self.geometry[factor]
+        level = self.levels[factor]
+        rows, starts, stops = disc_row_extents(lat, lon, radius_km, transform, shape)
+        return sum(_span_sum(level[r], s, t, periodic) for r, s, t in zip(rows, starts, stops))
+
+    def read_window(self, factor: int) -> Callable[[int, int, int, int], np.ndarray]:
+        level = self.levels[factor]
+        return lambda r0, r1, c0, c1: np.asarray(level[r0:r1, c0:c1], dtype=np.float64)
+
+    def radial_profile(self, lat: float, lon: float, radii_km, factor: Optional[int] = None) -> np.ndarray:
+        """radial_population_profile, en küçük pozitif yarıçapa uygun seviyede."""
+        if factor is None:
+            positive = [r for r in np.ravel(radii_km) if r > 0]
+            factor = self.select_level(min(positive)) if positive else self.factors[0]
+        transform, shape, _ = self.geometry[factor]
+        return radial_population_profile(self.read_window(factor), transform, shape, lat, lon, radii_km)
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_POPULATION_PYRAMID_DIR) -> "PopulationPyramid":
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if int(meta.get("version", 0)) != POPULATION_PYRAMID_VERSION:
+            raise ValueError(f"Population pyramid version {meta.get('version')} != {POPULATION_PYRAMID_VERSION}; "
+                             "rebuild it")
+        levels = {int(f): np.load(os.path.join(directory, f"level_{int(f)}.npy"), mmap_mode="r")
+                  for f in meta["factors"]}
+        return cls(levels, meta)
+
+
+def load_population_pyramid(directory: str = DEFAULT_POPULATION_PYRAMID_DIR) -> Optional[PopulationPyramid]:
+    """Piramit varsa ve sürümü uyuyorsa yükler; yoksa None."""
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+    try:
+        return PopulationPyramid.load(directory)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Population pyramid yüklenemedi ({directory}): {e}")
+        return None
+
+
+def _aggregate(block: np.ndarray, factor: int) -> np.ndarray:
+    """f×f blok toplamları (kenarlar sıfırla doldurulur)."""
+    rows, cols = block.shape
+    pad_r, pad_c = -rows % factor, -cols % factor
+    if pad_r or pad_c:
+        block = np.pad(block, ((0, pad_r), (0, pad_c)))
+    r, c = block.shape
+    return block.reshape(r // factor, factor, c // factor, factor).sum(axis=(1, 3))
+
+
+def build_population_pyramid(source, directory: str = DEFAULT_POPULATION_PYRAMID_DIR, *,
+                             factors=PYRAMID_FACTORS, transform=None, nodata=None,
+                             block_rows: int = BUILD_BLOCK_ROWS) -> PopulationPyramid:
+    """
+    Raster dosyasından ya da 2B diziden piramit seviyelerini kurar.
+
+    Raster tek geçişte, tüm çarpanların katı olan satır bloklarıyla okunur.
+    """
+    started = time.time()
+    factors = sorted({int(f) for f in factors})
+    if not factors or factors[0] < 1:
+        raise ValueError("factors must be positive integers")
+    step = math.lcm(*factors)
+    block_rows = max(step, block_rows // step * step)
+    height, width, transform, nodata, read_rows, source_info, close = _open_source(source, transform, nodata)
+    os.makedirs(directory, exist_ok=True)
+    levels = {
+        f: np.lib.format.open_memmap(os.path.join(directory, f"level_{f}.npy"), mode="w+", dtype=np.float32,
+                                     shape=(-(-height // f), -(-width // f)))
+        for f in factors
+    }
+    try:
+        for r0 in range(0, height, block_rows):
+            block = _clean(read_rows(r0, min(height, r0 + block_rows)), nodata)
+            for f, level in levels.items():
+                aggregated = _aggregate(block, f)
+                level[r0 // f:r0 // f + aggregated.shape[0]] = aggregated
+        for level in levels.values():
+            level.flush()
+    finally:
+        levels.clear()
+        close()
+
+    _write_meta(directory, {
+        "version": POPULATION_PYRAMID_VERSION,
+        "shape": [int(height), int(width)],
+        "transform": list(_affine(transform)),
+        "factors": factors,
+        "source": source_info,
+        "build_seconds": round(time.time() - started, 1),
+    })
+    return PopulationPyramid.load(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Population grid (row prefix-sum) tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="build the prefix-sum store from a WorldPop raster")
+    p_build.add_argument("--raster", default=DEFAULT_WORLDPOP_RASTER)
+    p_build.add_argument("--out", default=DEFAULT_POPULATION_GRID_DIR)
+    p_build.add_argument("--block-rows", type=int, default=BUILD_BLOCK_ROWS)
+    p_pyramid = sub.add_parser("build-pyramid", help="build the multi-resolution aggregate grids")
+    p_pyramid.add_argument("--raster", default=DEFAULT_WORLDPOP_RASTER)
+    p_pyramid.add_argument("--out", default=DEFAULT_POPULATION_PYRAMID_DIR)
+    p_pyramid.add_argument("--factors", type=int, nargs="+", default=list(PYRAMID_FACTORS))
+    p_info = sub.add_parser("info", help="print the store metadata")
+    p_info.add_argument("--path", default=DEFAULT_POPULATION_GRID_DIR)
+    p_query = sub.add_parser("query", help="population within radius_km of (lat, lon)")
+    p_query.add_argument("lat", type=float)
+    p_query.add_argument("lon", type=float)
+    p_query.add_argument("radius_km", type=float)
+    p_query.add_argument("--path", default=DEFAULT_POPULATION_GRID_DIR)
+    p_query.add_argument("--pyramid", nargs="?", const=DEFAULT_POPULATION_PYRAMID_DIR,
+                         help="query the pyramid instead of the prefix-sum store")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        grid = build_population_grid(args.raster, args.out, block_rows=args.block_rows)
+        print(f"✓ Population grid v{grid.version}: {grid.shape[0]}x{grid.shape[1]}, "
+              f"{grid.total_population():,.0f} kişi, {grid.meta['build_seconds']} s -> {args.out}")
+    elif args.command == "build-pyramid":
+        pyramid = build_population_pyramid(args.raster, args.out, factors=args.factors)
+        levels = ", ".join(f"{f}x: {pyramid.pixel_km(f):.1f} km" for f in pyramid.factors)
+        print(f"✓ Population pyramid v{pyramid.version} ({levels}), {pyramid.meta['build_seconds']} s -> {args.out}")
+    elif args.command == "info":
+        with open(os.path.join(args.path, "meta.json"), encoding="utf-8") as f:
+            print(json.dumps(json.load(f), indent=2))
+    else:
+        store = PopulationPyramid.load(args.pyramid) if args.pyramid else PopulationGrid.load(args.path)
+        t0 = time.perf_counter()
+        population = store.disc_population(args.lat, args.lon, args.radius_km)
+        print(f"{population:,.0f} kişi ({(time.perf_counter() - t0) * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Pencereli, karo (tile) önbellekli raster erişimi: WorldPop, DEM ve GEBCO
+kaynakları için ortak okuma katmanı.
+
+    TileCache     çözülmüş karoların LRU önbelleği; bayt cinsinden bellek
+                  bütçesi aşılınca en eski karolar atılır. Tüm rasterlar
+                  varsayılan olarak tek bir paylaşılan önbelleği kullanır
+                  (RASTER_TILE_CACHE_MB, varsayılan 256 MB).
+    TiledRaster   rasterio veri kümesini sarar: `read_window` istenen
+                  pencereyi karolardan birleştirir, `value_at` tek noktayı
+                  (src.sample yerine) karodan okur.
+
+Karolar TILE_SIZE × TILE_SIZE piksel pencerelerdir ve yalnızca ilk
+erişimde diskten okunur; aynı bölgeye yakın sorgular (aynı çarpma noktası
+etrafındaki farklı yarıçaplar, komşu noktalar) diske inmez. Büyük
+pencereler çağıran tarafından satır blokları halinde istenir (bkz.
+population_grid.iter_disc_blocks); böylece herhangi bir yarıçap sınırlı
+bellekle tam olarak toplanabilir.
+
+rasterio veri kümeleri iş parçacığı güvenli değildir; her raster kendi
+kilidiyle okunur. Önbellek kendi kilidiyle korunur.
+"""
+
+import collections
+import math
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+TILE_SIZE = 512
+DEFAULT_CACHE_BYTES = int(float(os.environ.get("RASTER_TILE_CACHE_MB", 256)) * 2 ** 20)
+
+
+class TileCache:
+    """Bayt bütçeli LRU karo önbelleği (iş parçacığı güvenli)."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._tiles: "collections.OrderedDict[Hashable, np.ndarray]" = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """Önbellekteki karo; yoksa `load()` ile okunup eklenir (salt okunur dizi)."""
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+        tile = np.asarray(load())
+        tile.setflags(write=False)
+        with self._lock:
+            if key not in self._tiles:
+                self._tiles[key] = tile
+                self._bytes += tile.nbytes
+            # Bütçeden büyük tek karo da döner ama önbellekte tutulmaz
+            while self._bytes > self.max_bytes and self._tiles:
+                _, evicted = self._tiles.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+        return tile
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tiles": len(self._tiles),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+SHARED_TILE_CACHE = TileCache()
+
+
+class TiledRaster:
+    """
+    rasterio veri kümesi üzerinde karo önbellekli pencere okuma.
+
+    `src` en az `read(band, window=((r0, r1), (c0, c1)))`, `height`,
+    `width`, `transform` ve `nodata` sağlamalıdır.
+    """
+
+    def __init__(self, src, band: int = 1, tile_size: int = TILE_SIZE, cache: Optional[TileCache] = None,
+                 name: Optional[str] = None):
+        self.src = src
+        self.band = int(band)
+        self.tile_size = int(tile_size)
+        self.cache = cache if cache is not None else SHARED_TILE_CACHE
+        self.name = name or getattr(src, "name", None) or f"raster-{id(src)}"
+        self.height, self.width = int(src.height), int(src.width)
+        self.shape = (self.height, self.width)
+        self.transform = src.transform
+        self.nodata = src.nodata
+        self.crs = getattr(src, "crs", None)
+        self._lock = threading.Lock()
+
+    def _tile(self, tile_row: int, tile_col: int) -> np.ndarray:
+        def load():
+            r0, c0 = tile_row * self.tile_size, tile_col * self.tile_size
+            r1, c1 = min(self.height, r0 + self.tile_size), min(self.width, c0 + self.tile_size)
+            with self._lock:
+                return self.src.read(self.band, window=((r0, r1), (c0, c1)))
+
+        return self.cache.get((self.name, self.band, self.tile_size, tile_row, tile_col), load)
+
+    def read_window(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray:
+        """[row0, row1) × [col0, col1) piksel değerleri (raster sınırları içinde)."""
+        if not (0 <= row0 <= row1 <= self.height and 0 <= col0 <= col1 <= self.width):
+            raise IndexError(f"Window rows {row0}:{row1}, cols {col0}:{col1} outside {self.shape}")
+        ts = self.tile_size
+        tile_rows = range(row0 // ts, -(-row1 // ts))
+        tile_cols = range(col0 // ts, -(-col1 // ts))
+        if len(tile_rows) == 1 and len(tile_cols) == 1:
+            tr, tc = tile_rows[0], tile_cols[0]
+            return self._tile(tr, tc)[row0 - tr * ts:row1 - tr * ts, col0 - tc * ts:col1 - tc * ts]
+        out = None
+        for tr in tile_rows:
+            for tc in tile_cols:
+                tile = self._tile(tr, tc)
+                if out is None:
+                    out = np.empty((row1 - row0, col1 - col0), dtype=tile.dtype)
+                r0, r1 = max(row0, tr * ts), min(row1, (tr + 1) * ts)
+                c0, c1 = max(col0, tc * ts), min(col1, (tc + 1) * ts)
+                out[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = tile[r0 - tr * ts:r1 - tr * ts,
+                                                                     c0 - tc * ts:c1 - tc * ts]
+        if out is None:
+            out = np.empty((row1 - row0, col1 - col0), dtype=np.float32)
+        return out
+
+    def index(self, lon: float, lat: float):
+        """Noktayı içeren pikselin (satır, sütun) indeksi."""
+        a, _, c, _, e, f = tuple(self.transform)[:6]
+        return int(math.floor((lat - f) / e)), int(math.floor((lon - c) / a))
+
+    def value_at(self, lon: float, lat: float):
+        """Noktayı içeren pikselin değeri (src.sample ile aynı piksel); raster dışında IndexError."""
+        row, col = self.index(lon, lat)
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise IndexError(f"({lon}, {lat}) outside raster {self.name}")
+        ts = self.tile_size
+        return self._tile(row // ts, col // ts)[row % ts, col % ts]
+
+    def close(self) -> None:
+        self.src.close()
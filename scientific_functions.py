@@ -8,6 +8,9 @@ import numpy as np
 import math
 import json
 
+from entry_emulator import emulate_entry
+from parallel_entry import simulate_atmospheric_entry_auto
+
 # ============================================================================
 # 1. SPEKTRAL TAKSONOMİ VE KOMPOZISYON
 # ============================================================================
@@ -843,47 +846,252 @@ def calculate_shock_chemistry_emp(velocity_kms, mass_kg, shock_chemistry_data, p
 # 11. BELİRSİZLİK ANALİZİ (MONTE CARLO)
 # ============================================================================
 
-def run_uncertainty_analysis(input_params, uncertainty_distributions, n_samples=1000):
+# Çıktılar ve örneklenen girdiler (korelasyon matrisi sırası)
+UNCERTAINTY_OUTPUTS = ('energy_mt', 'impact_energy_mt', 'crater_diameter_m', 'thermal_radius_km',
+                       'blast_1_psi_km', 'blast_5_psi_km', 'blast_20_psi_km')
+UNCERTAINTY_INPUTS = ('diameter_m', 'density_kgm3', 'velocity_kms', 'angle_deg')
+
+# Zincir sabitleri (meteor_physics etki fonksiyonlarıyla aynı)
+# Giriş çözücüsü ayarları (app.calculate_atmospheric_entry ve entry_emulator.SOLVER_SETTINGS ile aynı)
+UNCERTAINTY_ENTRY_KWARGS = dict(Cd=0.47, g=9.81, C_h=0.1, Q=8e6, dt=0.05, max_steps=20000)
+HORIZON_LIMIT_30KM_M = 3.57 * math.sqrt(30000.0) * 1000.0
+
+
+def _sample_uncertain_inputs(input_params, uncertainty_distributions, n_samples, rng):
+    """Ortak (korelasyonlu) girdi örnekleri: Gaussian copula + JSON marjinalleri."""
+    mc = uncertainty_distributions.get('monte_carlo_sampling_distributions', {})
+    cov = uncertainty_distributions.get('covariance_matrices', {})
+
+    # Yoğunluk: spektral tipe göre kesilmiş normal
+    density_dist = mc.get('density_distribution', {})
+    by_type = density_dist.get('by_type', {})
+    spec = str(input_params.get('spectral_type', '')).strip().upper()[:1]
+    type_stats = by_type.get(f'{spec}_type', by_type.get('unknown', {'mean_kg_m3': 2600, 'sigma_kg_m3': 1500}))
+    density = float(input_params.get('density_kgm3', type_stats['mean_kg_m3']))
+    density_sigma = float(type_stats['sigma_kg_m3'])
+    density_bounds = density_dist.get('bounds', [500, 8500])
+
+    # Çap: log-normal (geometrik σ); verilmezse kütle ve yoğunluktan
+    if 'diameter_m' in input_params:
+        diameter = float(input_params['diameter_m'])
+    else:
+        diameter = (6.0 * float(input_params['mass_kg']) / (math.pi * density)) ** (1/3)
+    sigma_geometric = float(mc.get('diameter_distribution', {}).get('sigma_geometric', 1.5))
+
+    # Hız: gözlem yayına göre σ (tablo 20 km/s için; göreli olarak ölçeklenir)
+    arc = input_params.get('observation_arc', '1_month_arc')
+    arc_values = mc.get('velocity_distribution', {}).get('typical_values', {}).get(arc, {'mean_km_s': 20, 'sigma_km_s': 2})
+    velocity = float(input_params['velocity_kms'])
+    velocity_sigma = velocity * float(arc_values['sigma_km_s']) / float(arc_values['mean_km_s'])
+
+    angle = float(input_params.get('angle_deg', 45))
+    angle_sigma = float(mc.get('entry_angle_distribution', {}).get('sigma_deg', 15))
+
+    # Korelasyonlar: çap-yoğunluk ve hız-açı (UNCERTAINTY_INPUTS sırası)
+    rho_dd = float(cov.get('diameter_density_correlation', {}).get('correlation_coefficient', 0.0))
+    rho_va = float(cov.get('velocity_angle_correlation', {}).get('correlation_coefficient', 0.0))
+    corr = np.array([[1.0, rho_dd, 0.0, 0.0],
+                     [rho_dd, 1.0, 0.0, 0.0],
+                     [0.0, 0.0, 1.0, rho_va],
+                     [0.0, 0.0, rho_va, 1.0]])
+    z = rng.standard_normal((n_samples, 4)) @ np.linalg.cholesky(corr).T
+
+    samples = {
+        'diameter_m': diameter * sigma_geometric ** z[:, 0],
+        'density_kgm3': np.clip(density + density_sigma * z[:, 1], *density_bounds),
+        'velocity_kms': np.maximum(velocity + velocity_sigma * z[:, 2], 11.0),
+        'angle_deg': np.clip(angle + angle_sigma * z[:, 3], 5.0, 90.0),
+    }
+    marginals = {
+        'diameter_m': {'distribution': 'log_normal', 'median': diameter, 'sigma_geometric': sigma_geometric},
+        'density_kgm3': {'distribution': 'normal_truncated', 'mean': density, 'sigma': density_sigma,
+                         'bounds': list(density_bounds)},
+        'velocity_kms': {'distribution': 'normal', 'mean': velocity, 'sigma': velocity_sigma,
+                         'observation_arc': arc},
+        'angle_deg': {'distribution': 'normal_truncated', 'mean': angle, 'sigma': angle_sigma, 'bounds': [5, 90]},
+        'correlations': {'diameter_density': rho_dd, 'velocity_angle': rho_va},
+    }
+    return samples, marginals
+
+
+def _impact_chain(diameter_m, density_kgm3, velocity_kms, angle_deg, strength_pa, target_density_kgm3,
+                  emulator=None):
+    """Giriş → krater → termal → şok dalgası zinciri, dizi girdilerle (örnek başına döngü yok).
+
+    Airburst bayrağı, patlama irtifası ve kalan enerji giriş çözücüsünden gelir:
+    emülatör verilirse `emulate_entry` (güven bölgesi dışı noktalar tam
+    çözücüye düşer), yoksa float32 çözücü (büyük partiler parallel_entry ile
+    çekirdeklere bölünür). Airburst'te termal ve şok dalgası atmosferde
+    bırakılan enerjiyle, yer çarpmasında krater, termal ve şok dalgası kalan
+    kütle ve çarpma hızıyla hesaplanır.
     """
-    Monte Carlo simülasyonu ile belirsizlik analizi.
+    mass_kg = (math.pi / 6.0) * diameter_m ** 3 * density_kgm3
+    energy_j = 0.5 * mass_kg * (velocity_kms * 1000.0) ** 2
+
+    if emulator is not None:
+        entry = emulate_entry(mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3, strength_pa,
+                              emulator=emulator, **UNCERTAINTY_ENTRY_KWARGS)
+    else:
+        entry = simulate_atmospheric_entry_auto(mass_kg, diameter_m, velocity_kms, angle_deg, density_kgm3,
+                                                strength_pa, dtype=np.float32, **UNCERTAINTY_ENTRY_KWARGS)
+    is_airburst = np.asarray(entry['is_airburst'], dtype=bool)
+    burst_km = np.where(is_airburst, np.asarray(entry['airburst_altitude_m'], dtype=float) / 1000.0, 0.0)
+    impact_mass_kg = np.asarray(entry['mass_impact_kg'], dtype=float)
+    impact_v_ms = np.asarray(entry['velocity_impact_kms'], dtype=float) * 1000.0
+    impact_energy_j = 0.5 * impact_mass_kg * impact_v_ms ** 2
+    # Airburst: atmosferde bırakılan enerji; yer çarpması: yüzeye ulaşan enerji
+    effect_energy_j = np.where(is_airburst, np.maximum(energy_j - impact_energy_j, 0.0), impact_energy_j)
+
+    # Krater: pi-scaling (crater_diameter_m_pi_scaling), kalan kütlenin eşdeğer çapı ve çarpma hızıyla
+    g = 9.81
+    impact_d_m = np.cbrt(6.0 * impact_mass_kg / (math.pi * density_kgm3))
+    sin_theta = np.maximum(np.sin(np.radians(angle_deg)), 1e-6)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pi2 = g * impact_d_m / impact_v_ms ** 2
+        pi3 = 1e6 / (target_density_kgm3 * impact_v_ms ** 2)
+        crater_m = (1.25 * 1.03 * impact_d_m * (density_kgm3 / target_density_kgm3) ** (1/3)
+                    * (pi2 + pi3) ** -0.22 * sin_theta ** (1/3))
+    crater_m = np.where(is_airburst | (impact_v_ms <= 0) | (impact_d_m <= 0), 0.0, crater_m)
+
+    # Termal: r = sqrt(η E / (4π F_crit)), airburst'te ufukla sınırlı (thermal_radius_m_from_yield)
+    eta = np.where(is_airburst, 0.30, 0.10)
+    thermal_m = np.sqrt(eta * effect_energy_j / (4.0 * math.pi * 250e3))
+    thermal_m = np.where(is_airburst, np.minimum(thermal_m, HORIZON_LIMIT_30KM_M), thermal_m)
+
+    # Şok dalgası: Z-ölçekleme + patlama yüksekliği düzeltmesi (airblast_radii_km_from_energy_j)
+    scale = np.cbrt(effect_energy_j / 4.184e9)
+    blast = {}
+    for psi, z_m in (('1_psi', 55.0), ('5_psi', 22.0), ('20_psi', 8.0)):
+        r_km = z_m * scale / 1000.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.where(r_km > 0, np.maximum(0.3, np.exp(-burst_km / (3.0 * r_km))), 0.0)
+        blast[psi] = r_km * factor
+
+    return {
+        'energy_mt': energy_j / 4.184e15,
+        'impact_energy_mt': impact_energy_j / 4.184e15,
+        'crater_diameter_m': crater_m,
+        'thermal_radius_km': thermal_m / 1000.0,
+        'blast_1_psi_km': blast['1_psi'],
+        'blast_5_psi_km': blast['5_psi'],
+        'blast_20_psi_km': blast['20_psi'],
+        'is_airburst': is_airburst,
+        'airburst_altitude_km': burst_km,
+    }
+
+
+def _equiprobable_bins(x, bins):
+    """Her örneğin x'in eş-olasılıklı (sıra tabanlı) kutularındaki indeksi."""
+    n = x.size
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[np.argsort(x, kind='stable')] = np.arange(n)
+    return ranks * bins // n
+
+
+def _first_order_indices(input_bins, output, bins):
+    """Var(E[Y|X_i]) / Var(Y): X_i'nin eş-olasılıklı kutularında Y ortalamalarının varyansı."""
+    var_y = float(np.var(output))
+    if var_y <= 0:
+        return {name: 0.0 for name in input_bins}
+    n = output.size
+    indices = {}
+    for name, bin_index in input_bins.items():
+        counts = np.bincount(bin_index, minlength=bins)
+        means = np.bincount(bin_index, weights=output, minlength=bins) / np.maximum(counts, 1)
+        between = float(np.sum(counts * (means - output.mean()) ** 2) / n)
+        indices[name] = min(max(between / var_y, 0.0), 1.0)
+    return indices
+
+
+def run_uncertainty_analysis(input_params, uncertainty_distributions, n_samples=1000, seed=None,
+                             entry_emulator=None):
+    """
+    Monte Carlo simülasyonu ile belirsizlik analizi (vektörel).
+    
+    Çap, yoğunluk, hız ve açı parameter_uncertainty_distributions.json'daki
+    marjinallerden (log-normal çap, tipe göre kesilmiş normal yoğunluk, gözlem
+    yayına göre hız σ, açı σ) ve korelasyonlardan (çap-yoğunluk, hız-açı;
+    Gaussian copula) ortak örneklenir. Tüm örnekler giriş → krater → termal →
+    şok dalgası zincirinden tek seferde dizi olarak geçer; airburst bayrağı,
+    patlama irtifası ve kalan enerji giriş çözücüsünden (ya da emülatörden)
+    gelir. Çözücü örnek sayısıyla doğrusal ölçeklenir (float32, tek çekirdek:
+    ~1.5·10^4 örnek/s).
+    
+    Varyans katkıları birinci mertebe indekslerdir (Var(E[Y|X_i]) / Var(Y),
+    eş-olasılıklı kutularla). Girdiler korelasyonlu olduğundan toplamları
+    1'i aşabilir.
     
     Args:
-        input_params: dict (nominal değerler)
+        input_params: dict (nominal değerler: mass_kg veya diameter_m,
+            velocity_kms, angle_deg; isteğe bağlı density_kgm3,
+            spectral_type, strength_pa, target_density_kgm3, observation_arc)
         uncertainty_distributions: parameter_uncertainty_distributions.json
         n_samples: Simülasyon sayısı
+        seed: Tekrarlanabilirlik için tohum
+        entry_emulator: entry_emulator.load_entry_emulator() çıktısı (isteğe bağlı)
     
     Returns:
         dict: {
             'median': dict,
             'confidence_interval_95': dict,
-            'uncertainty_contributors': list
+            'variance_contributions': dict,   # çıktı → girdi → indeks
+            'uncertainty_contributors': list  # girdiler, ortalama katkıya göre sıralı
         }
     """
     if not uncertainty_distributions:
         return None
     
-    # Basitleştirilmiş Monte Carlo
-    # Gerçek implementasyon numpy ile yapılmalı
+    rng = np.random.default_rng(seed)
+    samples, marginals = _sample_uncertain_inputs(input_params, uncertainty_distributions, int(n_samples), rng)
+    chain = _impact_chain(
+        samples['diameter_m'], samples['density_kgm3'], samples['velocity_kms'], samples['angle_deg'],
+        float(input_params.get('strength_pa', 1e6)), float(input_params.get('target_density_kgm3', 2500)),
+        emulator=entry_emulator,
+    )
     
     results = {
         'method': 'monte_carlo_sampling',
-        'samples': n_samples,
-        'note': 'Full implementation requires numpy array operations'
+        'samples': int(n_samples),
+        'parameter_uncertainties': marginals,
+        'median': {},
+        'confidence_interval_95': {},
+        'mean': {},
+        'std': {},
+        'variance_contributions': {},
     }
     
-    # Her parametre için belirsizlik
-    param_uncertainties = {}
-    for param, nominal_value in input_params.items():
-        dist_info = uncertainty_distributions.get(param, {})
-        uncertainty_1sigma = dist_info.get('uncertainty_1sigma', 0.3)  # 30% varsayılan
-        
-        param_uncertainties[param] = {
-            'nominal': nominal_value,
-            'uncertainty_percent': uncertainty_1sigma * 100,
-            'lower_bound_1sigma': nominal_value * (1 - uncertainty_1sigma),
-            'upper_bound_1sigma': nominal_value * (1 + uncertainty_1sigma)
-        }
+    bins = int(max(2, min(50, math.sqrt(n_samples) / 2)))
+    input_bins = {name: _equiprobable_bins(samples[name], bins) for name in UNCERTAINTY_INPUTS}
+    for name in UNCERTAINTY_OUTPUTS:
+        values = chain[name]
+        p2_5, p50, p97_5 = np.percentile(values, [2.5, 50, 97.5])
+        results['median'][name] = float(p50)
+        results['confidence_interval_95'][name] = [float(p2_5), float(p97_5)]
+        results['mean'][name] = float(values.mean())
+        results['std'][name] = float(values.std())
+        results['variance_contributions'][name] = _first_order_indices(input_bins, values, bins)
+    
+    airburst = chain['is_airburst']
+    results['airburst_probability'] = float(airburst.mean())
+    if airburst.any():
+        altitudes = chain['airburst_altitude_km'][airburst]
+        results['median']['airburst_altitude_km'] = float(np.median(altitudes))
+        results['confidence_interval_95']['airburst_altitude_km'] = [
+            float(v) for v in np.percentile(altitudes, [2.5, 97.5])
+        ]
     
-    results['parameter_uncertainties'] = param_uncertainties
+    # Girdileri tüm çıktılardaki ortalama katkıya göre sırala
+    contributions = results['variance_contributions']
+    results['uncertainty_contributors'] = sorted(
+        (
+            {
+                'parameter': param,
+                'mean_first_order_index': float(np.mean([contributions[out][param] for out in UNCERTAINTY_OUTPUTS])),
+            }
+            for param in UNCERTAINTY_INPUTS
+        ),
+        key=lambda item: item['mean_first_order_index'],
+        reverse=True,
+    )
     
     return results
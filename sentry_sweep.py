@@ -0,0 +1,405 @@
+"""
+Sentry geneli gece risk taraması: JPL Sentry listesindeki her tehdit için
+giriş + etki zinciri temsili çarpma konumlarında koşturulur ve sonuçlar
+indeksli bir SQLite deposuna yazılır.
+
+    threats           tehdit başına girdiler (çap, v_inf, ip) ve deterministik
+                      giriş sonuçları (enerji, hava patlaması, krater, termal ve
+                      patlama yarıçapları), satır içerik özeti (input_hash)
+    threat_locations  (tehdit, konum) başına karar hattı sonucu: Palermo,
+                      Torino, beklenen kayıp, önerilen eylem
+    sweeps            her taramanın özeti (yeniden hesaplanan/silinen sayıları)
+
+Fiziksel parametreler çap ve v_inf'ten türetilir (sentry_scenario: hız
+sqrt(v_inf² + v_esc²), kütle sabit yoğunluklu küreden). Konum başına nüfus,
+nominal termal yarıçap içindeki insan sayısıdır (düzgün yoğunluk).
+
+Artımlı çalışma: satır özeti modelin kullandığı CSV alanlarından (des, çap,
+v_inf, ip) ve tarama ayarlarından (model sürümü, yoğunluk, açı, örnek sayısı,
+tohum, konumlar) hesaplanır. Yalnızca özeti değişen tehditler yeniden
+hesaplanır; listeden düşen tehditler silinir. Karar hattı her senaryo için
+kendi rastgele akışlarını kullandığından artımlı sonuç tam taramayla aynıdır.
+Katalog alanları (ad, H, ps_cum, son gözlem) her taramada tazelenir.
+
+Tarama tek bir işlemde (transaction) yazılır; WAL kipinde okuyucular
+(`load_rankings`, /sentry_rankings) yarım bir taramayı görmez.
+
+Kullanım:
+    python sentry_sweep.py                               # datasets/jpl_sentry_threats.csv → results/sentry_sweep.sqlite
+    python sentry_sweep.py --samples 2000 --seed 7       # ayar değişikliği tüm tehditleri yeniden hesaplar
+    python sentry_sweep.py --force                       # özetlerden bağımsız tam tarama
+    python sentry_sweep.py --show dense_urban --rank-by expected_casualties
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from decision_support_engine import (
+    BLAST_RADIUS_SCALES,
+    PORTFOLIO_RANK_KEYS,
+    DecisionSupportEngine,
+    sentry_scenario,
+)
+
+DEFAULT_CSV_PATH = "datasets/jpl_sentry_threats.csv"
+DEFAULT_DB_PATH = "results/sentry_sweep.sqlite"
+# Model veya şema değişince artırılır: tüm tehditler yeniden hesaplanır
+SWEEP_MODEL_VERSION = 2
+# Modelin kullandığı Sentry sütunları (satır özeti bunlardan)
+SENTRY_INPUT_FIELDS = ("des", "diameter", "v_inf", "ip")
+# Temsili çarpma konumları; yoğunluk kişi/km²
+REPRESENTATIVE_LOCATIONS = (
+    {"name": "dense_urban", "lat": 35.68, "lon": 139.69, "is_ocean": False, "country": "Japan",
+     "population_density_km2": 6000.0},
+    {"name": "suburban", "lat": 51.45, "lon": 7.01, "is_ocean": False, "country": "Germany",
+     "population_density_km2": 1000.0},
+    {"name": "global_average_land", "lat": 20.59, "lon": 78.96, "is_ocean": False, "country": "India",
+     "population_density_km2": 60.0},
+    {"name": "rural", "lat": 60.9, "lon": 101.9, "is_ocean": False, "country": "Russia",
+     "population_density_km2": 2.0},
+    {"name": "open_ocean", "lat": 0.0, "lon": -140.0, "is_ocean": True, "country": "Unknown",
+     "population_density_km2": 0.0},
+)
+DEFAULT_DENSITY_KGM3 = 2500.0
+DEFAULT_ANGLE_DEG = 45.0
+DEFAULT_SAMPLES = 1000
+DEFAULT_SEED = 42
+# Tehdit başına giriş sonuçları (compute_entry_effects anahtarları → sütunlar)
+ENTRY_COLUMNS = (
+    ("energy_mt", "energy_mt"),
+    ("impact_energy_mt", "impact_energy_mt"),
+    ("airburst_altitude_km", "airburst_altitude_km"),
+    ("crater_diameter_km", "crater_diameter_km"),
+    ("thermal_radius_km", "thermal_radius_km"),
+) + tuple(("blast_radius_km." + psi, f"blast_radius_{psi}_km") for psi, _ in BLAST_RADIUS_SCALES)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threats (
+    des TEXT PRIMARY KEY,
+    fullname TEXT,
+    h REAL,
+    ps_cum REAL,
+    ts_max INTEGER,
+    n_imp INTEGER,
+    impact_range TEXT,
+    last_obs TEXT,
+    diameter_m REAL NOT NULL,
+    v_inf_kms REAL,
+    velocity_kms REAL NOT NULL,
+    impact_probability REAL NOT NULL,
+    mass_kg REAL NOT NULL,
+    is_airburst INTEGER NOT NULL,
+    {entry_columns},
+    input_hash TEXT NOT NULL,
+    sweep_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS threat_locations (
+    des TEXT NOT NULL,
+    location TEXT NOT NULL,
+    base_population INTEGER NOT NULL,
+    palermo_scale REAL NOT NULL,
+    torino_scale INTEGER NOT NULL,
+    expected_casualties REAL NOT NULL,
+    impact_type TEXT NOT NULL,
+    recommended_action TEXT NOT NULL,
+    PRIMARY KEY (des, location)
+);
+CREATE INDEX IF NOT EXISTS idx_threat_locations_palermo ON threat_locations (location, palermo_scale DESC);
+CREATE INDEX IF NOT EXISTS idx_threat_locations_casualties ON threat_locations (location, expected_casualties DESC);
+CREATE INDEX IF NOT EXISTS idx_threat_locations_torino ON threat_locations (location, torino_scale DESC);
+CREATE INDEX IF NOT EXISTS idx_threats_probability ON threats (impact_probability DESC);
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    csv_path TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    n_threats INTEGER NOT NULL,
+    n_recomputed INTEGER NOT NULL,
+    n_removed INTEGER NOT NULL,
+    n_skipped INTEGER NOT NULL
+);
+""".format(entry_columns=",\n    ".join(f"{column} REAL NOT NULL" for _, column in ENTRY_COLUMNS))
+
+
+def _float_or_none(value: Optional[str]) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    value = _float_or_none(value)
+    return None if value is None else int(value)
+
+
+def sweep_config(density_kgm3: float = DEFAULT_DENSITY_KGM3, angle_deg: float = DEFAULT_ANGLE_DEG,
+                 n_samples: int = DEFAULT_SAMPLES, seed: int = DEFAULT_SEED,
+                 locations=REPRESENTATIVE_LOCATIONS) -> Dict[str, Any]:
+    """Sonuçları etkileyen tüm tarama ayarları (özetin parçası)."""
+    return {
+        "model_version": SWEEP_MODEL_VERSION,
+        "density_kgm3": float(density_kgm3),
+        "angle_deg": float(angle_deg),
+        "n_samples": int(n_samples),
+        "seed": int(seed),
+        "locations": [dict(location) for location in locations],
+    }
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def row_hash(row: Dict[str, str], config_hash: str) -> str:
+    """Modelin kullandığı CSV alanları + tarama ayarları için içerik özeti."""
+    return _digest([config_hash] + [(row.get(field) or "").strip() for field in SENTRY_INPUT_FIELDS])
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Yazma bağlantısı; şemayı kurar."""
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _catalog_fields(row: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "fullname": (row.get("fullname") or "").strip(),
+        "h": _float_or_none(row.get("h")),
+        "ps_cum": _float_or_none(row.get("ps_cum")),
+        "ts_max": _int_or_none(row.get("ts_max")),
+        "n_imp": _int_or_none(row.get("n_imp")),
+        "impact_range": row.get("range") or "",
+        "last_obs": row.get("last_obs") or "",
+    }
+
+
+def compute_threats(rows: List[Dict[str, str]], config: Dict[str, Any],
+                    engine: Optional[DecisionSupportEngine] = None) -> List[Dict[str, Any]]:
+    """
+    Sentry satırları için giriş sonuçları ve konum başına karar hattı sonuçları.
+
+    Her konum için değişen tehditler tek bir run_portfolio çağrısıyla
+    koşturulur; hava patlaması bayrağı giriş çözücüsünden portföye geçer.
+    Dönen kayıtlar doğrudan `threats` / `threat_locations` satırlarıdır.
+    """
+    engine = engine or DecisionSupportEngine(seed=config["seed"])
+    scenarios = [sentry_scenario(row, density_kgm3=config["density_kgm3"], angle_deg=config["angle_deg"])
+                 for row in rows]
+    if not scenarios:
+        return []
+    diameter = np.array([s["diameter_m"] for s in scenarios])
+    velocity = np.array([s["velocity_kms"] for s in scenarios])
+    mass = (4/3) * np.pi * (diameter / 2) ** 3 * config["density_kgm3"]
+    effects = engine.compute_entry_effects(mass, velocity, config["angle_deg"], config["density_kgm3"])
+
+    records = []
+    for i, (row, scenario) in enumerate(zip(rows, scenarios)):
+        record = _catalog_fields(row)
+        record.update({
+            "des": scenario["scenario_id"],
+            "diameter_m": scenario["diameter_m"],
+            "v_inf_kms": _float_or_none(row.get("v_inf")),
+            "velocity_kms": scenario["velocity_kms"],
+            "impact_probability": scenario["impact_probability"],
+            "mass_kg": float(mass[i]),
+            "is_airburst": int(effects["is_airburst"][i]),
+            "locations": {},
+        })
+        for key, column in ENTRY_COLUMNS:
+            record[column] = float(effects[key][i])
+        records.append(record)
+
+    for location in config["locations"]:
+        located = []
+        for scenario, record in zip(scenarios, records):
+            thermal_km = record["thermal_radius_km"]
+            located.append(dict(
+                scenario,
+                lat=location["lat"],
+                lon=location["lon"],
+                is_ocean=location["is_ocean"],
+                country=location["country"],
+                base_population=int(round(location["population_density_km2"] * np.pi * thermal_km ** 2)),
+                # Çarpma tipi giriş çözücüsünün bayrağından: threats ile threat_locations tutarlı
+                is_airburst=bool(record["is_airburst"]),
+            ))
+        portfolio = engine.run_portfolio(located, n_samples=config["n_samples"], seed=config["seed"])
+        by_id = {entry["scenario_id"]: entry for entry in portfolio.ranking}
+        for scenario, record in zip(located, records):
+            entry = by_id[scenario["scenario_id"]]
+            record["locations"][location["name"]] = {
+                "base_population": scenario["base_population"],
+                "palermo_scale": entry["palermo_scale"],
+                "torino_scale": int(entry["torino_scale"]),
+                "expected_casualties": entry["expected_casualties"],
+                "impact_type": entry["impact_type"],
+                "recommended_action": entry["recommended_action"],
+            }
+    return records
+
+
+def run_sweep(csv_path: str = DEFAULT_CSV_PATH, db_path: str = DEFAULT_DB_PATH, *,
+              density_kgm3: float = DEFAULT_DENSITY_KGM3, angle_deg: float = DEFAULT_ANGLE_DEG,
+              n_samples: int = DEFAULT_SAMPLES, seed: int = DEFAULT_SEED,
+              locations=REPRESENTATIVE_LOCATIONS, force: bool = False) -> Dict[str, Any]:
+    """
+    CSV'yi depoyla karşılaştırır, değişen tehditleri yeniden hesaplar ve
+    taramanın özetini (sweeps satırı) döndürür.
+    """
+    started = time.time()
+    config = sweep_config(density_kgm3, angle_deg, n_samples, seed, locations)
+    config_hash = _digest(config)
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    valid = [row for row in rows if row.get("des") and row.get("diameter")]
+    hashes = {row["des"]: row_hash(row, config_hash) for row in valid}
+
+    conn = connect(db_path)
+    try:
+        stored = dict(conn.execute("SELECT des, input_hash FROM threats"))
+        changed = [row for row in valid if force or stored.get(row["des"]) != hashes[row["des"]]]
+        removed = [(des,) for des in stored if des not in hashes]
+        records = compute_threats(changed, config)
+
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO sweeps (started_at, finished_at, csv_path, config_hash, n_threats, n_recomputed,"
+                " n_removed, n_skipped) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (started, started, csv_path, config_hash, len(valid), len(records), len(removed),
+                 len(rows) - len(valid)),
+            )
+            sweep_id = cursor.lastrowid
+            conn.executemany("DELETE FROM threats WHERE des = ?", removed)
+            conn.executemany("DELETE FROM threat_locations WHERE des = ?", removed)
+
+            threat_columns = (["des", "fullname", "h", "ps_cum", "ts_max", "n_imp", "impact_range", "last_obs",
+                               "diameter_m", "v_inf_kms", "velocity_kms", "impact_probability", "mass_kg",
+                               "is_airburst"] + [column for _, column in ENTRY_COLUMNS])
+            conn.executemany(
+                f"INSERT OR REPLACE INTO threats ({', '.join(threat_columns)}, input_hash, sweep_id)"
+                f" VALUES ({', '.join('?' * (len(threat_columns) + 2))})",
+                [[record[c] for c in threat_columns] + [hashes[record["des"]], sweep_id] for record in records],
+            )
+            conn.executemany("DELETE FROM threat_locations WHERE des = ?", [(r["des"],) for r in records])
+            conn.executemany(
+                "INSERT INTO threat_locations (des, location, base_population, palermo_scale, torino_scale,"
+                " expected_casualties, impact_type, recommended_action) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(record["des"], name, loc["base_population"], loc["palermo_scale"], loc["torino_scale"],
+                  loc["expected_casualties"], loc["impact_type"], loc["recommended_action"])
+                 for record in records for name, loc in record["locations"].items()],
+            )
+            # Katalog alanları modele girmez; değişmeyen tehditlerde de tazelenir
+            conn.executemany(
+                "UPDATE threats SET fullname = :fullname, h = :h, ps_cum = :ps_cum, ts_max = :ts_max,"
+                " n_imp = :n_imp, impact_range = :impact_range, last_obs = :last_obs WHERE des = :des",
+                [dict(_catalog_fields(row), des=row["des"]) for row in valid],
+            )
+            finished = time.time()
+            conn.execute("UPDATE sweeps SET finished_at = ? WHERE id = ?", (finished, sweep_id))
+        summary = dict(zip(
+            ("id", "started_at", "finished_at", "csv_path", "config_hash", "n_threats", "n_recomputed",
+             "n_removed", "n_skipped"),
+            conn.execute("SELECT * FROM sweeps WHERE id = ?", (sweep_id,)).fetchone(),
+        ))
+    finally:
+        conn.close()
+    return summary
+
+
+def load_rankings(db_path: str = DEFAULT_DB_PATH, location: str = REPRESENTATIVE_LOCATIONS[0]["name"],
+                  rank_by: str = "palermo_scale", limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+    """
+    Depodaki önceden hesaplanmış sıralama (salt okunur bağlantı).
+
+    Eşitlikler beklenen kayıpla, sonra tanımla bozulur. Depo yoksa
+    FileNotFoundError, bilinmeyen konum / sıralama ölçütü için ValueError.
+    """
+    if rank_by not in PORTFOLIO_RANK_KEYS:
+        raise ValueError(f"Unknown rank_by {rank_by!r}; expected one of {PORTFOLIO_RANK_KEYS}")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        sweep = conn.execute("SELECT * FROM sweeps ORDER BY id DESC LIMIT 1").fetchone()
+        locations = [r[0] for r in conn.execute("SELECT DISTINCT location FROM threat_locations")]
+        if location not in locations:
+            raise ValueError(f"Unknown location {location!r}; expected one of {sorted(locations)}")
+        order_column = "t.impact_probability" if rank_by == "impact_probability" else f"l.{rank_by}"
+        total = conn.execute("SELECT COUNT(*) FROM threat_locations WHERE location = ?", (location,)).fetchone()[0]
+        rows = conn.execute(
+            "SELECT t.*, l.base_population, l.palermo_scale, l.torino_scale, l.expected_casualties,"
+            " l.impact_type, l.recommended_action"
+            " FROM threat_locations l JOIN threats t ON t.des = l.des"
+            f" WHERE l.location = ? ORDER BY {order_column} DESC, l.expected_casualties DESC, l.des"
+            " LIMIT ? OFFSET ?",
+            (location, int(limit), int(offset)),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    rankings = []
+    for rank, row in enumerate(rows, start=int(offset) + 1):
+        entry = {key: row[key] for key in row.keys() if key not in ("input_hash", "sweep_id")}
+        entry["is_airburst"] = bool(entry["is_airburst"])
+        entry["rank"] = rank
+        rankings.append(entry)
+    return {
+        "location": location,
+        "rank_by": rank_by,
+        "total": total,
+        "limit": int(limit),
+        "offset": int(offset),
+        "locations": sorted(locations),
+        "sweep": dict(sweep) if sweep is not None else None,
+        "rankings": rankings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--density", type=float, default=DEFAULT_DENSITY_KGM3)
+    parser.add_argument("--angle", type=float, default=DEFAULT_ANGLE_DEG)
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--force", action="store_true", help="özetlerden bağımsız tüm tehditleri yeniden hesapla")
+    parser.add_argument("--show", metavar="LOCATION", help="taramadan sonra bu konumun sıralamasını yazdır")
+    parser.add_argument("--rank-by", default="palermo_scale", choices=list(PORTFOLIO_RANK_KEYS))
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    summary = run_sweep(args.csv, args.db, density_kgm3=args.density, angle_deg=args.angle,
+                        n_samples=args.samples, seed=args.seed, force=args.force)
+    print(f"sweep {summary['id']}: {summary['n_threats']} threats, {summary['n_recomputed']} recomputed, "
+          f"{summary['n_removed']} removed, {summary['n_skipped']} skipped "
+          f"({summary['finished_at'] - summary['started_at']:.1f}s) → {args.db}")
+    if args.show:
+        ranking = load_rankings(args.db, args.show, args.rank_by, args.top)
+        print(f"{'#':>4} {'des':<14} {'PS':>7} {'TS':>3} {'E (MT)':>10} {'E[casualties]':>14}  action")
+        for row in ranking["rankings"]:
+            print(f"{row['rank']:>4} {row['des']:<14} {row['palermo_scale']:>7.2f} {row['torino_scale']:>3} "
+                  f"{row['energy_mt']:>10.4g} {row['expected_casualties']:>14.4g}  {row['recommended_action']}")
+
+
+if __name__ == "__main__":
+    main()
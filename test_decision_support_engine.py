@@ -0,0 +1,92 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from decision_support_engine import DecisionSupportEngine, sentry_portfolio_scenarios
+
+SCENARIO = dict(
+    scenario_id="rng_test",
+    mass_kg=5.5e8,
+    velocity_kms=15.0,
+    angle_deg=35,
+    density_kgm3=2500,
+    diameter_m=75,
+    lat=60.9,
+    lon=101.9,
+    is_ocean=False,
+    country="Russia",
+    impact_probability=0.01,
+    affected_plants=[],
+    base_population=100000,
+    sensitivity_samples=64,
+)
+
+
+def _run(engine, **overrides):
+    return json.dumps(engine.run_full_pipeline(**dict(SCENARIO, **overrides)).to_dict(), sort_keys=True)
+
+
+def test_pipeline_is_reproducible_and_leaves_global_rng_alone():
+    np.random.seed(123)
+    before = np.random.get_state()[1].copy()
+    engine = DecisionSupportEngine(seed=7)
+    first = _run(engine)
+    assert np.array_equal(np.random.get_state()[1], before)
+    assert _run(DecisionSupportEngine(seed=7)) == first
+    assert _run(engine, seed=8) != first
+    assert json.loads(_run(engine, seed=8))["metadata"]["seed"] == 8
+
+
+def test_concurrent_pipelines_match_sequential_runs():
+    engine = DecisionSupportEngine(seed=42)
+    jobs = [dict(seed=s, sampler=sampler) for s in (1, 2) for sampler in ("random", "sobol")]
+    sequential = [_run(engine, **job) for job in jobs]
+    with ThreadPoolExecutor(4) as pool:
+        concurrent = list(pool.map(lambda job: _run(engine, **job), jobs))
+    assert concurrent == sequential
+
+
+PORTFOLIO = [
+    dict(SCENARIO, scenario_id="tunguska"),
+    dict(SCENARIO, scenario_id="chelyabinsk", mass_kg=1.2e7, velocity_kms=19.16, angle_deg=18, density_kgm3=3300,
+         diameter_m=20, impact_probability=1.0, observation_arc_days=0),
+    dict(SCENARIO, scenario_id="ocean", mass_kg=6.1e10, velocity_kms=12.6, diameter_m=340, is_ocean=True,
+         country="Japan", impact_probability=0.2, observation_arc_days=400, seed=3),
+]
+
+
+def test_portfolio_matches_single_runs():
+    engine = DecisionSupportEngine(seed=42)
+    for sampler in ("random", "sobol"):
+        portfolio = engine.run_portfolio(PORTFOLIO, sampler=sampler, sensitivity_top=1, sensitivity_samples=64)
+        top = portfolio.ranking[0]["scenario_id"]
+        for scenario, result in zip(PORTFOLIO, portfolio.results):
+            single = json.loads(_run(engine, **dict(scenario, sampler=sampler)))
+            batch = json.loads(json.dumps(result.to_dict()))
+            if result.scenario_id != top:
+                assert batch.pop("sensitivity")["sensitivity_method"] == "not_computed"
+                single.pop("sensitivity")
+            assert batch == single
+
+
+def test_portfolio_ranking_and_sentry_scenarios():
+    scenarios = sentry_portfolio_scenarios(limit=40, base_population=10000)
+    assert len(scenarios) == 40 and all(s["velocity_kms"] >= 11.186 for s in scenarios)
+    portfolio = DecisionSupportEngine().run_portfolio(scenarios, n_samples=200, rank_by="expected_casualties")
+    values = [row["expected_casualties"] for row in portfolio.ranking]
+    assert values == sorted(values, reverse=True)
+    assert [row["rank"] for row in portfolio.ranking] == list(range(1, 41))
+    assert "results" not in portfolio.to_dict(include_results=False)
+
+
+def test_known_airburst_flag_replaces_size_based_draw():
+    engine = DecisionSupportEngine(seed=42)
+    scenarios = [dict(PORTFOLIO[1], is_airburst=False), dict(PORTFOLIO[2], is_airburst=True), PORTFOLIO[0]]
+    portfolio = engine.run_portfolio(scenarios)
+    assert [r.physics.impact_type for r in portfolio.results[:2]] == ["land", "airburst"]
+    for scenario, result in zip(scenarios, portfolio.results):
+        single = json.loads(_run(engine, **scenario))
+        batch = json.loads(json.dumps(result.to_dict()))
+        batch.pop("sensitivity"), single.pop("sensitivity")
+        assert batch == single
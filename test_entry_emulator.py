@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from entry_emulator import SOLVER_SETTINGS, EntryEmulator, build_entry_emulator, emulate_entry
+from meteor_physics import simulate_atmospheric_entry_vectorized
+
+SMALL_AXES = {
+    "diameter_m": np.geomspace(2.0, 200.0, 4),
+    "velocity_kms": np.array([12.0, 20.0, 30.0]),
+    "angle_deg": np.array([30.0, 60.0]),
+    "density_kgm3": np.array([1500.0, 3000.0]),
+    "strength_pa": np.geomspace(1e5, 1e7, 3),
+    "surface_elevation_m": np.array([0.0, 1500.0]),
+}
+
+
+@pytest.fixture(scope="module")
+def emulator(tmp_path_factory):
+    em = build_entry_emulator(SMALL_AXES, workers=1, validation_samples=50)
+    path = tmp_path_factory.mktemp("emu") / "entry_emulator_test.npz"
+    em.save(str(path))
+    return EntryEmulator.load(str(path))
+
+
+def test_grid_nodes_reproduce_solver(emulator):
+    d, v, a, rho, s = SMALL_AXES["diameter_m"][2], 20.0, 30.0, 3000.0, 1e6
+    m = rho * np.pi / 6.0 * d ** 3
+    exact = simulate_atmospheric_entry_vectorized(m, d, v, a, rho, s, surface_elevation_m=1500.0, **SOLVER_SETTINGS)
+    emu = emulate_entry(m, d, v, a, rho, s, surface_elevation_m=1500.0, emulator=emulator)
+
+    # On a node the interpolant is the stored value (float32); off-trust cells use the solver itself.
+    for key in ("velocity_impact_kms", "mass_impact_kg", "breakup_altitude_m", "airburst_altitude_m"):
+        assert emu[key][0] == pytest.approx(exact[key][0], rel=1e-5, abs=1e-3)
+    assert emu["is_airburst"][0] == exact["is_airburst"][0]
+    assert "coverage" in emulator.error_bound
+
+
+def test_out_of_grid_and_mismatched_settings_fall_back(emulator):
+    m = np.array([3000.0 * np.pi / 6.0 * 20.0 ** 3, 1e3])
+    args = (m, [20.0, 0.9], [20.0, 50.0], [30.0, 45.0], [3000.0, 3000.0], [1e6, 1e6])
+    res = emulate_entry(*args, emulator=emulator)
+    assert not res["emulated"][1]
+    exact = simulate_atmospheric_entry_vectorized(m[1], 0.9, 50.0, 45.0, 3000.0, 1e6, **SOLVER_SETTINGS)
+    assert res["velocity_impact_kms"][1] == exact["velocity_impact_kms"][0]
+
+    other = emulate_entry(*args, emulator=emulator, **dict(SOLVER_SETTINGS, dt=0.02))
+    assert not other["emulated"].any()
+
+
+def test_scalar_and_batch_queries_agree(emulator):
+    rng = np.random.default_rng(4)
+    n = 30
+    rho = rng.uniform(1600.0, 2900.0, n)
+    d = 10 ** rng.uniform(0.5, 2.2, n)
+    q = (rho * np.pi / 6.0 * d ** 3, d, rng.uniform(13.0, 29.0, n), rng.uniform(31.0, 59.0, n), rho,
+         10 ** rng.uniform(5.1, 6.9, n))
+    batch = emulate_entry(*q, surface_elevation_m=500.0, emulator=emulator)
+    assert batch["emulated"].any()
+    for i in range(n):
+        one = emulate_entry(*(x[i] for x in q), surface_elevation_m=500.0, emulator=emulator)
+        for key, value in batch.items():
+            assert one[key][0] == pytest.approx(value[i], rel=1e-12), key
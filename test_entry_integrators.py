@@ -0,0 +1,250 @@
+"""
+Atmospheric entry integrators: fixed-step RK4 vs adaptive RK45.
+
+Checks that the adaptive Dormand–Prince mode reproduces a converged
+reference run and needs far fewer steps than the default RK4 path.
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import numpy as np
+import pytest
+
+from meteor_physics import simulate_atmospheric_entry_vectorized
+
+# (mass_kg, diameter_m, velocity_kms, angle_deg, density, strength_pa)
+VALIDATION_CASES = {
+    "chelyabinsk": (1.1e7, 19.8, 19.16, 18.3, 2900, 1e7),
+    "tunguska": (5.5e8, 75, 15.0, 35.0, 2500, 9e7),
+    "barringer": (5e8, 50, 12.8, 45, 7800, 1e8),
+    "chicxulub": (2.1e15, 11700, 20.0, 45, 2500, 1e7),
+}
+
+
+def _random_batch(n=40, seed=7):
+    rng = np.random.default_rng(seed)
+    d = 10 ** rng.uniform(0.0, 2.5, n)
+    rho = rng.uniform(1000.0, 7800.0, n)
+    m = rho * np.pi / 6.0 * d ** 3
+    v = rng.uniform(11.0, 40.0, n)
+    angle = rng.uniform(10.0, 80.0, n)
+    strength = 10 ** rng.uniform(5.0, 8.0, n)
+    return m, d, v, angle, rho, strength
+
+
+def test_rk45_matches_converged_reference():
+    m, d, v, angle, rho, strength = _random_batch()
+    ref = simulate_atmospheric_entry_vectorized(m, d, v, angle, rho, strength, dt=0.002, max_steps=200000)
+    res = simulate_atmospheric_entry_vectorized(m, d, v, angle, rho, strength, method="rk45")
+
+    dv = np.abs(res["velocity_impact_kms"] - ref["velocity_impact_kms"]) / v
+    dm = np.abs(res["mass_impact_kg"] - ref["mass_impact_kg"]) / m
+    assert dv.max() < 5e-3
+    assert dm.max() < 5e-3
+    assert np.array_equal(res["is_airburst"], ref["is_airburst"])
+
+
+@pytest.mark.parametrize("name", sorted(VALIDATION_CASES))
+def test_rk45_agrees_with_rk4_on_validation_cases(name):
+    args = VALIDATION_CASES[name]
+    rk4 = simulate_atmospheric_entry_vectorized(*args, return_history=True)
+    rk45 = simulate_atmospheric_entry_vectorized(*args, method="rk45", return_history=True)
+
+    v_entry = args[2]
+    assert abs(rk45["velocity_impact_kms"][0] - rk4["velocity_impact_kms"][0]) < 0.01 * v_entry
+    assert bool(rk45["is_airburst"][0]) == bool(rk4["is_airburst"][0])
+
+    # Breakup altitude within one RK4 step of descent
+    step_descent = v_entry * 1000.0 * np.sin(np.deg2rad(args[3])) * 0.05
+    assert abs(rk45["breakup_altitude_m"][0] - rk4["breakup_altitude_m"][0]) <= step_descent
+
+    assert len(rk45["history"]["altitude"]) * 5 <= len(rk4["history"]["altitude"])
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        simulate_atmospheric_entry_vectorized(1e6, 10, 20, 45, 3000, 1e7, method="euler")
+
+
+def test_compacted_rk4_is_bit_identical_to_masked_loop():
+    from meteor_physics import _simulate_entry_core
+
+    kwargs = dict(
+        start_altitude_m=100000.0, surface_elevation_m=0.0, Cd=0.47, g=9.81, C_h=0.1, Q=8e6,
+        dt=0.05, max_steps=400, return_history=True, pancake_tau_s=1.0, pancake_max_factor=5.0,
+    )
+    batch = _random_batch(n=200, seed=11)
+    masked = _simulate_entry_core(*batch, compact_active=False, **kwargs)
+    compact = _simulate_entry_core(*batch, **kwargs)
+
+    for key, value in masked.items():
+        if key == "history":
+            for name, rows in value.items():
+                assert np.array_equal(rows, compact["history"][name], equal_nan=True), name
+        else:
+            assert np.array_equal(value, compact[key]), key
+
+
+def test_history_decimation_and_subset():
+    batch = _random_batch(n=60, seed=3)
+    full = simulate_atmospheric_entry_vectorized(*batch, max_steps=3000, return_history=True)
+    # Varsayılan geçmiş seyreltilmez: her adım kaydedilir
+    assert full["history"]["stride_steps"] == 1
+    tracked = [0, 7, 42]
+    thin = simulate_atmospheric_entry_vectorized(*batch, max_steps=3000, return_history=True,
+                                                 history_indices=tracked, history_max_records=64)
+
+    hist = thin["history"]
+    assert hist["altitude"].shape[1] == len(tracked)
+    assert hist["altitude"].shape[0] <= 64
+    stride = hist["stride_steps"]
+    # Every kept row is an exact row of the full history.
+    rows = full["history"]["altitude"][::stride][: hist["altitude"].shape[0]]
+    assert np.array_equal(hist["altitude"], rows[:, tracked], equal_nan=True)
+    assert np.array_equal(thin["breakup_altitude_m"], full["breakup_altitude_m"])
+
+    levels = simulate_atmospheric_entry_vectorized(*batch, max_steps=3000, return_history=True,
+                                                   history_altitude_step_m=1000.0)["history"]
+    assert levels["altitude"].shape == (levels["altitude_levels_m"].size, 60)
+    # Each recorded state lies at or below its level, within one step of descent.
+    alt = levels["altitude"]
+    ok = ~np.isnan(alt)
+    assert np.all(alt[ok] <= np.broadcast_to(levels["altitude_levels_m"][:, None], alt.shape)[ok])
+
+
+def test_buffered_kernel_is_bit_identical_to_allocating_kernel():
+    from meteor_physics import _simulate_entry_core
+
+    kwargs = dict(
+        start_altitude_m=100000.0, surface_elevation_m=250.0, Cd=0.47, g=9.81, C_h=0.1, Q=8e6,
+        dt=0.05, max_steps=20000, return_history=False, pancake_tau_s=1.0, pancake_max_factor=5.0,
+    )
+    batch = _random_batch(n=300, seed=5)
+    allocating = _simulate_entry_core(*batch, buffered_kernel=False, **kwargs)
+    buffered = _simulate_entry_core(*batch, **kwargs)
+
+    for key, value in allocating.items():
+        assert np.array_equal(value, buffered[key]), key
+
+
+def test_numba_backend_matches_numpy_backend():
+    pytest.importorskip("numba")
+    batch = _random_batch(n=200, seed=3)
+    ref = simulate_atmospheric_entry_vectorized(*batch)
+    jit = simulate_atmospheric_entry_vectorized(*batch, backend="numba")
+
+    for key, value in ref.items():
+        if value.dtype == bool:
+            assert np.array_equal(value, jit[key]), key
+        else:
+            np.testing.assert_allclose(jit[key], value, rtol=1e-9, atol=1e-9, err_msg=key)
+
+
+def test_numba_backend_rejects_rk45():
+    with pytest.raises(ValueError):
+        simulate_atmospheric_entry_vectorized(1e6, 10, 20, 45, 3000, 1e7, method="rk45", backend="numba")
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"compact_active": False}, {"method": "rk45"}])
+def test_deposition_profile_conserves_lost_energy(kwargs):
+    from meteor_physics import _simulate_entry_core
+
+    batch = _random_batch(n=80, seed=21)
+    res = _simulate_entry_core(
+        *batch, start_altitude_m=100000.0, surface_elevation_m=200.0, Cd=0.47, g=9.81, C_h=0.1, Q=8e6,
+        dt=0.05, max_steps=20000, return_history=False, pancake_tau_s=1.0, pancake_max_factor=5.0,
+        deposition_bins=50, **kwargs,
+    )
+    profile = res["deposition_profile_J_per_m"]
+    edges = res["deposition_altitude_edges_m"]
+    assert profile.shape == (80, 50) and edges[0] == 200.0 and edges[-1] == 100000.0
+
+    deposited = (profile * np.diff(edges)).sum(axis=1)
+    lost = res["initial_energy_joules"] - res["final_energy_joules"]
+    assert np.allclose(deposited, lost, rtol=1e-9, atol=1e-6 * res["initial_energy_joules"].max())
+
+    bands = res["deposition_profile_percentiles"]
+    assert bands.shape == (3, 50)
+    assert np.all(np.diff(bands, axis=0) >= 0)
+
+
+def test_us1976_table_matches_layer_equations_and_drives_entry():
+    import json
+    import math
+
+    from meteor_physics import US_STANDARD_ATMOSPHERE_1976_PATH, _simulate_entry_core, us_standard_atmosphere_1976_table
+
+    with open(US_STANDARD_ATMOSPHERE_1976_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    R, g0, M = (data["constants"][k] for k in ("R_gas_constant", "g0_gravity", "M_air_molar_mass"))
+    table = us_standard_atmosphere_1976_table()
+
+    for layer in data["layers"]:
+        # Mid-layer point evaluated directly from the hydrostatic layer equations
+        h = layer["base_altitude_km"] * 1000.0 + 1234.5
+        Tb, L = layer["base_temp_k"], layer["lapse_rate_k_km"] / 1000.0
+        if L == 0:
+            T, p = Tb, layer["base_pressure_pa"] * math.exp(-g0 * M * 1234.5 / (R * Tb))
+        else:
+            T = Tb + L * 1234.5
+            p = layer["base_pressure_pa"] * (Tb / T) ** (g0 * M / (R * L))
+        assert table.density(h) == pytest.approx(p * M / (R * T), rel=1e-6)
+
+    kwargs = dict(
+        start_altitude_m=100000.0, surface_elevation_m=0.0, Cd=0.47, g=9.81, C_h=0.1, Q=8e6,
+        dt=0.05, max_steps=20000, return_history=False, pancake_tau_s=1.0, pancake_max_factor=5.0,
+        atmosphere="us1976",
+    )
+    batch = _random_batch(n=60, seed=9)
+    masked = _simulate_entry_core(*batch, compact_active=False, **kwargs)
+    buffered = _simulate_entry_core(*batch, **kwargs)
+    for key, value in masked.items():
+        assert np.array_equal(value, buffered[key]), key
+
+    with pytest.raises(ValueError):
+        _simulate_entry_core(*batch, **dict(kwargs, atmosphere="mars"))
+
+
+def test_standard_atmosphere_scalar_and_array_agree_across_100_km():
+    from meteor_physics import (
+        ABOVE_CEILING_DENSITY_KGM3,
+        standard_atmosphere_density,
+        us_standard_atmosphere_1976_table,
+    )
+
+    altitudes = np.array([0.0, 42.0, 99.5, 99.99, 100.0, 100.5, 110.0, 150.0])
+    batch = standard_atmosphere_density(altitudes)
+    assert batch.shape == altitudes.shape
+    scalars = [standard_atmosphere_density(float(h)) for h in altitudes]
+    assert all(isinstance(rho, float) for rho in scalars)
+    assert np.array_equal(batch, scalars)
+    below = altitudes < 100.0
+    assert np.array_equal(batch[below], us_standard_atmosphere_1976_table().density(altitudes[below] * 1000.0))
+    assert np.all(batch[~below] == ABOVE_CEILING_DENSITY_KGM3)
+
+
+@pytest.mark.parametrize("atmosphere", ["isothermal", "us1976"])
+def test_float32_ensemble_statistics_match_float64(atmosphere):
+    batch = _random_batch(n=2000, seed=17)
+    ref = simulate_atmospheric_entry_vectorized(*batch, atmosphere=atmosphere)
+    fast = simulate_atmospheric_entry_vectorized(*batch, atmosphere=atmosphere, dtype=np.float32)
+    assert fast["velocity_impact_kms"].dtype == np.float32
+
+    for key in ("velocity_impact_kms", "mass_impact_kg", "breakup_altitude_m", "airburst_altitude_m",
+                "energy_loss_percent"):
+        a = ref[key]
+        b = fast[key].astype(float)
+        scale = max(np.std(a), 1e-12)
+        # Ensemble mean and 95 % band within 1 % of the ensemble spread
+        assert abs(b.mean() - a.mean()) <= 0.01 * scale, key
+        for q in (2.5, 97.5):
+            assert abs(np.percentile(b, q) - np.percentile(a, q)) <= 0.01 * scale, (key, q)
+    assert abs(fast["is_airburst"].mean() - ref["is_airburst"].mean()) <= 0.005
+
+
+def test_float32_rejected_outside_numpy_rk4():
+    with pytest.raises(ValueError):
+        simulate_atmospheric_entry_vectorized(1e6, 10, 20, 45, 3000, 1e7, method="rk45", dtype=np.float32)
+    with pytest.raises(ValueError):
+        simulate_atmospheric_entry_vectorized(1e6, 10, 20, 45, 3000, 1e7, dtype=np.float16)
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from jobs import JobManager, JobQueueFull, report_progress
+
+
+def _square_with_progress(x, steps):
+    for i in range(steps):
+        report_progress(i + 1, steps, stage="loop", partial={"last": i})
+    return x * x
+
+
+def _spin_until_cancelled(seconds):
+    t0 = time.monotonic()
+    i = 0
+    while time.monotonic() - t0 < seconds:
+        i += 1
+        report_progress(i, None)
+        time.sleep(0.01)
+    return "finished"
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def _wait_done(manager, job_id, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    after, events = 0, []
+    while time.monotonic() < deadline:
+        new, done = manager.wait_events(job_id, after, timeout=1.0)
+        events += new
+        after = events[-1]["id"] if events else after
+        if done:
+            return events
+    raise AssertionError("job did not finish")
+
+
+@pytest.fixture(scope="module")
+def manager():
+    m = JobManager(max_workers=1, max_pending=3)
+    yield m
+    m.shutdown()
+
+
+def test_report_progress_outside_job_is_noop():
+    report_progress(1, 2, partial={"x": 1})
+
+
+def test_job_runs_and_streams_progress(manager):
+    job_id = manager.submit("square", _square_with_progress, 7, 5)
+    events = _wait_done(manager, job_id)
+    assert manager.result(job_id) == ("succeeded", 49)
+    status = manager.status(job_id)
+    assert status["state"] == "succeeded" and status["progress"] == {"done": 5, "total": 5, "stage": "loop"}
+    assert status["partial"] == {"last": 4}
+    types = [e["type"] for e in events]
+    assert types[0] == "queued" and types[-1] == "succeeded" and types.count("progress") == 5
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+
+
+def test_failed_job_reports_error(manager):
+    job_id = manager.submit("fail", _fail)
+    _wait_done(manager, job_id)
+    status = manager.status(job_id)
+    assert status["state"] == "failed" and "boom" in status["error"]
+    assert manager.result(job_id) == ("failed", None)
+
+
+def test_cancel_running_and_queued_jobs(manager):
+    running = manager.submit("spin", _spin_until_cancelled, 60.0)
+    queued = manager.submit("spin", _spin_until_cancelled, 60.0)
+    deadline = time.monotonic() + 60
+    while manager.status(running)["state"] != "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert manager.cancel(queued) in ("cancelled", "queued")
+    manager.cancel(running)
+    _wait_done(manager, running, timeout=30)
+    _wait_done(manager, queued, timeout=30)
+    assert manager.status(running)["state"] == "cancelled"
+    assert manager.status(queued)["state"] == "cancelled"
+    with pytest.raises(KeyError):
+        manager.status("missing")
+
+
+def test_pending_limit(manager):
+    ids = [manager.submit("spin", _spin_until_cancelled, 60.0) for _ in range(3)]
+    with pytest.raises(JobQueueFull):
+        manager.submit("spin", _spin_until_cancelled, 60.0)
+    for job_id in ids:
+        manager.cancel(job_id)
+    for job_id in ids:
+        _wait_done(manager, job_id, timeout=30)
@@ -0,0 +1,231 @@
+import numpy as np
+import pytest
+
+from monte_carlo import (
+    DesignSampler,
+    QuantileSketch,
+    RunningMoments,
+    SobolSequence,
+    StreamingHistogram,
+    ExceedanceEstimate,
+    entry_input_sampler,
+    entry_inputs_from_normals,
+    latin_hypercube,
+    normal_ppf,
+    run_adaptive_monte_carlo,
+    run_importance_sampling,
+    run_streaming_monte_carlo,
+    sobol_indices,
+)
+
+
+def _skewed(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Airburst'ler gibi sıfır kütlesi + log-normal krater kuyruğu
+    x = np.where(rng.random(n) < 0.3, 0.0, rng.lognormal(3.0, 1.2, n))
+    return x
+
+
+def test_running_moments_match_numpy_across_blocks():
+    x = _skewed(100_003)
+    moments = RunningMoments()
+    for block in np.array_split(x, 17):
+        moments.update(block)
+    assert moments.count == x.size
+    assert moments.mean == pytest.approx(x.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(x.std(), rel=1e-10)
+    assert (moments.min, moments.max) == (x.min(), x.max())
+
+
+def test_histogram_grows_range_without_losing_counts():
+    x = _skewed(50_000, seed=1)
+    hist = StreamingHistogram(bins=20)
+    # Dar bir ilk blok: aralık sonraki bloklarla iki katına çıkarak genişlemeli
+    hist.update(np.array([5.0, 6.0]))
+    for block in np.array_split(x, 9):
+        hist.update(block)
+    counts, edges = hist.result()
+    assert counts.shape == (20,) and edges.shape == (21,)
+    assert counts.sum() == x.size + 2
+    # Kenarlar np.histogram ile aynı; sayımlar ince kutu çözünürlüğünde
+    ref_counts, ref_edges = np.histogram(np.concatenate([[5.0, 6.0], x]), bins=20)
+    assert np.allclose(edges, ref_edges, rtol=0, atol=1e-12 * (x.max() - x.min()))
+    assert np.abs(counts - ref_counts).sum() <= 0.01 * x.size
+
+
+def test_histogram_single_value_matches_numpy():
+    hist = StreamingHistogram(bins=20)
+    for _ in range(3):
+        hist.update(np.zeros(7))
+    counts, edges = hist.result()
+    ref_counts, ref_edges = np.histogram(np.zeros(21), bins=20)
+    assert np.array_equal(counts, ref_counts) and np.array_equal(edges, ref_edges)
+    assert (edges[0], edges[-1]) == (-0.5, 0.5)
+
+
+def test_quantile_sketch_is_exact_below_limit_and_close_above():
+    x = _skewed(400_000, seed=2)
+    small = QuantileSketch(exact_limit=10_000)
+    small.update(x[:5000])
+    assert np.array_equal(small.percentile([2.5, 50, 97.5]), np.percentile(x[:5000], [2.5, 50, 97.5]))
+
+    sketch = QuantileSketch(exact_limit=10_000)
+    for block in np.array_split(x, 40):
+        sketch.update(block)
+    assert sketch.means.size <= 600
+    spread = np.percentile(x, 97.5) - np.percentile(x, 2.5)
+    for p in (2.5, 25, 50, 75, 97.5):
+        assert abs(sketch.percentile(p) - np.percentile(x, p)) <= 0.005 * spread, p
+
+
+def test_streaming_run_is_reproducible_and_bounded():
+    def sample(rng, k):
+        return {"x": rng.lognormal(0.0, 1.0, k)}
+
+    def evaluate(inputs):
+        return {"y": 2.0 * inputs["x"], "hit": (inputs["x"] > 3.0).astype(float)}
+
+    seen = []
+    run_a = run_streaming_monte_carlo(sample, lambda i: seen.append(i["x"].size) or evaluate(i), 25_000,
+                                      block_size=4096, seed=3, histogram_bins={"y": 20})
+    run_b = run_streaming_monte_carlo(sample, evaluate, 25_000, block_size=4096, seed=3)
+    assert max(seen) == 4096 and sum(seen) == 25_000
+    assert run_a["y"].count == 25_000
+    assert run_a["y"].mean == run_b["y"].mean
+    assert run_a["y"].histogram.result()[0].sum() == 25_000
+    # P(lognormal(0,1) > 3) ≈ 0.1365
+    assert run_a["hit"].mean == pytest.approx(0.1365, abs=0.01)
+
+
+def test_sobol_sequence_is_stratified_and_continues_across_blocks():
+    plain = SobolSequence(3, scramble=False).random(4)
+    assert np.allclose(plain[1:], [[0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.25, 0.75, 0.75]], atol=1e-9)
+
+    seq = SobolSequence(8, np.random.default_rng(4))
+    x = np.vstack([seq.random(300), seq.random(724)])
+    assert np.array_equal(x, SobolSequence(8, np.random.default_rng(4)).random(1024))
+    # Her 1/1024 aralıkta her boyutta tam bir nokta; ilk iki boyut (0, 10, 2)-ağı
+    for d in range(8):
+        assert np.unique(np.floor(x[:, d] * 1024)).size == 1024
+    for kx in range(11):
+        cells = np.floor(x[:, 0] * 2 ** kx) * 2 ** (10 - kx) + np.floor(x[:, 1] * 2 ** (10 - kx))
+        assert np.bincount(cells.astype(int), minlength=1024).max() == 1
+
+
+def test_latin_hypercube_and_normal_ppf():
+    u = latin_hypercube(np.random.default_rng(0), 500, 4)
+    for d in range(4):
+        assert np.array_equal(np.sort(np.floor(u[:, d] * 500)), np.arange(500))
+
+    from statistics import NormalDist
+
+    p = np.array([1e-12, 1e-4, 0.02, 0.2, 0.5, 0.8, 0.975, 1 - 1e-9])
+    expected = [NormalDist().inv_cdf(v) for v in p]
+    assert np.allclose(normal_ppf(p), expected, rtol=2e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("sampler", ["random", "sobol", "lhs"])
+def test_entry_input_sampler_marginals(sampler):
+    sample = entry_input_sampler(1e9, 20.0, 45.0, 3000.0, sampler=sampler)
+    rng = np.random.default_rng(5)
+    blocks = [sample(rng, 4096), sample(rng, 4096)]
+    block = {k: np.concatenate([b[k] for b in blocks]) for k in blocks[0]}
+    assert block["velocity_kms"].mean() == pytest.approx(20.0, rel=2e-3)
+    assert block["velocity_kms"].std() == pytest.approx(1.0, rel=0.03)
+    assert block["angle_deg"].std() == pytest.approx(4.5, rel=0.03)
+    assert block["density_kgm3"].min() >= 100.0
+    assert np.allclose(np.pi / 6 * block["diameter_m"] ** 3 * block["density_kgm3"], 1e9)
+
+
+def test_design_sampler_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        DesignSampler("halton", 2, np.random.default_rng())
+    with pytest.raises(ValueError):
+        SobolSequence(40)
+
+
+def _lognormal_run(sigma, **kw):
+    sample = lambda rng, k: {"x": rng.lognormal(0.0, sigma, k)}
+    return run_adaptive_monte_carlo(sample, lambda inputs: {"y": inputs["x"]}, seed=3, **kw)
+
+
+def test_adaptive_run_stops_at_target():
+    metrics, report = _lognormal_run(0.1, target_rel_half_width=0.01, max_samples=10**6)
+    assert report["converged"] and report["samples_used"] == 1000 and report["batches"] == 1
+
+    metrics, report = _lognormal_run(1.0, target_rel_half_width=0.01, max_samples=10**6, block_size=20_000)
+    y = metrics["y"]
+    assert report["converged"] and 1000 < report["samples_used"] < 10**6
+    assert y.count == report["samples_used"]
+    assert report["achieved_relative_ci_half_width"]["y"] <= 0.01
+    assert 1.96 * y.std / np.sqrt(y.count) / y.mean <= 0.01
+
+
+def test_adaptive_run_reports_unconverged_budget():
+    metrics, report = _lognormal_run(3.0, target_rel_half_width=0.001, max_samples=50_000)
+    assert not report["converged"]
+    assert report["samples_used"] == metrics["y"].count == 50_000
+    assert report["achieved_relative_ci_half_width"]["y"] > 0.001
+
+
+def _gaussian_tail(threshold, dims):
+    from statistics import NormalDist
+
+    # z_1 + ... + z_d > t  ⇔  N(0, d) > t
+    return 1.0 - NormalDist(0.0, np.sqrt(dims)).cdf(threshold)
+
+
+def test_importance_sampling_matches_analytic_gaussian_tail():
+    queries = [("s", 4.0), ("s", 9.0)]
+    results = run_importance_sampling(
+        lambda z: {"z": z}, lambda inputs: {"s": inputs["z"].sum(axis=1)}, queries,
+        dims=2, iterations=20_000, seed=4, block_size=7000,
+    )
+    for (metric, threshold), result in zip(queries, results):
+        exact = _gaussian_tail(threshold, 2)
+        assert result["samples"] == 20_000 and result["pilot_samples"] > 0
+        assert result["relative_error"] < 0.05
+        assert abs(result["probability"] - exact) < 4 * result["std_error"]
+    # P ≈ 1.1e-10: düz örneklemeyle ~10^12 örnek gerekirdi
+    assert results[1]["probability"] == pytest.approx(_gaussian_tail(9.0, 2), rel=0.15)
+
+
+def test_importance_sampling_with_zero_shift_is_plain_monte_carlo():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(10_000)
+    estimate = ExceedanceEstimate()
+    estimate.update(x > 1.0, np.ones_like(x))
+    p = (x > 1.0).mean()
+    assert estimate.probability == pytest.approx(p)
+    assert estimate.variance == pytest.approx(p * (1 - p) / (x.size - 1))
+
+    result = run_importance_sampling(lambda z: {"z": z}, lambda inputs: {"s": inputs["z"][:, 0]}, [("s", 1.0)],
+                                     dims=1, iterations=5000, shifts=[[0.0]], seed=1)[0]
+    assert result["pilot_samples"] == 0 and result["mean_weight"] == 1.0
+    assert result["hits"] / 5000 == result["probability"]
+
+
+def test_entry_inputs_strength_dimension():
+    z = np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 0.0, -2.0]])
+    inputs = entry_inputs_from_normals(z, 1e9, 20.0, 45.0, 3000.0, strength_sigma_dex=0.5)
+    assert np.allclose(inputs["strength_pa"], [1e7 * 10**0.5, 1e6])
+    fixed = entry_input_sampler(1e9, 20.0, 45.0, 3000.0)(np.random.default_rng(0), 10)
+    assert np.all(fixed["strength_pa"] == 1e7)
+
+
+def _ishigami(u):
+    x = -np.pi + 2 * np.pi * u
+    y = np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+    return {"y": y, "flat": np.ones(len(u))}
+
+
+def test_sobol_indices_match_ishigami():
+    indices, report = sobol_indices(_ishigami, 3, 4096, seed=1, block_size=5000)
+    assert report["evaluations"] == 4096 * 5 and report["batches"] == 5
+    y = indices["y"]
+    # Analitik: S = (0.3139, 0.4424, 0), ST = (0.5576, 0.4424, 0.2437)
+    assert np.allclose(y["first_order"], [0.3139, 0.4424, 0.0], atol=0.03)
+    assert np.allclose(y["total"], [0.5576, 0.4424, 0.2437], atol=0.03)
+    assert np.all(y["total_ci_95"][:, 0] <= y["total_ci_95"][:, 1])
+    # Sabit metrik aynı değerlendirmelerden çıkar; varyans 0 → indeksler 0
+    assert np.all(indices["flat"]["first_order"] == 0) and np.all(indices["flat"]["total"] == 0)
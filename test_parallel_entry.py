@@ -0,0 +1,87 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+import parallel_entry
+from benchmark_entry import monte_carlo_batch, sample_monte_carlo_batch
+from meteor_physics import simulate_atmospheric_entry_vectorized
+from monte_carlo import DEFAULT_BLOCK_SIZE
+from parallel_entry import (
+    ENTRY_INPUT_KEYS,
+    SHARDED_MIN_SAMPLES,
+    simulate_atmospheric_entry_auto,
+    simulate_atmospheric_entry_sharded,
+    simulate_sampled_entry_sharded,
+)
+
+ENTRY_KWARGS = dict(dt=0.05, max_steps=20000, deposition_bins=16)
+
+
+def _assert_same(a, b):
+    assert set(a) == set(b)
+    for key in a:
+        assert np.array_equal(a[key], b[key]), key
+
+
+def test_sharded_matches_single_process():
+    batch = monte_carlo_batch(600, seed=3)
+    ref = simulate_atmospheric_entry_vectorized(*batch, **ENTRY_KWARGS)
+    sharded = simulate_atmospheric_entry_sharded(*batch, workers=2, shard_size=170, **ENTRY_KWARGS)
+    _assert_same(ref, sharded)
+
+
+def test_sampled_shards_independent_of_worker_count():
+    inputs_1, res_1 = simulate_sampled_entry_sharded(500, sample_monte_carlo_batch, seed=11, workers=1, shard_size=120)
+    inputs_2, res_2 = simulate_sampled_entry_sharded(500, sample_monte_carlo_batch, seed=11, workers=2, shard_size=120)
+    _assert_same(inputs_1, inputs_2)
+    _assert_same(res_1, res_2)
+
+    # Parçalar farklı akışlardan örneklenir; sonuçlar girdilerle tutarlı olmalı
+    assert len(np.unique(inputs_1["velocity_kms"])) == 500
+    ref = simulate_atmospheric_entry_vectorized(*(inputs_1[k] for k in ENTRY_INPUT_KEYS))
+    for key in ref:
+        assert np.array_equal(ref[key], res_1[key]), key
+
+
+def test_auto_uses_single_process_below_threshold():
+    batch = monte_carlo_batch(50, seed=4)
+    ref = simulate_atmospheric_entry_vectorized(*batch, return_history=True, history_indices=[0])
+    auto = simulate_atmospheric_entry_auto(*batch, workers=4, return_history=True, history_indices=[0])
+    assert "history" in auto
+    assert np.array_equal(ref["velocity_impact_kms"], auto["velocity_impact_kms"])
+
+
+def test_auto_shards_monte_carlo_blocks_on_shared_pool():
+    # /simulate_monte_carlo blokları eşiğin üstünde kalmalı
+    assert SHARDED_MIN_SAMPLES <= DEFAULT_BLOCK_SIZE
+    batch = monte_carlo_batch(400, seed=6)
+    ref = simulate_atmospheric_entry_vectorized(*batch)
+    first = simulate_atmospheric_entry_auto(*batch, workers=2, min_samples=100, shard_size=100)
+    pool = parallel_entry._POOL
+    assert pool is not None
+    second = simulate_atmospheric_entry_auto(*batch, workers=2, min_samples=100, shard_size=100)
+    assert parallel_entry._POOL is pool
+    _assert_same(ref, first)
+    _assert_same(ref, second)
+
+
+def test_sharded_keeps_float32_outputs():
+    batch = monte_carlo_batch(300, seed=8)
+    ref = simulate_atmospheric_entry_vectorized(*batch, dtype=np.float32)
+    sharded = simulate_atmospheric_entry_sharded(*batch, workers=2, shard_size=100, dtype=np.float32)
+    assert sharded["velocity_impact_kms"].dtype == np.float32
+    _assert_same(ref, sharded)
+
+
+def _dying_sampler(rng, k):
+    os._exit(3)  # OOM-kill benzeri: işçi süreci aniden ölür
+
+
+def test_dead_worker_raises_instead_of_hanging():
+    with pytest.raises(BrokenProcessPool):
+        simulate_sampled_entry_sharded(400, _dying_sampler, seed=1, workers=2, shard_size=100)
+    # Bozulan havuz bırakılır; sonraki çağrı yeni havuzla çalışır
+    inputs, res = simulate_sampled_entry_sharded(200, sample_monte_carlo_batch, seed=1, workers=2, shard_size=100)
+    assert res["velocity_impact_kms"].shape == (200,)
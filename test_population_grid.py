@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from population_grid import (
+    EARTH_RADIUS_KM,
+    DiscMaskCache,
+    PopulationGrid,
+    build_population_grid,
+    build_population_pyramid,
+    disc_pixel_summary,
+    disc_row_extents,
+    load_population_grid,
+    load_population_pyramid,
+    radial_population_profile,
+)
+
+# 0.5° global grid (periodic) and a regional 0.1° grid (not periodic)
+GLOBAL_TRANSFORM = (0.5, 0.0, -180.0, 0.0, -0.5, 90.0)
+REGIONAL_TRANSFORM = (0.1, 0.0, 20.0, 0.0, -0.1, 50.0)
+
+
+def _raster(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.gamma(0.5, 200.0, shape)
+    data[rng.random(shape) < 0.1] = -9999.0  # nodata
+    return data
+
+
+def _brute_force(data, transform, lat, lon, radius_km):
+    a, _, c, _, e, f = transform
+    rows, cols = np.indices(data.shape)
+    phi = np.radians(f + e * (rows + 0.5))
+    lam = np.radians(c + a * (cols + 0.5))
+    phi0, lam0 = np.radians(lat), np.radians(lon)
+    h = np.sin((phi - phi0) / 2) ** 2 + np.cos(phi0) * np.cos(phi) * np.sin((lam - lam0) / 2) ** 2
+    distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    return np.where((distance <= radius_km) & (data > 0), data, 0).sum()
+
+
+@pytest.fixture(scope="module")
+def global_grid(tmp_path_factory):
+    data = _raster((360, 720))
+    grid = build_population_grid(data, str(tmp_path_factory.mktemp("grid")), transform=GLOBAL_TRANSFORM,
+                                 nodata=-9999.0, block_rows=50)
+    return data, grid
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [
+    (41.0, 29.0, 150.0),
+    (0.0, 179.9, 800.0),      # dateline
+    (-33.9, -179.0, 2500.0),
+    (88.0, 10.0, 700.0),      # contains the north pole
+    (-89.9, 0.0, 300.0),
+    (10.0, 20.0, 12000.0),    # wider than a hemisphere
+    (10.0, 20.0, 25000.0),    # whole sphere
+    (45.0, 45.0, 10.0),       # smaller than a pixel
+])
+def test_disc_population_matches_brute_force(global_grid, lat, lon, radius_km):
+    data, grid = global_grid
+    expected = _brute_force(data, GLOBAL_TRANSFORM, lat, lon, radius_km)
+    assert grid.disc_population(lat, lon, radius_km) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+
+def test_whole_sphere_and_empty_disc(global_grid):
+    data, grid = global_grid
+    assert grid.periodic
+    assert grid.disc_population(0, 0, 30000) == pytest.approx(np.where(data > 0, data, 0).sum())
+    assert grid.disc_population(0, 0, 0) == 0
+
+
+def test_regional_grid_is_clipped(tmp_path):
+    data = _raster((200, 300), seed=1)
+    grid = build_population_grid(data, str(tmp_path), transform=REGIONAL_TRANSFORM, nodata=-9999.0)
+    assert not grid.periodic
+    for lat, lon, radius_km in ((40.0, 35.0, 300.0), (49.9, 20.1, 120.0), (60.0, 35.0, 1500.0)):
+        expected = _brute_force(data, REGIONAL_TRANSFORM, lat, lon, radius_km)
+        assert grid.disc_population(lat, lon, radius_km) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+    assert isinstance(load_population_grid(str(tmp_path)), PopulationGrid)
+    assert load_population_grid(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.parametrize("lat, lon", [(41.0, 29.0), (0.0, 179.9), (88.0, 10.0), (-60.0, -100.0)])
+def test_radial_profile_matches_disc_queries(global_grid, lat, lon):
+    _, grid = global_grid
+    radii = [900.0, 0.0, 45.0, 2500.0, 300.0, 300.0]
+    profile = grid.radial_profile(lat, lon, radii)
+    expected = [grid.disc_population(lat, lon, r) for r in radii]
+    assert profile == pytest.approx(expected, rel=1e-9, abs=1e-6)
+    assert np.all(np.diff(grid.radial_profile(lat, lon, np.linspace(0, 3000, 31))) >= 0)
+    blocked = radial_population_profile(grid.read_window, grid.transform, grid.shape, lat, lon, radii,
+                                        block_pixels=500)
+    assert blocked == pytest.approx(profile, rel=1e-12)
+
+
+@pytest.fixture(scope="module")
+def pyramid(global_grid, tmp_path_factory):
+    data, _ = global_grid
+    return build_population_pyramid(data, str(tmp_path_factory.mktemp("pyramid")), factors=(1, 2, 6),
+                                    transform=GLOBAL_TRANSFORM, nodata=-9999.0, block_rows=7)
+
+
+def test_pyramid_levels_are_block_sums(global_grid, pyramid):
+    data, grid = global_grid
+    clean = np.where(data > 0, data, 0)
+    assert pyramid.factors == (1, 2, 6)
+    assert pyramid.levels[6].shape == (60, 120) and pyramid.levels[6].dtype == np.float32
+    assert pyramid.levels[6][3, 7] == pytest.approx(clean[18:24, 42:48].sum(), rel=1e-6)
+    for factor in pyramid.factors:
+        assert pyramid.levels[factor].sum(dtype=np.float64) == pytest.approx(clean.sum(), rel=1e-6)
+    assert pyramid.disc_population(41.0, 29.0, 400.0, factor=1) == pytest.approx(
+        grid.disc_population(41.0, 29.0, 400.0), rel=1e-6)
+    assert load_population_pyramid("/nonexistent/population_pyramid") is None
+
+
+def test_pyramid_selects_coarsest_suitable_level(global_grid, pyramid):
+    _, grid = global_grid
+    pixel_km = pyramid.pixel_km(1)
+    assert pyramid.select_level(pixel_km * 5) == 1
+    assert pyramid.select_level(pixel_km * 2 * 20) == 2
+    assert pyramid.select_level(pixel_km * 6 * 20 + 1) == 6
+    for lat, lon in ((41.0, 29.0), (-10.0, 179.0), (75.0, -40.0)):
+        exact = grid.disc_population(lat, lon, 6000.0)
+        assert pyramid.disc_population(lat, lon, 6000.0) == pytest.approx(exact, rel=0.02)
+        profile = pyramid.radial_profile(lat, lon, [6000.0, 8000.0])
+        assert profile[0] == pytest.approx(pyramid.disc_population(lat, lon, 6000.0), rel=1e-6)
+
+
+def _pixels(rows, starts, stops, width):
+    return {(int(r), int(k) % width) for r, s, t in zip(rows, starts, stops) for k in range(s, t)}
+
+
+@pytest.mark.parametrize("lat, radius_km", [(41.3, 150.0), (78.2, 900.0), (-88.9, 400.0), (5.1, 3.0)])
+def test_disc_mask_cache_shifts_extents_along_a_row(global_grid, lat, radius_km):
+    data, grid = global_grid
+    cache = DiscMaskCache()
+    for lon in (29.1, -179.9, 120.4, 179.8):
+        cached = cache.extents(lat, lon, radius_km, GLOBAL_TRANSFORM, grid.shape)
+        exact = disc_row_extents(lat, lon, radius_km, GLOBAL_TRANSFORM, grid.shape)
+        assert _pixels(*exact, grid.shape[1]) <= _pixels(*cached, grid.shape[1])
+        summary = disc_pixel_summary(grid.read_window, GLOBAL_TRANSFORM, grid.shape, lat, lon, radius_km,
+                                     block_pixels=500, mask_cache=cache)
+        assert summary["total"] == pytest.approx(_brute_force(data, GLOBAL_TRANSFORM, lat, lon, radius_km),
+                                                 rel=1e-9, abs=1e-6)
+        profile = radial_population_profile(grid.read_window, GLOBAL_TRANSFORM, grid.shape, lat, lon,
+                                            [radius_km / 2, radius_km], mask_cache=cache)
+        assert profile == pytest.approx(grid.radial_profile(lat, lon, [radius_km / 2, radius_km]), rel=1e-9)
+    assert cache.stats()["entries"] == 1 and cache.stats()["hits"] > 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from population_grid import EARTH_RADIUS_KM, disc_pixel_summary, radial_population_profile, raster_window_reader
+from raster_tiles import TileCache, TiledRaster
+
+TRANSFORM = (0.5, 0.0, -180.0, 0.0, -0.5, 90.0)
+
+
+class ArrayDataset:
+    """rasterio benzeri bellek içi veri kümesi; okumaları sayar."""
+
+    def __init__(self, data, transform=TRANSFORM, nodata=-9999.0):
+        self.data = data
+        self.height, self.width = data.shape
+        self.transform = transform
+        self.nodata = nodata
+        self.name = f"array-{id(data)}"
+        self.reads = 0
+
+    def read(self, band, window):
+        (r0, r1), (c0, c1) = window
+        self.reads += 1
+        return self.data[r0:r1, c0:c1].copy()
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(3)
+    data = rng.gamma(0.5, 200.0, (360, 720)).astype(np.float32)
+    data[rng.random(data.shape) < 0.1] = -9999.0
+    return ArrayDataset(data)
+
+
+def test_windows_span_tiles_and_hit_the_cache(dataset):
+    raster = TiledRaster(dataset, tile_size=7, cache=TileCache(10 ** 9))
+    assert np.array_equal(raster.read_window(5, 30, 690, 720), dataset.data[5:30, 690:720])
+    assert np.array_equal(raster.read_window(3, 4, 10, 12), dataset.data[3:4, 10:12])
+    reads = dataset.reads
+    raster.read_window(6, 29, 691, 719)
+    assert dataset.reads == reads and raster.cache.stats()["hits"] > 0
+    assert raster.value_at(29.1, 41.2) == dataset.data[97, 418]
+    with pytest.raises(IndexError):
+        raster.read_window(0, 10, 700, 730)
+    with pytest.raises(IndexError):
+        raster.value_at(0.0, 95.0)
+
+
+def test_cache_respects_memory_budget(dataset):
+    cache = TileCache(max_bytes=16 * 16 * 4 * 5)
+    raster = TiledRaster(dataset, tile_size=16, cache=cache)
+    raster.read_window(0, 200, 0, 200)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes and stats["tiles"] == 5 and stats["evictions"] > 0
+
+
+def test_large_disc_is_exact_with_bounded_memory(dataset):
+    raster = TiledRaster(dataset, tile_size=32, cache=TileCache(32 * 32 * 4 * 8))
+    lat, lon, radius_km = 20.0, 170.0, 4000.0
+    a, _, c, _, e, f = TRANSFORM
+    rows, cols = np.indices(dataset.data.shape)
+    phi, lam = np.radians(f + e * (rows + 0.5)), np.radians(c + a * (cols + 0.5))
+    h = (np.sin((phi - np.radians(lat)) / 2) ** 2
+         + np.cos(np.radians(lat)) * np.cos(phi) * np.sin((lam - np.radians(lon)) / 2) ** 2)
+    inside = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h)) <= radius_km
+    values = dataset.data[inside & (dataset.data > 0)].astype(np.float64)
+
+    reader = raster_window_reader(raster)
+    summary = disc_pixel_summary(reader, TRANSFORM, raster.shape, lat, lon, radius_km, block_pixels=2000)
+    assert summary["total"] == pytest.approx(values.sum(), rel=1e-9)
+    assert summary["max"] == pytest.approx(values.max())
+    assert summary["count"] == values.size
+    assert summary["p95"] == pytest.approx(np.percentile(values, 95), rel=0.03)
+    assert summary["median"] == pytest.approx(np.median(values), rel=0.03)
+    assert raster.cache.stats()["bytes"] <= raster.cache.max_bytes
+
+    clipped = disc_pixel_summary(reader, TRANSFORM, raster.shape, lat, lon, radius_km, clip=(100.0, 1.0))
+    assert clipped["total"] == pytest.approx(np.where(values > 100.0, 1.0, values).sum(), rel=1e-9)
+    profile = radial_population_profile(reader, TRANSFORM, raster.shape, lat, lon, [radius_km], block_pixels=2000)
+    assert profile[0] == pytest.approx(values.sum(), rel=1e-9)
@@ -0,0 +1,77 @@
+import csv
+import sqlite3
+
+import pytest
+
+from sentry_sweep import DEFAULT_CSV_PATH, REPRESENTATIVE_LOCATIONS, load_rankings, run_sweep
+
+
+def _write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _table(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute(query).fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def sentry_rows():
+    with open(DEFAULT_CSV_PATH, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return rows[:12]
+
+
+def test_sweep_recomputes_only_changed_threats(tmp_path, sentry_rows):
+    csv_path, db_path = tmp_path / "sentry.csv", str(tmp_path / "sweep.sqlite")
+    _write_rows(csv_path, sentry_rows)
+    first = run_sweep(str(csv_path), db_path, n_samples=200)
+    assert (first["n_threats"], first["n_recomputed"], first["n_removed"]) == (12, 12, 0)
+    assert run_sweep(str(csv_path), db_path, n_samples=200)["n_recomputed"] == 0
+
+    changed = [dict(row) for row in sentry_rows[1:]]
+    changed[0]["ip"] = str(float(changed[0]["ip"]) * 10)
+    changed[1]["last_obs"] = "2099-01-01"  # catalog field only: refreshed, not recomputed
+    _write_rows(csv_path, changed)
+    update = run_sweep(str(csv_path), db_path, n_samples=200)
+    assert (update["n_threats"], update["n_recomputed"], update["n_removed"]) == (11, 1, 1)
+
+    fresh_path = str(tmp_path / "fresh.sqlite")
+    run_sweep(str(csv_path), fresh_path, n_samples=200)
+    for query in ("SELECT * FROM threat_locations",
+                  "SELECT des, last_obs, impact_probability, energy_mt, thermal_radius_km FROM threats"):
+        assert _table(db_path, query) == _table(fresh_path, query)
+    assert run_sweep(str(csv_path), db_path, n_samples=100)["n_recomputed"] == 11
+    # Hava patlaması bayrağı ve çarpma tipi aynı kaynaktan (giriş çözücüsü)
+    mismatched = _table(db_path, "SELECT t.des FROM threats t JOIN threat_locations l ON t.des = l.des "
+                                 "WHERE t.is_airburst != (l.impact_type = 'airburst')")
+    assert mismatched == []
+
+
+def test_load_rankings(tmp_path, sentry_rows):
+    csv_path, db_path = tmp_path / "sentry.csv", str(tmp_path / "sweep.sqlite")
+    with pytest.raises(FileNotFoundError):
+        load_rankings(db_path)
+    _write_rows(csv_path, sentry_rows)
+    run_sweep(str(csv_path), db_path, n_samples=200)
+
+    ranking = load_rankings(db_path, "dense_urban", "expected_casualties", limit=5, offset=2)
+    assert ranking["total"] == 12 and ranking["sweep"]["id"] == 1
+    assert ranking["locations"] == sorted(location["name"] for location in REPRESENTATIVE_LOCATIONS)
+    assert [row["rank"] for row in ranking["rankings"]] == [3, 4, 5, 6, 7]
+    full = load_rankings(db_path, "dense_urban", "expected_casualties", limit=100)["rankings"]
+    values = [row["expected_casualties"] for row in full]
+    assert values == sorted(values, reverse=True)
+    assert [row["des"] for row in full[2:7]] == [row["des"] for row in ranking["rankings"]]
+    ocean = load_rankings(db_path, "open_ocean", limit=100)["rankings"]
+    assert all(row["base_population"] == 0 for row in ocean)
+    with pytest.raises(ValueError):
+        load_rankings(db_path, "mars")
+    with pytest.raises(ValueError):
+        load_rankings(db_path, rank_by="diameter_m")
@@ -0,0 +1,76 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from meteor_physics import (
+    airblast_radii_km_from_energy_j,
+    crater_diameter_m_pi_scaling,
+    simulate_atmospheric_entry_vectorized,
+    thermal_radius_m_from_yield,
+)
+from scientific_functions import UNCERTAINTY_ENTRY_KWARGS, _impact_chain, run_uncertainty_analysis
+
+DISTRIBUTIONS_PATH = os.path.join(os.path.dirname(__file__), "datasets", "parameter_uncertainty_distributions.json")
+
+
+@pytest.fixture(scope="module")
+def distributions():
+    with open(DISTRIBUTIONS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_vectorized_chain_matches_scalar_physics():
+    d = np.array([20.0, 45.0, 120.0, 800.0])
+    rho = np.array([3300.0, 7800.0, 2700.0, 5300.0])
+    v = np.array([19.0, 25.0, 17.0, 30.0])
+    a = np.array([18.0, 60.0, 45.0, 80.0])
+    chain = _impact_chain(d, rho, v, a, 1e6, 2500.0)
+    # Airburst bayrağı, patlama irtifası ve kalan enerji giriş çözücüsünden gelir
+    mass = np.pi / 6 * d ** 3 * rho
+    entry = simulate_atmospheric_entry_vectorized(mass, d, v, a, rho, 1e6, dtype=np.float32, **UNCERTAINTY_ENTRY_KWARGS)
+    np.testing.assert_array_equal(chain["is_airburst"], entry["is_airburst"])
+    assert chain["is_airburst"].any() and not chain["is_airburst"].all()
+    for i in range(d.size):
+        airburst = bool(entry["is_airburst"][i])
+        energy_j = chain["energy_mt"][i] * 4.184e15
+        assert energy_j == pytest.approx(0.5 * mass[i] * (v[i] * 1000) ** 2, rel=1e-9)
+        m_imp, v_imp = float(entry["mass_impact_kg"][i]), float(entry["velocity_impact_kms"][i]) * 1000
+        impact_j = 0.5 * m_imp * v_imp ** 2
+        assert chain["impact_energy_mt"][i] * 4.184e15 == pytest.approx(impact_j, rel=1e-9)
+        effect_j = energy_j - impact_j if airburst else impact_j
+        burst_m = float(entry["airburst_altitude_m"][i]) if airburst else 0.0
+        assert chain["airburst_altitude_km"][i] * 1000 == pytest.approx(burst_m)
+        thermal = thermal_radius_m_from_yield(effect_j, is_airburst=airburst) / 1000
+        assert chain["thermal_radius_km"][i] == pytest.approx(thermal, rel=1e-9)
+        blast = airblast_radii_km_from_energy_j(effect_j, burst_m)
+        for psi in ("1_psi", "5_psi", "20_psi"):
+            assert chain[f"blast_{psi}_km"][i] == pytest.approx(blast[f"{psi}_km"], rel=1e-9)
+        d_imp = (6 * m_imp / (np.pi * rho[i])) ** (1 / 3)
+        crater = 0.0 if airburst else crater_diameter_m_pi_scaling(d_imp, v_imp, rho[i], 2500.0, a[i])
+        assert chain["crater_diameter_m"][i] == pytest.approx(crater, rel=1e-9)
+
+
+def test_uncertainty_analysis_samples_json_marginals(distributions):
+    params = {"mass_kg": 1e10, "velocity_kms": 20.0, "angle_deg": 45.0, "density_kgm3": 2700.0, "spectral_type": "S"}
+    result = run_uncertainty_analysis(params, distributions, n_samples=20_000, seed=3)
+    marginals = result["parameter_uncertainties"]
+    assert marginals["density_kgm3"]["sigma"] == 500
+    assert marginals["velocity_kms"]["sigma"] == pytest.approx(2.0)
+    assert marginals["correlations"] == {"diameter_density": 0.3, "velocity_angle": -0.6}
+
+    for name, (lo, hi) in result["confidence_interval_95"].items():
+        assert lo <= result["median"][name] <= hi
+    # E ∝ d³: çap (geometrik σ 1.5) enerji varyansına en büyük katkı
+    assert result["uncertainty_contributors"][0]["parameter"] == "diameter_m"
+    contributions = result["variance_contributions"]["energy_mt"]
+    assert contributions["diameter_m"] > 0.5 and contributions["angle_deg"] < 0.05
+    assert 0.0 <= result["airburst_probability"] <= 1.0
+
+    again = run_uncertainty_analysis(params, distributions, n_samples=20_000, seed=3)
+    assert again["median"] == result["median"]
+
+
+def test_uncertainty_analysis_without_distributions():
+    assert run_uncertainty_analysis({"mass_kg": 1e10, "velocity_kms": 20.0}, None) is None